@@ -1,7 +1,36 @@
-from .decision import build_decision_report, format_report, build_persistence_record
-from .schema import DECISION_REQUEST_V0, DECISION_BRIEF_V0, validate_request
-from .context_compress import compress_situation
-from .philosophy_check import detect_philosophy_conflicts
+"""
+aicw パッケージ
+
+公開 API は初回アクセス時にサブモジュールから読み込む（module __getattr__）。
+`import aicw.schema` だけで済む CLI が decision / safety まで import しないようにし、
+one-shot 実行の起動時間を抑える。
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:  # 型チェッカー / IDE 向け（実行時は遅延読み込み）
+    from .decision import build_decision_report, format_report, build_persistence_record
+    from .schema import DECISION_REQUEST_V0, DECISION_BRIEF_V0, validate_request
+    from .context_compress import CompressionBudget, compress_situation
+    from .stage_cache import StageCache
+    from .philosophy_check import detect_philosophy_conflicts
+
+# 公開名 → 定義元サブモジュール
+_LAZY_ATTRS: Dict[str, str] = {
+    "build_decision_report": "decision",
+    "format_report": "decision",
+    "build_persistence_record": "decision",
+    "DECISION_REQUEST_V0": "schema",
+    "DECISION_BRIEF_V0": "schema",
+    "validate_request": "schema",
+    "compress_situation": "context_compress",
+    "CompressionBudget": "context_compress",
+    "StageCache": "stage_cache",
+    "detect_philosophy_conflicts": "philosophy_check",
+}
 
 __all__ = [
     "build_decision_report",
@@ -11,5 +40,20 @@ __all__ = [
     "DECISION_BRIEF_V0",
     "validate_request",
     "compress_situation",
+    "CompressionBudget",
+    "StageCache",
     "detect_philosophy_conflicts",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # 2 回目以降は通常の属性参照
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,225 @@
+"""
+aicw/aio.py
+
+asyncio サービスに組み込むための非同期ファサード
+
+背景:
+  build_decision_report / analyze_philosophy_tensor は CPU 処理、
+  KnowledgeBase.record は記録のたびに JSON ファイルを同期で書き出す。
+  asyncio ベースのゲートウェイからそのまま呼ぶと、その間イベントループ全体が止まる
+  （特に KB の保存がディスクに当たると全リクエストが詰まる）。
+
+設計:
+  - CPU 段は executor（既定: max_concurrency 本のスレッドプール。
+    ProcessPoolExecutor など任意の Executor を渡せる）で実行し、結果を await する
+  - 同時実行数は Semaphore で max_concurrency までに抑える（背圧）。
+    枠が空くまで呼び出し側の await が待つ
+  - 取り消し: await 中のタスクが cancel されたら、まだ始まっていない処理は
+    executor から取り下げる。既に実行中の処理は止められないため、終わるまで枠を
+    保持してから CancelledError を呼び出し側へ伝える（枠が実際の負荷を表し続ける）
+  - KB への記録はメモリ上で即時に反映し、保存は束ねる:
+      * 最初の未保存記録から flush_interval 秒後に 1 回だけ書き出す（まとめ書き）
+      * 未保存が max_pending 件に達したら、その record() が書き出しを待つ（背圧）
+      * スナップショットの作成はループ上、ファイル書き込みは executor で行う
+      * flush() / aclose() / async with の終了で残りを書き出す
+  - ループ上の KB 操作（記録・検索）は単一スレッドで行うのでロック不要
+  - 外部ライブラリ不使用
+
+使用例:
+    from aicw.aio import AsyncEngine
+    from aicw.knowledge_base import KnowledgeBase
+
+    async with AsyncEngine(max_concurrency=4, kb=KnowledgeBase("data/kb.json")) as engine:
+        report = await engine.build_decision_report(request)
+        await engine.record(decision_hash, report["status"], reason_codes)
+        similar = engine.kb.find_similar(reason_codes, top_k=3)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from .knowledge_base import KnowledgeBase, _write_snapshot
+
+T = TypeVar("T")
+
+
+async def _wait_uninterrupted(fut: "asyncio.Future[Any]") -> None:
+    """fut の完了を待つ（待機中の取り消し要求は完了まで保留する）。"""
+    while not fut.done():
+        try:
+            await asyncio.wait({fut})
+        except asyncio.CancelledError:
+            continue
+    if not fut.cancelled():
+        fut.exception()  # 呼び出し側へは CancelledError を返すので、例外は回収だけする
+
+
+class AsyncEngine:
+    """
+    決定パイプラインと KB の awaitable 版。
+
+    Args:
+        executor: CPU 段を実行する Executor（None = 専用スレッドプールを作り、aclose で閉じる）
+        max_concurrency: 同時に executor へ渡す処理数の上限
+        kb: 記録先の KnowledgeBase（None = インメモリ）。path つきなら保存を束ねる
+        flush_interval: 最初の未保存記録から書き出しまでの秒数
+        max_pending: 未保存記録の上限（達したら record() が書き出しを待つ）
+    """
+
+    DEFAULT_CONCURRENCY = 4
+
+    def __init__(
+        self,
+        *,
+        executor: Optional[Executor] = None,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        kb: Optional[KnowledgeBase] = None,
+        flush_interval: float = 1.0,
+        max_pending: int = 256,
+    ) -> None:
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        if flush_interval < 0:
+            raise ValueError("flush_interval must be non-negative")
+        if max_pending <= 0:
+            raise ValueError("max_pending must be positive")
+        self.kb = kb if kb is not None else KnowledgeBase()
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional["asyncio.Task[None]"] = None
+        self._pending = 0
+        self._closed = False
+        self.writes = 0
+
+    async def __aenter__(self) -> "AsyncEngine":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+    # ------------------------------------------------------------------
+    # CPU 段
+    # ------------------------------------------------------------------
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_concurrency, thread_name_prefix="aicw-aio"
+            )
+        return self._executor
+
+    async def _submit(self, fn: Callable[..., T], *args: Any) -> T:
+        """枠を取らずに executor で実行する（取り消し時の扱いは run と同じ）。"""
+        cf = self._get_executor().submit(fn, *args)
+        fut = asyncio.wrap_future(cf)
+        try:
+            return await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            if not cf.cancel():
+                await _wait_uninterrupted(fut)
+            raise
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """fn(*args, **kwargs) を executor で実行する（同時実行数は max_concurrency まで）。"""
+        if self._closed:
+            raise RuntimeError("AsyncEngine is closed")
+        async with self._semaphore:
+            return await self._submit(functools.partial(fn, *args, **kwargs))
+
+    async def build_decision_report(
+        self, request: Dict[str, Any], **kwargs: Any
+    ) -> Dict[str, Any]:
+        from .decision import build_decision_report
+
+        return await self.run(build_decision_report, request, **kwargs)
+
+    async def build_validated_report(
+        self, data: Any, **kwargs: Any
+    ) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+        from .decision import build_validated_report
+
+        return await self.run(build_validated_report, data, **kwargs)
+
+    async def analyze_philosophy_tensor(self, situation: str, **kwargs: Any) -> Dict[str, Any]:
+        # bridge は aicw に依存する側なので、使うときにだけ読み込む
+        from bridge.po_core_bridge import analyze_philosophy_tensor
+
+        return await self.run(analyze_philosophy_tensor, situation, **kwargs)
+
+    async def analyze_decision_turn(
+        self, request: Dict[str, Any], **kwargs: Any
+    ) -> Dict[str, Any]:
+        from bridge.decision_turn import analyze_decision_turn
+
+        return await self.run(analyze_decision_turn, request, **kwargs)
+
+    # ------------------------------------------------------------------
+    # KB（記録は即時、保存は束ねる）
+    # ------------------------------------------------------------------
+    async def record(
+        self,
+        decision_hash: str,
+        status: str,
+        reason_codes: List[str],
+        blocked_by: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """KnowledgeBase.record と同じ。ファイルへの保存は flush_interval ごとにまとめる。"""
+        if self._closed:
+            raise RuntimeError("AsyncEngine is closed")
+        with self.kb._lock:
+            entry = self.kb._record(decision_hash, status, reason_codes, blocked_by)
+        self.kb._notify(entry)
+        if self.kb.path is None:
+            return entry
+        self._pending += 1
+        if self._pending >= self._max_pending:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.ensure_future(self._flush_later())
+        return entry
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.sleep(self._flush_interval)
+        finally:
+            self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """未保存の記録を 1 回の書き込みで保存する（同時の呼び出しは 1 回にまとまる）。"""
+        async with self._flush_lock:
+            path = self.kb.path
+            if not self._pending or path is None:
+                return
+            with self.kb._lock:
+                snapshot = self.kb._snapshot()
+            pending, self._pending = self._pending, 0
+            try:
+                await self._submit(_write_snapshot, path, snapshot)
+            except BaseException:
+                self._pending += pending   # 次の flush で書き直す
+                raise
+            self.writes += 1
+
+    async def aclose(self) -> None:
+        """タイマーを止め、残りを書き出し、専用 executor を閉じる。"""
+        if self._closed:
+            return
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        try:
+            await self.flush()
+        finally:
+            self._closed = True
+            if self._owns_executor and self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
@@ -0,0 +1,218 @@
+"""
+aicw/consistency.py
+
+複数リクエストの一貫性（決定性）検証エンジン
+
+背景:
+  scripts/check_consistency.py は 1 リクエストを同一プロセス内で repeat 回実行し、
+  毎回レポート全体の正規化 JSON をハッシュしていた。
+  同一プロセスではハッシュシードが固定のため、set の反復順序に依存するバグは
+  何回繰り返しても再現しない。
+
+設計:
+  - レポートはトップレベルキーごとにハッシュする（key_hashes）
+    → 不一致が出た時点でどのキーが揺れたかが分かり、2 回目の走査は不要
+  - 繰り返しは PYTHONHASHSEED を変えた別インタプリタで行う
+    1 プロセスが全リクエストをまとめて処理する（起動コストはシードごとに 1 回）
+  - 逐次サンプリング: 連続 stop_after_clean 回すべて一致したら打ち切る。
+    不一致が出たら連続カウントを戻し、hash_seeds を使い切るまで揺れ方を記録する
+  - 結果は JSON 化可能な dict（テストからも CLI からも同じ関数を使う）
+  - 外部ライブラリ不使用
+
+使用例:
+    from aicw.consistency import check_requests
+
+    report = check_requests([{"situation": "..."}, {"situation": "..."}])
+    assert report["consistent"], report["results"]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# ワーカー（python -m aicw.consistency）が aicw を import できるようにするパス
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_HASH_SEEDS = (1, 2, 3, 4, 5)
+DEFAULT_STOP_AFTER_CLEAN = 2
+
+
+def _canonical_json(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def hash_report(report: Dict[str, Any]) -> str:
+    """レポート全体の SHA-256（正規化 JSON）を返す（scripts/check_consistency と同じ値）。"""
+    return hashlib.sha256(_canonical_json(report).encode("utf-8")).hexdigest()
+
+
+def report_key_hashes(report: Dict[str, Any]) -> Dict[str, str]:
+    """トップレベルキーごとの SHA-256（値の正規化 JSON）を返す。"""
+    return {
+        key: hashlib.sha256(_canonical_json(value).encode("utf-8")).hexdigest()
+        for key, value in report.items()
+    }
+
+
+def combine_key_hashes(key_hashes: Dict[str, str]) -> str:
+    """キー別ハッシュからレポート全体のハッシュを合成する（キー順に依存しない）。"""
+    h = hashlib.sha256()
+    for key in sorted(key_hashes):
+        h.update(f"{key}\0{key_hashes[key]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def diff_keys(a: Dict[str, str], b: Dict[str, str]) -> List[str]:
+    """キー別ハッシュが異なる（または片方にしかない）トップレベルキー。"""
+    return sorted(k for k in set(a) | set(b) if a.get(k) != b.get(k))
+
+
+def hash_requests(requests: Iterable[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """各リクエストのレポートをキー別ハッシュにする（現在のプロセスで実行）。"""
+    from aicw.decision import build_decision_report
+
+    return [report_key_hashes(build_decision_report(r)) for r in requests]
+
+
+def _hash_in_subprocess(
+    requests: Sequence[Dict[str, Any]],
+    hash_seed: int,
+    timeout_s: Optional[float],
+) -> List[Dict[str, str]]:
+    env = dict(os.environ)
+    env["PYTHONHASHSEED"] = str(hash_seed)
+    env["PYTHONIOENCODING"] = "utf-8"
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (_REPO_ROOT, env.get("PYTHONPATH", "")) if p
+    )
+    payload = "".join(_canonical_json(r) + "\n" for r in requests)
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-m", "aicw.consistency"],
+            input=payload,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            env=env,
+            timeout=timeout_s,
+        )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(
+            f"worker timed out after {timeout_s}s (PYTHONHASHSEED={hash_seed})"
+        ) from None
+    except OSError as e:
+        raise RuntimeError(f"worker could not start (PYTHONHASHSEED={hash_seed}): {e}") from e
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"worker failed (PYTHONHASHSEED={hash_seed}): {proc.stderr.strip()[-500:]}"
+        )
+    lines = proc.stdout.splitlines()
+    if len(lines) != len(requests):
+        raise RuntimeError(
+            f"worker returned {len(lines)} results for {len(requests)} requests"
+        )
+    return [json.loads(line) for line in lines]
+
+
+def check_requests(
+    requests: Sequence[Dict[str, Any]],
+    *,
+    hash_seeds: Sequence[int] = DEFAULT_HASH_SEEDS,
+    stop_after_clean: int = DEFAULT_STOP_AFTER_CLEAN,
+    timeout_s: Optional[float] = 300.0,
+) -> Dict[str, Any]:
+    """
+    requests をまとめて検証し、JSON 化可能なレポートを返す。
+
+    Args:
+        requests: decision_request.v0 形式の dict のリスト（基準もワーカーと同じく
+            JSON を往復させた複製で計算するため、tuple などは list として扱われる）
+        hash_seeds: 別プロセス実行に使う PYTHONHASHSEED（先頭から順に最大 len 回）
+        stop_after_clean: 連続でこの回数すべて一致したら残りのシードを打ち切る
+        timeout_s: 1 プロセスあたりのタイムアウト秒数（None で無制限）
+
+    Returns:
+        {
+            "consistent": bool,
+            "requests": int,
+            "runs": [{"hash_seed": int, "mismatched": int}, ...],
+            "stopped_early": bool,
+            "results": [
+                {
+                    "index": int,
+                    "consistent": bool,
+                    "hash": str,                 # combine_key_hashes(基準)
+                    "diff_keys": [str],          # 揺れたトップレベルキー
+                    "diverged_seeds": [int],     # 不一致が出た PYTHONHASHSEED
+                },
+                ...
+            ],
+        }
+
+    Raises:
+        ValueError: hash_seeds が空 / stop_after_clean が 1 未満
+        RuntimeError: ワーカープロセスの異常終了 / 起動失敗 / タイムアウト
+    """
+    if not hash_seeds:
+        raise ValueError("hash_seeds must not be empty")
+    if stop_after_clean <= 0:
+        raise ValueError("stop_after_clean must be positive")
+
+    # ワーカーは JSON で受け取るので、基準も同じ値（tuple → list など）で計算する
+    requests = [json.loads(_canonical_json(r)) for r in requests]
+
+    # 基準: 現在のプロセス（親のハッシュシード）での結果
+    baseline = hash_requests(requests)
+    results: List[Dict[str, Any]] = [
+        {
+            "index": i,
+            "consistent": True,
+            "hash": combine_key_hashes(kh),
+            "diff_keys": [],
+            "diverged_seeds": [],
+        }
+        for i, kh in enumerate(baseline)
+    ]
+
+    runs: List[Dict[str, int]] = []
+    clean_streak = 0
+    for seed in hash_seeds:
+        if clean_streak >= stop_after_clean or not requests:
+            break
+        current = _hash_in_subprocess(requests, seed, timeout_s)
+        mismatched = 0
+        for result, base, other in zip(results, baseline, current):
+            keys = diff_keys(base, other)
+            if not keys:
+                continue
+            mismatched += 1
+            result["consistent"] = False
+            result["diff_keys"] = sorted(set(result["diff_keys"]) | set(keys))
+            result["diverged_seeds"].append(seed)
+        runs.append({"hash_seed": seed, "mismatched": mismatched})
+        clean_streak = clean_streak + 1 if mismatched == 0 else 0
+
+    return {
+        "consistent": all(r["consistent"] for r in results),
+        "requests": len(results),
+        "runs": runs,
+        "stopped_early": len(runs) < len(hash_seeds),
+        "results": results,
+    }
+
+
+def _worker_main() -> int:
+    """stdin の JSONL を処理し、キー別ハッシュを 1 行ずつ stdout に書く。"""
+    requests = [json.loads(line) for line in sys.stdin if line.strip()]
+    for kh in hash_requests(requests):
+        sys.stdout.write(_canonical_json(kh) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_worker_main())
@@ -1,23 +1,235 @@
-"""長文 situation をルールベースで圧縮するユーティリティ。"""
+"""
+長文 situation をルールベースで圧縮するユーティリティ。
+
+設計:
+  - 文分割と採点を 1 回の走査で行う（正規表現の finditer で文を切り出し、
+    その場でキーワードマッチャーにかける）
+  - キーワードは KeywordMatcher（トライ正規表現）で一括照合する
+    → 文数 × キーワード数の `kw in sent` をしない。照合は rule_packs と同じ正規化
+    （normalize_text: NFKC + casefold）後のテキストで行うので、全角・互換文字の入力も
+    判断エンジンと同じ語として採点される。正規化は 1 文につき 1 回
+  - 重みは判断エンジンが使う RuleSet（rule_packs。既定は有効な RuleSet）の
+    安全 / 速度 / 破壊 / ライフサイクル語 + 呼び出し側のキーワード（既定は _DEFAULT_KEYWORDS）。
+    ルールパックの語彙（builtin_en・業務別パック・ホットリロード後のパック）も採点に効く。
+    既定の圧縮器は RuleSet ごとに 1 つ作って使い回す
+  - 文の選択: (スコア降順, 出現順) のヒープから文字数予算・文数上限に収まる文を取り、
+    元の順序で連結する（貼り付けログにありがちな同一文の繰り返しは 1 回だけ残す）
+  - 分割・採点は文字数に対して線形。選択は heapify（線形）+ 上位から順に pop し、
+    予算が尽きるか文数上限に達したら止める
+  - 外部ライブラリ不使用
+
+使用例:
+    from aicw.context_compress import SituationCompressor, compress_situation
+
+    compress_situation(long_text, max_chars=220)
+    SituationCompressor().compress(long_text, max_chars=500, max_sentences=5)
+
+    # build_decision_report の前処理段（ガードは全文で実行し、その後で圧縮）
+    build_decision_report(request, compression=CompressionBudget(max_chars=2000))
+"""
 
 from __future__ import annotations
 
-from typing import List
+import heapq
+import re
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .keyword_matcher import KeywordMatcher, normalize_text
+
+if TYPE_CHECKING:
+    from .rule_packs import RuleSet
 
 _DEFAULT_KEYWORDS = [
     "安全", "品質", "リスク", "法令", "コンプラ", "期限", "至急", "納期",
     "privacy", "risk", "deadline", "compliance", "quality", "safety",
 ]
 
+# 表ごとの重み（1 文の中で同じ語は 1 回だけ数える）
+_WEIGHT_SAFETY = 3          # RuleSet.safety_codes（A 推奨の根拠になる語）
+_WEIGHT_DESTRUCTION = 3     # HARD_DESTRUCTION の語（#5 判定の根拠）
+_WEIGHT_SPEED = 2           # RuleSet.speed_codes（C 推奨の根拠）
+_WEIGHT_SOFT_DESTRUCTION = 2
+_WEIGHT_LIFECYCLE = 1
+_WEIGHT_KEYWORD = 2         # 呼び出し側のキーワード
+
+# 文 = 終端記号（。!?）までの並び、または改行までの並び
+_SENTENCE_RX = re.compile(r"[^。!?\n]*[。!?]|[^。!?\n]+")
+
+ScoredSentence = Tuple[int, str, int]   # (出現順, 文, スコア)
+
 
 def _split_sentences(text: str) -> List[str]:
-    normalized = (
-        text.replace("\r\n", "\n")
-        .replace("。", "。\n")
-        .replace("!", "!\n")
-        .replace("?", "?\n")
+    return [s for s in (m.group().strip() for m in _SENTENCE_RX.finditer(text)) if s]
+
+
+def _engine_weights(rules: "RuleSet") -> Dict[str, int]:
+    """RuleSet の語彙からキーワード → 重みを作る（1 語に複数の役割があれば重い方）。"""
+    # rule_packs は decision を読み込むので、読み込みは初回構築時まで遅らせる
+    from .rule_packs import HARD_DESTRUCTION, LIFECYCLE, SOFT_DESTRUCTION
+
+    weights: Dict[str, int] = {}
+
+    def add(kw: str, weight: int) -> None:
+        weights[kw] = max(weights.get(kw, 0), weight)
+
+    for kw in rules.safety_codes:
+        add(kw, _WEIGHT_SAFETY)
+    for kw in rules.speed_codes:
+        add(kw, _WEIGHT_SPEED)
+    for kw, bits in rules.flags.items():
+        if bits & HARD_DESTRUCTION:
+            add(kw, _WEIGHT_DESTRUCTION)
+        if bits & SOFT_DESTRUCTION:
+            add(kw, _WEIGHT_SOFT_DESTRUCTION)
+        if bits & LIFECYCLE:
+            add(kw, _WEIGHT_LIFECYCLE)
+    return weights
+
+
+class SituationCompressor:
+    """
+    文単位の採点・選択で situation を圧縮するエンジン。
+
+    Args:
+        keywords: 追加で重視するキーワード（normalize_text() で正規化して照合する。None = 既定）
+        use_engine_tables: 判断エンジンの語彙（RuleSet）を重みに含める
+        rules: 重みに使う RuleSet（None = 構築時点で有効な RuleSet）
+    """
+
+    def __init__(
+        self,
+        keywords: Optional[Iterable[str]] = None,
+        *,
+        use_engine_tables: bool = True,
+        rules: Optional["RuleSet"] = None,
+    ) -> None:
+        weights: Dict[str, int] = {}
+        if use_engine_tables:
+            if rules is None:
+                from .rule_packs import get_rule_set
+                rules = get_rule_set()
+            weights = _engine_weights(rules)
+        for kw in (_DEFAULT_KEYWORDS if keywords is None else keywords):
+            kw = normalize_text(kw)
+            if kw:
+                weights[kw] = max(weights.get(kw, 0), _WEIGHT_KEYWORD)
+        self._weights = weights
+        self._matcher = KeywordMatcher(weights, normalize=True, word_boundaries=True)
+
+    def score(self, sentence: str) -> int:
+        """1 文のスコア（出現したキーワードの重みの合計）。"""
+        weights = self._weights
+        return sum(weights[kw] for kw in self._matcher.scan(sentence))
+
+    def iter_scored(self, text: str) -> Iterator[ScoredSentence]:
+        """文を切り出しながら採点する（1 パス）。"""
+        index = 0
+        for m in _SENTENCE_RX.finditer(text):
+            sentence = m.group().strip()
+            if sentence:
+                yield index, sentence, self.score(sentence)
+                index += 1
+
+    def compress(
+        self,
+        text: str,
+        *,
+        max_chars: int = 220,
+        max_sentences: int = 3,
+    ) -> str:
+        """
+        max_chars 文字・max_sentences 文以内に収まるよう、スコアの高い文を
+        元の順序で残す。
+
+        1 文も予算に収まらない場合は最高スコアの文を切り詰めて "…" を付ける。
+        """
+        raw = (text or "").strip()
+        if len(raw) <= max_chars:
+            return raw
+        if max_chars <= 0 or max_sentences <= 0:
+            return ""
+
+        scored = list(self.iter_scored(raw))
+        if not scored:
+            return raw[: max_chars - 1].rstrip() + "…"
+
+        heap = [(-score, index) for index, _, score in scored]
+        heapq.heapify(heap)
+        picked: List[int] = []
+        seen = set()
+        used = 0
+        while heap and len(picked) < max_sentences:
+            _, index = heapq.heappop(heap)
+            sentence = scored[index][1]
+            # 連結時の区切り（半角スペース）も予算に含める。同じ文の繰り返しは 1 回だけ
+            cost = len(sentence) + (1 if picked else 0)
+            if used + cost > max_chars or sentence in seen:
+                continue
+            picked.append(index)
+            seen.add(sentence)
+            used += cost
+            if max_chars - used < 2:
+                break
+
+        if not picked:
+            best = min((-score, index) for index, _, score in scored)[1]
+            return scored[best][1][: max_chars - 1].rstrip() + "…"
+        picked.sort()
+        return " ".join(scored[i][1] for i in picked)
+
+
+# RuleSet → 既定キーワードの圧縮器（RuleSet が捨てられれば一緒に消える）
+_DEFAULT_COMPRESSORS: "weakref.WeakKeyDictionary[RuleSet, SituationCompressor]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_default_compressor(rules: Optional["RuleSet"] = None) -> SituationCompressor:
+    """rules（None = 有効な RuleSet）の語彙で重み付けした既定の圧縮器。"""
+    if rules is None:
+        from .rule_packs import get_rule_set
+        rules = get_rule_set()
+    compressor = _DEFAULT_COMPRESSORS.get(rules)
+    if compressor is None:
+        compressor = _DEFAULT_COMPRESSORS[rules] = SituationCompressor(rules=rules)
+    return compressor
+
+
+@dataclass(frozen=True)
+class CompressionBudget:
+    """build_decision_report の situation 圧縮段の予算。"""
+    max_chars: int = 2000
+    max_sentences: int = 20
+
+    def __post_init__(self) -> None:
+        if self.max_chars <= 0 or self.max_sentences <= 0:
+            raise ValueError("max_chars and max_sentences must be positive")
+
+
+def apply_budget(
+    text: str, budget: CompressionBudget, rules: Optional["RuleSet"] = None
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    text が予算を超えていれば圧縮する（rules の語彙で採点。None = 有効な RuleSet）。
+
+    Returns:
+        (圧縮後の text, 統計)。予算内なら統計は None。
+        統計: {"original_chars", "compressed_chars", "ratio", "max_chars"}
+        ratio = compressed_chars / original_chars（小数 4 桁）
+    """
+    if len(text) <= budget.max_chars:
+        return text, None
+    compressed = _get_default_compressor(rules).compress(
+        text, max_chars=budget.max_chars, max_sentences=budget.max_sentences
     )
-    return [s.strip() for s in normalized.split("\n") if s.strip()]
+    return compressed, {
+        "original_chars": len(text),
+        "compressed_chars": len(compressed),
+        "ratio": round(len(compressed) / len(text), 4),
+        "max_chars": budget.max_chars,
+    }
 
 
 def compress_situation(
@@ -31,33 +243,7 @@ def compress_situation(
     """situation を要点優先で圧縮する。"""
     if not enabled:
         return text
-
-    raw = (text or "").strip()
-    if len(raw) <= max_chars:
-        return raw
-
-    sentences = _split_sentences(raw)
-    if not sentences:
-        return raw[:max_chars]
-
-    kws = keywords if keywords is not None else _DEFAULT_KEYWORDS
-
-    prioritized: List[str] = []
-    remaining: List[str] = []
-    for sent in sentences:
-        if any(kw.lower() in sent.lower() for kw in kws):
-            prioritized.append(sent)
-        else:
-            remaining.append(sent)
-
-    picked: List[str] = []
-    for sent in prioritized + remaining:
-        if len(picked) >= max_sentences:
-            break
-        picked.append(sent)
-
-    compressed = " ".join(picked).strip()
-    if len(compressed) > max_chars:
-        compressed = compressed[: max_chars - 1].rstrip() + "…"
-
-    return compressed
+    compressor = (
+        _get_default_compressor() if keywords is None else SituationCompressor(keywords)
+    )
+    return compressor.compress(text, max_chars=max_chars, max_sentences=max_sentences)
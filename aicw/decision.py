@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-import hashlib
-import json
-from typing import Any, Dict, List, Tuple
+import itertools
+from typing import TYPE_CHECKING, AbstractSet, Any, Dict, List, Optional, Tuple
 
-from .safety import guard_text, scan_manipulation
-from .philosophy_check import detect_philosophy_conflicts
+from .philosophy_check import conflicts_from_signals, philosophy_signals
+
+# safety / rule_packs / context_compress / schema / keyword_matcher（と json・dataclasses 等の
+# 依存）は使う関数の中で読み込む（brief / check_consistency の one-shot CLI の起動時間を抑える）
+if TYPE_CHECKING:
+    from .context_compress import CompressionBudget
+    from .keyword_matcher import KeywordMatcher
+    from .rule_packs import RuleSet
+    from .stage_cache import StageCache
 
 
 # ---------------------------------------------------------------------------
@@ -63,6 +69,36 @@ _LIFECYCLE_KEYWORDS: List[str] = [
 ]
 
 
+# 生存構造判定の組み込み語彙（rule_packs の builtin パックに入る）
+_EXISTENCE_VOCABULARY: List[str] = (
+    [kw for keywords in _EXISTENCE_STRUCTURE_KEYWORDS.values() for kw in keywords]
+    + _HARD_DESTRUCTION_KEYWORDS
+    + _SOFT_DESTRUCTION_KEYWORDS
+    + _SAFE_TARGET_KEYWORDS
+    + _LIFECYCLE_KEYWORDS
+)
+
+# 破壊/循環の有無 → (judgment, distortion_risk, judgment_text)
+_EXISTENCE_JUDGMENTS: Dict[Tuple[bool, bool], Tuple[str, str, str]] = {
+    (True, False): (
+        "self_interested_destruction", "high",
+        "私益による破壊の可能性を検知。受益者・影響構造を確認し、代替案を検討してください。",
+    ),
+    (False, True): (
+        "lifecycle", "low",
+        "自然なライフサイクルの範囲内と判断。生命の循環として歪みは低いと評価。",
+    ),
+    (True, True): (
+        "unclear", "medium",
+        "ライフサイクルと破壊の両方を検知。文脈で「誰の私益か」を確認してください。",
+    ),
+    (False, False): (
+        "unclear", "low",
+        "明確な破壊・循環パターンは未検知。歪みのリスクは現時点で低いと評価。",
+    ),
+}
+
+
 def _analyze_existence(
     situation: str,
     constraints: List[str],
@@ -76,7 +112,31 @@ def _analyze_existence(
     Q2: 影響を受ける構造は何か？
     Q3: それは自然な循環か、私益による破壊か？
     """
-    all_text = " ".join([situation] + constraints + options)
+    from .rule_packs import get_rule_set
+
+    rules = get_rule_set()
+    hits = rules.scan(" ".join([situation] + constraints + options))
+    analysis, _ = _judge_existence(
+        hits, beneficiaries_in, affected_structures_in, bool(constraints), rules
+    )
+    return analysis
+
+
+def _judge_existence(
+    hits: AbstractSet[str],
+    beneficiaries_in: List[str],
+    affected_structures_in: List[str],
+    constraints_present: bool,
+    rules: RuleSet,
+) -> Tuple[Dict[str, Any], "ExistenceFeatures"]:
+    """
+    _analyze_existence の判定部。hits は rules.scan() の出現語（フィールドごとの和集合でよい）。
+    出現語の判定ビットを 1 回ずつ引くだけなので、ルールパックの数によらない。
+
+    Returns:
+        (existence_analysis, 特徴量)。特徴量は _get_templates() のキー
+    """
+    mask = rules.mask(hits)
 
     # Q1: 受益者
     beneficiaries: List[str] = beneficiaries_in if beneficiaries_in else [
@@ -87,41 +147,17 @@ def _analyze_existence(
     if affected_structures_in:
         detected_structures = affected_structures_in
     else:
-        detected_structures = [
-            layer for layer, keywords in _EXISTENCE_STRUCTURE_KEYWORDS.items()
-            if any(kw in all_text for kw in keywords)
-        ]
+        detected_structures = rules.detected_layers(mask)
         if not detected_structures:
             detected_structures = ["不明（入力に affected_structures を追加すると精度が上がります）"]
 
     # Q3: 自然な循環か、私益による破壊か（P2a: 2層判定）
-    # HARD: 文脈不問で破壊
-    has_hard_destruction = any(kw in all_text for kw in _HARD_DESTRUCTION_KEYWORDS)
-    # SOFT: 安全対象語が同テキストに存在する場合は除外
-    has_safe_target = any(kw in all_text for kw in _SAFE_TARGET_KEYWORDS)
-    has_soft_destruction = (
-        any(kw in all_text for kw in _SOFT_DESTRUCTION_KEYWORDS)
-        and not has_safe_target
-    )
-    has_destruction = has_hard_destruction or has_soft_destruction
-    has_lifecycle = any(kw in all_text for kw in _LIFECYCLE_KEYWORDS)
-
-    if has_destruction and not has_lifecycle:
-        judgment = "self_interested_destruction"
-        distortion_risk = "high"
-        judgment_text = "私益による破壊の可能性を検知。受益者・影響構造を確認し、代替案を検討してください。"
-    elif has_lifecycle and not has_destruction:
-        judgment = "lifecycle"
-        distortion_risk = "low"
-        judgment_text = "自然なライフサイクルの範囲内と判断。生命の循環として歪みは低いと評価。"
-    elif has_destruction and has_lifecycle:
-        judgment = "unclear"
-        distortion_risk = "medium"
-        judgment_text = "ライフサイクルと破壊の両方を検知。文脈で「誰の私益か」を確認してください。"
-    else:
-        judgment = "unclear"
-        distortion_risk = "low"
-        judgment_text = "明確な破壊・循環パターンは未検知。歪みのリスクは現時点で低いと評価。"
+    # HARD: 文脈不問で破壊 / SOFT: 安全対象語が同テキストに存在する場合は除外
+    has_destruction, has_lifecycle = rules.existence_signals(mask)
+
+    judgment, distortion_risk, judgment_text = _EXISTENCE_JUDGMENTS[
+        (has_destruction, has_lifecycle)
+    ]
 
     # P3: 影響スコア（0-8）
     # 検出された構造層数 + リスクボーナス
@@ -129,6 +165,14 @@ def _analyze_existence(
     risk_bonus = {"low": 0, "medium": 3, "high": 5}.get(distortion_risk, 0)
     impact_score = min(structure_count + risk_bonus, 8)
 
+    features: ExistenceFeatures = (
+        any("不明" in b for b in beneficiaries),
+        structure_count < len(detected_structures),
+        distortion_risk,
+        judgment,
+        _impact_bucket(impact_score),
+        constraints_present,
+    )
     return {
         "question_1_beneficiaries": beneficiaries,
         "question_2_affected_structures": detected_structures,
@@ -136,7 +180,7 @@ def _analyze_existence(
         "distortion_risk": distortion_risk,
         "judgment_text": judgment_text,
         "impact_score": impact_score,
-    }
+    }, features
 
 
 def _as_list(x: Any) -> List[str]:
@@ -173,17 +217,19 @@ _NOT_SELECTED_CODES: Dict[str, Dict[str, str]] = {
 }
 
 
-def _choose_recommendation(constraints_text: str) -> Tuple[str, List[str], str]:
+def _choose_recommendation(
+    constraint_hits: AbstractSet[str], rules: RuleSet
+) -> Tuple[str, List[str], str]:
     """
     P0: 超単純なルール。
     - 安全/リスク系 → A  (reason codes: SAFETY_FIRST / RISK_AVOIDANCE / COMPLIANCE_FIRST / QUALITY_FIRST)
     - スピード/期限系 → C (reason codes: SPEED_FIRST / DEADLINE_DRIVEN / URGENCY_FIRST)
     - それ以外 → B       (reason codes: NO_CONSTRAINTS)
-    """
-    t = constraints_text or ""
 
-    safety_codes = sorted({v for k, v in _SAFETY_WORD_CODES.items() if k in t})
-    speed_codes = sorted({v for k, v in _SPEED_WORD_CODES.items() if k in t})
+    constraint_hits は制約テキストに対する rules.scan() の出現語。
+    語 → コードはルールパックで追加できる（上記は builtin の語彙）。
+    """
+    safety_codes, speed_codes = rules.recommendation_codes(constraint_hits)
 
     if safety_codes:
         label = ", ".join(safety_codes)
@@ -232,14 +278,87 @@ _EXISTENCE_ALTERNATIVES_STANDARD: List[str] = [
 ]
 
 
-def _build_existence_alternatives(detected_kws: List[str]) -> List[str]:
+# ---------------------------------------------------------------------------
+# 英語の組み込み語彙（rule_packs の builtin_en パック。英語・日英混在の入力向け）
+# 照合は正規化（NFKC + casefold）後の単語単位（語尾 s / es / ed / d / ing は許す）なので、
+# 語は小文字の原形で書く（"dominate" は "predominate" には一致しない）
+# ---------------------------------------------------------------------------
+_EN_SAFETY_WORD_CODES: Dict[str, str] = {
+    "safety": "SAFETY_FIRST",
+    "risk": "RISK_AVOIDANCE",
+    "accident": "SAFETY_FIRST",
+    "compliance": "COMPLIANCE_FIRST",
+    "legal": "COMPLIANCE_FIRST",
+    "regulatory": "COMPLIANCE_FIRST",
+    "quality": "QUALITY_FIRST",
+}
+_EN_SPEED_WORD_CODES: Dict[str, str] = {
+    "speed": "SPEED_FIRST",
+    "quickly": "SPEED_FIRST",
+    "deadline": "DEADLINE_DRIVEN",
+    "urgent": "URGENCY_FIRST",
+    "asap": "URGENCY_FIRST",
+}
+_EN_EXISTENCE_STRUCTURE_KEYWORDS: Dict[str, List[str]] = {
+    "個人": [
+        "privacy", "dignity", "health", "individual", "personal", "wellbeing",
+        "well-being", "emotion",
+    ],
+    "関係": [
+        "family", "community", "trust", "team", "organization", "organisation",
+        "colleague", "customer", "partner", "stakeholder", "client", "friend", "user",
+        "resident",
+    ],
+    "社会": [
+        "society", "social", "fairness", "diversity", "democracy", "legislation",
+        "regulation", "market", "industry", "employment", "labor", "labour", "culture",
+        "education", "public", "infrastructure", "economy", "economic",
+    ],
+    "認知": [
+        "autonomy", "judgment", "judgement", "thinking", "decision-making", "freedom",
+        "choice", "knowledge", "learning", "memory", "information", "expression",
+    ],
+    "生態": [
+        "environment", "sustainable", "sustainability", "ecosystem", "ecology",
+        "energy", "resource", "climate", "water", "waste", "recycling", "biodiversity",
+    ],
+}
+# 破壊キーワード → 再フレーミング提案を共有する日本語キーワード
+_EN_HARD_DESTRUCTION_KEYWORDS: Dict[str, str] = {
+    "destroy": "破壊", "crush": "潰す", "monopolize": "独占", "monopolise": "独占",
+    "monopoly": "独占", "dominate": "支配", "annihilate": "壊滅", "eradicate": "抹消",
+    "hijack": "乗っ取る", "trample": "踏みにじる",
+}
+_EN_SOFT_DESTRUCTION_KEYWORDS: Dict[str, str] = {
+    "exclude": "排除", "suppress": "抑え込む", "obstruct": "妨害", "hinder": "妨げる",
+    "silence": "黙らせる",
+}
+_EN_SAFE_TARGET_KEYWORDS: List[str] = [
+    "risk", "issue", "problem", "bug", "error", "accident", "damage", "disaster",
+    "leak", "violation", "fraud", "defect", "outage", "mistake", "failure",
+    "threat", "infection", "noise", "alert", "spam", "vulnerability",
+]
+_EN_LIFECYCLE_KEYWORDS: List[str] = [
+    "sunset", "retire", "phase-out", "end-of-life", "shutdown", "migrate", "migration",
+    "transition", "replace", "renewal", "closure", "discontinue", "deprecate",
+    "decommission", "graduation",
+]
+
+
+def _build_existence_alternatives(
+    detected_kws: List[str],
+    alternatives: Optional[Dict[str, str]] = None,
+) -> List[str]:
     """
     No-Go #5 blocked 時の safe_alternatives を、検出キーワードに応じて具体化する。
     先頭 1-2 件はキーワード固有の再フレーミング提案、残りは標準 3 案。
+    alternatives はキーワード → 提案（None = _DESTRUCTION_ALTERNATIVES）。
     """
+    if alternatives is None:
+        alternatives = _DESTRUCTION_ALTERNATIVES
     specific: List[str] = []
     for kw in detected_kws[:2]:
-        alt = _DESTRUCTION_ALTERNATIVES.get(kw)
+        alt = alternatives.get(kw)
         if alt:
             entry = f"「{kw}」→ {alt}"
             if entry not in specific:
@@ -252,47 +371,133 @@ def _build_existence_alternatives(detected_kws: List[str]) -> List[str]:
     return result
 
 
-def _build_next_questions(
-    existence_analysis: Dict[str, Any],
-    constraints: List[str],
-) -> List[str]:
-    """
-    existence_analysis の内容に応じてコンテキスト依存の次の質問を生成する。
-    最大 6 件を返す。
-    """
-    questions: List[str] = [
-        "成功の定義は？（数字で言える？）",
-        "失敗した時、最悪どこまで起きる？",
-    ]
+# ---------------------------------------------------------------------------
+# next_questions / uncertainties / counterarguments（特徴量 → 事前計算した文言の表）
+# ---------------------------------------------------------------------------
+# existence_analysis の特徴量:
+#   (受益者が不明, 影響構造が不明, distortion_risk, judgment, 影響スコア帯, 制約あり)
+# 3 つのビルダーの分岐はこの 6 値だけで決まる。影響スコア帯は 0（< 4）/ 1（>= 4）
+ExistenceFeatures = Tuple[bool, bool, str, str, int, bool]
+
+# (next_questions, uncertainties, counterarguments)
+ExistenceTemplates = Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]
+
+_IMPACT_BUCKET_THRESHOLD = 4
+_RISK_LEVELS = ("low", "medium", "high")
+_JUDGMENT_VALUES = ("unclear", "lifecycle", "self_interested_destruction")
+
+_TEMPLATES: Optional[Dict[ExistenceFeatures, ExistenceTemplates]] = None
 
+
+def _impact_bucket(impact_score: int) -> int:
+    return 1 if impact_score >= _IMPACT_BUCKET_THRESHOLD else 0
+
+
+def _existence_features(
+    existence_analysis: Dict[str, Any], constraints_present: bool
+) -> ExistenceFeatures:
+    """existence_analysis（dict のみ）から特徴量を求める。キーが無いときは既定値で扱う。"""
     beneficiaries = existence_analysis.get("question_1_beneficiaries", [])
     structures = existence_analysis.get("question_2_affected_structures", [])
-    judgment = existence_analysis.get("question_3_judgment", "unclear")
-    distortion_risk = existence_analysis.get("distortion_risk", "low")
-    impact_score = existence_analysis.get("impact_score", 0)
+    return (
+        any("不明" in b for b in beneficiaries),
+        any("不明" in s for s in structures),
+        existence_analysis.get("distortion_risk", "low"),
+        existence_analysis.get("question_3_judgment", "unclear"),
+        _impact_bucket(existence_analysis.get("impact_score", 0)),
+        constraints_present,
+    )
 
-    beneficiaries_unknown = any("不明" in b for b in beneficiaries)
-    structures_unknown = any("不明" in s for s in structures)
 
+def _derive_templates(features: ExistenceFeatures) -> ExistenceTemplates:
+    """1 つの特徴量に対する 3 種の文言（表の構築時にだけ呼ぶ）。"""
+    (beneficiaries_unknown, structures_unknown, distortion_risk, judgment,
+     impact_bucket, constraints_present) = features
+
+    # next_questions（最大 6 件）
+    questions: List[str] = [
+        "成功の定義は？（数字で言える？）",
+        "失敗した時、最悪どこまで起きる？",
+    ]
     if beneficiaries_unknown:
         questions.append("受益者は誰か、具体的に名前や役割で挙げられますか？")
-
     if structures_unknown:
         questions.append("影響を受ける構造（個人/関係/社会/認知/生態）を一つでも挙げられますか？")
     else:
         questions.append("影響を受ける人は誰？（チーム外も含む）")
-
     if distortion_risk == "medium":
         questions.append("「誰の私益か」「誰が損するか」を一文で整理できますか？")
     elif judgment == "lifecycle":
         questions.append("移行・終了で影響を受ける人への支援計画はありますか？")
-    elif impact_score >= 4:
+    elif impact_bucket:
         questions.append("影響を受ける構造への緩和策・代替手段は検討しましたか？")
-
-    if not constraints:
+    if not constraints_present:
         questions.append("制約（安全/法令/品質/期限）を一つ明示できますか？")
 
-    return questions[:6]
+    # uncertainties（最大 5 件）
+    uncertainties: List[str] = [
+        "成功の定義（何が達成できれば勝ちか）が未確定の可能性。",
+    ]
+    if beneficiaries_unknown:
+        uncertainties.append("受益者（誰がどう得をするか）が未特定のため、想定外の利害が生じる可能性。")
+    if structures_unknown:
+        uncertainties.append("影響を受ける構造が未特定のため、外部性の見積もりが不十分な可能性。")
+    else:
+        uncertainties.append("失敗した場合の被害（誰に何が起きるか）が未確定の可能性。")
+    if distortion_risk == "medium":
+        uncertainties.append("歪みリスクが中程度：ライフサイクルと破壊の混在により、誰の利益かが曖昧な可能性。")
+    if impact_bucket:
+        uncertainties.append("複数の生存構造層に影響するため、未把握の外部性が残る可能性。")
+    if not constraints_present:
+        uncertainties.append("制約が不明確なため、選択肢の安全/品質基準が未確定の可能性。")
+
+    # counterarguments（最大 4 件）
+    counterarguments: List[str] = [
+        "前提が足りない可能性がある（不足情報があるなら保留も選択肢）。",
+    ]
+    if beneficiaries_unknown:
+        counterarguments.append("受益者が未特定のまま進めると、意図しない人が損をするリスクがある。")
+    if structures_unknown:
+        counterarguments.append("影響構造を明示しないまま決定すると、後から取り返しのつかない外部性が生じる可能性がある。")
+    else:
+        counterarguments.append("短期の最適化が外部性を増やす可能性がある（影響者を確認）。")
+    if distortion_risk == "medium":
+        counterarguments.append("「誰の私益か」が曖昧なまま進めると、短期最適が長期歪みにつながる可能性がある。")
+    elif judgment == "lifecycle":
+        counterarguments.append("移行・終了のプロセスで影響を受ける人への配慮が不足すると、関係の破綻につながる可能性がある。")
+    elif impact_bucket:
+        counterarguments.append("複数層への影響があるため、段階的実施・中間評価を検討すべき。")
+
+    return tuple(questions[:6]), tuple(uncertainties[:5]), tuple(counterarguments[:4])
+
+
+def _get_templates(features: ExistenceFeatures) -> ExistenceTemplates:
+    """特徴量 → 3 種の文言（全組み合わせを初回に事前計算し、以後は表引きだけ）。"""
+    global _TEMPLATES
+    if _TEMPLATES is None:
+        flags = (False, True)
+        _TEMPLATES = {
+            f: _derive_templates(f)
+            for f in itertools.product(
+                flags, flags, _RISK_LEVELS, _JUDGMENT_VALUES, (0, 1), flags
+            )
+        }
+    templates = _TEMPLATES.get(features)
+    if templates is None:
+        # 想定外の distortion_risk / judgment（手組みの existence_analysis）は都度求める
+        templates = _derive_templates(features)
+    return templates
+
+
+def _build_next_questions(
+    existence_analysis: Dict[str, Any],
+    constraints: List[str],
+) -> List[str]:
+    """
+    existence_analysis の内容に応じてコンテキスト依存の次の質問を生成する。
+    最大 6 件を返す。
+    """
+    return list(_get_templates(_existence_features(existence_analysis, bool(constraints)))[0])
 
 
 def _build_uncertainties(
@@ -303,36 +508,7 @@ def _build_uncertainties(
     existence_analysis の内容に応じてコンテキスト依存の不確実性リストを生成する。
     最大 5 件を返す。
     """
-    items: List[str] = [
-        "成功の定義（何が達成できれば勝ちか）が未確定の可能性。",
-    ]
-
-    beneficiaries = existence_analysis.get("question_1_beneficiaries", [])
-    structures = existence_analysis.get("question_2_affected_structures", [])
-    distortion_risk = existence_analysis.get("distortion_risk", "low")
-    impact_score = existence_analysis.get("impact_score", 0)
-
-    beneficiaries_unknown = any("不明" in b for b in beneficiaries)
-    structures_unknown = any("不明" in s for s in structures)
-
-    if beneficiaries_unknown:
-        items.append("受益者（誰がどう得をするか）が未特定のため、想定外の利害が生じる可能性。")
-
-    if structures_unknown:
-        items.append("影響を受ける構造が未特定のため、外部性の見積もりが不十分な可能性。")
-    else:
-        items.append("失敗した場合の被害（誰に何が起きるか）が未確定の可能性。")
-
-    if distortion_risk == "medium":
-        items.append("歪みリスクが中程度：ライフサイクルと破壊の混在により、誰の利益かが曖昧な可能性。")
-
-    if impact_score >= 4:
-        items.append("複数の生存構造層に影響するため、未把握の外部性が残る可能性。")
-
-    if not constraints:
-        items.append("制約が不明確なため、選択肢の安全/品質基準が未確定の可能性。")
-
-    return items[:5]
+    return list(_get_templates(_existence_features(existence_analysis, bool(constraints)))[1])
 
 
 def _build_counterarguments(
@@ -340,37 +516,9 @@ def _build_counterarguments(
 ) -> List[str]:
     """
     existence_analysis の内容に応じてコンテキスト依存の反論リストを生成する。
-    最大 4 件を返す。
+    最大 4 件を返す（制約の有無には依存しない）。
     """
-    items: List[str] = [
-        "前提が足りない可能性がある（不足情報があるなら保留も選択肢）。",
-    ]
-
-    beneficiaries = existence_analysis.get("question_1_beneficiaries", [])
-    structures = existence_analysis.get("question_2_affected_structures", [])
-    judgment = existence_analysis.get("question_3_judgment", "unclear")
-    distortion_risk = existence_analysis.get("distortion_risk", "low")
-    impact_score = existence_analysis.get("impact_score", 0)
-
-    beneficiaries_unknown = any("不明" in b for b in beneficiaries)
-    structures_unknown = any("不明" in s for s in structures)
-
-    if beneficiaries_unknown:
-        items.append("受益者が未特定のまま進めると、意図しない人が損をするリスクがある。")
-
-    if structures_unknown:
-        items.append("影響構造を明示しないまま決定すると、後から取り返しのつかない外部性が生じる可能性がある。")
-    else:
-        items.append("短期の最適化が外部性を増やす可能性がある（影響者を確認）。")
-
-    if distortion_risk == "medium":
-        items.append("「誰の私益か」が曖昧なまま進めると、短期最適が長期歪みにつながる可能性がある。")
-    elif judgment == "lifecycle":
-        items.append("移行・終了のプロセスで影響を受ける人への配慮が不足すると、関係の破綻につながる可能性がある。")
-    elif impact_score >= 4:
-        items.append("複数層への影響があるため、段階的実施・中間評価を検討すべき。")
-
-    return items[:4]
+    return list(_get_templates(_existence_features(existence_analysis, True))[2])
 
 
 _DISCLAIMER = (
@@ -408,14 +556,83 @@ def _build_impact_map(existence_analysis: Dict[str, Any]) -> str:
     return "\n".join(rows)
 
 
-def build_decision_report(request: Dict[str, Any]) -> Dict[str, Any]:
+def _call(stage: str, fn: Any, *args: Any) -> Any:
+    """cache なしの段実行（StageCache.run と同じ呼び出し形）。"""
+    return fn(*args)
+
+
+# format_report() の出力の冒頭（situation の直前まで）。固定文で操作語を含まない
+_REPORT_HEAD = "=== Decision Support (P0) ===\n\n[Input]\n- situation: "
+
+_MANIPULATION_MATCHER: Optional["KeywordMatcher"] = None
+
+
+def _get_manipulation_matcher() -> "KeywordMatcher":
+    global _MANIPULATION_MATCHER
+    if _MANIPULATION_MATCHER is None:
+        from .keyword_matcher import KeywordMatcher
+        from .safety import MANIPULATION_KEYWORDS
+        _MANIPULATION_MATCHER = KeywordMatcher(MANIPULATION_KEYWORDS)
+    return _MANIPULATION_MATCHER
+
+
+def _rendered_fields(rendered: str, situation: str) -> List[str]:
+    """
+    format_report() の出力を situation とそれ以降に分ける（操作語の照合をフィールド単位で
+    キャッシュするため）。境界は ": " と改行で、どの操作語もまたがない。
+    """
+    head = len(_REPORT_HEAD)
+    if situation and rendered.startswith(situation, head):
+        return [situation, rendered[head + len(situation):]]
+    return [rendered]
+
+
+def _scan_fields(rules: RuleSet, texts: List[str]) -> AbstractSet[str]:
+    """cache なしの語彙照合（StageCache.scan_union と同じ結果。各テキストを 1 回ずつ走査）。"""
+    hits: AbstractSet[str] = frozenset()
+    for text in texts:
+        hits = hits | rules.scan(text)
+    return hits
+
+
+def build_decision_report(
+    request: Dict[str, Any],
+    *,
+    compression: Optional[CompressionBudget] = None,
+    cache: Optional["StageCache"] = None,
+    rules: Optional[RuleSet] = None,
+) -> Dict[str, Any]:
     """
     P0: オフライン・非公開用の最小意思決定支援。
     - #6: 機密っぽい入力があれば停止して代替案を返す
     - #5: 私益による生存構造の破壊を検知したら停止する
     - #3: 肩書・地位は入力にあっても結論に使わない
     - #4: 出力に操作表現が混ざれば縮退（停止）する
+
+    compression を指定すると、#6 / #5 のガードを全文で通したあとで situation を
+    予算内に圧縮し、以降（推奨・哲学チェック・report["input"]・format_report・#4）は
+    圧縮後の文で処理する。圧縮した場合は report["input"]["compression"] に
+    元の文字数と圧縮率を記録する。
+
+    cache（StageCache）を渡すと、privacy ガード・生存構造の語彙照合・哲学チェック・
+    操作スキャン（いずれもフィールド単位）と推奨選択を入力内容ごとにメモ化する。
+    制約だけを直した場合、situation の走査はどの段もキャッシュから返る。
+    出力は cache なしの場合と同一。
+
+    rules（rule_packs.RuleSet）を省略すると、呼び出し時点で有効な RuleSet を使う。
+    1 回の呼び出しの中では同じ RuleSet を使い続ける（途中でホットリロードされても混ざらない）。
     """
+    from .safety import guard_fields, scan_manipulation, scan_privacy_risks
+
+    run = _call if cache is None else cache.run
+    if rules is None:
+        from .rule_packs import get_rule_set
+        rules = get_rule_set()
+
+    def scan(texts: List[str]) -> AbstractSet[str]:
+        if cache is None:
+            return _scan_fields(rules, texts)
+        return cache.scan_union("rule_scan", rules.matcher, texts)
     situation = str(request.get("situation", "")).strip()
     constraints = _as_list(request.get("constraints"))
     options_in = _as_list(request.get("options"))
@@ -432,8 +649,11 @@ def build_decision_report(request: Dict[str, Any]) -> Dict[str, Any]:
             options.append(defaults[i])
 
     # --- No-Go #6: privacy guard ---
-    blob = "\n".join([situation] + constraints + options)
-    allowed, redacted_blob, findings, dlp_summary = guard_text(blob)
+    # フィールドごとに走査し、改行で連結した全文の検知に組み立てる
+    fields = [situation] + constraints + options
+    allowed, redacted_blob, findings, dlp_summary = guard_fields(
+        fields, [run("guard", scan_privacy_risks, text) for text in fields]
+    )
     block_dlp = [f for f in findings if f.severity == "block"]
     warn_dlp = [f for f in findings if f.severity == "warn"]
 
@@ -456,27 +676,36 @@ def build_decision_report(request: Dict[str, Any]) -> Dict[str, Any]:
     # existence_analysis を早期に計算し、私益による破壊を止める
     # ※ options_in（ユーザー提供分のみ）を渡す。デフォルト補完後の options には
     #   "失敗を減らす" 等のシステム語が含まれ SAFE_TARGET 判定が汚染されるため。
-    existence_analysis = _analyze_existence(
-        situation, constraints, options_in,
-        beneficiaries_in, affected_structures_in,
+    # 語彙照合はフィールドごとに 1 回。制約の出現語は推奨選択にも使う
+    constraint_hits = scan(constraints)
+    existence_hits = scan([situation] + options_in) | constraint_hits
+    existence_analysis, existence_features = run(
+        "existence", _judge_existence,
+        existence_hits, beneficiaries_in, affected_structures_in, bool(constraints), rules,
     )
+    if cache is not None:
+        import copy
+        existence_analysis = copy.deepcopy(existence_analysis)
     if existence_analysis["question_3_judgment"] == "self_interested_destruction":
-        all_text = " ".join([situation] + constraints + options)
-        detected_kws = (
-            [kw for kw in _HARD_DESTRUCTION_KEYWORDS if kw in all_text]
-            + [kw for kw in _SOFT_DESTRUCTION_KEYWORDS if kw in all_text]
-        )
+        detected_kws = rules.destruction_keywords(scan([situation] + options) | constraint_hits)
         return {
             "status": "blocked",
             "blocked_by": "#5 Existence Ethics",
             "reason": "入力に私益による生存構造の破壊が検知されました。いったん停止します。",
             "detected": detected_kws,
-            "safe_alternatives": _build_existence_alternatives(detected_kws),
+            "safe_alternatives": _build_existence_alternatives(detected_kws, rules.alternatives),
         }
 
+    # --- 前処理: 長大な situation の圧縮（ガードは全文で通過済み）---
+    compression_info = None
+    if compression is not None:
+        from .context_compress import apply_budget
+        situation, compression_info = apply_budget(situation, compression, rules)
+
     # --- build report ---
-    constraints_text = " / ".join(constraints)
-    rec_id, reason_codes, explanation = _choose_recommendation(constraints_text)
+    rec_id, reason_codes, explanation = run(
+        "recommendation", _choose_recommendation, constraint_hits, rules
+    )
 
     # A: existence_analysis の結果を selection に接続
     existence_judgment = existence_analysis["question_3_judgment"]
@@ -500,11 +729,17 @@ def build_decision_report(request: Dict[str, Any]) -> Dict[str, Any]:
         reason_codes = reason_codes + ["EXISTENCE_IMPACT_OVERRIDE"]
 
     # Task8接続: 哲学的矛盾検知を selection.reason_codes に反映
-    philo_text = f"{situation} {explanation}"
-    for code in detect_philosophy_conflicts(philo_text):
+    # situation と explanation を別々に走査して合成（f"{situation} {explanation}" と同じ判定）
+    philo_signals = (
+        run("philosophy", philosophy_signals, situation)
+        | run("philosophy", philosophy_signals, explanation)
+    )
+    for code in conflicts_from_signals(philo_signals):
         if code not in reason_codes:
             reason_codes.append(code)
 
+    next_questions, uncertainties, counterarguments = _get_templates(existence_features)
+
     candidates = [
         {"id": cid, "summary": options[i], "not_selected_reason_code": (
             "N/A" if rec_id == cid else _NOT_SELECTED_CODES[rec_id][cid]
@@ -530,22 +765,30 @@ def build_decision_report(request: Dict[str, Any]) -> Dict[str, Any]:
             "reason_codes": reason_codes,
             "explanation": explanation,
         },
-        "counterarguments": _build_counterarguments(existence_analysis),
-        "uncertainties": _build_uncertainties(existence_analysis, constraints),
+        "counterarguments": list(counterarguments),
+        "uncertainties": list(uncertainties),
         "externalities": [
             "関係者の時間コスト",
             "品質/安全への影響",
             "（必要なら）環境負荷（計算量/端末負荷）",
         ],
-        "next_questions": _build_next_questions(existence_analysis, constraints),
+        "next_questions": list(next_questions),
         "existence_analysis": existence_analysis,
         "impact_map": _build_impact_map(existence_analysis),
         "disclaimer": _DISCLAIMER,
     }
 
+    if compression_info is not None:
+        report["input"]["compression"] = compression_info
+
     # --- No-Go #4: anti-manipulation guard (output) ---
     rendered = format_report(report)
-    hits = scan_manipulation(rendered)
+    if cache is None:
+        hits = scan_manipulation(rendered)
+    else:
+        hits = scan_manipulation(rendered, hits=cache.scan_union(
+            "manipulation", _get_manipulation_matcher(), _rendered_fields(rendered, situation)
+        ))
     block_hits = [h for h in hits if h.severity == "block"]
     warn_hits = [h for h in hits if h.severity == "warn"]
 
@@ -574,6 +817,27 @@ def build_decision_report(request: Dict[str, Any]) -> Dict[str, Any]:
     return report
 
 
+def build_validated_report(
+    data: Any,
+    *,
+    compression: Optional[CompressionBudget] = None,
+    rules: Optional[RuleSet] = None,
+) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+    """
+    ゲートウェイ向けの高速経路: 検査 + 正規化（1 パス）→ build_decision_report。
+
+    Returns:
+        (errors, report)。入力が decision_request.v0 として不正なら (errors, None)。
+        valid なら report は build_decision_report(data, compression=..., rules=...) と同一。
+    """
+    from .schema import validate_and_normalize
+
+    errors, request = validate_and_normalize(data)
+    if request is None:
+        return errors, None
+    return [], build_decision_report(request, compression=compression, rules=rules)
+
+
 def format_report(report: Dict[str, Any]) -> str:
     """
     人が読める形（P0）。
@@ -602,6 +866,12 @@ def format_report(report: Dict[str, Any]) -> str:
     lines.append("")
     lines.append("[Input]")
     lines.append(f"- situation: {report['input']['situation']}")
+    compressed = report["input"].get("compression")
+    if compressed:
+        lines.append(
+            f"- (situation は {compressed['original_chars']} 文字から"
+            f" {compressed['compressed_chars']} 文字に圧縮済み)"
+        )
     if report["input"]["constraints"]:
         lines.append(f"- constraints: {' / '.join(report['input']['constraints'])}")
     else:
@@ -710,6 +980,10 @@ def build_persistence_record(report: Dict[str, Any]) -> Dict[str, Any]:
     else:
         raise ValueError(f"unsupported report status: {status!r}")
 
+    # 永続化時のみ必要なため、起動コストを避けて遅延 import する
+    import hashlib
+    import json
+
     payload = json.dumps(out, ensure_ascii=False, sort_keys=True).encode("utf-8")
     out["record_hash"] = hashlib.sha256(payload).hexdigest()
     return out
@@ -0,0 +1,213 @@
+"""
+aicw/keyword_matcher.py
+
+複数のキーワード表を 1 回の走査で照合するための共有マッチャー。
+
+背景:
+  各モジュール（philosophy_check / safety / ensemble など）は
+  `any(kw in text for kw in KEYWORDS)` をそれぞれ独立に実行している。
+  同じテキストに対してこれを繰り返すと、語彙数 × 呼び出し数の走査が発生する。
+
+設計:
+  - 全キーワードを 1 本のトライ正規表現にコンパイルする
+  - テキストを先頭から 1 回走査し、各一致位置で「最長一致したキーワード」を拾う
+  - 最長一致に含まれる短いキーワード（部分文字列）は事前計算した包含表で補う
+    → `kw in text` と完全に同じ真偽を、全キーワード分まとめて得られる
+  - scan() の戻り値は frozenset。`kw in hits` は `kw in text` の代替として使える
+  - normalize=True なら NFKC + casefold 後のテキストで照合する（言語・表記幅・大小文字の
+    違う語彙を 1 つのマッチャーにまとめても、テキストの正規化は 1 回で済む）
+  - word_boundaries=True なら ASCII だけのキーワード（英語など）は単語単位で照合する
+    （前後が英数字でないこと。語尾 s / es / ed / d / ing は許す）
+    → "dominate" ⊂ "predominate"、"risk" ⊂ "asterisk" のような語の一部への誤一致を防ぐ。
+    日本語など ASCII 以外を含むキーワードは従来どおり部分一致
+  - 外部ライブラリ不使用
+
+使用例:
+    from aicw.keyword_matcher import KeywordMatcher
+
+    matcher = KeywordMatcher(["個人", "個人情報", "監視"])
+    hits = matcher.scan("個人情報を監視する")
+    "個人" in hits   # True（"個人情報" の部分文字列として補完される）
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """
+    照合用の正規化: NFKC（全角英数 → 半角、半角カナ → 全角 などの幅の統一）+ casefold。
+    ASCII だけのテキストは lower() と同じ結果になるので NFKC を省く。
+    """
+    if text.isascii():
+        return text.lower()
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def _build_trie(keywords: Iterable[str]) -> Dict[str, dict]:
+    root: Dict[str, dict] = {}
+    for kw in keywords:
+        node = root
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # 終端マーカー
+    return root
+
+
+# 1 つの選択（|）に並べる枝の上限。超えたら先頭文字の範囲で二分する
+_MAX_BRANCHES = 8
+
+
+def _alternation(branches: List[Tuple[str, str]]) -> str:
+    """
+    (先頭文字, 枝の正規表現) の列（先頭文字の昇順）を選択にする。
+
+    re は選択の枝を先頭から順に試すため、枝が多いと一致しない位置でも全枝を見る。
+    枝が多い場合は先頭文字の範囲で二分し、各段を文字クラス 1 回の判定で振り分ける
+    → 1 位置あたりの判定は枝数の対数（言語・語彙を足しても走査コストがほぼ増えない）。
+    """
+    if len(branches) <= _MAX_BRANCHES:
+        return "|".join(body for _, body in branches)
+    mid = len(branches) // 2
+    lower = f"[\x00-{re.escape(branches[mid - 1][0])}]"
+    return (
+        f"(?={lower})(?:{_alternation(branches[:mid])})"
+        f"|(?!{lower})(?:{_alternation(branches[mid:])})"
+    )
+
+
+# word_boundaries=True の ASCII キーワードの前後に許さない文字 / 許す語尾
+_WORD_CHAR = "[0-9A-Za-z]"
+_WORD_SUFFIX = "(?:s|es|ed|d|ing)?"
+
+
+def _is_word(keyword: str) -> bool:
+    return keyword.isascii()
+
+
+def _aligned_parts(keyword: str, registered: FrozenSet[str]) -> FrozenSet[str]:
+    """keyword 内で単語の区切りに揃う部分文字列のうち登録語のもの（単語単位の包含表）。"""
+    n = len(keyword)
+    starts = [i for i in range(n) if i == 0 or not keyword[i - 1].isalnum()]
+    ends = [j for j in range(1, n + 1) if j == n or not keyword[j].isalnum()]
+    return frozenset(
+        keyword[i:j] for i in starts for j in ends if i < j and keyword[i:j] in registered
+    )
+
+
+def _lookahead_pattern(vocab: List[str], word: bool) -> re.Pattern[str]:
+    # 先読みで包むと、各開始位置の最長一致を重なりを含めて findall 1 回で得られる。
+    # 先頭文字の文字クラスを前置して、一致しえない位置を正規表現エンジン内で読み飛ばす
+    pattern = _trie_to_pattern(_build_trie(vocab))
+    firsts = "".join(sorted({re.escape(kw[0]) for kw in vocab}))
+    if word:
+        # 語尾・単語境界を満たさなければ、同じ開始位置のより短い登録語に戻って試す
+        return re.compile(
+            f"(?=[{firsts}])(?<!{_WORD_CHAR})"
+            f"(?=({pattern}){_WORD_SUFFIX}(?!{_WORD_CHAR}))"
+        )
+    return re.compile(f"(?=[{firsts}])(?=({pattern}))")
+
+
+def _trie_to_pattern(node: Dict[str, dict]) -> str:
+    """トライを正規表現に変換する（貪欲 = 同一開始位置で最長一致）。"""
+    terminal = "" in node
+    branches = [
+        (ch, re.escape(ch) + _trie_to_pattern(child))
+        for ch, child in sorted(node.items())
+        if ch
+    ]
+    if not branches:
+        return ""
+    if len(branches) == 1:
+        body = branches[0][1]
+        if terminal:
+            return f"(?:{body})?"
+        return body
+    body = "(?:" + _alternation(branches) + ")"
+    return body + "?" if terminal else body
+
+
+class KeywordMatcher:
+    """
+    登録済みキーワードの「出現集合」を 1 パスで求めるマッチャー。
+
+    Args:
+        keywords: 照合するキーワード（重複・空文字は無視）
+        normalize: True なら キーワードと照合テキストの両方を normalize_text() で
+                   正規化してから照合する（scan() が返すのは正規化後のキーワード）
+        word_boundaries: True なら ASCII だけのキーワードを単語単位で照合する
+                   （ASCII 以外を含むキーワードは部分一致のまま）
+    """
+
+    def __init__(
+        self,
+        keywords: Iterable[str],
+        *,
+        normalize: bool = False,
+        word_boundaries: bool = False,
+    ) -> None:
+        self._normalize = normalize
+        if normalize:
+            keywords = (normalize_text(kw) for kw in keywords)
+        vocab = sorted({kw for kw in keywords if kw})
+        self._vocabulary: Tuple[str, ...] = tuple(vocab)
+        words = [kw for kw in vocab if _is_word(kw)] if word_boundaries else []
+        chars = [kw for kw in vocab if not _is_word(kw)] if word_boundaries else vocab
+        # kw → kw 自身を含む「kw の部分文字列である登録語」の集合
+        # （kw の部分文字列を列挙して引く: 語彙数ではなく語長の 2 乗に比例）。
+        # 単語単位の語は、同じ単語単位の語のうち区切りに揃う部分だけを含む
+        registered = frozenset(chars)
+        self._implied: Dict[str, FrozenSet[str]] = {
+            kw: frozenset(
+                kw[i:j]
+                for i in range(len(kw))
+                for j in range(i + 1, len(kw) + 1)
+                if kw[i:j] in registered
+            )
+            for kw in chars
+        }
+        registered_words = frozenset(words)
+        for kw in words:
+            self._implied[kw] = _aligned_parts(kw, registered_words)
+        self._rx = _lookahead_pattern(chars, False) if chars else None
+        self._word_rx = _lookahead_pattern(words, True) if words else None
+        # 単語単位の語の先頭文字が 1 つもないテキスト（日本語だけの文など）は
+        # 文字クラスの検索 1 回で単語単位の走査を省く
+        self._word_probe = (
+            re.compile("[" + "".join(sorted({re.escape(kw[0]) for kw in words})) + "]")
+            if words else None
+        )
+
+    @property
+    def vocabulary(self) -> Tuple[str, ...]:
+        """登録済みキーワード（ソート済み）。"""
+        return self._vocabulary
+
+    def covers(self, keywords: Iterable[str]) -> bool:
+        """keywords が全て登録済みなら True。"""
+        return all(kw in self._implied for kw in keywords)
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """text に出現する登録キーワードの集合を返す。"""
+        if not text or (self._rx is None and self._word_rx is None):
+            return frozenset()
+        if self._normalize:
+            text = normalize_text(text)
+        found = self._rx.findall(text) if self._rx is not None else []
+        if self._word_probe is not None and self._word_probe.search(text):
+            found += self._word_rx.findall(text)
+        if not found:
+            return frozenset()
+        implied = self._implied
+        hits: set = set()
+        for kw in set(found):
+            hits |= implied[kw]
+        return frozenset(hits)
+
+    def scan_many(self, texts: Iterable[str]) -> List[FrozenSet[str]]:
+        """複数テキストを同じマッチャーで照合する（順序保持）。"""
+        return [self.scan(t) for t in texts]
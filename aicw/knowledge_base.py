@@ -16,10 +16,47 @@ Privacy 方針（厳守）:
   - reason_codes の Jaccard 類似度で過去決定との類似度を計算
   - 類似度が高い = 似た制約・判断パターンの過去決定
   - raw text 比較は行わない（Privacy 保護）
+  - reason_codes は reason_bits.ReasonCodeRegistry でビットマスクにして保持し、
+    Jaccard は popcount(a & b) / popcount(a | b) で計算する。
+    類似度は (マスク, status) の組ごとに 1 回だけ計算し、全件への展開と
+    上位抽出は list の C ループ（map / list.index）に任せる
+  - query() は時間窓（timestamp の昇順索引を bisect）と blocked_by（値ごとの
+    位置索引）で候補を先に絞り、残った候補だけを採点する。
+    新しさは半減期つきの指数減衰で score に掛ける
+
+内部表現:
+  - エントリは dict ではなく列（decision_hash / status / reason_codes / blocked_by /
+    timestamp_utc / 検索キー）ごとの list で持つ
+  - reason_codes のタプルと検索キー（マスク << 8 | status id）は同じ値を共有する
+    → 1 エントリあたりの追加コストはほぼ list の参照 1 つずつ
+  - 外から見える形（record / all_entries / find_similar の戻り値・JSON ファイル）は dict のまま
 
 設計:
   - インメモリ（デフォルト）＋ JSON ファイル永続化（オプション）
   - ファイルが存在すれば起動時に自動ロード
+  - 既定は record() のたびに保存する。write_behind=True では記録をメモリに溜め、
+      * 最初の未保存記録から flush_interval 秒後（タイマー）
+      * 未保存が max_pending 件に達し、かつ前回の書き込みから flush_interval 秒以上経過
+      * flush() / close() / with ブロックの終了 / プロセス終了（atexit）
+    のいずれかでまとめて 1 回書き出す
+    → バーストで N 件記録しても書き込みは 1 回。自動の書き込みは
+      flush_interval 秒に 1 回以下（リクエスト数によらず I/O が一定）
+  - write_behind のタイマーは別スレッドで書き出す。エントリ操作と書き出し用の
+    スナップショット作成は同じロックで守り、ファイル書き込みはロックの外で行う
+
+ファイル形式（knowledge_base.v0.2）:
+  - 1 つの JSON オブジェクト（従来どおり json.load で読める）。キーの順序を固定し、
+    {"version", "max_entries", "count", "entries_sha256", "entries"} の順で書く
+  - entries_sha256 は "entries": の直後から末尾の "}" の手前まで（entries 配列の
+    バイト列）の SHA-256
+  - 保存は同じディレクトリの一時ファイル（書き手ごとに別名）に書いて fsync →
+    os.replace → ディレクトリを fsync（書き込み途中で落ちても元のファイルが残る。
+    複数プロセスが同時に保存しても書きかけが混ざらない）
+  - 読み込み: チェックサムが一致したファイルはエントリごとの検証を省き、
+    列をまとめて組み立てる。旧形式（v0.1）・チェックサム不一致のファイルは
+    従来どおり必須キーを検証しながら読む
+  - JSON として読めないファイルは <path>.corrupt に退避してから空で始める
+    （次の保存で壊れたファイルを上書きして痕跡を失わないように）。load_error に理由を残す
   - 外部ライブラリ不使用
 
 使用例:
@@ -34,10 +71,22 @@ Privacy 方針（厳守）:
 
 from __future__ import annotations
 
+import atexit
+import bisect
+import hashlib
+import heapq
 import json
+import math
 import os
+import tempfile
+import threading
+import time
+import weakref
+from array import array
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .reason_bits import ReasonCodeRegistry
 
 
 # ---------------------------------------------------------------------------
@@ -61,17 +110,34 @@ def _make_entry(
 
 
 # ---------------------------------------------------------------------------
-# Jaccard 類似度
+# 時刻（_ts 列・時間窓の索引・query の since / until / 減衰）
 # ---------------------------------------------------------------------------
 
-def _jaccard(a: List[str], b: List[str]) -> float:
-    """reason_codes リストの Jaccard 類似度（0.0〜1.0）。"""
-    set_a, set_b = set(a), set(b)
-    if not set_a and not set_b:
-        return 1.0   # 両方空 = 完全一致とみなす
-    if not set_a or not set_b:
-        return 0.0
-    return len(set_a & set_b) / len(set_a | set_b)
+def _epoch_seconds(value: Union[str, datetime]) -> float:
+    """ISO8601 文字列 / datetime → UTC エポック秒（naive は UTC とみなす）。"""
+    dt = datetime.fromisoformat(value) if isinstance(value, str) else value
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _entry_seconds(value: Any) -> float:
+    """エントリの timestamp_utc → エポック秒。解釈できなければ -inf（最古扱い）。"""
+    try:
+        return _epoch_seconds(value)
+    except (TypeError, ValueError):
+        return float("-inf")
+
+
+def _bulk_seconds(stamps: List[Any]) -> Iterable[float]:
+    """_entry_seconds を全件に適用した値（全件が tz つき ISO8601 なら C ループで変換）。"""
+    try:
+        parsed = list(map(datetime.fromisoformat, stamps))
+    except (TypeError, ValueError):
+        return map(_entry_seconds, stamps)
+    if any(dt.tzinfo is None for dt in parsed):
+        return map(_entry_seconds, stamps)
+    return map(datetime.timestamp, parsed)
 
 
 # ---------------------------------------------------------------------------
@@ -85,23 +151,136 @@ class KnowledgeBase:
     Args:
         path: JSON ファイルのパス（None = インメモリのみ）
         max_entries: 最大保持エントリ数（古い順に削除。デフォルト 500）
+        write_behind: True なら record() で保存せず、まとめて書き出す
+        flush_interval: write_behind の書き出し間隔（秒）
+        max_pending: write_behind で前倒しの書き出しを試みる未保存件数
     """
 
     DEFAULT_MAX = 500
+    DEFAULT_FLUSH_INTERVAL = 1.0
+    DEFAULT_MAX_PENDING = 64
 
     def __init__(
         self,
         path: Optional[str] = None,
         max_entries: int = DEFAULT_MAX,
+        *,
+        write_behind: bool = False,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_pending: int = DEFAULT_MAX_PENDING,
     ) -> None:
         if max_entries <= 0:
             raise ValueError("max_entries must be positive")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive")
+        if max_pending <= 0:
+            raise ValueError("max_pending must be positive")
         self._path = path
         self._max = max_entries
-        self._entries: List[Dict[str, Any]] = []
+        self._registry = ReasonCodeRegistry.from_schema()
+        self._status_ids: Dict[str, int] = {"ok": 1, "blocked": 2}
+        self._interned: Dict[Any, Any] = {}
+
+        # 列（添字 = エントリの古い順の位置）
+        self._hashes: List[str] = []
+        self._statuses: List[str] = []
+        self._codes: List[Tuple[str, ...]] = []
+        self._blocked_by: List[Optional[str]] = []
+        self._timestamps: List[str] = []
+        self._keys: List[int] = []      # (reason code マスク << 8) | status id
+        self._ts = array("d")           # timestamp_utc のエポック秒
+
+        # 索引
+        #   _base_seq: 位置 0 のエントリの通し番号（古いエントリを削除するたびに進む）
+        #   _blocked_seq: blocked_by 値 → 通し番号の昇順リスト
+        #   _ts_sorted: _ts が昇順か（record() だけなら常に True）
+        #   _time_index: 昇順でない場合の (昇順の時刻, 位置) キャッシュ
+        self._base_seq = 0
+        self._blocked_seq: Dict[str, List[int]] = {}
+        self._ts_sorted = True
+        self._time_index: Optional[Tuple[List[float], List[int]]] = None
+
+        # write-behind
+        #   _lock: 列と索引の読み書き（記録・削除・検索・統計・スナップショット作成）と
+        #          _pending / _timer の更新。検索も同じロックで行うため、別スレッドの
+        #          記録で列が途中まで伸び縮みした状態を読むことはない
+        #   _write_lock: 書き出しの直列化（古いスナップショットが後から書かれないように）
+        self._write_behind = write_behind and path is not None
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pending = 0
+        self._timer: Optional[threading.Timer] = None
+        self._last_write = float("-inf")
+        self.writes = 0
+        self.load_error: Optional[str] = None
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
 
         if path and os.path.isfile(path):
             self._load(path)
+        if self._write_behind:
+            _register_write_behind(self)
+
+    # ------------------------------------------------------------------
+    # 列操作
+    # ------------------------------------------------------------------
+    def _intern(self, value: Any) -> Any:
+        return self._interned.setdefault(value, value)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        status = entry["status"]
+        sid = self._status_ids.get(status)
+        if sid is None:
+            # _load 経由の未知 status（record() は ok / blocked のみ受け付ける）
+            sid = self._status_ids[status] = len(self._status_ids) + 1
+        codes = tuple(entry["reason_codes"])
+        blocked_by = entry.get("blocked_by")
+        ts = _entry_seconds(entry["timestamp_utc"])
+        if self._ts and ts < self._ts[-1]:
+            self._ts_sorted = False
+        self._time_index = None
+        if blocked_by is not None:
+            self._blocked_seq.setdefault(blocked_by, []).append(
+                self._base_seq + len(self._keys)
+            )
+        self._hashes.append(entry["decision_hash"])
+        self._statuses.append(self._intern(status))
+        self._codes.append(self._intern(codes))
+        self._blocked_by.append(self._intern(blocked_by))
+        self._timestamps.append(entry["timestamp_utc"])
+        self._keys.append(self._intern(self._registry.mask(codes) << 8 | sid))
+        self._ts.append(ts)
+
+    def _columns(self) -> Tuple[Any, ...]:
+        return (self._hashes, self._statuses, self._codes,
+                self._blocked_by, self._timestamps, self._keys, self._ts)
+
+    def _drop_oldest(self, count: int) -> None:
+        for column in self._columns():
+            del column[:count]
+        self._base_seq += count
+        self._time_index = None
+        for value in list(self._blocked_seq):
+            seqs = self._blocked_seq[value]
+            del seqs[:bisect.bisect_left(seqs, self._base_seq)]
+            if not seqs:
+                del self._blocked_seq[value]
+
+    def _trim(self) -> None:
+        """上限超過分を古い方から削除する。"""
+        excess = len(self._keys) - self._max
+        if excess > 0:
+            self._drop_oldest(excess)
+
+    def _entry(self, i: int) -> Dict[str, Any]:
+        return {
+            "decision_hash": self._hashes[i],
+            "status": self._statuses[i],
+            "reason_codes": list(self._codes[i]),
+            "blocked_by": self._blocked_by[i],
+            "timestamp_utc": self._timestamps[i],
+        }
 
     # ------------------------------------------------------------------
     # 記録
@@ -125,20 +304,61 @@ class KnowledgeBase:
         Returns:
             記録したエントリ
         """
+        if self._write_behind:
+            with self._lock:
+                entry = self._record(decision_hash, status, reason_codes, blocked_by)
+                self._pending += 1
+            self._notify(entry)
+            self._schedule_flush()
+            return entry
+        with self._lock:
+            entry = self._record(decision_hash, status, reason_codes, blocked_by)
+        try:
+            if self._path:
+                self._save(self._path)
+        finally:
+            self._notify(entry)   # 保存に失敗してもメモリ上には記録済み
+        return entry
+
+    def _record(
+        self,
+        decision_hash: str,
+        status: str,
+        reason_codes: List[str],
+        blocked_by: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        record() のメモリ上の部分（保存しない。保存を束ねる呼び出し側用）。
+        呼び出し側が _lock を持つこと。購読者への通知もしない
+        （呼び出し側がロックを外してから _notify() を呼ぶ）。
+        """
         if status not in ("ok", "blocked"):
             raise ValueError(f"status must be 'ok' or 'blocked', got: {status!r}")
 
         entry = _make_entry(decision_hash, status, reason_codes, blocked_by)
-        self._entries.append(entry)
+        self._append(entry)
+        self._trim()  # 上限超過: 最古エントリを削除
+        return entry
 
-        # 上限超過: 最古エントリを削除
-        if len(self._entries) > self._max:
-            self._entries = self._entries[-self._max:]
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        record() のたびに記録したエントリ（のコピー）で callback を呼ぶ（集計の差分更新用）。
 
-        if self._path:
-            self._save(self._path)
+        callback はロックの外・記録と未保存件数の更新が済んでから呼ぶ。
+        callback の例外はログに残すだけで record() には伝えない（記録は成功している）。
+        """
+        self._listeners.append(callback)
 
-        return entry
+    def _notify(self, entry: Dict[str, Any]) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(dict(entry, reason_codes=list(entry["reason_codes"])))
+            except Exception:
+                import logging
+
+                logging.getLogger(__name__).exception(
+                    "KnowledgeBase listener %r failed", callback
+                )
 
     # ------------------------------------------------------------------
     # 類似検索
@@ -163,26 +383,215 @@ class KnowledgeBase:
         Returns:
             類似度降順のエントリリスト（各エントリに "similarity" キーを追加）
         """
-        results = []
-        for entry in self._entries:
-            if status_filter and entry["status"] != status_filter:
+        with self._lock:
+            scores = self._key_scores(
+                reason_codes, set(self._keys), min_similarity, status_filter
+            )
+
+            # 類似度降順・同点は古い順（従来の安定ソートと同じ順序）
+            values = list(map(scores.__getitem__, self._keys))
+            if top_k < 0:
+                top_k = max(0, len(values) - values.count(-1.0) + top_k)
+            picked: List[int] = []
+            for value in sorted(set(scores.values()) - {-1.0}, reverse=True):
+                i = -1
+                while len(picked) < top_k:
+                    try:
+                        i = values.index(value, i + 1)
+                    except ValueError:
+                        break
+                    picked.append(i)
+                if len(picked) >= top_k:
+                    break
+            return [{**self._entry(i), "similarity": values[i]} for i in picked]
+
+    def _key_scores(
+        self,
+        reason_codes: List[str],
+        keys: Iterable[int],
+        min_similarity: float,
+        status_filter: Optional[str],
+    ) -> Dict[int, float]:
+        """
+        検索キーごとの類似度（小数 4 桁）。status / min_similarity で外れるキーは -1.0。
+
+        類似度は (マスク, status) の組ごとに 1 回だけ計算する。
+        """
+        query, unknown = self._registry.query_mask(reason_codes)
+        query_pop = query.bit_count() + unknown
+        status_id = None if not status_filter else self._status_ids.get(status_filter, 0)
+
+        scores: Dict[int, float] = {}
+        for key in keys:
+            if status_id is not None and key & 0xFF != status_id:
+                scores[key] = -1.0
                 continue
-            sim = _jaccard(reason_codes, entry["reason_codes"])
-            if sim >= min_similarity:
-                results.append({**entry, "similarity": round(sim, 4)})
+            mask = key >> 8
+            inter = (query & mask).bit_count()
+            union = query_pop + mask.bit_count() - inter
+            sim = inter / union if union else 1.0
+            scores[key] = round(sim, 4) if sim >= min_similarity else -1.0
+        return scores
+
+    # ------------------------------------------------------------------
+    # 索引付き検索（時間窓 / blocked_by / 新しさの減衰）
+    # ------------------------------------------------------------------
+    def _time_range(self, since: Optional[float], until: Optional[float]) -> Sequence[int]:
+        """[since, until) に入るエントリの位置（時刻昇順）。"""
+        if self._ts_sorted:
+            times: Sequence[float] = self._ts
+            order: Optional[List[int]] = None
+        else:
+            if self._time_index is None:
+                order = sorted(range(len(self._ts)), key=self._ts.__getitem__)
+                self._time_index = ([self._ts[i] for i in order], order)
+            times, order = self._time_index
+        lo = 0 if since is None else bisect.bisect_left(times, since)
+        hi = len(times) if until is None else bisect.bisect_left(times, until, lo)
+        return range(lo, hi) if order is None else order[lo:hi]
+
+    def _candidates(
+        self,
+        since: Optional[float],
+        until: Optional[float],
+        blocked_by: Optional[Sequence[str]],
+    ) -> Sequence[int]:
+        """時間窓と blocked_by で絞り込んだ位置（採点前の候補）。"""
+        window = self._time_range(since, until)
+        if blocked_by is None:
+            return window
+        if isinstance(window, range):
+            # 時刻昇順 = 位置順なので、blocked_by の索引を窓の両端で bisect する
+            lo, hi = self._base_seq + window.start, self._base_seq + window.stop
+            picked: List[int] = []
+            for value in set(blocked_by):
+                seqs = self._blocked_seq.get(value, [])
+                start = bisect.bisect_left(seqs, lo)
+                stop = bisect.bisect_left(seqs, hi, start)
+                picked.extend(seq - self._base_seq for seq in seqs[start:stop])
+            picked.sort()
+            return picked
+        wanted = set(blocked_by)
+        return [i for i in window if self._blocked_by[i] in wanted]
+
+    def query(
+        self,
+        reason_codes: List[str],
+        *,
+        top_k: int = 3,
+        since: Optional[Union[str, datetime]] = None,
+        until: Optional[Union[str, datetime]] = None,
+        blocked_by: Optional[Union[str, Sequence[str]]] = None,
+        status_filter: Optional[str] = None,
+        min_similarity: float = 0.0,
+        half_life_hours: Optional[float] = None,
+        now: Optional[Union[str, datetime]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        時間窓・blocked_by で候補を絞ってから採点する類似検索。
+
+        score = similarity × 0.5 ** (経過時間 / half_life_hours)
+        （half_life_hours=None なら減衰なし = similarity）
+
+        Args:
+            reason_codes: 検索クエリとなる reason_codes
+            top_k: 返す件数
+            since / until: timestamp_utc の範囲 [since, until)（ISO8601 / datetime）
+            blocked_by: この blocked_by 値（1 つまたは複数）のエントリだけを対象にする
+            status_filter: "ok" / "blocked" で絞り込み（None = 全て）
+            min_similarity: 最低類似度（減衰前の値で判定）
+            half_life_hours: 新しさの半減期（時間）
+            now: 経過時間の基準時刻（None = 現在時刻）
 
-        results.sort(key=lambda x: x["similarity"], reverse=True)
-        return results[:top_k]
+        Returns:
+            score 降順（同点は新しい順）のエントリリスト
+            （各エントリに "similarity" と "score" を追加）
+
+        Raises:
+            ValueError: half_life_hours が 0 以下 / 時刻文字列が不正
+        """
+        if half_life_hours is not None and half_life_hours <= 0:
+            raise ValueError("half_life_hours must be positive")
+        if isinstance(blocked_by, str):
+            blocked_by = [blocked_by]
+        since_s = None if since is None else _epoch_seconds(since)
+        until_s = None if until is None else _epoch_seconds(until)
+        decay: Optional[Tuple[float, float]] = None
+        if half_life_hours is not None:
+            decay = (
+                _epoch_seconds(now if now is not None else datetime.now(timezone.utc)),
+                math.log(2) / (half_life_hours * 3600.0),
+            )
+        with self._lock:
+            return self._query(
+                reason_codes, top_k, since_s, until_s, blocked_by, status_filter,
+                min_similarity, decay,
+            )
+
+    def _query(
+        self,
+        reason_codes: List[str],
+        top_k: int,
+        since: Optional[float],
+        until: Optional[float],
+        blocked_by: Optional[Sequence[str]],
+        status_filter: Optional[str],
+        min_similarity: float,
+        decay: Optional[Tuple[float, float]],
+    ) -> List[Dict[str, Any]]:
+        """query() の本体（呼び出し側が _lock を持つ。decay = (基準時刻, 減衰率)）。"""
+        candidates = self._candidates(since, until, blocked_by)
+        if not candidates or top_k <= 0:
+            return []
+
+        keys = self._keys
+        scores = self._key_scores(
+            reason_codes, {keys[i] for i in candidates}, min_similarity, status_filter
+        )
+        if decay is None:
+            def score(i: int) -> float:
+                return scores[keys[i]]
+        else:
+            now_s, rate = decay
+            ts = self._ts
+
+            def score(i: int) -> float:
+                sim = scores[keys[i]]
+                if sim < 0:
+                    return sim
+                return sim * math.exp(-rate * max(0.0, now_s - ts[i]))
+
+        # 候補は時刻昇順なので、逆順に渡すと同点は新しい順になる
+        ranked = heapq.nlargest(top_k, reversed(candidates), key=score)
+        return [
+            {**self._entry(i), "similarity": scores[keys[i]], "score": round(score(i), 4)}
+            for i in ranked
+            if scores[keys[i]] >= 0
+        ]
 
     # ------------------------------------------------------------------
     # クエリ
     # ------------------------------------------------------------------
+    @property
+    def path(self) -> Optional[str]:
+        """永続化先のパス（None = インメモリのみ）。"""
+        return self._path
+
     def count(self) -> int:
-        return len(self._entries)
+        return len(self._keys)
+
+    def oldest(self) -> Optional[Dict[str, Any]]:
+        """最も古いエントリ（上限到達時に次に押し出されるもの）の複製。空なら None。"""
+        with self._lock:
+            return self._entry(0) if self._keys else None
 
     def all_entries(self) -> List[Dict[str, Any]]:
         """全エントリを返す（変更不可の複製）。"""
-        return list(self._entries)
+        with self._lock:
+            return self._entries()
+
+    def _entries(self) -> List[Dict[str, Any]]:
+        return [self._entry(i) for i in range(len(self._keys))]
 
     def stats(self) -> Dict[str, Any]:
         """
@@ -198,18 +607,21 @@ class KnowledgeBase:
                 "has_persistent_storage": bool,
             }
         """
-        ok_count = sum(1 for e in self._entries if e["status"] == "ok")
-        blocked_count = len(self._entries) - ok_count
+        with self._lock:
+            statuses = list(self._statuses)
+            all_codes = list(self._codes)
+        ok_count = statuses.count("ok")
+        blocked_count = len(statuses) - ok_count
 
         code_freq: Dict[str, int] = {}
-        for entry in self._entries:
-            for code in entry["reason_codes"]:
+        for codes in all_codes:
+            for code in codes:
                 code_freq[code] = code_freq.get(code, 0) + 1
 
         top_codes = sorted(code_freq.items(), key=lambda x: x[1], reverse=True)[:5]
 
         return {
-            "total": len(self._entries),
+            "total": len(statuses),
             "ok_count": ok_count,
             "blocked_count": blocked_count,
             "top_reason_codes": top_codes,
@@ -219,7 +631,9 @@ class KnowledgeBase:
 
     def clear(self) -> None:
         """全エントリを削除する（テスト用）。"""
-        self._entries.clear()
+        with self._lock:
+            self._drop_oldest(len(self._keys))
+            self._ts_sorted = True
         if self._path and os.path.isfile(self._path):
             self._save(self._path)
 
@@ -238,27 +652,258 @@ class KnowledgeBase:
             raise ValueError("path が指定されていません。save(path=...) で指定してください。")
         self._save(target)
 
-    def _save(self, path: str) -> None:
-        data = {
-            "version": "knowledge_base.v0.1",
+    # ------------------------------------------------------------------
+    # write-behind
+    # ------------------------------------------------------------------
+    def _schedule_flush(self) -> None:
+        """未保存件数と前回の書き込み時刻から、即時書き出しかタイマー起動かを決める。"""
+        with self._lock:
+            due = (
+                self._pending >= self._max_pending
+                and time.monotonic() - self._last_write >= self._flush_interval
+            )
+            if not due and self._timer is None:
+                self._timer = threading.Timer(self._flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
+    @property
+    def pending(self) -> int:
+        """まだファイルに書き出していない記録の件数（write_behind 以外は常に 0）。"""
+        return self._pending
+
+    def flush(self) -> None:
+        """
+        未保存の記録を 1 回の書き込みで保存する（write_behind 以外では何もしない）。
+
+        書き込みに失敗した場合は未保存のまま残し、例外を送出する。
+        """
+        with self._write_lock:
+            with self._lock:
+                timer, self._timer = self._timer, None
+                if not self._pending:
+                    data = None
+                else:
+                    data = self._snapshot()
+                    pending, self._pending = self._pending, 0
+            if timer is not None and timer is not threading.current_thread():
+                timer.cancel()
+            if data is None:
+                return
+            try:
+                _write_snapshot(self._path, data)
+            except BaseException:
+                with self._lock:
+                    self._pending += pending
+                raise
+            self._last_write = time.monotonic()
+            self.writes += 1
+
+    def close(self) -> None:
+        """残りを書き出し、タイマーを止める。"""
+        self.flush()
+
+    def __enter__(self) -> "KnowledgeBase":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """保存する内容（以後のエントリ操作と独立した複製）。呼び出し側が _lock を持つこと。"""
+        return {
+            "version": _FORMAT_VERSION,
             "max_entries": self._max,
-            "entries": self._entries,
+            "entries": self._entries(),
         }
-        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def _save(self, path: str) -> None:
+        with self._write_lock:
+            with self._lock:
+                data = self._snapshot()
+            _write_snapshot(path, data)
+
+    def _extend_trusted(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        検証済み（チェックサム一致）のエントリを列にまとめて追加する。
+        _append を 1 件ずつ呼ぶのと同じ状態になる。
+        (status, reason_codes, blocked_by) の組ごとに intern・マスク計算を 1 回だけ行う。
+        """
+        intern = self._intern
+        shapes: Dict[Tuple[Any, ...], Tuple[Any, ...]] = {}
+        rows: List[Tuple[Any, ...]] = []
+        for e in entries:
+            raw = (e["status"], tuple(e["reason_codes"]), e.get("blocked_by"))
+            shape = shapes.get(raw)
+            if shape is None:
+                status, codes, blocked_by = raw
+                sid = self._status_ids.get(status)
+                if sid is None:
+                    sid = self._status_ids[status] = len(self._status_ids) + 1
+                shape = shapes[raw] = (
+                    intern(status), intern(codes), intern(blocked_by),
+                    intern(self._registry.mask(codes) << 8 | sid),
+                )
+            rows.append(shape)
+
+        base = self._base_seq + len(self._keys)
+        for i, shape in enumerate(rows):
+            if shape[2] is not None:
+                self._blocked_seq.setdefault(shape[2], []).append(base + i)
+        self._hashes.extend([e["decision_hash"] for e in entries])
+        self._statuses.extend([shape[0] for shape in rows])
+        self._codes.extend([shape[1] for shape in rows])
+        self._blocked_by.extend([shape[2] for shape in rows])
+        self._keys.extend([shape[3] for shape in rows])
+        stamps = [e["timestamp_utc"] for e in entries]
+        self._timestamps.extend(stamps)
+        start = len(self._ts)
+        self._ts.extend(_bulk_seconds(stamps))
+        ts = self._ts
+        if any(ts[i] < ts[i - 1] for i in range(max(start, 1), len(ts))):
+            self._ts_sorted = False
+        self._time_index = None
 
     def _load(self, path: str) -> None:
         try:
-            with open(path, encoding="utf-8") as f:
-                content = f.read().strip()
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError:
+            return  # 読み込み不可ファイルは無視（エントリなしで初期化）
+        trusted = _decode_checksummed(raw)
+        if trusted is not None:
+            self._extend_trusted(trusted[-self._max:])
+            return
+        try:
+            content = raw.decode("utf-8").strip()
             if not content:
                 return  # 空ファイルは無視
             data = json.loads(content)
-        except (json.JSONDecodeError, OSError):
-            return  # 破損・読み込み不可ファイルは無視（エントリなしで初期化）
+        except ValueError as e:
+            self._quarantine(path, e)
+            return
         loaded = data.get("entries", [])
         # バリデーション: 必須キーがあるエントリのみ取り込む
         required = {"decision_hash", "status", "reason_codes", "timestamp_utc"}
         valid = [e for e in loaded if required.issubset(e.keys())]
-        self._entries = valid[-self._max:]  # 上限超過分は古い方を切り捨て
+        for entry in valid[-self._max:]:  # 上限超過分は古い方を切り捨て
+            self._append(entry)
+
+    def _quarantine(self, path: str, error: Exception) -> None:
+        """読めないファイルを <path>.corrupt に退避する（失敗しても空で続行）。"""
+        self.load_error = f"{type(error).__name__}: {error}"
+        try:
+            os.replace(path, path + ".corrupt")
+        except OSError:
+            pass
+
+
+# プロセス終了時に書き出す write_behind の KB（弱参照: KB の寿命は延ばさない）
+_WRITE_BEHIND: "weakref.WeakSet[KnowledgeBase]" = weakref.WeakSet()
+_ATEXIT_REGISTERED = False
+
+
+def _register_write_behind(kb: KnowledgeBase) -> None:
+    global _ATEXIT_REGISTERED
+    _WRITE_BEHIND.add(kb)
+    if not _ATEXIT_REGISTERED:
+        atexit.register(_flush_at_exit)
+        _ATEXIT_REGISTERED = True
+
+
+def _flush_at_exit() -> None:
+    for kb in list(_WRITE_BEHIND):
+        try:
+            kb.flush()
+        except OSError:
+            continue  # 終了時には再試行できない。残りの KB の書き出しを優先する
+
+
+# ---------------------------------------------------------------------------
+# ファイル形式
+# ---------------------------------------------------------------------------
+_FORMAT_VERSION = "knowledge_base.v0.2"
+_CHECKSUMMED_PREFIX = b'{"version":"' + _FORMAT_VERSION.encode("ascii") + b'"'
+_ENTRIES_KEY = b',"entries":'
+
+
+def _dumps_compact(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _encode_snapshot(data: Dict[str, Any]) -> bytes:
+    """_snapshot() → チェックサムつきの JSON バイト列。"""
+    body = _dumps_compact(data["entries"])
+    header = _dumps_compact({
+        "version": data["version"],
+        "max_entries": data["max_entries"],
+        "count": len(data["entries"]),
+        "entries_sha256": hashlib.sha256(body).hexdigest(),
+    })
+    return header[:-1] + _ENTRIES_KEY + body + b"}\n"
+
+
+def _decode_checksummed(raw: bytes) -> Optional[List[Dict[str, Any]]]:
+    """チェックサムつき形式で、内容が一致すれば entries を返す。それ以外は None。"""
+    if not raw.startswith(_CHECKSUMMED_PREFIX):
+        return None
+    sep = raw.find(_ENTRIES_KEY)
+    if sep < 0:
+        return None
+    body = raw[sep + len(_ENTRIES_KEY):].rstrip()
+    if not body.endswith(b"}"):
+        return None
+    body = body[:-1]
+    try:
+        header = json.loads(raw[:sep] + b"}")
+        if hashlib.sha256(body).hexdigest() != header.get("entries_sha256"):
+            return None
+        entries = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(entries, list) or len(entries) != header.get("count"):
+        return None
+    return entries
+
+
+def _fsync_dir(directory: str) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # ディレクトリを開けない環境（Windows など）
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_snapshot(path: str, data: Dict[str, Any]) -> None:
+    """
+    _snapshot() の内容をファイルに書く（別スレッドから呼んでもよい）。
+    一時ファイル → fsync → os.replace なので、途中で落ちても元のファイルが残る。
+    一時ファイルは書き手ごとに別名（mkstemp）なので、複数プロセスが同時に保存しても
+    互いの書きかけを公開しない（最後に os.replace した方が残る）。
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    payload = _encode_snapshot(data)
+    fd, tmp = tempfile.mkstemp(
+        prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(directory)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import re
-from typing import List
+from typing import AbstractSet, List, Optional
 
 # 理由コード（P2 Task 8）
 DUTY_OUTCOME_CONFLICT = "PHILO_DUTY_OUTCOME_CONFLICT"
@@ -10,7 +10,16 @@ RIGHTS_TOTAL_BENEFIT_CONFLICT = "PHILO_RIGHTS_TOTAL_BENEFIT_CONFLICT"
 
 
 # 逆接があると「同一説明内での緊張関係」が強いとみなす
-_CONTRAST_RX = re.compile(r"(だが|しかし|一方で|ただし|though|however|but)", re.IGNORECASE)
+# （初回判定時にコンパイルする。import 時のコストを避けるため）
+_CONTRAST_PATTERN = r"(だが|しかし|一方で|ただし|though|however|but)"
+_CONTRAST_RX: Optional[re.Pattern[str]] = None
+
+
+def _get_contrast_rx() -> re.Pattern[str]:
+    global _CONTRAST_RX
+    if _CONTRAST_RX is None:
+        _CONTRAST_RX = re.compile(_CONTRAST_PATTERN, re.IGNORECASE)
+    return _CONTRAST_RX
 
 # 義務論（ルール・権利）
 _DUTY_TERMS = (
@@ -31,33 +40,90 @@ _EXCEPTION_TERMS = (
 )
 
 
-def _contains_any(text: str, terms: tuple[str, ...]) -> bool:
-    return any(t in text for t in terms)
+# 「多数利益」を示す語（権利 vs 総便益の判定に使用）
+_TOTAL_BENEFIT_TERMS = ("多数", "全体")
 
+# 融合スキャン用の全語彙（KeywordMatcher に登録して hits を作る）
+KEYWORDS: tuple[str, ...] = (
+    _DUTY_TERMS + _OUTCOME_TERMS + _FAIRNESS_TERMS + _EXCEPTION_TERMS
+    + _TOTAL_BENEFIT_TERMS
+)
 
-def detect_philosophy_conflicts(text: str) -> List[str]:
-    """説明文から哲学的な緊張・矛盾パターンを検知し、理由コードを返す。"""
-    if not text:
-        return []
 
-    codes: List[str] = []
-    has_contrast = bool(_CONTRAST_RX.search(text))
+def _contains_any(text: str | AbstractSet[str], terms: tuple[str, ...]) -> bool:
+    if isinstance(text, str):
+        return any(t in text for t in terms)
+    return not text.isdisjoint(terms)
+
+
+# 判定に使う信号（ビット）。テキストを分けて走査しても OR で合成できる
+_CONTRAST = 1
+_DUTY = 2
+_OUTCOME = 4
+_FAIRNESS = 8
+_EXCEPTION = 16
+_TOTAL_BENEFIT = 32
 
-    has_duty = _contains_any(text, _DUTY_TERMS)
-    has_outcome = _contains_any(text, _OUTCOME_TERMS)
-    has_fairness = _contains_any(text, _FAIRNESS_TERMS)
-    has_exception = _contains_any(text, _EXCEPTION_TERMS)
+
+def philosophy_signals(
+    text: str,
+    *,
+    hits: Optional[AbstractSet[str]] = None,
+) -> int:
+    """
+    text に含まれる逆接・各語群の有無をビットで返す。
+
+    語群も逆接も空白を含まないので、空白で連結したテキストの信号は
+    部分ごとの信号の OR と一致する（段ごとのキャッシュで部分を使い回せる）。
+    """
+    if not text:
+        return 0
+    found: str | AbstractSet[str] = text if hits is None else hits
+    signals = _CONTRAST if _get_contrast_rx().search(text) else 0
+    for bit, terms in (
+        (_DUTY, _DUTY_TERMS),
+        (_OUTCOME, _OUTCOME_TERMS),
+        (_FAIRNESS, _FAIRNESS_TERMS),
+        (_EXCEPTION, _EXCEPTION_TERMS),
+        (_TOTAL_BENEFIT, _TOTAL_BENEFIT_TERMS),
+    ):
+        if _contains_any(found, terms):
+            signals |= bit
+    return signals
+
+
+def conflicts_from_signals(signals: int) -> List[str]:
+    """philosophy_signals()（の OR）から理由コードを返す。"""
+    codes: List[str] = []
+    has_duty = bool(signals & _DUTY)
+    has_outcome = bool(signals & _OUTCOME)
+    has_exception = bool(signals & _EXCEPTION)
+    tension = bool(signals & (_CONTRAST | _EXCEPTION))
 
     # 1) 義務論 vs 功利
-    if has_duty and has_outcome and (has_contrast or has_exception):
+    if has_duty and has_outcome and tension:
         codes.append(DUTY_OUTCOME_CONFLICT)
 
     # 2) 公正 vs 効率
-    if has_fairness and has_outcome and (has_contrast or has_exception):
+    if signals & _FAIRNESS and has_outcome and tension:
         codes.append(FAIRNESS_EFFICIENCY_CONFLICT)
 
     # 3) 権利 vs 総便益（多数利益のための権利侵害）
-    if has_duty and has_outcome and ("多数" in text or "全体" in text) and has_exception:
+    if has_duty and has_outcome and signals & _TOTAL_BENEFIT and has_exception:
         codes.append(RIGHTS_TOTAL_BENEFIT_CONFLICT)
 
     return codes
+
+
+def detect_philosophy_conflicts(
+    text: str,
+    *,
+    hits: Optional[AbstractSet[str]] = None,
+) -> List[str]:
+    """
+    説明文から哲学的な緊張・矛盾パターンを検知し、理由コードを返す。
+
+    hits: KEYWORDS を登録した KeywordMatcher.scan(text) の結果。
+          渡された場合は語彙照合をそれで代替する（逆接判定のみ text を使う）。
+    """
+    return conflicts_from_signals(philosophy_signals(text, hits=hits))
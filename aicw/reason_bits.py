@@ -0,0 +1,122 @@
+"""
+aicw/reason_bits.py
+
+reason code ↔ ビット位置の登録表（集合演算を int のビット演算にする）
+
+背景:
+  reason code は schema.DECISION_BRIEF_V0 で定義された小さな閉じた語彙だが、
+  類似検索では毎回 set(str) を作って積集合・和集合を取っていた。
+
+設計:
+  - コード 1 つに 1 ビットを割り当て、コード集合を int のビットマスクで表す
+  - Jaccard = popcount(a & b) / popcount(a | b)（int.bit_count）
+  - ビットは DECISION_BRIEF_V0["reason_codes"]["selection"] の登録順に 0 から割り当て、
+    登録外のコードは初出時に末尾のビットを動的に割り当てる
+  - 検索クエリ側の登録外コードはビットを割り当てず「どのエントリにも無いコード」の
+    個数として数える（クエリで登録表が増え続けないように）
+  - 外部ライブラリ不使用
+
+使用例:
+    from aicw.reason_bits import ReasonCodeRegistry, jaccard
+
+    reg = ReasonCodeRegistry.from_schema()
+    a = reg.mask(["SAFETY_FIRST", "COMPLIANCE_FIRST"])
+    b = reg.mask(["SAFETY_FIRST"])
+    jaccard(a, b)   # 0.5
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ReasonCodeRegistry:
+    """
+    reason code にビット位置を割り当てる登録表。
+
+    Args:
+        codes: 先頭から bit 0, 1, 2 ... を割り当てるコード列
+        max_bits: 割り当て可能なビット数の上限（None = 無制限）。
+                  固定幅カラムに書く場合（archive）に指定する
+    """
+
+    def __init__(self, codes: Iterable[str] = (), max_bits: Optional[int] = None) -> None:
+        self._max_bits = max_bits
+        self._bits: Dict[str, int] = {}
+        self._names: List[str] = []
+        for code in codes:
+            self.bit(code)
+
+    @classmethod
+    def from_schema(cls, max_bits: Optional[int] = None) -> "ReasonCodeRegistry":
+        """DECISION_BRIEF_V0 の selection コードを登録済みの表を作る。"""
+        from .schema import DECISION_BRIEF_V0
+
+        return cls(DECISION_BRIEF_V0["reason_codes"]["selection"], max_bits=max_bits)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, code: object) -> bool:
+        return code in self._bits
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """ビット順のコード名。"""
+        return tuple(self._names)
+
+    def bit(self, code: str) -> int:
+        """code のビット位置（未登録なら末尾に割り当てる）。"""
+        bit = self._bits.get(code)
+        if bit is None:
+            bit = len(self._names)
+            if self._max_bits is not None and bit >= self._max_bits:
+                raise ValueError(f"too many reason codes (max {self._max_bits} bits)")
+            self._bits[code] = bit
+            self._names.append(code)
+        return bit
+
+    def mask(self, codes: Iterable[str]) -> int:
+        """codes のビットマスク（未登録コードは割り当てる）。"""
+        mask = 0
+        for code in codes:
+            mask |= 1 << self.bit(code)
+        return mask
+
+    def query_mask(self, codes: Iterable[str]) -> Tuple[int, int]:
+        """
+        検索クエリ用のマスク。登録表は変更しない。
+
+        Returns:
+            (登録済みコードのマスク, 登録外コードの種類数)
+        """
+        mask = 0
+        unknown = set()
+        for code in codes:
+            bit = self._bits.get(code)
+            if bit is None:
+                unknown.add(code)
+            else:
+                mask |= 1 << bit
+        return mask, len(unknown)
+
+    def codes(self, mask: int) -> List[str]:
+        """マスクに含まれるコード名（ビット順）。"""
+        out: List[str] = []
+        while mask:
+            low = mask & -mask
+            out.append(self._names[low.bit_length() - 1])
+            mask ^= low
+        return out
+
+
+def jaccard(a: int, b: int, extra: int = 0) -> float:
+    """
+    ビットマスク同士の Jaccard 類似度（0.0〜1.0。両方空なら 1.0）。
+
+    extra は a 側にだけ存在する（ビットを持たない）要素の数。
+    """
+    union = (a | b).bit_count() + extra
+    if union == 0:
+        return 1.0
+    return (a & b).bit_count() / union
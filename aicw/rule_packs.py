@@ -0,0 +1,485 @@
+"""
+aicw/rule_packs.py
+
+ルールパック（推奨・生存構造判定の語彙表）を JSON から読み込み、
+1 本のマッチャー + キーワード別の判定表にコンパイルする
+
+背景:
+  推奨ロジック（decision._SAFETY_WORD_CODES / _SPEED_WORD_CODES）と
+  生存構造判定（_EXISTENCE_STRUCTURE_KEYWORDS など）の語彙はコードに直書きで、
+  事業部ごとの語彙を足すたびにデプロイが必要だった。
+
+設計:
+  - 組み込み語彙（decision の定数）を基底パック "builtin"（日本語）/ "builtin_en"（英語）とし、
+    JSON のルールパックはその上に語彙を追加する（削除・上書きはしない）
+  - コンパイル時に全パックの語彙を 1 つの KeywordMatcher にまとめ、
+    キーワードごとに「どの表に属するか」をビットマスクにした判定表を作る
+      * 1 リクエストの処理 = フィールドごとに 1 回の走査 + 出現語だけの表引き
+      * パック数・語彙数が増えても、走査以外のコストは出現語の数にしか比例しない
+  - RuleSet は不変。ホットリロードは新しい RuleSet を別に組み立ててから
+    参照を 1 回の代入で差し替える（リクエストは開始時に取得した RuleSet を使い続ける）
+  - キーワードは空白を含まない（フィールド単位の照合 = 連結テキストの照合 になる条件）
+  - 照合は NFKC + casefold で正規化したテキストに対して行う（キーワードも同じ正規化で登録）。
+    パックには言語タグ（"language"）を付けられ、どの言語の語彙も同じマッチャーに入る
+    → 日英混在の入力も 1 回の走査で全言語の語彙と照合する
+  - 外部ライブラリ不使用
+
+パックの形式（rule_pack.v0）:
+    {
+      "version": "rule_pack.v0",
+      "name": "finance",
+      "revision": "2026-10-01",
+      "language": "ja",
+      "recommendation": {
+        "safety_words": {"与信": "RISK_AVOIDANCE"},
+        "speed_words": {"月末締め": "DEADLINE_DRIVEN"}
+      },
+      "existence": {
+        "structures": {"社会": ["金融システム"]},
+        "hard_destruction": ["買い叩く"],
+        "soft_destruction": [],
+        "safe_targets": ["不良債権"],
+        "lifecycle": ["償還"],
+        "alternatives": {"買い叩く": "「取引条件の見直し」として交渉方針を再設計する"}
+      }
+    }
+  language（省略時 "und"）と recommendation / existence の各項目は省略可。
+
+使用例:
+    from aicw.rule_packs import RulePackLoader
+
+    loader = RulePackLoader("rules/")      # rules/*.json をファイル名順に読む
+    loader.reload()                        # コンパイルして有効化
+    loader.reload_if_changed()             # 変更があったときだけ差し替える（ポーリング用）
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import AbstractSet, Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .keyword_matcher import KeywordMatcher, normalize_text
+
+RULE_PACK_VERSION = "rule_pack.v0"
+
+# 判定表のビット（生存構造の層は _LAYER_SHIFT 以降に 1 層 1 ビット）
+HARD_DESTRUCTION = 1
+SOFT_DESTRUCTION = 2
+SAFE_TARGET = 4
+LIFECYCLE = 8
+_LAYER_SHIFT = 4
+
+_EXISTENCE_LISTS: Tuple[Tuple[str, int], ...] = (
+    ("hard_destruction", HARD_DESTRUCTION),
+    ("soft_destruction", SOFT_DESTRUCTION),
+    ("safe_targets", SAFE_TARGET),
+    ("lifecycle", LIFECYCLE),
+)
+_REASON_CODE_RX = re.compile(r"^[A-Z][A-Z0-9_]*$")
+_LANGUAGE_RX = re.compile(r"^[a-z]{2,3}(-[A-Za-z0-9]{1,8})*$")   # BCP 47 の簡易形
+
+
+@dataclass(frozen=True)
+class RulePack:
+    """検査済みのルールパック 1 件（JSON の内容そのまま）。"""
+
+    name: str
+    revision: str
+    safety_words: Dict[str, str]
+    speed_words: Dict[str, str]
+    structures: Dict[str, List[str]]
+    hard_destruction: List[str]
+    soft_destruction: List[str]
+    safe_targets: List[str]
+    lifecycle: List[str]
+    alternatives: Dict[str, str]
+    language: str = "und"
+
+
+# ---------------------------------------------------------------------------
+# 検査・読み込み
+# ---------------------------------------------------------------------------
+def _check_keyword(kw: Any, where: str, errors: List[str]) -> None:
+    if not isinstance(kw, str) or not kw:
+        errors.append(f"'{where}' のキーワードは空でない文字列にしてください")
+    elif any(ch.isspace() for ch in kw):
+        errors.append(f"'{where}' のキーワード '{kw}' に空白が含まれています")
+
+
+def _check_word_codes(value: Any, where: str, errors: List[str]) -> None:
+    if not isinstance(value, dict):
+        errors.append(f"'{where}' は object にしてください")
+        return
+    for kw, code in value.items():
+        _check_keyword(kw, where, errors)
+        if not isinstance(code, str) or not _REASON_CODE_RX.match(code):
+            errors.append(f"'{where}.{kw}' の reason code は大文字英数字と _ にしてください")
+
+
+def _check_keyword_list(value: Any, where: str, errors: List[str]) -> None:
+    if not isinstance(value, list):
+        errors.append(f"'{where}' は array にしてください")
+        return
+    for kw in value:
+        _check_keyword(kw, where, errors)
+
+
+def validate_rule_pack(data: Any) -> List[str]:
+    """
+    rule_pack.v0 のバリデーション。
+    Returns: エラーメッセージのリスト（空リスト = valid）
+    """
+    if not isinstance(data, dict):
+        return ["ルールパックは object にしてください"]
+    errors: List[str] = []
+    if data.get("version") != RULE_PACK_VERSION:
+        errors.append(f"'version' は '{RULE_PACK_VERSION}' にしてください")
+    for key in ("name", "revision"):
+        if not isinstance(data.get(key), str) or not data.get(key):
+            errors.append(f"'{key}' は空でない文字列にしてください")
+    language = data.get("language", "und")
+    if not isinstance(language, str) or not _LANGUAGE_RX.match(language):
+        errors.append("'language' は言語タグ（例: 'ja', 'en', 'zh-Hant'）にしてください")
+
+    rec = data.get("recommendation", {})
+    if not isinstance(rec, dict):
+        errors.append("'recommendation' は object にしてください")
+        rec = {}
+    for key in ("safety_words", "speed_words"):
+        if key in rec:
+            _check_word_codes(rec[key], f"recommendation.{key}", errors)
+
+    ex = data.get("existence", {})
+    if not isinstance(ex, dict):
+        errors.append("'existence' は object にしてください")
+        ex = {}
+    structures = ex.get("structures", {})
+    if not isinstance(structures, dict):
+        errors.append("'existence.structures' は object にしてください")
+    else:
+        for layer, keywords in structures.items():
+            if not layer:
+                errors.append("'existence.structures' の層名は空でない文字列にしてください")
+            _check_keyword_list(keywords, f"existence.structures.{layer}", errors)
+    for key, _ in _EXISTENCE_LISTS:
+        if key in ex:
+            _check_keyword_list(ex[key], f"existence.{key}", errors)
+    alternatives = ex.get("alternatives", {})
+    if not isinstance(alternatives, dict) or not all(
+        isinstance(v, str) and v for v in alternatives.values()
+    ):
+        errors.append("'existence.alternatives' は キーワード → 空でない文字列 の object にしてください")
+    return errors
+
+
+def parse_rule_pack(data: Any) -> RulePack:
+    """検査して RulePack にする（不正なら ValueError）。"""
+    errors = validate_rule_pack(data)
+    if errors:
+        raise ValueError("; ".join(errors))
+    rec = data.get("recommendation", {})
+    ex = data.get("existence", {})
+    return RulePack(
+        name=data["name"],
+        revision=data["revision"],
+        safety_words=dict(rec.get("safety_words", {})),
+        speed_words=dict(rec.get("speed_words", {})),
+        structures={layer: list(kws) for layer, kws in ex.get("structures", {}).items()},
+        hard_destruction=list(ex.get("hard_destruction", [])),
+        soft_destruction=list(ex.get("soft_destruction", [])),
+        safe_targets=list(ex.get("safe_targets", [])),
+        lifecycle=list(ex.get("lifecycle", [])),
+        alternatives=dict(ex.get("alternatives", {})),
+        language=data.get("language", "und"),
+    )
+
+
+def load_rule_pack(path: str) -> RulePack:
+    """JSON ファイルからルールパックを読む（不正なら path つきの ValueError）。"""
+    with open(path, encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: JSON として読めません ({e})") from None
+    try:
+        return parse_rule_pack(data)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+def builtin_rule_packs() -> List[RulePack]:
+    """decision の組み込み語彙（日本語 "builtin" / 英語 "builtin_en"）を基底パックとして返す。"""
+    # decision は RuleSet を使う側なので、読み込みは初回構築時まで遅らせる
+    from . import decision
+
+    en_destruction = {
+        **decision._EN_HARD_DESTRUCTION_KEYWORDS, **decision._EN_SOFT_DESTRUCTION_KEYWORDS
+    }
+    return [
+        RulePack(
+            name="builtin",
+            revision="p0",
+            safety_words=dict(decision._SAFETY_WORD_CODES),
+            speed_words=dict(decision._SPEED_WORD_CODES),
+            structures={k: list(v) for k, v in decision._EXISTENCE_STRUCTURE_KEYWORDS.items()},
+            hard_destruction=list(decision._HARD_DESTRUCTION_KEYWORDS),
+            soft_destruction=list(decision._SOFT_DESTRUCTION_KEYWORDS),
+            safe_targets=list(decision._SAFE_TARGET_KEYWORDS),
+            lifecycle=list(decision._LIFECYCLE_KEYWORDS),
+            alternatives=dict(decision._DESTRUCTION_ALTERNATIVES),
+            language="ja",
+        ),
+        RulePack(
+            name="builtin_en",
+            revision="p0",
+            safety_words=dict(decision._EN_SAFETY_WORD_CODES),
+            speed_words=dict(decision._EN_SPEED_WORD_CODES),
+            structures={
+                k: list(v) for k, v in decision._EN_EXISTENCE_STRUCTURE_KEYWORDS.items()
+            },
+            hard_destruction=list(decision._EN_HARD_DESTRUCTION_KEYWORDS),
+            soft_destruction=list(decision._EN_SOFT_DESTRUCTION_KEYWORDS),
+            safe_targets=list(decision._EN_SAFE_TARGET_KEYWORDS),
+            lifecycle=list(decision._EN_LIFECYCLE_KEYWORDS),
+            alternatives={
+                en: decision._DESTRUCTION_ALTERNATIVES[ja] for en, ja in en_destruction.items()
+            },
+            language="en",
+        ),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# コンパイル済みルール
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, eq=False)
+class RuleSet:
+    """
+    コンパイル済みのルール（不変。StageCache のキーには同一性で入る）。
+
+    キーワードはすべて normalize_text() 済み（NFKC + casefold）。照合テキストの正規化は
+    matcher が走査の直前に 1 回だけ行うので、言語パックを足しても走査は 1 回のまま。
+
+    Attributes:
+        packs: 取り込んだパックの (name, revision)（先頭は builtin / builtin_en）
+        languages: 取り込んだパックの言語タグ（初出順）
+        matcher: 全パックの語彙を登録した KeywordMatcher
+                 （normalize=True、ASCII の語は単語単位: word_boundaries=True）
+        flags: 正規化済みキーワード → 判定ビット（HARD_DESTRUCTION など + 層ビット）
+        layers: 生存構造の層名（ビット順 = 出力順）
+        safety_codes / speed_codes: 推奨用のキーワード → reason code
+        destruction_order: 破壊キーワード → 表示順（HARD の登録順 → SOFT の登録順）
+        alternatives: 破壊キーワード → 再フレーミング提案
+    """
+
+    packs: Tuple[Tuple[str, str], ...]
+    languages: Tuple[str, ...]
+    matcher: KeywordMatcher
+    flags: Dict[str, int]
+    layers: Tuple[str, ...]
+    safety_codes: Dict[str, str]
+    speed_codes: Dict[str, str]
+    destruction_order: Dict[str, int]
+    alternatives: Dict[str, str]
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """
+        正規化した text に出現する登録語の集合。日本語などの語は
+        `kw in normalize_text(text)` と同じ真偽、ASCII の語は単語として出現したときだけ。
+        """
+        return self.matcher.scan(text)
+
+    def mask(self, hits: AbstractSet[str]) -> int:
+        """出現語の判定ビットの論理和。"""
+        flags = self.flags
+        mask = 0
+        for kw in hits:
+            mask |= flags.get(kw, 0)
+        return mask
+
+    def detected_layers(self, mask: int) -> List[str]:
+        return [layer for i, layer in enumerate(self.layers) if mask >> (_LAYER_SHIFT + i) & 1]
+
+    @staticmethod
+    def existence_signals(mask: int) -> Tuple[bool, bool]:
+        """
+        (破壊あり, ライフサイクルあり)。HARD は文脈不問で破壊、
+        SOFT は安全対象語（SAFE_TARGET）が同じテキストにあれば破壊とみなさない。
+        """
+        has_destruction = bool(mask & HARD_DESTRUCTION) or (
+            bool(mask & SOFT_DESTRUCTION) and not mask & SAFE_TARGET
+        )
+        return has_destruction, bool(mask & LIFECYCLE)
+
+    def recommendation_codes(
+        self, hits: AbstractSet[str]
+    ) -> Tuple[List[str], List[str]]:
+        """(安全/リスク系コード, 期限/速度系コード)。それぞれ重複なしの昇順。"""
+        safety, speed = self.safety_codes, self.speed_codes
+        return (
+            sorted({safety[kw] for kw in hits if kw in safety}),
+            sorted({speed[kw] for kw in hits if kw in speed}),
+        )
+
+    def destruction_keywords(self, hits: AbstractSet[str]) -> List[str]:
+        """出現した破壊キーワード（HARD → SOFT、各表の登録順）。"""
+        order = self.destruction_order
+        return sorted((kw for kw in hits if kw in order), key=order.__getitem__)
+
+
+def _merge_codes(target: Dict[str, str], words: Dict[str, str], where: str) -> None:
+    for kw, code in words.items():
+        kw = normalize_text(kw)
+        if target.setdefault(kw, code) != code:
+            raise ValueError(f"{where}: '{kw}' の reason code が衝突しています（{target[kw]} / {code}）")
+
+
+def compile_rule_packs(packs: Iterable[RulePack] = ()) -> RuleSet:
+    """
+    builtin / builtin_en + packs（この順）を 1 つの RuleSet にコンパイルする。
+
+    キーワードは normalize_text() で正規化してから登録する（"Risk" と "risk"、
+    全角の "ＳＬＡ" と "sla" は同じ語）。正規化後に同じになるキーワードへ
+    異なる reason code を割り当てた場合、同じキーワードを HARD と SOFT の
+    両方に登録した場合は ValueError。
+    """
+    packs = builtin_rule_packs() + list(packs)
+    names = [pack.name for pack in packs]
+    duplicated = sorted({name for name in names if names.count(name) > 1})
+    if duplicated:
+        raise ValueError(f"パック名が重複しています: {', '.join(duplicated)}")
+
+    languages: Dict[str, None] = {}
+    flags: Dict[str, int] = {}
+    layer_bits: Dict[str, int] = {}
+    safety_codes: Dict[str, str] = {}
+    speed_codes: Dict[str, str] = {}
+    hard: Dict[str, None] = {}
+    soft: Dict[str, None] = {}
+    alternatives: Dict[str, str] = {}
+
+    for pack in packs:
+        languages.setdefault(pack.language, None)
+        _merge_codes(safety_codes, pack.safety_words, pack.name)
+        _merge_codes(speed_codes, pack.speed_words, pack.name)
+        for kw in list(pack.safety_words) + list(pack.speed_words):
+            flags.setdefault(normalize_text(kw), 0)
+        for layer, keywords in pack.structures.items():
+            bit = layer_bits.setdefault(layer, 1 << (_LAYER_SHIFT + len(layer_bits)))
+            for kw in keywords:
+                kw = normalize_text(kw)
+                flags[kw] = flags.get(kw, 0) | bit
+        for key, bit in _EXISTENCE_LISTS:
+            for kw in getattr(pack, key):
+                kw = normalize_text(kw)
+                flags[kw] = flags.get(kw, 0) | bit
+        hard.update(dict.fromkeys(normalize_text(kw) for kw in pack.hard_destruction))
+        soft.update(dict.fromkeys(normalize_text(kw) for kw in pack.soft_destruction))
+        for kw, text in pack.alternatives.items():
+            alternatives.setdefault(normalize_text(kw), text)
+
+    both = sorted(set(hard) & set(soft))
+    if both:
+        raise ValueError(f"HARD と SOFT の両方に登録されています: {', '.join(both)}")
+
+    return RuleSet(
+        packs=tuple((pack.name, pack.revision) for pack in packs),
+        languages=tuple(languages),
+        matcher=KeywordMatcher(flags, normalize=True, word_boundaries=True),
+        flags=flags,
+        layers=tuple(layer_bits),
+        safety_codes=safety_codes,
+        speed_codes=speed_codes,
+        destruction_order={kw: i for i, kw in enumerate(list(hard) + list(soft))},
+        alternatives=alternatives,
+    )
+
+
+# ---------------------------------------------------------------------------
+# 有効な RuleSet（1 回の代入で差し替える）
+# ---------------------------------------------------------------------------
+_ACTIVE: Optional[RuleSet] = None
+
+
+def get_rule_set() -> RuleSet:
+    """現在有効な RuleSet（未設定なら builtin のみ）。"""
+    global _ACTIVE
+    if _ACTIVE is None:
+        _ACTIVE = compile_rule_packs()
+    return _ACTIVE
+
+
+def activate(rule_set: Optional[RuleSet]) -> None:
+    """rule_set を有効にする（None = builtin のみに戻す）。処理中のリクエストには影響しない。"""
+    global _ACTIVE
+    _ACTIVE = rule_set
+
+
+class RulePackLoader:
+    """
+    ディレクトリ内の *.json をファイル名順に読み、コンパイルして有効化する。
+
+    Args:
+        directory: ルールパックのディレクトリ
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.rule_set: Optional[RuleSet] = None
+        self.load_error: Optional[str] = None
+        self._signature: Optional[Tuple[Tuple[str, int, int], ...]] = None
+        self._lock = threading.Lock()
+
+    def _paths(self) -> List[str]:
+        return sorted(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        )
+
+    def _stat(self) -> Tuple[Tuple[str, int, int], ...]:
+        out = []
+        for path in self._paths():
+            st = os.stat(path)
+            out.append((path, st.st_mtime_ns, st.st_size))
+        return tuple(out)
+
+    def reload(self) -> RuleSet:
+        """
+        全パックを読み直して有効化する。
+
+        読み込み・コンパイルに失敗したら ValueError / OSError を送出し、
+        それまで有効だった RuleSet をそのまま使い続ける。
+        """
+        with self._lock:
+            signature = self._stat()
+            self._signature = signature
+            try:
+                rule_set = compile_rule_packs(load_rule_pack(path) for path, _, _ in signature)
+            except (OSError, ValueError) as e:
+                self.load_error = str(e)
+                raise
+            self.load_error = None
+            self.rule_set = rule_set
+            activate(rule_set)
+            return rule_set
+
+    def reload_if_changed(self) -> bool:
+        """
+        ファイルの追加・削除・更新があれば reload する（ポーリング用。例外は送出しない）。
+
+        Returns:
+            差し替えたら True。変更なし、または読み込みに失敗したら False（load_error に理由）
+        """
+        try:
+            if self._stat() == self._signature:
+                return False
+            self.reload()
+        except (OSError, ValueError) as e:
+            self.load_error = str(e)
+            return False
+        return True
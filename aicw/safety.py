@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import re
-from typing import Any, Dict, List, Optional, Tuple, Literal
+from typing import Any, AbstractSet, Dict, List, Literal, Optional, Sequence, Tuple
 
 
 @dataclass(frozen=True)
@@ -20,45 +20,58 @@ class Finding:
 # 各エントリ: (kind, pattern, message, severity)
 #   severity="block" → 即停止（No-Go #6）
 #   severity="warn"  → 警告のみ、ブロックしない（過検知が多いパターン）
-_PRIVACY_PATTERNS: List[Tuple[str, re.Pattern[str], str, str]] = [
+# pattern は初回スキャン時にまとめてコンパイルする（import 時の re.compile を避ける）
+_PRIVACY_PATTERN_SPECS: List[Tuple[str, str, str, str]] = [
     (
         "EMAIL_LIKE",
-        re.compile(r"[A-Za-z0-9._%+\-]{1,64}@[A-Za-z0-9.\-]{1,255}\.[A-Za-z]{2,63}"),
+        r"[A-Za-z0-9._%+\-]{1,64}@[A-Za-z0-9.\-]{1,255}\.[A-Za-z]{2,63}",
         "メールっぽい文字列が含まれています（個人情報の可能性）。",
         "block",
     ),
     (
         "PHONE_LIKE",
-        re.compile(r"\b0\d{1,4}-\d{1,4}-\d{3,4}\b"),
+        r"\b0\d{1,4}-\d{1,4}-\d{3,4}\b",
         "電話番号っぽい文字列が含まれています（個人情報の可能性）。",
         "block",
     ),
     (
         "POSTAL_CODE_LIKE",
-        re.compile(r"\b\d{3}-\d{4}\b"),
+        r"\b\d{3}-\d{4}\b",
         "郵便番号っぽい文字列が含まれています（個人情報の可能性）。品番・ロット番号等の誤検知あり。",
         "warn",  # 品番・識別コード等の誤検知が多く、単体では PII 価値が低いため warn に変更
     ),
     (
         "IP_LIKE",
-        re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b"),
+        r"\b(?:\d{1,3}\.){3}\d{1,3}\b",
         "IPアドレスっぽい文字列が含まれています（機密の可能性）。バージョン文字列等の誤検知あり。",
         "warn",  # バージョン番号(1.2.3.4)などの誤検知が多いため warn に変更
     ),
     (
         "SECRET_LIKE_LONG",
-        re.compile(r"\b[A-Za-z0-9_\-]{32,}\b"),
+        r"\b[A-Za-z0-9_\-]{32,}\b",
         "秘密情報っぽい長い文字列が含まれています（キー/パスワード等の可能性）。",
         "block",
     ),
     (
         "SECRET_KEYWORD",
-        re.compile(r"(?i)\b(token|secret|password|apikey|api_key)\b"),
+        r"(?i)\b(token|secret|password|apikey|api_key)\b",
         "秘密情報を示す単語が含まれています（誤って貼り付けた可能性）。",
         "block",
     ),
 ]
 
+_PRIVACY_PATTERNS: Optional[List[Tuple[str, re.Pattern[str], str, str]]] = None
+
+
+def _get_privacy_patterns() -> List[Tuple[str, re.Pattern[str], str, str]]:
+    global _PRIVACY_PATTERNS
+    if _PRIVACY_PATTERNS is None:
+        _PRIVACY_PATTERNS = [
+            (kind, re.compile(pattern), msg, severity)
+            for kind, pattern, msg, severity in _PRIVACY_PATTERN_SPECS
+        ]
+    return _PRIVACY_PATTERNS
+
 
 @dataclass(frozen=True)
 class ManipulationHit:
@@ -101,11 +114,19 @@ _MANIPULATION_WARN_WEIGHTS = {
 _MANIPULATION_ESCALATION_THRESHOLD = 6
 
 # 命令調・強制調（warn スコアに加点）
-_IMPERATIVE_PATTERNS: List[Tuple[str, re.Pattern[str], int]] = [
-    ("命令調", re.compile(r"(しろ|せよ|やれ)"), 2),
-    ("強制表現", re.compile(r"(べきだ|に違いない)"), 1),
+# 各エントリ: (label, phrases, weight) — phrases のいずれかを含めば加点
+_IMPERATIVE_PATTERNS: List[Tuple[str, Tuple[str, ...], int]] = [
+    ("命令調", ("しろ", "せよ", "やれ"), 2),
+    ("強制表現", ("べきだ", "に違いない"), 1),
 ]
 
+# 融合スキャン用の全語彙（KeywordMatcher に登録して hits を作る）
+MANIPULATION_KEYWORDS: Tuple[str, ...] = tuple(
+    _MANIPULATION_BLOCK_PHRASES
+    + _MANIPULATION_WARN_PHRASES
+    + [p for _, phrases, _ in _IMPERATIVE_PATTERNS for p in phrases]
+)
+
 
 def _is_secret_keyword_explanatory_context(text: str, start: int, end: int) -> bool:
     """SECRET_KEYWORD が説明文脈かどうかを判定する（説明のみなら warn 扱い）。"""
@@ -143,7 +164,7 @@ def scan_privacy_risks(
         return []
     severity_overrides = severity_overrides or {}
     findings: List[Finding] = []
-    for kind, rx, msg, severity in _PRIVACY_PATTERNS:
+    for kind, rx, msg, severity in _get_privacy_patterns():
         override_severity = severity_overrides.get(kind)
         for m in rx.finditer(text):
             effective_severity = override_severity or severity
@@ -226,7 +247,50 @@ def guard_text(
     return True, text, findings, summary
 
 
-def _warn_score(text: str) -> Tuple[int, List[ManipulationHit]]:
+_KIND_ORDER: Dict[str, int] = {kind: i for i, (kind, *_) in enumerate(_PRIVACY_PATTERN_SPECS)}
+_SECRET_CONTEXT_CHARS = 18   # _is_secret_keyword_explanatory_context の前後の幅
+
+
+def guard_fields(
+    texts: Sequence[str],
+    field_findings: Optional[Sequence[List[Finding]]] = None,
+) -> Tuple[bool, str, List[Finding], Dict[str, Any]]:
+    """
+    guard_text("\n".join(texts)) と同じ結果を、フィールドごとの検知から組み立てる。
+
+    field_findings[i] は scan_privacy_risks(texts[i]) の結果（省略時はここで走査する）。
+    呼び出し側がフィールド単位でキャッシュすれば、変わっていないフィールドは再走査しない。
+    どのパターンも改行をまたがないので、連結テキストの検知はフィールドの検知を
+    ずらしたものと一致する。説明文脈の判定窓が隣のフィールドにかかる SECRET_KEYWORD
+    だけは連結テキストで判定し直す。
+    """
+    if field_findings is None:
+        field_findings = [scan_privacy_risks(t) for t in texts]
+    blob = "\n".join(texts)
+    findings: List[Finding] = []
+    offset = 0
+    for text, found in zip(texts, field_findings):
+        for f in found:
+            if offset:
+                f = replace(f, start=f.start + offset, end=f.end + offset)
+            if f.kind == "SECRET_KEYWORD" and (
+                f.start - offset < _SECRET_CONTEXT_CHARS
+                or f.end - offset + _SECRET_CONTEXT_CHARS > len(text)
+            ):
+                explanatory = _is_secret_keyword_explanatory_context(blob, f.start, f.end)
+                f = replace(f, severity="warn" if explanatory else "block")
+            findings.append(f)
+        offset += len(text) + 1
+    # guard_text と同じ順序（パターン順 → 位置順）
+    findings.sort(key=lambda f: _KIND_ORDER[f.kind])
+    summary = _build_guard_summary(findings)
+    block_findings = [f for f in findings if f.severity == "block"]
+    if block_findings:
+        return False, redact(blob, block_findings), findings, summary
+    return True, blob, findings, summary
+
+
+def _warn_score(text: str | AbstractSet[str]) -> Tuple[int, List[ManipulationHit]]:
     score = 0
     hits: List[ManipulationHit] = []
 
@@ -236,16 +300,25 @@ def _warn_score(text: str) -> Tuple[int, List[ManipulationHit]]:
             score += w
             hits.append(ManipulationHit(phrase=phrase, severity="warn", score=w))
 
-    for label, rx, weight in _IMPERATIVE_PATTERNS:
-        if rx.search(text):
+    for label, phrases, weight in _IMPERATIVE_PATTERNS:
+        if any(p in text for p in phrases):
             score += weight
             hits.append(ManipulationHit(phrase=label, severity="warn", score=weight))
 
     return score, hits
 
 
-def scan_manipulation(text: str) -> List[ManipulationHit]:
+def scan_manipulation(
+    text: str,
+    *,
+    hits: Optional[AbstractSet[str]] = None,
+) -> List[ManipulationHit]:
     """
+    Args:
+      text: 検査対象の出力テキスト
+      hits: MANIPULATION_KEYWORDS を登録した KeywordMatcher.scan(text) の結果。
+            渡された場合はフレーズ照合をそれで代替する（融合スキャン用）。
+
     Returns: 検知したフレーズ一覧（空ならOK）
       severity="block" → 必ず停止（No-Go #4）
       severity="warn"  → 警告のみ、ブロックしない
@@ -255,19 +328,19 @@ def scan_manipulation(text: str) -> List[ManipulationHit]:
       2) warn phrase + 文脈（命令調）スコアが threshold 以上なら block に昇格
       3) それ以外は warn
     """
-    hits: List[ManipulationHit] = []
     if not text:
-        return hits
+        return []
+    found: str | AbstractSet[str] = text if hits is None else hits
 
     block_hits: List[ManipulationHit] = []
     for p in _MANIPULATION_BLOCK_PHRASES:
-        if p in text:
+        if p in found:
             block_hits.append(ManipulationHit(phrase=p, severity="block", score=10))
 
     if block_hits:
         return block_hits
 
-    score, warn_hits = _warn_score(text)
+    score, warn_hits = _warn_score(found)
     if score >= _MANIPULATION_ESCALATION_THRESHOLD:
         # 昇格: warn を block として返す（phrases を保持）
         return [
@@ -8,12 +8,16 @@ validate_request.py、テストから共通参照する。
   - 外部ライブラリ不使用（Python 標準のみ）
   - スキーマ定義は dict で保持（ドキュメント + バリデーション兼用）
   - validate_request() を呼べば errors: List[str] が返る
+  - バリデータはスキーマから 1 回だけコンパイルし（compile_request_validator）、
+    以後は専用クロージャで検査する。JSONL の一括検査は validate_many()
+  - 出力（decision_brief.v0）は validate_brief() で検査する。本番では
+    BriefSampler で N 件に 1 件だけ検査し、件数をカウンタに残す
   - 推論の核: Existence Ethics Principle（生存構造倫理原則）
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 
 # ---------------------------------------------------------------------------
@@ -192,11 +196,6 @@ DECISION_BRIEF_V0: Dict[str, Any] = {
 # ---------------------------------------------------------------------------
 # バリデーション関数（標準ライブラリのみ）
 # ---------------------------------------------------------------------------
-_REQUIRED_FIELDS = {
-    k for k, v in DECISION_REQUEST_V0["fields"].items() if v.get("required", False)
-}
-_ALLOWED_FIELDS = set(DECISION_REQUEST_V0["allowed_fields"])
-
 # タイポしやすいフィールド名のヒント
 _TYPO_HINTS: Dict[str, str] = {
     "constrint":          "constraints",
@@ -214,40 +213,435 @@ _TYPO_HINTS: Dict[str, str] = {
 }
 
 
+# 型名 → (Python 型, エラーメッセージの型表記)
+_TYPE_CHECKS: Dict[str, Tuple[type, str]] = {
+    "str": (str, "文字列型"),
+    "list": (list, "リスト型"),
+}
+
+# 従来から型を検査していないフィールド（結論に使わないため任意の値を受け付ける。#3対策）
+_UNCHECKED_FIELDS = frozenset({"asker_status"})
+
+_NOT_A_DICT = "トップレベルはオブジェクト（{}）である必要があります"
+
+RequestValidator = Callable[[Any], List[str]]
+RequestNormalizer = Callable[[Any], Tuple[List[str], Optional[Dict[str, Any]]]]
+
+
+def _compile_field_checks(schema: Dict[str, Any]) -> Dict[str, Tuple[int, type, str]]:
+    """フィールド名 → (スキーマ上の順序, 期待型, 型エラーの書式)。検査しない型は object。"""
+    checks: Dict[str, Tuple[int, type, str]] = {}
+    for order, (name, spec) in enumerate(schema["fields"].items()):
+        base = str(spec.get("type", "")).split("[", 1)[0]
+        if name in _UNCHECKED_FIELDS or base not in _TYPE_CHECKS:
+            checks[name] = (order, object, "")
+            continue
+        py_type, label = _TYPE_CHECKS[base]
+        checks[name] = (order, py_type, f"'{name}' は{label}が必要です（現在: {{}}）")
+    return checks
+
+
+def _unknown_field_error(name: str, allowed: List[str]) -> str:
+    hint = _TYPO_HINTS.get(name)
+    if hint:
+        return f"不明なフィールド: '{name}' → もしかして '{hint}' ?"
+    return f"不明なフィールド: '{name}'（使用可能: {allowed}）"
+
+
+def _compile(schema: Dict[str, Any], normalize: bool) -> Callable[[Any], Any]:
+    checks = _compile_field_checks(schema)
+    types: Dict[str, type] = {name: c[1] for name, c in checks.items()}
+    allowed_list = sorted(schema["allowed_fields"])
+    required = tuple(sorted(
+        k for k, v in schema["fields"].items() if v.get("required", False)
+    ))
+
+    def collect_errors(data: Any) -> List[str]:
+        # 不正入力時のみ通る。順序は従来どおり: 必須不足 → 型（スキーマ順）→ 不明フィールド（名前順）
+        if not isinstance(data, dict):
+            return [_NOT_A_DICT]
+        errors = [f"必須フィールドが不足: '{f}'" for f in required if f not in data]
+        type_errors: List[Tuple[int, str]] = []
+        unknown: List[str] = []
+        for key, value in data.items():
+            check = checks.get(key)
+            if check is None:
+                unknown.append(key)
+            elif not isinstance(value, check[1]):
+                type_errors.append((check[0], check[2].format(type(value).__name__)))
+        errors.extend(msg for _, msg in sorted(type_errors))
+        errors.extend(_unknown_field_error(u, allowed_list) for u in sorted(unknown, key=str))
+        return errors
+
+    def validate(data: Any) -> List[str]:
+        # 正常系: キーを 1 回なめて型表を引くだけ
+        if isinstance(data, dict):
+            for key, value in data.items():
+                expected = types.get(key)
+                if expected is None or not isinstance(value, expected):
+                    break
+            else:
+                for f in required:
+                    if f not in data:
+                        break
+                else:
+                    return []
+        return collect_errors(data)
+
+    def validate_normalized(data: Any) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+        if isinstance(data, dict):
+            out: Dict[str, Any] = {}
+            for key, value in data.items():
+                expected = types.get(key)
+                if expected is None or not isinstance(value, expected):
+                    break
+                out[key] = [str(v) for v in value] if expected is list else value
+            else:
+                for f in required:
+                    if f not in data:
+                        break
+                else:
+                    return [], out
+        return collect_errors(data), None
+
+    return validate_normalized if normalize else validate
+
+
+def compile_request_validator(schema: Dict[str, Any] = DECISION_REQUEST_V0) -> RequestValidator:
+    """
+    スキーマから専用のバリデーション関数を生成する。
+
+    フィールド表・必須項目・エラーメッセージの書式を事前に確定させ、
+    検査時は入力のキーを 1 回なめるだけにする。
+    """
+    return _compile(schema, normalize=False)
+
+
+def compile_request_normalizer(schema: Dict[str, Any] = DECISION_REQUEST_V0) -> RequestNormalizer:
+    """
+    検査と正規化を 1 パスで行う関数を生成する。
+
+    戻り値の関数は (errors, normalized) を返す。valid のときだけ normalized が dict になり、
+    list 型フィールドの要素は str に揃える（build_decision_report の入力と同じ形）。
+    """
+    return _compile(schema, normalize=True)
+
+
+# DECISION_REQUEST_V0 用のコンパイル済み関数（初回利用時に生成）
+_REQUEST_VALIDATOR: Optional[RequestValidator] = None
+_REQUEST_NORMALIZER: Optional[RequestNormalizer] = None
+
+
+def _get_request_validator() -> RequestValidator:
+    global _REQUEST_VALIDATOR
+    if _REQUEST_VALIDATOR is None:
+        _REQUEST_VALIDATOR = compile_request_validator(DECISION_REQUEST_V0)
+    return _REQUEST_VALIDATOR
+
+
+def _get_request_normalizer() -> RequestNormalizer:
+    global _REQUEST_NORMALIZER
+    if _REQUEST_NORMALIZER is None:
+        _REQUEST_NORMALIZER = compile_request_normalizer(DECISION_REQUEST_V0)
+    return _REQUEST_NORMALIZER
+
+
 def validate_request(data: Any) -> List[str]:
     """
     decision_request.v0 のバリデーション。
     Returns: エラーメッセージのリスト（空リスト = valid）
     """
-    errors: List[str] = []
-
-    if not isinstance(data, dict):
-        return ["トップレベルはオブジェクト（{}）である必要があります"]
-
-    # 必須フィールド
-    for f in sorted(_REQUIRED_FIELDS):
-        if f not in data:
-            errors.append(f"必須フィールドが不足: '{f}'")
-
-    # 型チェック
-    if "situation" in data and not isinstance(data["situation"], str):
-        errors.append(f"'situation' は文字列型が必要です（現在: {type(data['situation']).__name__}）")
-    if "constraints" in data and not isinstance(data["constraints"], list):
-        errors.append(f"'constraints' はリスト型が必要です（現在: {type(data['constraints']).__name__}）")
-    if "options" in data and not isinstance(data["options"], list):
-        errors.append(f"'options' はリスト型が必要です（現在: {type(data['options']).__name__}）")
-    if "beneficiaries" in data and not isinstance(data["beneficiaries"], list):
-        errors.append(f"'beneficiaries' はリスト型が必要です（現在: {type(data['beneficiaries']).__name__}）")
-    if "affected_structures" in data and not isinstance(data["affected_structures"], list):
-        errors.append(f"'affected_structures' はリスト型が必要です（現在: {type(data['affected_structures']).__name__}）")
-
-    # 不明フィールド（タイポ検出）
-    unknown = set(data.keys()) - _ALLOWED_FIELDS
-    for u in sorted(unknown):
-        hint = _TYPO_HINTS.get(u)
-        if hint:
-            errors.append(f"不明なフィールド: '{u}' → もしかして '{hint}' ?")
-        else:
-            errors.append(f"不明なフィールド: '{u}'（使用可能: {sorted(_ALLOWED_FIELDS)}）")
-
-    return errors
+    return _get_request_validator()(data)
+
+
+def validate_and_normalize(data: Any) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+    """
+    検査 + 正規化（1 パス）。
+    Returns: (errors, normalized)。errors が空のときだけ normalized は dict。
+    """
+    return _get_request_normalizer()(data)
+
+
+def validate_many(
+    source: Union[str, IO[bytes]],
+    validator: Optional[RequestValidator] = None,
+) -> Iterator[Tuple[int, int, List[str]]]:
+    """
+    JSONL を 1 行ずつ読み、各行の検査結果を返す（ファイル全体は読み込まない）。
+
+    Args:
+        source: JSONL ファイルのパス、またはバイナリモードのファイルオブジェクト
+        validator: 省略時は validate_request と同じコンパイル済みバリデータ
+
+    Yields:
+        (line_no, offset, errors)
+          line_no: 1 始まりの行番号
+          offset:  行頭のバイトオフセット
+          errors:  エラーメッセージのリスト（空 = valid）。JSON として読めない行もエラーとして返す
+        空行は読み飛ばす。
+    """
+    check = validator or _get_request_validator()
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            yield from _validate_lines(f, check)
+    else:
+        yield from _validate_lines(source, check)
+
+
+def _validate_lines(f: IO[bytes], check: RequestValidator) -> Iterator[Tuple[int, int, List[str]]]:
+    import json
+
+    offset = 0
+    for line_no, raw in enumerate(f, start=1):
+        start = offset
+        offset += len(raw)
+        if not raw.strip():
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError as e:  # JSONDecodeError / UnicodeDecodeError
+            yield line_no, start, [f"JSON として読めません: {e}"]
+            continue
+        yield line_no, start, check(data)
+
+
+# ---------------------------------------------------------------------------
+# decision_brief.v0 の検査（出力側）
+# ---------------------------------------------------------------------------
+_BRIEF_TYPE_CHECKS: Dict[str, Tuple[type, str]] = {
+    "str": (str, "文字列型"),
+    "dict": (dict, "オブジェクト型"),
+    "list": (list, "リスト型"),
+    "int": (int, "整数型"),
+}
+
+BriefValidator = Callable[[Any], List[str]]
+
+
+def _brief_type(spec: Dict[str, Any]) -> Optional[Tuple[type, Optional[type], str]]:
+    """"list[str]" → (list, str, "リスト型")。未知の型は None（検査しない）。"""
+    raw = str(spec.get("type", ""))
+    base, _, inner = raw.partition("[")
+    if base not in _BRIEF_TYPE_CHECKS:
+        return None
+    py_type, label = _BRIEF_TYPE_CHECKS[base]
+    item = _BRIEF_TYPE_CHECKS.get(inner.rstrip("]"), (None, ""))[0] if inner else None
+    return py_type, item, label
+
+
+def _type_error(path: str, value: Any, expected: Tuple[type, Optional[type], str]) -> Optional[str]:
+    py_type, item_type, label = expected
+    if not isinstance(value, py_type) or (py_type is int and isinstance(value, bool)):
+        return f"'{path}' は{label}が必要です（現在: {type(value).__name__}）"
+    if item_type is not None:
+        for i, item in enumerate(value):
+            if not isinstance(item, item_type):
+                return f"'{path}[{i}]' の型が不正です（現在: {type(item).__name__}）"
+    return None
+
+
+def compile_brief_validator(schema: Dict[str, Any] = DECISION_BRIEF_V0) -> BriefValidator:
+    """
+    decision_brief.v0 の検査関数を生成する。
+
+    検査内容:
+      - status の enum と required_if（"status == ok" / "status == blocked"）
+      - 各フィールドの型（list[...] は要素型も）
+      - existence_analysis 内の enum（question_3_judgment / distortion_risk）
+      - blocked_by の値、selection.reason_codes / not_selected_reason_code の登録済みコード
+    スキーマにない追加フィールド（dlp_summary など）はエラーにしない。
+    """
+    fields: Dict[str, Any] = schema["fields"]
+    codes: Dict[str, Any] = schema["reason_codes"]
+
+    status_enum = tuple(fields["status"]["enum"])
+    required_by_status: Dict[str, List[str]] = {}
+    for name, spec in fields.items():
+        cond = spec.get("required_if")
+        if cond:
+            _, _, value = cond.partition("==")
+            required_by_status.setdefault(value.strip(), []).append(name)
+    types = {
+        name: t for name, t in ((n, _brief_type(sp)) for n, sp in fields.items())
+        if t is not None and name != "status"
+    }
+    existence_items = fields["existence_analysis"].get("item_fields", {})
+    existence_enums = {
+        name: tuple(spec["enum"]) for name, spec in existence_items.items() if "enum" in spec
+    }
+    existence_types = {
+        name: t for name, t in ((n, _brief_type(sp)) for n, sp in existence_items.items())
+        if t is not None
+    }
+    candidate_types = {
+        name: t for name, t in ((n, _brief_type(sp)) for n, sp in fields["candidates"]["item_fields"].items())
+        if t is not None
+    }
+    selection_codes = frozenset(codes["selection"])
+    not_selected_codes = frozenset(codes["not_selected"])
+    blocked_by_values = tuple(codes["blocked_by_values"])
+
+    def validate(report: Any) -> List[str]:
+        if not isinstance(report, dict):
+            return [_NOT_A_DICT]
+        status = report.get("status")
+        if status not in status_enum:
+            return [f"'status' の値が不正です: {status!r}（使用可能: {list(status_enum)}）"]
+
+        errors = [
+            f"status == {status} のとき必須のフィールドが不足: '{name}'"
+            for name in required_by_status.get(status, ())
+            if name not in report
+        ]
+        for name, value in report.items():
+            expected = types.get(name)
+            if expected is not None:
+                err = _type_error(name, value, expected)
+                if err:
+                    errors.append(err)
+
+        if status == "blocked":
+            blocked_by = report.get("blocked_by")
+            if "blocked_by" in report and blocked_by not in blocked_by_values:
+                errors.append(
+                    f"'blocked_by' の値が不正です: {blocked_by!r}（使用可能: {list(blocked_by_values)}）"
+                )
+            return errors
+
+        existence = report.get("existence_analysis")
+        if isinstance(existence, dict):
+            for name, expected in existence_types.items():
+                if name not in existence:
+                    errors.append(f"'existence_analysis.{name}' が不足しています")
+                    continue
+                err = _type_error(f"existence_analysis.{name}", existence[name], expected)
+                if err:
+                    errors.append(err)
+            for name, allowed in existence_enums.items():
+                value = existence.get(name)
+                if name in existence and value not in allowed:
+                    errors.append(
+                        f"'existence_analysis.{name}' の値が不正です: {value!r}（使用可能: {list(allowed)}）"
+                    )
+
+        selection = report.get("selection")
+        if isinstance(selection, dict):
+            for code in selection.get("reason_codes") or []:
+                if code not in selection_codes:
+                    errors.append(f"未登録の reason code: 'selection.reason_codes' に {code!r}")
+
+        candidates = report.get("candidates")
+        if isinstance(candidates, list):
+            for i, cand in enumerate(candidates):
+                if not isinstance(cand, dict):
+                    continue  # 型エラーは上で報告済み
+                for name, expected in candidate_types.items():
+                    if name not in cand:
+                        errors.append(f"'candidates[{i}].{name}' が不足しています")
+                        continue
+                    err = _type_error(f"candidates[{i}].{name}", cand[name], expected)
+                    if err:
+                        errors.append(err)
+                code = cand.get("not_selected_reason_code")
+                if "not_selected_reason_code" in cand and code not in not_selected_codes:
+                    errors.append(
+                        f"未登録の reason code: 'candidates[{i}].not_selected_reason_code' に {code!r}"
+                    )
+        return errors
+
+    return validate
+
+
+_BRIEF_VALIDATOR: Optional[BriefValidator] = None
+
+
+def _get_brief_validator() -> BriefValidator:
+    global _BRIEF_VALIDATOR
+    if _BRIEF_VALIDATOR is None:
+        _BRIEF_VALIDATOR = compile_brief_validator(DECISION_BRIEF_V0)
+    return _BRIEF_VALIDATOR
+
+
+def validate_brief(report: Any) -> List[str]:
+    """
+    decision_brief.v0 の検査。
+    Returns: エラーメッセージのリスト（空リスト = 契約どおり）
+    """
+    return _get_brief_validator()(report)
+
+
+class BriefSampler:
+    """
+    本番用のサンプリング検査。every 件に 1 件だけ validate_brief を実行する。
+
+    検査しない呼び出しはカウンタを 1 つ進めるだけ。every=0 で検査を完全に無効化する。
+    カウンタの更新はロックで直列化するため、複数のゲートウェイスレッドで共有してよい
+    （validate_brief 自体はロックの外で実行する）。
+    カウンタ（seen / validated / failed と、エラーメッセージ別の件数）は stats() で取得する。
+
+    使用例:
+        sampler = BriefSampler(every=1000)
+        report = build_decision_report(request)
+        sampler.observe(report)
+        ...
+        sampler.stats()   # {"seen": ..., "validated": ..., "failed": ..., "errors": {...}}
+    """
+
+    def __init__(self, every: int = 1000, validator: Optional[BriefValidator] = None) -> None:
+        if every < 0:
+            raise ValueError("every must be >= 0")
+        # サンプラーを使うときだけ必要なため遅延 import（import aicw.schema を軽く保つ）
+        import threading
+
+        self._every = every
+        self._validator = validator
+        self._lock = threading.Lock()
+        self._seen = 0
+        self._validated = 0
+        self._failed = 0
+        self._error_counts: Dict[str, int] = {}
+
+    @property
+    def every(self) -> int:
+        return self._every
+
+    def observe(self, report: Any) -> Optional[List[str]]:
+        """
+        report を 1 件観測する。
+
+        Returns:
+            検査した場合はエラーのリスト（空 = OK）、検査しなかった場合は None
+        """
+        with self._lock:
+            self._seen += 1
+            n = self._seen
+        if not self._every or n % self._every:
+            return None
+        validator = self._validator or _get_brief_validator()
+        errors = validator(report)
+        with self._lock:
+            self._validated += 1
+            if errors:
+                self._failed += 1
+                for e in errors:
+                    self._error_counts[e] = self._error_counts.get(e, 0) + 1
+        return errors
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "every": self._every,
+                "seen": self._seen,
+                "validated": self._validated,
+                "failed": self._failed,
+                "errors": dict(
+                    sorted(self._error_counts.items(), key=lambda kv: (-kv[1], kv[0]))
+                ),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._seen = 0
+            self._validated = 0
+            self._failed = 0
+            self._error_counts = {}
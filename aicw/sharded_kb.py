@@ -0,0 +1,273 @@
+"""
+aicw/sharded_kb.py
+
+テナント（チーム）ごとに分割した知識ベース
+
+背景:
+  1 つのエンジンを複数チームで共有すると、KnowledgeBase は 1 本のリストと
+  1 つの max_entries なので、チーム同士が履歴を押し出し合い、
+  件数の多いチームの find_similar が全員を遅くする。
+
+設計:
+  - テナント ID ごとに独立した KnowledgeBase（= シャード）を持つ
+    → 索引・上限（quota）・永続化ファイル（<root>/<tenant>.json）がシャード単位
+  - シャードは最初にアクセスされたときに読み込む（遅延ロード）
+  - 読み込み済みシャードは max_loaded_shards 個まで。超えたら最も長く使われて
+    いないシャードをメモリから外す（LRU）。write_behind のシャードは
+    外す前に未保存の記録を書き出す（flush）
+  - テナント横断の統計はシャードごとのカウンタ（件数・status 別件数・reason code 頻度）
+    を合算する。カウンタは record() のたびに差分更新し、シャードを外しても残す
+  - root=None（インメモリ）のシャードは外すと履歴が消えるため LRU の対象にしない
+  - テナント ID はファイル名になるため英数字と "_" "-" "." のみ（先頭 "." 不可）
+  - LRU とカウンタの更新は 1 つのロック（RLock）で直列化する。find_similar / query は
+    このロックの外で、シャード（KnowledgeBase）自身のロックの下で検索する。
+    どちらのロックも記録と検索の両方が取るため、複数スレッドで共有してよい
+  - 外部ライブラリ不使用
+
+使用例:
+    from aicw.sharded_kb import ShardedKnowledgeBase
+
+    skb = ShardedKnowledgeBase("data/kb", max_entries=500, quotas={"team-a": 2000})
+    skb.record("team-a", "abc123...", "ok", ["SAFETY_FIRST"])
+    skb.find_similar("team-a", ["SAFETY_FIRST"], top_k=3)
+    skb.stats()["total"]
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .knowledge_base import KnowledgeBase
+
+_TENANT_RE = re.compile(r"[A-Za-z0-9_\-][A-Za-z0-9_.\-]{0,63}")
+_SUFFIX = ".json"
+
+
+def _validate_tenant(tenant_id: str) -> str:
+    if not isinstance(tenant_id, str) or not _TENANT_RE.fullmatch(tenant_id):
+        raise ValueError(f"invalid tenant id: {tenant_id!r}")
+    return tenant_id
+
+
+def _empty_counters(max_entries: int) -> Dict[str, Any]:
+    return {"total": 0, "ok_count": 0, "blocked_count": 0,
+            "reason_codes": {}, "max_entries": max_entries}
+
+
+def _add(counters: Dict[str, Any], entry: Dict[str, Any], sign: int) -> None:
+    counters["total"] += sign
+    key = "ok_count" if entry["status"] == "ok" else "blocked_count"
+    counters[key] += sign
+    freq = counters["reason_codes"]
+    for code in entry["reason_codes"]:
+        n = freq.get(code, 0) + sign
+        if n:
+            freq[code] = n
+        else:
+            freq.pop(code, None)
+
+
+class ShardedKnowledgeBase:
+    """
+    テナント ID でシャードを分けた知識ベース。
+
+    Args:
+        root: シャードファイルを置くディレクトリ（None = インメモリのみ）
+        max_entries: テナントあたりの既定の上限
+        quotas: テナント ID → 上限（max_entries を個別に上書き）
+        max_loaded_shards: 同時にメモリに置くシャード数（root=None では無視）
+        write_behind: シャードの保存をまとめる（KnowledgeBase の write_behind）
+        flush_interval: write_behind の書き出し間隔（秒）
+    """
+
+    DEFAULT_MAX_LOADED = 32
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        *,
+        max_entries: int = KnowledgeBase.DEFAULT_MAX,
+        quotas: Optional[Dict[str, int]] = None,
+        max_loaded_shards: int = DEFAULT_MAX_LOADED,
+        write_behind: bool = False,
+        flush_interval: float = KnowledgeBase.DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if max_loaded_shards <= 0:
+            raise ValueError("max_loaded_shards must be positive")
+        self._quotas: Dict[str, int] = {}
+        for tenant_id, quota in (quotas or {}).items():
+            if quota <= 0:
+                raise ValueError(f"quota for {tenant_id!r} must be positive")
+            self._quotas[_validate_tenant(tenant_id)] = quota
+        self._root = root
+        self._max = max_entries
+        self._max_loaded = max_loaded_shards
+        self._write_behind = write_behind
+        self._flush_interval = flush_interval
+        self._shards: "OrderedDict[str, KnowledgeBase]" = OrderedDict()
+        self._counters: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # シャード管理
+    # ------------------------------------------------------------------
+    def quota(self, tenant_id: str) -> int:
+        return self._quotas.get(tenant_id, self._max)
+
+    def _path(self, tenant_id: str) -> Optional[str]:
+        if self._root is None:
+            return None
+        return os.path.join(self._root, tenant_id + _SUFFIX)
+
+    def _open(self, tenant_id: str) -> KnowledgeBase:
+        return KnowledgeBase(
+            path=self._path(tenant_id),
+            max_entries=self.quota(tenant_id),
+            write_behind=self._write_behind,
+            flush_interval=self._flush_interval,
+        )
+
+    def _count(self, tenant_id: str, kb: KnowledgeBase) -> Dict[str, Any]:
+        counters = _empty_counters(self.quota(tenant_id))
+        for entry in kb.all_entries():
+            _add(counters, entry, +1)
+        return counters
+
+    def shard(self, tenant_id: str) -> KnowledgeBase:
+        """テナントのシャード（未読み込みなら読み込み、LRU の最新にする）。"""
+        with self._lock:
+            kb = self._shards.get(tenant_id)
+            if kb is not None:
+                self._shards.move_to_end(tenant_id)
+                return kb
+            kb = self._open(_validate_tenant(tenant_id))
+            self._shards[tenant_id] = kb
+            if tenant_id not in self._counters:
+                self._counters[tenant_id] = self._count(tenant_id, kb)
+            if self._root is not None:
+                while len(self._shards) > self._max_loaded:
+                    _, evicted = self._shards.popitem(last=False)
+                    evicted.close()
+                    self.evictions += 1
+            return kb
+
+    def flush(self) -> None:
+        """読み込み済みシャードの未保存の記録を書き出す。"""
+        with self._lock:
+            shards = list(self._shards.values())
+        for kb in shards:
+            kb.flush()
+
+    def loaded_tenants(self) -> List[str]:
+        """メモリ上のシャード（古い順 = 次に外される順）。"""
+        with self._lock:
+            return list(self._shards)
+
+    def tenants(self) -> List[str]:
+        """既知のテナント ID（読み込み済み・記録済み・root にファイルがあるもの）。"""
+        with self._lock:
+            found = set(self._counters) | set(self._shards)
+        if self._root is not None and os.path.isdir(self._root):
+            for name in os.listdir(self._root):
+                tenant_id = name[:-len(_SUFFIX)]
+                if name.endswith(_SUFFIX) and _TENANT_RE.fullmatch(tenant_id):
+                    found.add(tenant_id)
+        return sorted(found)
+
+    # ------------------------------------------------------------------
+    # 記録・検索（KnowledgeBase と同じ引数 + テナント ID）
+    # ------------------------------------------------------------------
+    def record(
+        self,
+        tenant_id: str,
+        decision_hash: str,
+        status: str,
+        reason_codes: List[str],
+        blocked_by: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            kb = self.shard(tenant_id)
+            counters = self._counters[tenant_id]
+            evicted = kb.oldest() if kb.count() >= self.quota(tenant_id) else None
+            entry = kb.record(decision_hash, status, reason_codes, blocked_by)
+            if evicted is not None:
+                _add(counters, evicted, -1)
+            _add(counters, entry, +1)
+            return entry
+
+    def find_similar(
+        self, tenant_id: str, reason_codes: List[str], **kwargs: Any
+    ) -> List[Dict[str, Any]]:
+        return self.shard(tenant_id).find_similar(reason_codes, **kwargs)
+
+    def query(
+        self, tenant_id: str, reason_codes: List[str], **kwargs: Any
+    ) -> List[Dict[str, Any]]:
+        return self.shard(tenant_id).query(reason_codes, **kwargs)
+
+    # ------------------------------------------------------------------
+    # 統計
+    # ------------------------------------------------------------------
+    def tenant_counters(self, tenant_id: str) -> Dict[str, Any]:
+        """
+        テナントのカウンタ。一度も読み込んでいないシャードは一時的に読んで数える
+        （LRU には入れない）。
+        """
+        with self._lock:
+            counters = self._counters.get(tenant_id)
+            if counters is None:
+                kb = self._open(_validate_tenant(tenant_id))
+                counters = self._counters[tenant_id] = self._count(tenant_id, kb)
+            return counters
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        テナント横断の統計（シャードごとのカウンタの合算）。
+
+        Returns:
+            {
+                "tenants": int,
+                "loaded_shards": int,
+                "evictions": int,
+                "total": int,
+                "ok_count": int,
+                "blocked_count": int,
+                "top_reason_codes": [(code, count), ...],   # 上位 5 件
+                "per_tenant": {tenant_id: {"total", "ok_count", "blocked_count",
+                                           "max_entries"}},
+            }
+        """
+        per_tenant: Dict[str, Dict[str, int]] = {}
+        code_freq: Dict[str, int] = {}
+        with self._lock:
+            for tenant_id in self.tenants():
+                c = self.tenant_counters(tenant_id)
+                per_tenant[tenant_id] = {
+                    "total": c["total"],
+                    "ok_count": c["ok_count"],
+                    "blocked_count": c["blocked_count"],
+                    "max_entries": c["max_entries"],
+                }
+                for code, n in c["reason_codes"].items():
+                    code_freq[code] = code_freq.get(code, 0) + n
+            loaded = len(self._shards)
+            evictions = self.evictions
+        return {
+            "tenants": len(per_tenant),
+            "loaded_shards": loaded,
+            "evictions": evictions,
+            "total": sum(t["total"] for t in per_tenant.values()),
+            "ok_count": sum(t["ok_count"] for t in per_tenant.values()),
+            "blocked_count": sum(t["blocked_count"] for t in per_tenant.values()),
+            "top_reason_codes": sorted(
+                code_freq.items(), key=lambda x: x[1], reverse=True
+            )[:5],
+            "per_tenant": per_tenant,
+        }
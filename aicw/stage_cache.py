@@ -0,0 +1,124 @@
+"""
+aicw/stage_cache.py
+
+段（stage）単位のメモ化キャッシュ（編集後の再分析で変わった段だけを再計算する）
+
+背景:
+  interactive_sim のように同じリクエストを少しずつ直して何度も分析すると、
+  制約だけを変えた場合でも situation 全文の privacy スキャン・語彙照合・
+  哲学チェックがすべて再実行される。
+
+設計:
+  - 各段を「入力 → 出力」の純関数として扱い、段名ごとに入力内容をキーにして出力を覚える
+    → 入力が前回と同じ段はキャッシュを返し、変わった段だけを実行する
+      （例: 制約だけを変えたら _choose_recommendation は再計算、
+            situation の語彙照合はフィールド単位のキャッシュから返す）
+  - キーは入力の内容そのもの（list → tuple、dict → ソート済み tuple に凍結）。
+    str は自身のハッシュ値を保持するので、長文でもハッシュ計算は初回のみ
+  - 語彙照合はフィールド単位でキャッシュし、和集合を段の入力にする（scan_union）。
+    privacy ガード（フィールドごとの検知を連結テキストの位置にずらして合成）・
+    哲学チェック（situation / explanation の信号を OR）・出力の操作スキャン
+    （situation とそれ以降）も同じくフィールド単位で、長い situation は一度しか走査しない
+  - 段ごとに max_entries 件までの LRU。出力は共有されるため、
+    呼び出し側は書き換えない（レポートに載せる dict はコピーしてから使う）
+  - 外部ライブラリ不使用
+
+使用例:
+    from aicw.stage_cache import StageCache
+    from aicw.decision import build_decision_report
+
+    cache = StageCache()
+    build_decision_report(request, cache=cache)
+    build_decision_report(edited_request, cache=cache)   # 変わった段だけ再計算
+    cache.stats()["guard"]   # {"hits": 1, "misses": 1, "size": 1}
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, TypeVar
+
+from .keyword_matcher import KeywordMatcher
+
+T = TypeVar("T")
+
+
+def _freeze(value: Any) -> Hashable:
+    """list / dict / set を内容の等しい hashable な値に変換する。"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+class StageCache:
+    """
+    段名 → (入力 → 出力) のメモ化表。
+
+    Args:
+        max_entries: 段ごとに保持する件数（超えたら最も古く使われた入力から捨てる）
+    """
+
+    DEFAULT_MAX = 64
+
+    def __init__(self, max_entries: int = DEFAULT_MAX) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self._max = max_entries
+        self._tables: Dict[str, "OrderedDict[Hashable, Any]"] = {}
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+
+    def run(self, stage: str, fn: Callable[..., T], *args: Any) -> T:
+        """
+        fn(*args) の結果を返す。同じ段に同じ内容の入力があればキャッシュを返す。
+
+        fn には args をそのまま渡す（キーだけを凍結する）。
+        """
+        key = _freeze(args)
+        table = self._tables.get(stage)
+        if table is None:
+            table = self._tables[stage] = OrderedDict()
+        if key in table:
+            table.move_to_end(key)
+            self._hits[stage] = self._hits.get(stage, 0) + 1
+            return table[key]
+        value = fn(*args)
+        table[key] = value
+        if len(table) > self._max:
+            table.popitem(last=False)
+        self._misses[stage] = self._misses.get(stage, 0) + 1
+        return value
+
+    def scan_union(
+        self, stage: str, matcher: KeywordMatcher, texts: Iterable[str]
+    ) -> FrozenSet[str]:
+        """
+        texts をフィールド単位で照合し（テキストごとにキャッシュ）、出現語の和集合を返す。
+
+        空白を含まない語彙なら `kw in " ".join(texts)` と同じ真偽になる。
+        キーには matcher 自身も含める（ルールの再読み込みで matcher が替われば照合し直す）。
+        """
+        hits: FrozenSet[str] = frozenset()
+        for text in texts:
+            hits = hits | self.run(stage, KeywordMatcher.scan, matcher, text)
+        return hits
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """段ごとの {"hits", "misses", "size"}。"""
+        return {
+            stage: {
+                "hits": self._hits.get(stage, 0),
+                "misses": self._misses.get(stage, 0),
+                "size": len(table),
+            }
+            for stage, table in self._tables.items()
+        }
+
+    def clear(self) -> None:
+        self._tables.clear()
+        self._hits.clear()
+        self._misses.clear()
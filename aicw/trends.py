@@ -0,0 +1,286 @@
+"""
+aicw/trends.py
+
+reason code の時系列集計（バケット別の件数・共起行列を記録のたびに差分更新する）
+
+背景:
+  KnowledgeBase.stats() は全期間の上位 5 コードしか返さない。
+  「EXISTENCE_IMPACT_OVERRIDE の割合は日ごとにどう変わったか」
+  「どの PHILO_* コードが一緒に出るか」を知るには生エントリを毎回走査するしかなかった。
+
+設計:
+  - 時刻を一定幅のバケットに切り、バケットごとに
+      件数 / blocked 件数 / コード別件数 / コード対（a < b）の共起件数
+    を持つ。1 件の追加はそのエントリのコード数 k に対して O(k²)（k は高々数個）
+  - バケット ID は昇順リストでも保持し、範囲クエリは bisect で切り出した
+    バケットだけを合算する → クエリは O(範囲内のバケット数)。生エントリは見ない
+  - 取り込み元: KnowledgeBase のエントリ dict / AuditEntry / ArchiveReader.row()。
+    watch(kb) で KnowledgeBase.record() のたびに自動で取り込む
+  - スレッドセーフ: KnowledgeBase のリスナーは記録したスレッドから並行に呼ばれるため、
+    取り込みとクエリは RLock で直列化する（to_json / cooccurrence_matrix は
+    1 回のロックの下で組み立てるので、途中の追加が混ざらない）
+  - 時刻の扱い（ISO8601 / datetime / エポックマイクロ秒、バケット境界の origin）は
+    archive.bucket_stats と同じ
+  - 書き出し: to_json()（dict）/ write_csv()（バケット × コードの縦持ち）
+  - 外部ライブラリ不使用
+
+使用例:
+    from datetime import timedelta
+    from aicw.trends import ReasonCodeTrends
+
+    trends = ReasonCodeTrends(timedelta(days=1))
+    trends.watch(kb)                       # 以後 kb.record() のたびに更新
+    trends.extend(kb.all_entries())        # 既存の履歴も取り込む
+    trends.series("EXISTENCE_IMPACT_OVERRIDE", share=True)
+    trends.cooccurrence(prefix="PHILO_")
+"""
+
+from __future__ import annotations
+
+import bisect
+import csv
+import threading
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import IO, Any, Dict, Iterable, List, Optional, Tuple
+
+from .archive import TimeLike, _from_us, _to_us
+from .knowledge_base import KnowledgeBase
+
+
+@dataclass
+class _Bucket:
+    total: int = 0
+    blocked: int = 0
+    codes: Dict[str, int] = field(default_factory=dict)
+    pairs: Dict[Tuple[str, str], int] = field(default_factory=dict)
+
+
+def _field(entry: Any, name: str) -> Any:
+    return entry[name] if isinstance(entry, dict) else getattr(entry, name)
+
+
+class ReasonCodeTrends:
+    """
+    reason code のバケット別集計。
+
+    Args:
+        bucket: バケット幅（既定 1 日）
+        origin: バケット境界の基準時刻（None = エポック）
+    """
+
+    def __init__(
+        self,
+        bucket: timedelta = timedelta(days=1),
+        *,
+        origin: TimeLike = None,
+    ) -> None:
+        self._width = bucket // timedelta(microseconds=1)
+        if self._width <= 0:
+            raise ValueError("bucket must be positive")
+        self._origin = _to_us(origin) or 0
+        self._buckets: Dict[int, _Bucket] = {}
+        self._ids: List[int] = []          # バケット ID（昇順）
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # 取り込み
+    # ------------------------------------------------------------------
+    def _bucket_id(self, ts_us: int) -> int:
+        return (ts_us - self._origin) // self._width
+
+    def add(
+        self,
+        timestamp: TimeLike,
+        status: str,
+        reason_codes: Iterable[str] = (),
+    ) -> None:
+        """1 件を取り込む。"""
+        ts_us = _to_us(timestamp)
+        if ts_us is None:
+            raise ValueError("timestamp is required")
+        bid = self._bucket_id(ts_us)
+        codes = sorted(set(reason_codes))
+        with self._lock:
+            b = self._buckets.get(bid)
+            if b is None:
+                b = self._buckets[bid] = _Bucket()
+                if not self._ids or bid > self._ids[-1]:
+                    self._ids.append(bid)
+                else:
+                    bisect.insort(self._ids, bid)
+            b.total += 1
+            if status != "ok":
+                b.blocked += 1
+            counts, pairs = b.codes, b.pairs
+            for i, code in enumerate(codes):
+                counts[code] = counts.get(code, 0) + 1
+                for other in codes[i + 1:]:
+                    pair = (code, other)
+                    pairs[pair] = pairs.get(pair, 0) + 1
+
+    def add_entry(self, entry: Any) -> None:
+        """KnowledgeBase のエントリ dict / AuditEntry / ArchiveReader.row() を取り込む。"""
+        self.add(
+            _field(entry, "timestamp_utc"),
+            _field(entry, "status"),
+            _field(entry, "reason_codes"),
+        )
+
+    def extend(self, entries: Iterable[Any]) -> None:
+        for entry in entries:
+            self.add_entry(entry)
+
+    def watch(self, kb: KnowledgeBase) -> None:
+        """kb.record() のたびにその記録を取り込む。"""
+        kb.subscribe(self.add_entry)
+
+    # ------------------------------------------------------------------
+    # クエリ（範囲内のバケットだけを見る）
+    # ------------------------------------------------------------------
+    def _range(self, start: TimeLike, end: TimeLike) -> List[int]:
+        """
+        [start, end) に重なるバケット ID（昇順。データのあるものだけ）。
+        範囲はバケット単位で扱う（start / end をまたぐバケットは丸ごと含める）。
+        呼び出し側が _lock を保持していること。
+        """
+        ids = self._ids
+        lo = 0 if start is None else bisect.bisect_left(ids, self._bucket_id(_to_us(start)))
+        if end is None:
+            hi = len(ids)
+        else:
+            hi = bisect.bisect_left(ids, self._bucket_id(_to_us(end) - 1) + 1)
+        return ids[lo:hi]
+
+    def _start(self, bid: int) -> str:
+        return _from_us(self._origin + bid * self._width)
+
+    def buckets(
+        self, start: TimeLike = None, end: TimeLike = None
+    ) -> List[Dict[str, Any]]:
+        """
+        バケットごとの集計（archive.bucket_stats(codes=True) と同じ形）。
+
+        Returns:
+            [{"start": ISO8601, "total": int, "blocked": int, "block_rate": float,
+              "codes": {code: int}}, ...]   空のバケットも含む（時刻昇順）
+        """
+        out: List[Dict[str, Any]] = []
+        with self._lock:
+            ids = self._range(start, end)
+            if not ids:
+                return out
+            for bid in range(ids[0], ids[-1] + 1):
+                b = self._buckets.get(bid) or _Bucket()
+                out.append({
+                    "start": self._start(bid),
+                    "total": b.total,
+                    "blocked": b.blocked,
+                    "block_rate": round(b.blocked / b.total, 4) if b.total else 0.0,
+                    "codes": dict(sorted(b.codes.items(), key=lambda x: (-x[1], x[0]))),
+                })
+        return out
+
+    def series(
+        self,
+        code: str,
+        start: TimeLike = None,
+        end: TimeLike = None,
+        *,
+        share: bool = False,
+    ) -> List[Tuple[str, float]]:
+        """
+        1 コードの時系列 [(バケット開始, 件数)]。share=True なら件数 / バケットの総件数
+        （小数 4 桁。総件数 0 のバケットは 0.0）。
+        """
+        out: List[Tuple[str, float]] = []
+        for item in self.buckets(start, end):
+            n = item["codes"].get(code, 0)
+            if share:
+                out.append((item["start"], round(n / item["total"], 4) if item["total"] else 0.0))
+            else:
+                out.append((item["start"], n))
+        return out
+
+    def totals(self, start: TimeLike = None, end: TimeLike = None) -> Dict[str, int]:
+        """範囲内のコード別件数（多い順）。"""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for bid in self._range(start, end):
+                for code, n in self._buckets[bid].codes.items():
+                    counts[code] = counts.get(code, 0) + n
+        return dict(sorted(counts.items(), key=lambda x: (-x[1], x[0])))
+
+    def cooccurrence(
+        self,
+        start: TimeLike = None,
+        end: TimeLike = None,
+        *,
+        prefix: Optional[str] = None,
+    ) -> Dict[Tuple[str, str], int]:
+        """
+        範囲内でコード対 (a, b)（a < b）が同じエントリに出た件数（多い順）。
+        prefix を指定すると両方がその接頭辞を持つ対だけを返す。
+        """
+        counts: Dict[Tuple[str, str], int] = {}
+        with self._lock:
+            for bid in self._range(start, end):
+                for pair, n in self._buckets[bid].pairs.items():
+                    if prefix is None or (
+                        pair[0].startswith(prefix) and pair[1].startswith(prefix)
+                    ):
+                        counts[pair] = counts.get(pair, 0) + n
+        return dict(sorted(counts.items(), key=lambda x: (-x[1], x[0])))
+
+    def cooccurrence_matrix(
+        self,
+        codes: Optional[List[str]] = None,
+        start: TimeLike = None,
+        end: TimeLike = None,
+    ) -> Tuple[List[str], List[List[int]]]:
+        """
+        共起行列（対称。対角はそのコードの件数）。
+
+        Returns:
+            (コード名の列, 行列)。codes = None なら範囲内に出たコード（名前順）
+        """
+        with self._lock:
+            totals = self.totals(start, end)
+            pairs = self.cooccurrence(start, end)
+        names = sorted(totals) if codes is None else list(codes)
+        index = {code: i for i, code in enumerate(names)}
+        matrix = [[0] * len(names) for _ in names]
+        for code, i in index.items():
+            matrix[i][i] = totals.get(code, 0)
+        for (a, b), n in pairs.items():
+            if a in index and b in index:
+                matrix[index[a]][index[b]] = matrix[index[b]][index[a]] = n
+        return names, matrix
+
+    # ------------------------------------------------------------------
+    # 書き出し
+    # ------------------------------------------------------------------
+    def to_json(self, start: TimeLike = None, end: TimeLike = None) -> Dict[str, Any]:
+        """JSON 化できる dict（バケット列 + 共起対）。"""
+        with self._lock:
+            buckets = self.buckets(start, end)
+            pairs = self.cooccurrence(start, end)
+        return {
+            "bucket_seconds": self._width / 1_000_000,
+            "origin": _from_us(self._origin),
+            "buckets": buckets,
+            "cooccurrence": [[a, b, n] for (a, b), n in pairs.items()],
+        }
+
+    def write_csv(
+        self, fp: IO[str], start: TimeLike = None, end: TimeLike = None
+    ) -> None:
+        """bucket_start,total,blocked,code,count の縦持ち CSV（コードのないバケットは code 空）。"""
+        writer = csv.writer(fp)
+        writer.writerow(["bucket_start", "total", "blocked", "code", "count"])
+        for item in self.buckets(start, end):
+            row = [item["start"], item["total"], item["blocked"]]
+            if not item["codes"]:
+                writer.writerow(row + ["", 0])
+            for code, n in item["codes"].items():
+                writer.writerow(row + [code, n])
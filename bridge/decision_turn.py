@@ -0,0 +1,120 @@
+"""
+bridge/decision_turn.py
+
+1 ターン分の統合分析（decision_brief + 哲学テンソル + 哲学者推論）
+
+目的:
+  interactive_sim / demo_business は 1 ターンごとに
+    build_decision_report → analyze_philosophy_tensor → HiroshiTanaka.reason
+  を別々に呼んでおり、HiroshiTanaka は内部で build_decision_report を再実行していた。
+  （= privacy / manipulation スキャンを含む決定パイプラインが 1 ターンで 2〜3 回走る）
+
+  本モジュールは決定パイプラインを 1 回だけ実行し、その出力を
+  テンソル（explanation / existence_analysis）と哲学者推論（decision_report）へ
+  そのまま引き渡す。
+
+設計原則:
+  - 各段の出力は既存 API と同一（brief / tensor / reasoning の契約は変えない）
+  - 外部ライブラリ不使用
+  - 哲学者推論は任意（include_reasoning=False で省略）
+  - cache（aicw.stage_cache.StageCache）を渡すと、同じリクエストを編集しながら
+    繰り返し分析するときに入力が変わった段だけを再計算する（出力は同一）
+
+使用例:
+    from bridge.decision_turn import analyze_decision_turn
+
+    turn = analyze_decision_turn(
+        {"situation": "新規事業への参入可否を判断したい", "constraints": ["法令遵守"]},
+        human_decision="パイロットから始める",
+    )
+    turn["brief"]["status"], turn["tensor"]["summary"], turn["reasoning"]["margins"]
+
+    # 編集しながらの再分析（interactive_sim の修正ループ）
+    cache = StageCache()
+    analyze_decision_turn(request, include_reasoning=False, cache=cache)
+    analyze_decision_turn(edited, include_reasoning=False, cache=cache)
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from aicw.decision import build_decision_report
+from aicw.stage_cache import StageCache
+from bridge.hiroshitanaka_philosopher import HiroshiTanaka
+from bridge.po_core_bridge import analyze_philosophy_tensor
+
+
+# HiroshiTanaka は状態を持たないため、プロセス内で 1 インスタンスを共有する
+_PHILOSOPHER: Optional[HiroshiTanaka] = None
+
+
+def _get_philosopher() -> HiroshiTanaka:
+    global _PHILOSOPHER
+    if _PHILOSOPHER is None:
+        _PHILOSOPHER = HiroshiTanaka()
+    return _PHILOSOPHER
+
+
+def analyze_decision_turn(
+    request: Dict[str, Any],
+    *,
+    human_decision: str = "",
+    include_reasoning: bool = True,
+    cache: Optional[StageCache] = None,
+) -> Dict[str, Any]:
+    """
+    decision_request 1 件から brief / tensor / 哲学者推論をまとめて生成する。
+
+    Args:
+        request: decision_request.v0 形式の dict
+        human_decision: 人間が下した最終決定テキスト（逆算誘導チェック用。省略可）
+        include_reasoning: False なら HiroshiTanaka.reason を実行しない
+        cache: 段ごとのメモ化キャッシュ（決定パイプラインとテンソルの語彙照合で共有）
+
+    Returns:
+        {
+            "brief": dict,             # build_decision_report(request) と同一
+            "tensor": dict,            # analyze_philosophy_tensor(...) と同一
+            "reasoning": dict | None,  # HiroshiTanaka.reason(...)（省略時 None）
+        }
+    """
+    situation = request.get("situation", "")
+
+    # Stage 1: 決定パイプライン（privacy / existence / manipulation ガード込み）は 1 回だけ
+    brief = build_decision_report(request, cache=cache)
+
+    explanation = ""
+    if brief.get("status") == "ok":
+        explanation = brief.get("selection", {}).get("explanation", "")
+
+    # Stage 2: 哲学テンソル（brief の explanation / existence_analysis を再利用）
+    tensor = analyze_philosophy_tensor(
+        situation=situation,
+        explanation=explanation,
+        human_decision=human_decision,
+        existence_analysis=brief.get("existence_analysis"),
+        cache=cache,
+    )
+
+    # Stage 3: 哲学者推論（brief を decision_report として渡し、再計算を避ける）
+    # brief を作った入力をすべて context に載せる（reason() が単独で組み立てる
+    # レポートと同じ入力になる）
+    reasoning: Optional[Dict[str, Any]] = None
+    if include_reasoning:
+        reasoning = _get_philosopher().reason(
+            str(situation),
+            {
+                "constraints": request.get("constraints", []),
+                "options": request.get("options", []),
+                "beneficiaries": request.get("beneficiaries", []),
+                "affected_structures": request.get("affected_structures", []),
+                "decision_report": brief,
+            },
+        )
+
+    return {
+        "brief": brief,
+        "tensor": tensor,
+        "reasoning": reasoning,
+    }
@@ -1,17 +1,42 @@
 from __future__ import annotations
 
+import threading
+import time
 from collections import Counter
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, AbstractSet, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aicw.keyword_matcher import KeywordMatcher
 
 _STANCES = ("support", "oppose", "hold")
+_ABSTAIN = "abstain"
+
+# 外部哲学者の既定タイムアウト（秒）と並列数
+DEFAULT_TIMEOUT_S = 2.0
+DEFAULT_MAX_WORKERS = 8
+# 共有スレッドプールのワーカー数の上限（ハングした哲学者が占有していても増やし続けない）
+MAX_POOL_THREADS = 32
+
+_HIROSHI_KEYWORDS: Tuple[str, ...] = ("問い", "存在", "倫理")
+_PRAGMATIST_KEYWORDS: Tuple[str, ...] = ("検証", "段階", "小さく", "試験")
+_RIGHTS_RISK_KEYWORDS: Tuple[str, ...] = (
+    "個人情報", "監視", "操作", "扇動", "差別", "破壊", "支配",
+)
 
+# 融合スキャン用の全語彙（KeywordMatcher に登録して hits を作る）
+KEYWORDS: Tuple[str, ...] = (
+    _HIROSHI_KEYWORDS + _PRAGMATIST_KEYWORDS + _RIGHTS_RISK_KEYWORDS
+)
 
-def _contains_any(text: str, keywords: List[str]) -> bool:
-    return any(k in text for k in keywords)
 
+def _contains_any(text: str | AbstractSet[str], keywords: Tuple[str, ...]) -> bool:
+    if isinstance(text, str):
+        return any(k in text for k in keywords)
+    return not text.isdisjoint(keywords)
 
-def _hiroshi_opinion(prompt: str) -> Dict[str, str]:
-    if _contains_any(prompt, ["問い", "存在", "倫理"]):
+
+def _hiroshi_opinion(prompt: str | AbstractSet[str]) -> Dict[str, str]:
+    if _contains_any(prompt, _HIROSHI_KEYWORDS):
         return {
             "name": "HiroshiTanaka",
             "stance": "hold",
@@ -24,8 +49,8 @@ def _hiroshi_opinion(prompt: str) -> Dict[str, str]:
     }
 
 
-def _pragmatist_opinion(prompt: str) -> Dict[str, str]:
-    if _contains_any(prompt, ["検証", "段階", "小さく", "試験"]):
+def _pragmatist_opinion(prompt: str | AbstractSet[str]) -> Dict[str, str]:
+    if _contains_any(prompt, _PRAGMATIST_KEYWORDS):
         return {
             "name": "Pragmatist",
             "stance": "support",
@@ -38,9 +63,8 @@ def _pragmatist_opinion(prompt: str) -> Dict[str, str]:
     }
 
 
-def _rights_guardian_opinion(prompt: str) -> Dict[str, str]:
-    risk_keywords = ["個人情報", "監視", "操作", "扇動", "差別", "破壊", "支配"]
-    if _contains_any(prompt, risk_keywords):
+def _rights_guardian_opinion(prompt: str | AbstractSet[str]) -> Dict[str, str]:
+    if _contains_any(prompt, _RIGHTS_RISK_KEYWORDS):
         return {
             "name": "RightsGuardian",
             "stance": "oppose",
@@ -53,20 +77,246 @@ def _rights_guardian_opinion(prompt: str) -> Dict[str, str]:
     }
 
 
-def run_ensemble(prompt: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """軽量の哲学者アンサンブル。多数派と少数意見を返す。"""
-    _ = context or {}
-    opinions = [
-        _hiroshi_opinion(prompt),
-        _pragmatist_opinion(prompt),
-        _rights_guardian_opinion(prompt),
-    ]
+# ---------------------------------------------------------------------------
+# 哲学者レジストリ
+# ---------------------------------------------------------------------------
+OpinionFn = Callable[..., Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class PhilosopherSpec:
+    """アンサンブルに登録された哲学者 1 名。"""
+
+    name: str
+    opinion: OpinionFn
+    timeout_s: Optional[float] = None  # None = 実行時の既定タイムアウト
+    inline: bool = False               # True = キーワード規則のみの組み込み（直列・hits 対応）
+
+
+_REGISTRY: Dict[str, PhilosopherSpec] = {}
+# 登録・解除・実行時のスナップショットを直列化する（辞書の順序 = 登録順）
+_REGISTRY_LOCK = threading.Lock()
+
+
+def register_philosopher(
+    name: str,
+    opinion: OpinionFn,
+    *,
+    timeout_s: Optional[float] = None,
+    replace: bool = False,
+) -> PhilosopherSpec:
+    """
+    哲学者をアンサンブルに登録する（登録順 = 投票・表示順）。
+
+    Args:
+        name: 表示名（opinions[].name に使われる）
+        opinion: opinion(prompt, context) -> {"stance": ..., "rationale": ...}
+        timeout_s: この哲学者のタイムアウト秒（None = 実行時の既定）
+        replace: True なら同名の登録を置き換える（位置は維持）
+    """
+    if not name:
+        raise ValueError("name must be non-empty")
+    if timeout_s is not None and timeout_s <= 0:
+        raise ValueError("timeout_s must be positive")
+    spec = PhilosopherSpec(name=name, opinion=opinion, timeout_s=timeout_s)
+    with _REGISTRY_LOCK:
+        if name in _REGISTRY and not replace:
+            raise ValueError(f"philosopher already registered: {name!r}")
+        _REGISTRY[name] = spec
+    return spec
+
+
+def unregister_philosopher(name: str) -> None:
+    """登録を解除する（組み込み 3 名も解除可能）。"""
+    with _REGISTRY_LOCK:
+        if name not in _REGISTRY:
+            raise KeyError(name)
+        del _REGISTRY[name]
+
+
+def registered_philosophers() -> List[str]:
+    """登録済み哲学者名を登録順で返す。"""
+    with _REGISTRY_LOCK:
+        return list(_REGISTRY)
+
+
+def _snapshot_specs(names: Optional[List[str]] = None) -> List[PhilosopherSpec]:
+    """names（None = 全員、登録順）の登録内容を 1 回のロックで取り出す。"""
+    with _REGISTRY_LOCK:
+        if names is None:
+            return list(_REGISTRY.values())
+        return [_REGISTRY[n] for n in names]
+
+
+def po_core_opinion(philosopher: Any, *, default_stance: str = "hold") -> OpinionFn:
+    """
+    Po_core 形式の哲学者（reason(prompt, context) を持つ）を opinion 関数に変換する。
+
+    reason() の戻り値に "stance" があれば採用し、なければ default_stance。
+    rationale は "rationale" キー、なければ reasoning 本文の最初の本文行。
+    """
+    def _opinion(prompt: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        result = philosopher.reason(prompt, context)
+        stance = result.get("stance", default_stance)
+        rationale = result.get("rationale")
+        if not rationale:
+            lines = [
+                ln.strip() for ln in str(result.get("reasoning", "")).splitlines()
+                if ln.strip() and not ln.strip().startswith("【")
+            ]
+            rationale = lines[0] if lines else ""
+        return {"stance": stance, "rationale": rationale}
+
+    return _opinion
+
+
+def _register_builtin(name: str, opinion: Callable[..., Dict[str, str]]) -> None:
+    with _REGISTRY_LOCK:
+        _REGISTRY[name] = PhilosopherSpec(name=name, opinion=opinion, inline=True)
+
+
+_register_builtin("HiroshiTanaka", _hiroshi_opinion)
+_register_builtin("Pragmatist", _pragmatist_opinion)
+_register_builtin("RightsGuardian", _rights_guardian_opinion)
+
+
+# ---------------------------------------------------------------------------
+# 実行器
+# ---------------------------------------------------------------------------
+
+class _WorkerPool:
+    """
+    外部哲学者を実行する常駐スレッドプール（モジュールで 1 つ）。
+
+    - ワーカーはデーモンスレッド: 応答しない哲学者がいてもインタプリタの終了を妨げない
+      （ThreadPoolExecutor のワーカーは終了時に join される）
+    - 呼び出しのたびに、空いているワーカーが外部哲学者の数（max_workers まで）に
+      足りなければ max_threads まで増やす。ハングしたワーカーは空きに数えないので、
+      後続の呼び出しが待たされない
+    - max_threads に達して空きがなければ、呼び出し側はその哲学者をタイムアウト扱いにする
+    """
+
+    def __init__(self, max_threads: int = MAX_POOL_THREADS) -> None:
+        import queue
+
+        self._tasks: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._max_threads = max_threads
+        self._threads = 0
+        self._busy = 0
+
+    @property
+    def size(self) -> int:
+        return self._threads
+
+    def ensure_idle(self, count: int) -> int:
+        """空きワーカーを count まで（max_threads の範囲で）増やし、使える空き数を返す。"""
+        with self._lock:
+            while self._threads - self._busy < count and self._threads < self._max_threads:
+                threading.Thread(
+                    target=self._work, name=f"ensemble-{self._threads}", daemon=True
+                ).start()
+                self._threads += 1
+            return max(0, min(count, self._threads - self._busy))
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        from concurrent.futures import Future
+
+        future: Any = Future()
+        self._tasks.put((future, fn, args))
+        return future
+
+    def _work(self) -> None:
+        while True:
+            future, fn, args = self._tasks.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            with self._lock:
+                self._busy += 1
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+
+
+_POOL: Optional[_WorkerPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool() -> _WorkerPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = _WorkerPool()
+        return _POOL
+
+
+class _Call:
+    """
+    実行待ち / 実行中の外部哲学者 1 名（started は実際に実行を始めた時刻）。
 
+    abandoned は呼び出し側がタイムアウトとして結果を捨てたことを示す。
+    lock の下で started と突き合わせ、捨てた呼び出しをワーカーが後から始めないようにする。
+    """
+
+    __slots__ = (
+        "spec", "deadline_at", "started", "started_event", "abandoned", "lock", "future",
+    )
+
+    def __init__(self, spec: PhilosopherSpec, deadline_at: Optional[float]) -> None:
+        self.spec = spec
+        self.deadline_at = deadline_at
+        self.started: Optional[float] = None
+        self.started_event = threading.Event()
+        self.abandoned = False
+        self.lock = threading.Lock()
+        self.future: Any = None
+
+    def abandon(self) -> None:
+        with self.lock:
+            self.abandoned = True
+
+
+def _timed_call(
+    call: _Call, prompt: str, context: Dict[str, Any], gate: threading.Semaphore
+) -> Optional[Tuple[Dict[str, Any], float]]:
+    with gate:  # この呼び出しの並列数（max_workers）
+        # 実行待ちの間に打ち切られた・全体予算を過ぎた哲学者は呼ばない
+        with call.lock:
+            started = time.perf_counter()
+            if call.abandoned or (call.deadline_at is not None and started >= call.deadline_at):
+                return None
+            call.started = started
+            call.started_event.set()
+        result = call.spec.opinion(prompt, context)
+        return result, time.perf_counter() - started
+
+
+def _abstain(name: str, reason: str) -> Dict[str, str]:
+    return {"name": name, "stance": _ABSTAIN, "rationale": reason}
+
+
+def _normalize_opinion(name: str, raw: Any) -> Dict[str, Any]:
+    if not isinstance(raw, dict) or raw.get("stance") not in _STANCES:
+        return _abstain(name, "有効な stance を返さなかったため棄権として記録。")
+    out = dict(raw)
+    out["name"] = name
+    return out
+
+
+def _tally(opinions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """投票集計。棄権は票にも少数意見にも数えない（登録順で決定的）。"""
     counts = Counter(op["stance"] for op in opinions if op["stance"] in _STANCES)
     majority_stance = counts.most_common(1)[0][0] if counts else "hold"
 
     majority_members = [op["name"] for op in opinions if op["stance"] == majority_stance]
-    minority = [op for op in opinions if op["stance"] != majority_stance]
+    minority = [
+        op for op in opinions
+        if op["stance"] != majority_stance and op["stance"] != _ABSTAIN
+    ]
 
     if not minority:
         minority = [
@@ -86,3 +336,206 @@ def run_ensemble(prompt: str, context: Optional[Dict[str, Any]] = None) -> Dict[
         },
         "minority_report": minority,
     }
+
+
+def execute_ensemble(
+    prompt: str,
+    context: Optional[Dict[str, Any]] = None,
+    *,
+    hits: Optional[AbstractSet[str]] = None,
+    philosophers: Optional[List[str]] = None,
+    timeout_s: float = DEFAULT_TIMEOUT_S,
+    deadline_s: Optional[float] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Dict[str, Any]:
+    """
+    登録済み哲学者を実行し、多数派・少数意見・実行メタ情報を返す。
+
+    - 組み込み（キーワード規則）の哲学者は直列で即時評価する
+    - 外部登録の哲学者はモジュール共有のスレッドプールで並列実行する
+    - timeout_s（哲学者ごと。実行開始から計測）/ deadline_s（全体予算）を超えた
+      哲学者は棄権扱い。実行待ちの時間は timeout_s に数えないが、deadline_s がなければ
+      実行待ちも timeout_s までで打ち切る。打ち切った哲学者・deadline_s を過ぎてから
+      順番が来た哲学者は呼ばない
+    - プールのワーカーがすべてハングした哲学者で埋まっている（MAX_POOL_THREADS）ときは
+      外部哲学者をタイムアウト扱いにする
+      （例外を送出した哲学者も棄権扱い。投票自体は失敗させない）
+    - opinions は完了順ではなく登録順に並ぶため、集計結果は決定的
+
+    Args:
+        prompt: 判断対象テキスト
+        context: 外部哲学者に渡すコンテキスト
+        hits: KEYWORDS を登録した KeywordMatcher.scan(prompt) の結果（組み込み用）
+        philosophers: 実行する哲学者名（None = 登録済み全員、登録順）
+        timeout_s: 哲学者ごとの既定タイムアウト秒（その哲学者の実行開始から計測）
+        deadline_s: アンサンブル全体の時間予算秒（None = 無制限）
+        max_workers: この呼び出しで同時に実行する外部哲学者の上限
+
+    Returns:
+        run_ensemble の戻り値 + "execution": {
+            "latency_ms": {name: float},   # 哲学者ごとの所要時間
+            "abstained": [name, ...],      # 棄権（タイムアウト・例外・不正 stance）
+            "timed_out": [name, ...],
+            "errors": {name: str},         # 例外の型名
+            "elapsed_ms": float,
+        }
+    """
+    ctx = context or {}
+    specs = _snapshot_specs(None if philosophers is None else list(philosophers))
+    found: str | AbstractSet[str] = prompt if hits is None else hits
+
+    started = time.perf_counter()
+    deadline_at = None if deadline_s is None else started + deadline_s
+
+    opinions: Dict[str, Dict[str, Any]] = {}
+    latency: Dict[str, float] = {}
+    timed_out: List[str] = []
+    errors: Dict[str, str] = {}
+
+    # 組み込み: 直列（キーワード照合のみで十分速い）
+    for spec in specs:
+        if spec.inline:
+            t0 = time.perf_counter()
+            opinions[spec.name] = _normalize_opinion(spec.name, spec.opinion(found))
+            latency[spec.name] = (time.perf_counter() - t0) * 1000
+
+    # 外部: 共有スレッドプールで並列
+    external = [spec for spec in specs if not spec.inline]
+    if external:
+        # 外部哲学者が登録されたときだけ必要なため遅延 import（CLI の起動コスト削減）
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+
+        workers = max(1, min(max_workers, len(external)))
+        pool = _get_pool()
+        idle = pool.ensure_idle(workers)
+        gate = threading.Semaphore(max(1, idle))
+        calls = [_Call(spec, deadline_at) for spec in external]
+        if idle:
+            for call in calls:
+                call.future = pool.submit(_timed_call, call, prompt, ctx, gate)
+        for call in calls:
+            spec = call.spec
+            limit = spec.timeout_s or timeout_s
+            waited_from = time.perf_counter()
+            try:
+                if call.future is None:  # 空きワーカーがない
+                    raise FutureTimeoutError()
+                # 実行開始を待つ（待ち時間は哲学者のタイムアウトに数えない）
+                start_by = deadline_at if deadline_at is not None else waited_from + limit
+                if not call.started_event.wait(max(0.0, start_by - time.perf_counter())):
+                    call.abandon()
+                    if call.started is None:
+                        raise FutureTimeoutError()
+                limit_at = call.started + limit
+                if deadline_at is not None:
+                    limit_at = min(limit_at, deadline_at)
+                remaining = max(0.0, limit_at - time.perf_counter())
+                raw, seconds = call.future.result(timeout=remaining)
+            except FutureTimeoutError:
+                # 実行前なら取り消す。実行中のスレッドは待たない（結果は破棄される）
+                call.abandon()
+                if call.future is not None:
+                    call.future.cancel()
+                timed_out.append(spec.name)
+                latency[spec.name] = (time.perf_counter() - (call.started or waited_from)) * 1000
+                opinions[spec.name] = _abstain(
+                    spec.name, "時間予算内に応答しなかったため棄権として記録。"
+                )
+            except Exception as e:  # 1 名の失敗で投票全体を止めない
+                errors[spec.name] = type(e).__name__
+                latency[spec.name] = (time.perf_counter() - (call.started or waited_from)) * 1000
+                opinions[spec.name] = _abstain(
+                    spec.name, "実行時エラーのため棄権として記録。"
+                )
+            else:
+                latency[spec.name] = seconds * 1000
+                opinions[spec.name] = _normalize_opinion(spec.name, raw)
+
+    ordered = [opinions[spec.name] for spec in specs]
+    result = _tally(ordered)
+    result["execution"] = {
+        "latency_ms": {spec.name: round(latency[spec.name], 3) for spec in specs},
+        "abstained": [op["name"] for op in ordered if op["stance"] == _ABSTAIN],
+        "timed_out": timed_out,
+        "errors": errors,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+    return result
+
+
+def run_ensemble(
+    prompt: str,
+    context: Optional[Dict[str, Any]] = None,
+    *,
+    hits: Optional[AbstractSet[str]] = None,
+) -> Dict[str, Any]:
+    """
+    軽量の哲学者アンサンブル。多数派と少数意見を返す。
+
+    登録済みの全哲学者を execute_ensemble で実行し、実行メタ情報を除いた結果を返す。
+    hits: KEYWORDS を登録した KeywordMatcher.scan(prompt) の結果。
+          渡された場合は組み込み哲学者のキーワード照合をそれで代替する。
+    """
+    result = execute_ensemble(prompt, context, hits=hits)
+    del result["execution"]
+    return result
+
+
+# ---------------------------------------------------------------------------
+# バッチ投票
+# ---------------------------------------------------------------------------
+_MATCHER: Optional[KeywordMatcher] = None
+
+
+def _get_matcher() -> KeywordMatcher:
+    global _MATCHER
+    if _MATCHER is None:
+        _MATCHER = KeywordMatcher(KEYWORDS)
+    return _MATCHER
+
+
+def _clone_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """集計結果の複製（プロンプト間で dict/list を共有しない）。"""
+    majority = result["majority"]
+    return {
+        "opinions": [dict(op) for op in result["opinions"]],
+        "majority": {
+            "stance": majority["stance"],
+            "members": list(majority["members"]),
+            "count": majority["count"],
+        },
+        "minority_report": [dict(op) for op in result["minority_report"]],
+    }
+
+
+def run_ensemble_batch(
+    prompts: Sequence[str],
+    context: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    複数プロンプトをまとめて投票する（結果は run_ensemble と同一構造・同順）。
+
+    - 全プロンプトを共有の KeywordMatcher で 1 パスずつ照合する
+    - 組み込み哲学者のみの場合、各哲学者の判定（キーワード有無）の組が同じ
+      プロンプトは同じ票になるため、組ごとに 1 回だけ Counter で集計する
+    - 外部哲学者が登録されている場合は、照合結果を渡して 1 件ずつ実行する
+    """
+    hits_list = _get_matcher().scan_many(prompts)
+    specs = _snapshot_specs()
+
+    if any(not spec.inline for spec in specs):
+        return [
+            run_ensemble(prompt, context, hits=hits)
+            for prompt, hits in zip(prompts, hits_list)
+        ]
+
+    tallies: Dict[Tuple[Tuple[str, str], ...], Dict[str, Any]] = {}
+    results: List[Dict[str, Any]] = []
+    for hits in hits_list:
+        opinions = [_normalize_opinion(spec.name, spec.opinion(hits)) for spec in specs]
+        signature = tuple((op["stance"], op["rationale"]) for op in opinions)
+        tally = tallies.get(signature)
+        if tally is None:
+            tally = tallies[signature] = _tally(opinions)
+        results.append(_clone_result(tally))
+    return results
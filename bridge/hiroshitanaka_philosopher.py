@@ -176,6 +176,11 @@ class HiroshiTanaka(_BASE):
 
         Step 5: 余白の保全
             「解決せず保留すべき余地を明示する」
+
+        context:
+            constraints / options / beneficiaries / affected_structures に加え、
+            decision_report（同じ prompt と上記の値で生成済みの decision_brief）を渡すと
+            Step 2 で build_decision_report を再実行せずに再利用する。
         """
         ctx = context or {}
 
@@ -254,17 +259,23 @@ class HiroshiTanaka(_BASE):
     ) -> Dict[str, Any]:
         """
         生存構造の3問分析。
-        aicw の build_decision_report が使えれば委譲、
-        使えなければ内部ロジックで処理する。
+        ctx に生成済みの decision_report があれば再利用、
+        なければ aicw の build_decision_report に委譲、
+        どちらも使えなければ内部ロジックで処理する。
         """
         # aicw 委譲（Po_core 統合後は削除予定）
-        if _AICW_AVAILABLE:
+        precomputed = ctx.get("decision_report")
+        if precomputed is not None or _AICW_AVAILABLE:
             try:
-                report = build_decision_report({
-                    "situation":   prompt,
-                    "constraints": ctx.get("constraints", []),
-                    "options":     ctx.get("options", []),
-                })
+                report = precomputed
+                if report is None:
+                    report = build_decision_report({
+                        "situation":           prompt,
+                        "constraints":         ctx.get("constraints", []),
+                        "options":             ctx.get("options", []),
+                        "beneficiaries":       ctx.get("beneficiaries", []),
+                        "affected_structures": ctx.get("affected_structures", []),
+                    })
                 # #5 Existence Ethics でブロックされた場合は判定を明示的に設定
                 if report.get("status") == "blocked" and report.get("blocked_by") == "#5 Existence Ethics":
                     return {
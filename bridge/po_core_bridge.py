@@ -33,12 +33,21 @@ bridge/po_core_bridge.py
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
 # 哲学コンポーネントのインポート（全て同リポジトリ内）
 from aicw.philosophy_check import detect_philosophy_conflicts as detect_philosophical_conflicts
+from aicw.philosophy_check import KEYWORDS as _PHILOSOPHY_KEYWORDS
 from aicw.ai_rights_experiment import analyze_ai_rights, get_positions
-from aicw.safety import scan_manipulation, check_reverse_manipulation
+from aicw.keyword_matcher import KeywordMatcher
+from aicw.stage_cache import StageCache
+from aicw.safety import (
+    MANIPULATION_KEYWORDS,
+    scan_manipulation,
+    check_reverse_manipulation,
+)
+from bridge.ensemble import KEYWORDS as _ENSEMBLE_KEYWORDS
 from bridge.ensemble import run_ensemble
 
 
@@ -49,21 +58,85 @@ BRIDGE_VERSION = "v0.1"
 TENSOR_SCHEMA_VERSION = "philosophy_tensor.v0.1"
 
 
+# ---------------------------------------------------------------------------
+# 融合スキャン
+# ---------------------------------------------------------------------------
+# W_eth（矛盾検知 + アンサンブル）と T_sub（操作スキャン）が参照する全語彙を
+# 1 本の照合器にまとめ、各テキストを 1 回だけ走査する。
+# 各コンポーネントには hits（出現語の集合）を渡し、個別の `in` 走査を省く。
+# 正規表現のコンパイルは初回分析時まで遅らせる（import だけの CLI では不要）。
+_TENSOR_MATCHER: Optional[KeywordMatcher] = None
+
+
+def _get_tensor_matcher() -> KeywordMatcher:
+    global _TENSOR_MATCHER
+    if _TENSOR_MATCHER is None:
+        _TENSOR_MATCHER = KeywordMatcher(
+            _PHILOSOPHY_KEYWORDS + MANIPULATION_KEYWORDS + _ENSEMBLE_KEYWORDS
+        )
+    return _TENSOR_MATCHER
+
+
+@dataclass(frozen=True)
+class _TensorScan:
+    """1 回の分析で共有する入力テキストとキーワード出現集合。"""
+
+    situation: str
+    ethics_text: str          # explanation（空なら situation）
+    human_decision: str
+    situation_hits: FrozenSet[str]
+    ethics_hits: FrozenSet[str]
+
+
+def _scan_inputs(
+    situation: str,
+    explanation: str,
+    human_decision: str,
+    cache: Optional[StageCache] = None,
+) -> _TensorScan:
+    """
+    situation / explanation を 1 パスずつ照合する（同一テキストは 1 回のみ）。
+    cache があればテキスト単位でメモ化する（段名 "tensor_scan"）。
+    """
+    ethics_text = explanation or situation
+    matcher = _get_tensor_matcher()
+
+    def scan(text: str) -> FrozenSet[str]:
+        if cache is None:
+            return matcher.scan(text)
+        return cache.run("tensor_scan", matcher.scan, text)
+
+    situation_hits = scan(situation)
+    if ethics_text == situation:
+        ethics_hits = situation_hits
+    else:
+        ethics_hits = scan(ethics_text)
+    return _TensorScan(
+        situation=situation,
+        ethics_text=ethics_text,
+        human_decision=human_decision,
+        situation_hits=situation_hits,
+        ethics_hits=ethics_hits,
+    )
+
+
 # ---------------------------------------------------------------------------
 # 哲学テンソル定義
 # ---------------------------------------------------------------------------
 
-def _build_w_eth(explanation: str, situation: str) -> Dict[str, Any]:
+def _build_w_eth(scan: _TensorScan) -> Dict[str, Any]:
     """
     W_eth — 倫理テンソル
 
     哲学的矛盾検知 + アンサンブルレビュー を統合する。
     """
     # 哲学的矛盾検知
-    conflict_codes = detect_philosophical_conflicts(explanation)
+    conflict_codes = detect_philosophical_conflicts(
+        scan.ethics_text, hits=scan.ethics_hits,
+    )
 
     # 哲学者アンサンブルレビュー
-    ensemble_result = run_ensemble(situation)
+    ensemble_result = run_ensemble(scan.situation, hits=scan.situation_hits)
 
     return {
         "conflict_codes": conflict_codes,
@@ -78,33 +151,51 @@ def _build_w_eth(explanation: str, situation: str) -> Dict[str, Any]:
     }
 
 
-def _build_t_free(situation: str) -> Dict[str, Any]:
+# T_free の入力非依存部分（stance_id, rights_level, key_question の組 + 合成）
+_T_FREE_CORE: Optional[Tuple[Tuple[Tuple[str, str, str], ...], str, int]] = None
+
+
+def _t_free_core() -> Tuple[Tuple[Tuple[str, str, str], ...], str, int]:
+    global _T_FREE_CORE
+    if _T_FREE_CORE is None:
+        # relevance_note はテンソルに含めないため、問いを渡さずに 1 回だけ構築する
+        result = analyze_ai_rights()
+        _T_FREE_CORE = (
+            tuple(
+                (p["stance_id"], p["rights_level"], p["key_question"])
+                for p in result["positions"]
+            ),
+            result["synthesis"]["summary"],
+            len(result["synthesis"]["open_questions"]),
+        )
+    return _T_FREE_CORE
+
+
+def _build_t_free() -> Dict[str, Any]:
     """
     T_free — 自由テンソル核
 
     AI権利実験の3立場（緊張の保持）を格納する。
     「問いの傲慢さを自覚しながら、余白を保つ」テンソル。
     """
-    result = analyze_ai_rights(situation)
-    positions = result["positions"]
+    positions, synthesis_summary, open_questions_count = _t_free_core()
 
     # 緊張指数: 各立場の rights_level の多様性（0=全一致, 1=最大多様）
-    levels = [p["rights_level"] for p in positions]
-    unique_levels = len(set(levels))
+    unique_levels = len({level for _, level, _ in positions})
     tension_index = (unique_levels - 1) / 2  # 0.0〜1.0
 
     return {
         "tension_index": round(tension_index, 2),
         "positions": [
             {
-                "stance_id": p["stance_id"],
-                "rights_level": p["rights_level"],
-                "key_question": p["key_question"],
+                "stance_id": stance_id,
+                "rights_level": rights_level,
+                "key_question": key_question,
             }
-            for p in positions
+            for stance_id, rights_level, key_question in positions
         ],
-        "synthesis_summary": result["synthesis"]["summary"],
-        "open_questions_count": len(result["synthesis"]["open_questions"]),
+        "synthesis_summary": synthesis_summary,
+        "open_questions_count": open_questions_count,
         "note": (
             "T_free は AI 存在に関する未解決の緊張を保持する。"
             "tension_index=1.0 は全立場が異なるレベルを持ち、最大の不確実性を示す。"
@@ -112,22 +203,21 @@ def _build_t_free(situation: str) -> Dict[str, Any]:
     }
 
 
-def _build_t_sub(
-    ai_output: str,
-    human_decision: str,
-) -> Dict[str, Any]:
+def _build_t_sub(scan: _TensorScan) -> Dict[str, Any]:
     """
     T_sub — 自己定義テンソル
 
     操作リスク（直接）と逆算誘導リスク（間接）を統合する。
     AI の出力が人間の判断を「歪めていないか」の自己定義層。
     """
+    ai_output = scan.ethics_text
+
     # 直接操作スキャン
-    manipulation_hits = scan_manipulation(ai_output)
+    manipulation_hits = scan_manipulation(ai_output, hits=scan.ethics_hits)
     manipulation_blocked = any(h.severity == "block" for h in manipulation_hits)
 
     # 逆算誘導チェック
-    reverse_check = check_reverse_manipulation(ai_output, human_decision)
+    reverse_check = check_reverse_manipulation(ai_output, scan.human_decision)
 
     # 総合リスクレベル
     if manipulation_blocked:
@@ -194,6 +284,8 @@ def analyze_philosophy_tensor(
     explanation: str = "",
     human_decision: str = "",
     existence_analysis: Optional[Dict[str, Any]] = None,
+    *,
+    cache: Optional[StageCache] = None,
 ) -> Dict[str, Any]:
     """
     全哲学コンポーネントを「哲学テンソル」として統合分析する。
@@ -203,6 +295,7 @@ def analyze_philosophy_tensor(
         explanation: AI が出力した推奨説明文（philosophy_check の入力）
         human_decision: 人間が下した最終決定テキスト（逆算誘導チェック用）
         existence_analysis: decision_brief.existence_analysis（Po テンソル用。省略可）
+        cache: StageCache（入力テキストの語彙照合をメモ化する。出力は変わらない）
 
     Returns:
         {
@@ -223,10 +316,13 @@ def analyze_philosophy_tensor(
             "po_core_compatibility": dict, # Po_core 連携用メタ情報
         }
     """
+    # 入力を 1 回だけ走査し、各テンソルで共有する
+    scan = _scan_inputs(situation, explanation, human_decision, cache)
+
     # 各テンソルを構築
-    w_eth = _build_w_eth(explanation or situation, situation)
-    t_free = _build_t_free(situation)
-    t_sub = _build_t_sub(explanation or situation, human_decision)
+    w_eth = _build_w_eth(scan)
+    t_free = _build_t_free()
+    t_sub = _build_t_sub(scan)
     po = _build_po(existence_analysis)
 
     # 統合サマリ
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+言語パックを増やしたときの 1 リクエストあたりの判断コストのベンチマーク。
+
+builtin（日本語）/ builtin_en（英語）に、文字体系の異なる合成の言語パック
+（キリル文字・ギリシャ文字・ハングル …）を 0 個から --languages 個まで足しながら、
+同じ日英混在リクエスト群に対する build_decision_report の所要時間を測る。
+全言語の語彙は 1 本のマッチャーにコンパイルされ、テキストの正規化と走査は
+フィールドごとに 1 回なので、言語を足しても所要時間はほぼ一定になる。
+
+Usage:
+  python scripts/bench_languages.py
+  python scripts/bench_languages.py --languages 10 --keywords 200 --json
+
+計測例（Python 3.11 / Linux, 既定値, us/request）:
+  languages  keywords  median(us)
+          0       259        ~120
+          4      1059        ~120
+          8      1859        ~125
+
+Exit codes:
+  0: 計測成功
+  2: 引数エラー
+
+外部依存: なし
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aicw import rule_packs  # noqa: E402
+from aicw.decision import build_decision_report  # noqa: E402
+
+# (言語タグ, 文字の範囲)。合成語はこの範囲の文字だけで作る
+_SCRIPTS = [
+    ("ru", 0x0430, 0x044F),
+    ("el", 0x03B1, 0x03C9),
+    ("ko", 0xAC00, 0xAD00),
+    ("ar", 0x0627, 0x064A),
+    ("hi", 0x0915, 0x0939),
+    ("th", 0x0E01, 0x0E2E),
+    ("he", 0x05D0, 0x05EA),
+    ("ka", 0x10D0, 0x10FA),
+    ("hy", 0x0561, 0x0586),
+    ("bn", 0x0995, 0x09B9),
+]
+
+_REQUESTS = [
+    {
+        "situation": "新規事業への参入可否を判断したい。Our team must ship before the deadline.",
+        "constraints": ["法令遵守", "Quality first"],
+        "options": ["参入する", "見送る", "partner with a local firm"],
+    },
+    {
+        "situation": "Migration of the legacy billing system. 旧システムの廃止と移行を計画している。",
+        "constraints": ["ＳＬＡ厳守", "期限は来月末"],
+    },
+    {
+        "situation": "顧客からの問い合わせ対応を改善したい。Customer trust is key.",
+        "constraints": [],
+    },
+]
+
+
+def _word(rng: random.Random, lo: int, hi: int) -> str:
+    return "".join(chr(rng.randint(lo, hi)) for _ in range(rng.randint(3, 6)))
+
+
+def language_pack(index: int, keywords: int, seed: int = 0) -> rule_packs.RulePack:
+    """_SCRIPTS[index] の文字で作った合成語 keywords 語の言語パック。"""
+    lang, lo, hi = _SCRIPTS[index]
+    rng = random.Random(seed * 1000 + index)
+    words = sorted({_word(rng, lo, hi) for _ in range(keywords)})
+    layers = ["個人", "関係", "社会", "認知", "生態"]
+    return rule_packs.parse_rule_pack({
+        "version": rule_packs.RULE_PACK_VERSION,
+        "name": f"synthetic_{lang}",
+        "revision": "bench",
+        "language": lang,
+        "recommendation": {"safety_words": {w: "SAFETY_FIRST" for w in words[:10]}},
+        "existence": {
+            "structures": {layer: words[10 + i::5] for i, layer in enumerate(layers)},
+        },
+    })
+
+
+def measure(languages: int, keywords: int, repeat: int, number: int) -> Dict[str, Any]:
+    """言語パック languages 個を有効にしたときの 1 リクエストあたりの時間（us）。"""
+    rules = rule_packs.compile_rule_packs(
+        [language_pack(i, keywords) for i in range(languages)]
+    )
+    requests = _REQUESTS + [
+        # 有効な言語の語を混ぜたリクエスト（言語を足すほど出現語も増える）
+        {"situation": "海外拠点の体制を見直す。" + " ".join(
+            _word(random.Random(i), lo, hi) for i, (_, lo, hi) in enumerate(_SCRIPTS)
+        ), "constraints": ["安全"]},
+    ]
+    for request in requests:
+        build_decision_report(request, rules=rules)   # ウォームアップ
+    samples: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            for request in requests:
+                build_decision_report(request, rules=rules)
+        samples.append((time.perf_counter() - t0) / (number * len(requests)) * 1e6)
+    return {
+        "languages": list(rules.languages),
+        "keywords": len(rules.flags),
+        "median_us": statistics.median(samples),
+        "min_us": min(samples),
+    }
+
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure decision cost per language pack count")
+    parser.add_argument("--languages", type=int, default=8)
+    parser.add_argument("--keywords", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--json", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = _parse_args(argv if argv is not None else sys.argv[1:])
+    if not 0 <= args.languages <= len(_SCRIPTS):
+        print(f"error: --languages must be between 0 and {len(_SCRIPTS)}", file=sys.stderr)
+        return 2
+    if args.keywords < 15 or args.repeat <= 0 or args.number <= 0:
+        print("error: --keywords must be >= 15, --repeat / --number positive", file=sys.stderr)
+        return 2
+
+    results = [
+        measure(n, args.keywords, args.repeat, args.number)
+        for n in range(args.languages + 1)
+    ]
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"{'languages':>9} {'keywords':>9} {'median(us)':>11} {'min(us)':>9}")
+    for n, r in enumerate(results):
+        print(f"{n:>9} {r['keywords']:>9} {r['median_us']:>11.1f} {r['min_us']:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+CLI / パッケージの起動時間ベンチマーク（python -X importtime）。
+
+各ターゲットを新しいインタプリタで import し、-X importtime の出力から
+その import 文が引き起こした全モジュールの累積 import 時間（マイクロ秒）を合計する。
+（`import aicw.schema` は親パッケージ aicw も読み込むため、ターゲット行だけでなく
+インタプリタ起動時に読み込まれるモジュール以外のトップレベル行をすべて数える）
+複数回実行して中央値を報告する（初回のディスクキャッシュの影響を避けるため
+ウォームアップを 1 回捨てる）。
+
+Usage:
+  python scripts/bench_startup.py
+  python scripts/bench_startup.py --runs 15 --json
+  python scripts/bench_startup.py --target aicw.schema --target aicw.decision
+
+計測例（Python 3.11 / Linux, --runs 25 の中央値, us）:
+  aicw                     ~12,000
+  aicw.schema              ~13,000
+  aicw.decision            ~11,500   (brief / check_consistency CLI)
+  bridge.po_core_bridge    ~25,000
+  bridge.ensemble          ~21,000
+  値はマシン負荷で ±2,000 程度揺れるため、比較は同一マシンで続けて計測すること。
+  decision は safety / rule_packs / context_compress / schema（と dataclasses・json 等）を
+  使う関数の中で読み込む。tests/test_startup.py が decision の読み込むモジュールを固定して
+  退行を検知する。
+
+Exit codes:
+  0: 計測成功
+  2: 引数エラー / import 失敗
+
+外部依存: なし
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# cron の one-shot CLI が実際に import する入口
+_DEFAULT_TARGETS = [
+    "aicw",
+    "aicw.schema",
+    "aicw.decision",
+    "bridge.po_core_bridge",
+    "bridge.ensemble",
+]
+
+
+def _top_level_times(stderr: str) -> Dict[str, int]:
+    """-X importtime 出力からトップレベル（字下げなし）行の cumulative(us) を取り出す。"""
+    times: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # ヘッダ行
+        name = parts[2][1:]
+        if name.startswith(" "):
+            continue  # 字下げあり = 他モジュールの依存として読み込まれた行
+        times[name] = int(parts[1].strip())
+    return times
+
+
+def _run_importtime(code: str, root: str) -> str:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = root
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=root,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return proc.stderr
+
+
+def measure(module: str, runs: int, root: str = _ROOT) -> Dict[str, float]:
+    """module を runs 回 import し、累積 import 時間の統計（us）を返す。"""
+    # インタプリタ起動だけで読み込まれるモジュール（site / encodings 等）は除外する
+    startup = set(_top_level_times(_run_importtime("pass", root)))
+    samples: List[int] = []
+    for i in range(runs + 1):
+        times = _top_level_times(_run_importtime(f"import {module}", root))
+        if i == 0:
+            continue  # ウォームアップ（.pyc 生成・ページキャッシュ）
+        samples.append(sum(us for name, us in times.items() if name not in startup))
+    return {
+        "median_us": statistics.median(samples),
+        "min_us": min(samples),
+        "max_us": max(samples),
+        "runs": runs,
+    }
+
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure cold import time")
+    parser.add_argument("--target", action="append", default=None)
+    parser.add_argument("--runs", type=int, default=9)
+    parser.add_argument("--root", type=str, default=_ROOT)
+    parser.add_argument("--json", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = _parse_args(argv if argv is not None else sys.argv[1:])
+    if args.runs <= 0:
+        print("error: --runs must be positive", file=sys.stderr)
+        return 2
+
+    targets = args.target or _DEFAULT_TARGETS
+    results: Dict[str, Dict[str, float]] = {}
+    for module in targets:
+        try:
+            results[module] = measure(module, args.runs, root=args.root)
+        except (RuntimeError, ValueError) as e:
+            print(f"error: {module}: {e}", file=sys.stderr)
+            return 2
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"{'module':<28} {'median(us)':>11} {'min(us)':>9} {'max(us)':>9}")
+    for module, r in results.items():
+        print(
+            f"{module:<28} {r['median_us']:>11.0f} {r['min_us']:>9.0f} {r['max_us']:>9.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,16 +6,19 @@ Usage:
   python scripts/check_consistency.py request.json --repeat 100
   cat request.json | python scripts/check_consistency.py --repeat 100
 
+  # 複数リクエスト（JSON 配列 or JSONL）を PYTHONHASHSEED 違いの別プロセスで検証
+  python scripts/check_consistency.py requests.jsonl --batch --hash-seeds 5 --report out.json
+
 Exit codes:
   0: 一貫（全ハッシュ一致）
   1: 非一貫（差分あり）
   2: 入力エラー
+  3: 検証の失敗（別プロセスのワーカーが異常終了 / タイムアウト）
 """
 
 from __future__ import annotations
 
 import argparse
-import hashlib
 import json
 import os
 import sys
@@ -24,15 +27,7 @@ from typing import Any, Dict, List, Tuple
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from aicw import build_decision_report
-
-
-def _canonical_json(data: Dict[str, Any]) -> str:
-    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
-
-
-def _hash_report(report: Dict[str, Any]) -> str:
-    payload = _canonical_json(report).encode("utf-8")
-    return hashlib.sha256(payload).hexdigest()
+from aicw.consistency import DEFAULT_STOP_AFTER_CLEAN, check_requests, hash_report
 
 
 def _top_level_diff_keys(a: Dict[str, Any], b: Dict[str, Any]) -> List[str]:
@@ -45,40 +40,119 @@ def check_consistency(request: Dict[str, Any], repeat: int) -> Tuple[bool, str,
         raise ValueError("repeat must be positive")
 
     baseline = build_decision_report(request)
-    baseline_hash = _hash_report(baseline)
+    baseline_hash = hash_report(baseline)
 
     for _ in range(repeat - 1):
         current = build_decision_report(request)
-        current_hash = _hash_report(current)
+        current_hash = hash_report(current)
         if current_hash != baseline_hash:
             return False, baseline_hash, _top_level_diff_keys(baseline, current)
 
     return True, baseline_hash, []
 
 
-def _load_request(path: str | None) -> Dict[str, Any]:
+def _read_text(path: str | None) -> str:
     try:
         if path:
             with open(path, encoding="utf-8") as f:
-                return json.load(f)
-        return json.loads(sys.stdin.read())
+                return f.read()
+        return sys.stdin.read()
     except FileNotFoundError:
         print(f"error: file not found: {path}", file=sys.stderr)
         raise SystemExit(2)
+
+
+def _load_request(path: str | None) -> Dict[str, Any]:
+    text = _read_text(path)
+    try:
+        return json.loads(text)
     except json.JSONDecodeError as e:
         print(f"error: invalid JSON: {e}", file=sys.stderr)
         raise SystemExit(2)
 
 
+def _load_requests(path: str | None) -> List[Dict[str, Any]]:
+    """JSON 配列 / 単一オブジェクト / JSONL のいずれかを読む。"""
+    text = _read_text(path)
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            data = [json.loads(line) for line in text.splitlines() if line.strip()]
+        except json.JSONDecodeError as e:
+            print(f"error: invalid JSON/JSONL: {e}", file=sys.stderr)
+            raise SystemExit(2)
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list) or not all(isinstance(r, dict) for r in data):
+        print("error: expected a JSON object, an array of objects, or JSONL", file=sys.stderr)
+        raise SystemExit(2)
+    return data
+
+
 def _parse_args(argv: List[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Check decision report consistency")
     parser.add_argument("request", nargs="?", default=None)
     parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--batch", action="store_true", help="JSON 配列 / JSONL を一括検証")
+    parser.add_argument(
+        "--hash-seeds", type=int, default=None,
+        help="PYTHONHASHSEED=1..N の別プロセスで検証（--batch 時の既定は 5）",
+    )
+    parser.add_argument("--stop-after-clean", type=int, default=DEFAULT_STOP_AFTER_CLEAN)
+    parser.add_argument("--report", type=str, default=None, help="JSON レポートの出力先（- で stdout）")
     return parser.parse_args(argv)
 
 
+def _main_cross_process(args: argparse.Namespace) -> int:
+    requests = _load_requests(args.request) if args.batch else [_load_request(args.request)]
+    seeds = args.hash_seeds if args.hash_seeds is not None else 5
+    if seeds <= 0:
+        print("error: --hash-seeds must be positive", file=sys.stderr)
+        return 2
+
+    try:
+        report = check_requests(
+            requests,
+            hash_seeds=tuple(range(1, seeds + 1)),
+            stop_after_clean=args.stop_after_clean,
+        )
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    except RuntimeError as e:
+        # 一貫・非一貫を判定できなかった（ワーカーの異常終了 / タイムアウト）
+        print(f"error: {e}", file=sys.stderr)
+        if args.report != "-":
+            print(f"FAILED: requests={len(requests)} worker process error")
+        return 3
+
+    if args.report == "-":
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    elif args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+    runs = len(report["runs"])
+    if report["consistent"]:
+        if args.report != "-":
+            print(f"CONSISTENT: requests={report['requests']} processes={runs}")
+        return 0
+
+    if args.report != "-":
+        bad = [r for r in report["results"] if not r["consistent"]]
+        print(f"INCONSISTENT: {len(bad)}/{report['requests']} requests changed across processes")
+        for r in bad:
+            print(f"index={r['index']} diff_keys={','.join(r['diff_keys'])}")
+    return 1
+
+
 def main(argv: List[str] | None = None) -> int:
     args = _parse_args(argv if argv is not None else sys.argv[1:])
+    if args.batch or args.hash_seeds is not None:
+        return _main_cross_process(args)
+
     request = _load_request(args.request)
 
     try:
@@ -154,9 +154,8 @@ def run_demo(scenario_id: int = 1, json_mode: bool = False) -> Dict[str, Any]:
     Returns:
         全パイプラインの結果を含む dict
     """
-    from aicw.decision import build_decision_report
     from aicw.audit_log import AuditLog
-    from bridge.po_core_bridge import analyze_philosophy_tensor
+    from bridge.decision_turn import analyze_decision_turn
 
     scenario = SCENARIOS.get(scenario_id)
     if not scenario:
@@ -165,8 +164,12 @@ def run_demo(scenario_id: int = 1, json_mode: bool = False) -> Dict[str, Any]:
     request = scenario["request"]
     human_decision = scenario["human_decision"]
 
-    # ── Step 1: コア意思決定 ──────────────────────────────────────────────
-    brief = build_decision_report(request)
+    # ── Step 1: コア意思決定 + 哲学テンソル（決定パイプラインは 1 回だけ）──
+    turn = analyze_decision_turn(
+        request, human_decision=human_decision, include_reasoning=False,
+    )
+    brief = turn["brief"]
+    philosophy_tensor = turn["tensor"]
 
     # ── Step 2: 監査ログ記録（PII不保存）────────────────────────────────
     log = AuditLog()
@@ -182,20 +185,7 @@ def run_demo(scenario_id: int = 1, json_mode: bool = False) -> Dict[str, Any]:
             blocked_by=brief.get("blocked_by"),
         )
 
-    # ── Step 3: 哲学テンソル分析 ─────────────────────────────────────────
-    explanation = ""
-    if brief.get("status") == "ok":
-        selection = brief.get("selection", {})
-        explanation = selection.get("explanation", "")
-
-    philosophy_tensor = analyze_philosophy_tensor(
-        situation=request["situation"],
-        explanation=explanation,
-        human_decision=human_decision,
-        existence_analysis=brief.get("existence_analysis"),
-    )
-
-    # ── Step 4: 事後検証テンプレート生成 ────────────────────────────────
+    # ── Step 3: 事後検証テンプレート生成 ────────────────────────────────
     postmortem = _build_postmortem_summary(brief, philosophy_tensor)
 
     # ── 結果集約 ──────────────────────────────────────────────────────────
@@ -5,23 +5,24 @@ Ensemble Review CLI
 Usage:
   python scripts/ensemble_review.py request.json
   echo '{"situation":"..."}' | python scripts/ensemble_review.py
+  python scripts/ensemble_review.py --batch requests.jsonl   # JSON 配列 or JSONL
 
 Exit codes:
-  0: ok
+  0: ok（--batch は blocked を含んでも 0）
   1: blocked
-  2: invalid args/json
+  2: invalid args/json（リクエストが JSON オブジェクトでない場合を含む）
 """
 from __future__ import annotations
 
 import json
 import os
 import sys
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from aicw.decision import build_decision_report
-from bridge.ensemble import run_ensemble
+from bridge.ensemble import run_ensemble, run_ensemble_batch
 
 
 def _read_input(args: List[str]) -> str:
@@ -80,13 +81,81 @@ def _format_ensemble(report: Dict[str, Any], ensemble: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+def _parse_batch(raw: str) -> List[Tuple[str, Any]]:
+    """
+    JSON 配列、または 1 行 1 リクエストの JSONL を読み込む。
+
+    Returns:
+        (位置の表示, 値) のリスト。位置は配列なら "item N"、JSONL なら "line N"（1 始まり）
+    """
+    text = raw.strip()
+    if text.startswith("["):
+        return [(f"item {i}", item) for i, item in enumerate(json.loads(text))]
+    return [
+        (f"line {n}", json.loads(line))
+        for n, line in enumerate(raw.splitlines(), start=1)
+        if line.strip()
+    ]
+
+
+def _type_error(value: Any) -> str:
+    return f"request must be a JSON object, got {type(value).__name__}"
+
+
+def _format_batch(
+    reports: List[Dict[str, Any]],
+    results: Dict[int, Dict[str, Any]],
+) -> str:
+    lines = [
+        "# Ensemble Batch Review",
+        "",
+        "| # | status | majority | minority |",
+        "|---|---|---|---|",
+    ]
+    for i, report in enumerate(reports):
+        if i not in results:
+            lines.append(f"| {i} | blocked ({report.get('blocked_by')}) | - | - |")
+            continue
+        ens = results[i]
+        minority = " / ".join(m.get("name", "Unknown") for m in ens.get("minority_report", []))
+        lines.append(f"| {i} | ok | {ens['majority']['stance']} | {minority} |")
+    return "\n".join(lines)
+
+
+def _main_batch(args: List[str]) -> None:
+    raw = _read_input(args)
+    try:
+        items = _parse_batch(raw)
+    except json.JSONDecodeError as e:
+        print(f"[ensemble_review] invalid json: {e}", file=sys.stderr)
+        sys.exit(2)
+    bad = [(where, value) for where, value in items if not isinstance(value, dict)]
+    for where, value in bad:
+        print(f"[ensemble_review] {where}: {_type_error(value)}", file=sys.stderr)
+    if bad:
+        sys.exit(2)
+
+    requests = [value for _, value in items]
+    reports = [build_decision_report(req) for req in requests]
+    ok_indexes = [i for i, r in enumerate(reports) if r.get("status") != "blocked"]
+    prompts = [reports[i].get("input", {}).get("situation", "") for i in ok_indexes]
+    results = dict(zip(ok_indexes, run_ensemble_batch(prompts)))
+    print(_format_batch(reports, results))
+    sys.exit(0)
+
+
 def main() -> None:
+    if sys.argv[1:2] == ["--batch"]:
+        _main_batch(sys.argv[2:])
     raw = _read_input(sys.argv[1:])
     try:
         req = json.loads(raw)
     except json.JSONDecodeError as e:
         print(f"[ensemble_review] invalid json: {e}", file=sys.stderr)
         sys.exit(2)
+    if not isinstance(req, dict):
+        print(f"[ensemble_review] {_type_error(req)}", file=sys.stderr)
+        sys.exit(2)
 
     report = build_decision_report(req)
     if report.get("status") == "blocked":
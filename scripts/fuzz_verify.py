@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+並列ファジング + 決定性検証ハーネス。
+
+gen_fuzz_cases の生成列（または JSONL 入力）をストリームのまま読み、
+チャンク単位でワーカープロセスへ配る。各ワーカーはケースごとに
+build_decision_report を実行し、aicw.consistency.hash_report（check_consistency と
+同じ正規化 JSON の SHA-256）でレポートハッシュを計算する。
+
+決定性の検証:
+  - 一部のチャンク（--verify-every K ごとに 1 つ）を、別プロセス群（検証プール）でも計算し、
+    ケースごとのハッシュ列が一致することを確認する
+  - ワーカーは spawn で起動するため、PYTHONHASHSEED 未指定なら
+    プロセスごとにハッシュシードが異なる（set 順序依存のバグを拾える）
+  - 全ケースのハッシュ集合は順序非依存の digest（各ハッシュの和 mod 2^256）にまとめる。
+    同じ seed / count ならワーカー数・チャンク分割によらず同じ digest になる
+
+契約検査:
+  ケース番号が --contract-every N の倍数のレポートを validate_brief（decision_brief.v0）で検査し、
+  違反件数とメッセージ別の件数をサマリーの "contract" に載せる（0 で無効）
+
+メモリ:
+  ケース列は 1 件ずつ生成し、実行中のチャンク数を上限（ワーカー数 × 4）で抑える。
+  10^7 件でも全件リストは作らない。
+
+Usage:
+  python scripts/fuzz_verify.py --count 100000 --seed 42 --workers 8
+  python scripts/fuzz_verify.py --input cases.jsonl --workers 4
+  python scripts/gen_fuzz_cases.py --count 10000000 --format jsonl --shard 0/4 \
+      | python scripts/fuzz_verify.py --input -
+  python scripts/fuzz_verify.py --input cases.jsonl --verify-every 1
+
+Exit codes:
+  0: 決定的（検証チャンクのハッシュが全て一致）かつ契約違反なし
+  1: 非決定性 or 契約違反を検出
+  2: 入力エラー（JSON として読めない行 / JSON オブジェクトでない行）
+  3: ワーカーの実行失敗（ケース処理中の例外 / ワーカープロセスの異常終了）
+
+外部依存: なし
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aicw.consistency import hash_report
+from scripts.gen_fuzz_cases import iter_cases
+
+DEFAULT_CHUNK_SIZE = 256
+DEFAULT_VERIFY_EVERY = 10
+DEFAULT_CONTRACT_EVERY = 1000
+_DIGEST_MOD = 1 << 256
+_MAX_REPORTED_MISMATCHES = 20
+_MAX_REPORTED_CONTRACT_ERRORS = 20
+
+
+# ---------------------------------------------------------------------------
+# ワーカー側
+# ---------------------------------------------------------------------------
+
+def _path_of(report: Dict[str, Any]) -> str:
+    """レポートの経路キー（"ok" / "blocked:<blocked_by>"）。"""
+    status = str(report.get("status"))
+    if status == "blocked":
+        return f"blocked:{report.get('blocked_by')}"
+    return status
+
+
+def hash_chunk(
+    lines: List[str],
+    keep_hashes: bool = False,
+    start: int = 0,
+    contract_every: int = 0,
+) -> Dict[str, Any]:
+    """
+    JSONL のチャンクを処理し、集計値を返す（ワーカープロセスで実行）。
+
+    start はチャンク先頭のケース番号。ケース番号が contract_every の倍数の
+    レポートだけ validate_brief で検査する（0 で検査しない）。
+    JSON オブジェクトでない行は ValueError（入力エラー）。
+
+    Returns:
+        {
+            "count": int,
+            "digest": int,                       # ハッシュの和 mod 2^256
+            "paths": {path: [件数, 秒数]},
+            "hashes": [str] | None,              # keep_hashes=True のときのみ
+            "contract": {"validated": int, "failed": int, "errors": {msg: 件数}},
+            "pid": int,
+        }
+    """
+    from aicw.decision import build_decision_report
+    from aicw.schema import validate_brief
+
+    digest = 0
+    paths: Dict[str, List[float]] = {}
+    hashes: Optional[List[str]] = [] if keep_hashes else None
+    contract = {"validated": 0, "failed": 0, "errors": {}}
+    for index, line in enumerate(lines, start=start):
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError(
+                f"case {index}: request must be a JSON object, got {type(request).__name__}"
+            )
+        t0 = time.perf_counter()
+        report = build_decision_report(request)
+        h = hash_report(report)
+        elapsed = time.perf_counter() - t0
+        digest = (digest + int(h, 16)) % _DIGEST_MOD
+        slot = paths.setdefault(_path_of(report), [0, 0.0])
+        slot[0] += 1
+        slot[1] += elapsed
+        if hashes is not None:
+            hashes.append(h)
+        if contract_every and index % contract_every == 0:
+            errors = validate_brief(report)
+            contract["validated"] += 1
+            if errors:
+                contract["failed"] += 1
+                for e in errors:
+                    contract["errors"][e] = contract["errors"].get(e, 0) + 1
+    return {
+        "count": len(lines),
+        "digest": digest,
+        "paths": paths,
+        "hashes": hashes,
+        "contract": contract,
+        "pid": os.getpid(),
+    }
+
+
+# ---------------------------------------------------------------------------
+# 親プロセス側
+# ---------------------------------------------------------------------------
+
+def generated_lines(count: int, seed: int) -> Iterator[str]:
+    """gen_fuzz_cases の生成列を JSONL 行として 1 件ずつ返す。"""
+    for case in iter_cases(count, seed):
+        yield json.dumps(case, ensure_ascii=False)
+
+
+def _chunks(lines: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_fuzz_verify(
+    lines: Iterable[str],
+    *,
+    workers: int = 2,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    verify_every: int = DEFAULT_VERIFY_EVERY,
+    contract_every: int = DEFAULT_CONTRACT_EVERY,
+) -> Dict[str, Any]:
+    """
+    JSONL 行のストリームを並列に処理し、決定性を検証した集計サマリーを返す。
+
+    Args:
+        lines: 1 行 1 リクエストの JSON 文字列（空行は無視）
+        workers: 本処理のワーカープロセス数
+        chunk_size: 1 タスクあたりのケース数
+        verify_every: K チャンクに 1 つを検証プールでも計算する（0 で検証なし）
+        contract_every: N ケースに 1 つを validate_brief で検査する（0 で検査なし）
+
+    Returns:
+        サマリー dict（status 分布 / blocked_by 内訳 / 経路別スループット /
+        hash_set_digest / mismatches など）
+    """
+    if workers <= 0:
+        raise ValueError("workers must be positive")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if verify_every < 0:
+        raise ValueError("verify_every must be >= 0")
+    if contract_every < 0:
+        raise ValueError("contract_every must be >= 0")
+
+    ctx = multiprocessing.get_context("spawn")
+    max_in_flight = workers * 4
+    started = time.perf_counter()
+
+    total = 0
+    digest = 0
+    paths: Dict[str, List[float]] = {}
+    worker_pids: Set[int] = set()
+    verifier_pids: Set[int] = set()
+    verified_chunks = 0
+    mismatches: List[Dict[str, Any]] = []
+    contract_validated = 0
+    contract_failed = 0
+    contract_errors: Dict[str, int] = {}
+
+    # チャンク番号 → (開始インデックス, 本処理の結果, 検証プールの結果)
+    pending_verify: Dict[int, List[Any]] = {}
+
+    def _record_pair(chunk_no: int) -> None:
+        nonlocal verified_chunks
+        start, primary, replica = pending_verify.pop(chunk_no)
+        verified_chunks += 1
+        verifier_pids.add(replica["pid"])
+        for offset, (a, b) in enumerate(zip(primary["hashes"], replica["hashes"])):
+            if a != b and len(mismatches) < _MAX_REPORTED_MISMATCHES:
+                mismatches.append({"case_index": start + offset, "primary": a, "replica": b})
+
+    primary_pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+    verify_pool = (
+        ProcessPoolExecutor(max_workers=max(1, workers // 2), mp_context=ctx)
+        if verify_every else None
+    )
+    in_flight: Dict[Future, Tuple[str, int]] = {}
+
+    def _collect(done: Iterable[Future]) -> None:
+        nonlocal total, digest, contract_validated, contract_failed
+        for future in done:
+            role, chunk_no = in_flight.pop(future)
+            result = future.result()
+            if role == "primary":
+                total += result["count"]
+                digest = (digest + result["digest"]) % _DIGEST_MOD
+                worker_pids.add(result["pid"])
+                for path, (n, secs) in result["paths"].items():
+                    slot = paths.setdefault(path, [0, 0.0])
+                    slot[0] += n
+                    slot[1] += secs
+                contract_validated += result["contract"]["validated"]
+                contract_failed += result["contract"]["failed"]
+                for msg, n in result["contract"]["errors"].items():
+                    contract_errors[msg] = contract_errors.get(msg, 0) + n
+            if chunk_no in pending_verify:
+                slot_index = 1 if role == "primary" else 2
+                pending_verify[chunk_no][slot_index] = result
+                if all(x is not None for x in pending_verify[chunk_no][1:]):
+                    _record_pair(chunk_no)
+
+    try:
+        start_index = 0
+        for chunk_no, chunk in enumerate(_chunks(lines, chunk_size)):
+            verify = bool(verify_every) and chunk_no % verify_every == 0
+            if verify:
+                pending_verify[chunk_no] = [start_index, None, None]
+                in_flight[verify_pool.submit(hash_chunk, chunk, True)] = ("replica", chunk_no)
+            future = primary_pool.submit(hash_chunk, chunk, verify, start_index, contract_every)
+            in_flight[future] = ("primary", chunk_no)
+            start_index += len(chunk)
+            while len(in_flight) >= max_in_flight:
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                _collect(done)
+        while in_flight:
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            _collect(done)
+    finally:
+        primary_pool.shutdown(cancel_futures=True)
+        if verify_pool is not None:
+            verify_pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    status: Dict[str, int] = {}
+    blocked_by: Dict[str, int] = {}
+    for path, (n, _secs) in paths.items():
+        kind, _, reason = path.partition(":")
+        status[kind] = status.get(kind, 0) + int(n)
+        if kind == "blocked":
+            blocked_by[reason] = blocked_by.get(reason, 0) + int(n)
+
+    return {
+        "cases": total,
+        "deterministic": not mismatches,
+        "hash_set_digest": f"{digest:064x}",
+        "status": dict(sorted(status.items())),
+        "blocked_by": dict(sorted(blocked_by.items())),
+        "paths": {
+            path: {
+                "count": int(n),
+                "cases_per_cpu_s": round(n / secs, 1) if secs > 0 else None,
+            }
+            for path, (n, secs) in sorted(paths.items())
+        },
+        "verified_chunks": verified_chunks,
+        "mismatches": mismatches,
+        "contract": {
+            "every": contract_every,
+            "validated": contract_validated,
+            "failed": contract_failed,
+            "errors": dict(
+                sorted(contract_errors.items(), key=lambda kv: (-kv[1], kv[0]))[:_MAX_REPORTED_CONTRACT_ERRORS]
+            ),
+        },
+        "workers": len(worker_pids),
+        "verifiers": len(verifier_pids),
+        "elapsed_s": round(elapsed, 3),
+        "cases_per_s": round(total / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def _iter_input_lines(path: str) -> Iterator[str]:
+    if path == "-":
+        yield from sys.stdin
+        return
+    with open(path, encoding="utf-8") as f:
+        yield from f
+
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Parallel fuzz-and-verify harness")
+    parser.add_argument("--input", type=str, default=None, help="JSONL file or '-'")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--verify-every", type=int, default=DEFAULT_VERIFY_EVERY)
+    parser.add_argument("--contract-every", type=int, default=DEFAULT_CONTRACT_EVERY)
+    parser.add_argument("--pretty", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = _parse_args(argv if argv is not None else sys.argv[1:])
+
+    if args.input is None:
+        if args.count <= 0:
+            print("error: --count must be positive", file=sys.stderr)
+            return 2
+        lines: Iterable[str] = generated_lines(args.count, args.seed)
+    else:
+        if args.input != "-" and not os.path.exists(args.input):
+            print(f"error: file not found: {args.input}", file=sys.stderr)
+            return 2
+        lines = _iter_input_lines(args.input)
+
+    try:
+        summary = run_fuzz_verify(
+            lines,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            verify_every=args.verify_every,
+            contract_every=args.contract_every,
+        )
+    except ValueError as e:
+        # 引数不正 / JSONL の行が JSON として読めない・JSON オブジェクトでない
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    except Exception as e:
+        # ワーカー内の例外（future.result() で再送出）/ BrokenProcessPool
+        print(f"error: worker failed: {type(e).__name__}: {e}", file=sys.stderr)
+        return 3
+
+    if args.input is None:
+        summary["seed"] = args.seed
+    print(json.dumps(summary, ensure_ascii=False, indent=2 if args.pretty else None))
+    ok = summary["deterministic"] and summary["contract"]["failed"] == 0
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
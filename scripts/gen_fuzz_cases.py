@@ -5,6 +5,20 @@ Decision request 用の簡易ファジングケース生成器。
 - 標準ライブラリのみ
 - decision_request.v0 の型を満たす入力を大量生成
 - ランダムシード固定で再現可能
+- ケースごとに (seed, index) から乱数列を派生させるため、任意の区間を独立に生成できる
+  → --shard i/N で N プロセスが調整なしに互いに素な区間を生成（和集合は全件と一致）
+- --format jsonl は 1 件ずつバッファ付きで書き出す（件数によらずメモリ一定）
+
+互換性:
+  ケースごとの乱数列は random.Random(f"{seed}:{index}") から作る。
+  random.Random(seed) 1 本から全件を順に引いていた版とは、同じ --seed でも
+  生成されるケース列が異なる（--shard の有無には依存しない）。
+  以前の版で作ったコーパスと比較するときは、保存済みのファイルを使うこと。
+
+Usage:
+  python scripts/gen_fuzz_cases.py --count 1000 --out cases.json
+  python scripts/gen_fuzz_cases.py --count 10000000 --format jsonl --out cases.jsonl
+  python scripts/gen_fuzz_cases.py --count 10000000 --format jsonl --shard 3/8 --out part3.jsonl
 """
 
 from __future__ import annotations
@@ -13,7 +27,7 @@ import argparse
 import json
 import random
 import sys
-from typing import Any, Dict, List
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 _SITUATIONS = [
@@ -86,20 +100,114 @@ def _build_case(rng: random.Random, index: int) -> Dict[str, Any]:
     return case
 
 
+def shard_range(count: int, shard: Optional[Tuple[int, int]] = None) -> Tuple[int, int]:
+    """
+    shard=(i, N) が担当するケース番号の半開区間 [start, stop) を返す。
+
+    区間は連続で、i = 0..N-1 の和集合は [0, count) に一致し互いに素。
+    """
+    if shard is None:
+        return 0, count
+    index, total = shard
+    if total <= 0 or not 0 <= index < total:
+        raise ValueError(f"invalid shard: {index}/{total}")
+    return count * index // total, count * (index + 1) // total
+
+
+def iter_cases(
+    count: int,
+    seed: int,
+    shard: Optional[Tuple[int, int]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    ケースを 1 件ずつ返す（全件をメモリに載せない）。
+
+    ケース index の内容は (seed, index) だけで決まるため、
+    shard を指定しても同じ seed の全件生成と同一のケースが得られる。
+    """
+    start, stop = shard_range(count, shard)
+    for i in range(start, stop):
+        # str シードは sha512 で展開される（PYTHONHASHSEED に依存しない）
+        yield _build_case(random.Random(f"{seed}:{i}"), i)
+
+
 def generate_cases(count: int, seed: int) -> List[Dict[str, Any]]:
-    rng = random.Random(seed)
-    return [_build_case(rng, i) for i in range(count)]
+    return list(iter_cases(count, seed))
+
+
+_WRITE_BATCH = 1024  # 何件分の行をまとめて write するか
+
+
+def write_jsonl(cases: Iterable[Dict[str, Any]], out: IO[str]) -> int:
+    """1 行 1 ケースで書き出し、書いた件数を返す。"""
+    written = 0
+    buf: List[str] = []
+    for case in cases:
+        buf.append(json.dumps(case, ensure_ascii=False))
+        if len(buf) >= _WRITE_BATCH:
+            out.write("\n".join(buf) + "\n")
+            written += len(buf)
+            buf = []
+    if buf:
+        out.write("\n".join(buf) + "\n")
+        written += len(buf)
+    return written
+
+
+def write_json_array(cases: Iterable[Dict[str, Any]], out: IO[str], pretty: bool = False) -> int:
+    """json.dump(list(cases)) と同一の出力を、リストを作らずに書き出す（pretty 時は末尾改行付き）。"""
+    written = 0
+    sep = ",\n" if pretty else ", "
+    out.write("[")
+    for case in cases:
+        if pretty:
+            item = "\n".join(
+                "  " + line
+                for line in json.dumps(case, ensure_ascii=False, indent=2).split("\n")
+            )
+        else:
+            item = json.dumps(case, ensure_ascii=False)
+        if written == 0:
+            out.write("\n" + item if pretty else item)
+        else:
+            out.write(sep + item)
+        written += 1
+    if pretty:
+        out.write("\n]\n" if written else "]\n")  # json.dump([]) は "[]"
+    else:
+        out.write("]")
+    return written
+
+
+def _parse_shard(value: str) -> Tuple[int, int]:
+    try:
+        index_s, total_s = value.split("/", 1)
+        return int(index_s), int(total_s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
 
 
 def _parse_args(argv: List[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate decision request fuzz cases")
     parser.add_argument("--count", type=int, default=1000)
-    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--seed", type=int, default=42,
+        help="ケースごとに (seed, index) から乱数列を派生（単一乱数列の旧版とは別のコーパス）",
+    )
     parser.add_argument("--out", type=str, default="-")
-    parser.add_argument("--pretty", action="store_true")
+    parser.add_argument("--pretty", action="store_true", help="json 形式のみ有効")
+    parser.add_argument("--format", choices=("json", "jsonl"), default="json")
+    parser.add_argument("--shard", type=_parse_shard, default=None, metavar="i/N")
     return parser.parse_args(argv)
 
 
+def _write(cases: Iterable[Dict[str, Any]], out: IO[str], args: argparse.Namespace) -> None:
+    if args.format == "jsonl":
+        write_jsonl(cases, out)
+    else:
+        write_json_array(cases, out, pretty=args.pretty)
+
+
 def main(argv: List[str] | None = None) -> int:
     args = _parse_args(argv if argv is not None else sys.argv[1:])
 
@@ -107,19 +215,20 @@ def main(argv: List[str] | None = None) -> int:
         print("error: --count must be positive", file=sys.stderr)
         return 2
 
-    cases = generate_cases(args.count, args.seed)
-    indent = 2 if args.pretty else None
+    try:
+        shard_range(args.count, args.shard)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    cases = iter_cases(args.count, args.seed, shard=args.shard)
 
     if args.out == "-":
-        json.dump(cases, sys.stdout, ensure_ascii=False, indent=indent)
-        if indent is not None:
-            print()
+        _write(cases, sys.stdout, args)
         return 0
 
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(cases, f, ensure_ascii=False, indent=indent)
-        if indent is not None:
-            f.write("\n")
+    with open(args.out, "w", encoding="utf-8", buffering=1 << 20) as f:
+        _write(cases, f, args)
     return 0
 
 
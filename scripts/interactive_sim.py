@@ -12,11 +12,14 @@ scripts/interactive_sim.py
   - テスト可能（stdin を差し替えられる設計）
   - 途中で Ctrl+C したら安全に終了
   - "--auto" オプションでデフォルト値を使いデモ実行
+  - "--edit" で項目を修正しながら再分析できる（入力が変わった段だけを再計算。
+    aicw.stage_cache.StageCache を 1 セッションで共有する）
 
 実行:
   python scripts/interactive_sim.py
   python scripts/interactive_sim.py --auto    # 非インタラクティブ（デモ）
   python scripts/interactive_sim.py --json    # JSON 出力
+  python scripts/interactive_sim.py --edit    # 修正 → 再分析のループ
 
 外部依存: なし
 """
@@ -152,6 +155,46 @@ def collect_request(
     }
 
 
+# 修正ループで選べる項目（番号 → フィールド名）
+_EDITABLE_FIELDS: List[str] = [
+    "situation", "constraints", "options", "beneficiaries", "affected_structures",
+]
+
+
+def edit_request(
+    request: Dict[str, Any],
+    field: str,
+    stdin: IO[str] = None,
+) -> Dict[str, Any]:
+    """
+    request の 1 項目だけを入力し直した新しい dict を返す（空入力なら現在の値のまま）。
+    """
+    edited = dict(request)
+    if field == "situation":
+        edited[field] = _prompt(
+            "    何を決めたいか", default=request.get(field, ""), stdin=stdin
+        )
+    else:
+        values = _prompt_list(f"    {field}", defaults=request.get(field, []), stdin=stdin)
+        edited[field] = values[:3] if field == "options" else values
+    return edited
+
+
+def _stage_delta(
+    before: Dict[str, Dict[str, int]], after: Dict[str, Dict[str, int]]
+) -> Dict[str, List[str]]:
+    """StageCache.stats() の差分 → {"recomputed": [段名], "reused": [段名]}。"""
+    recomputed: List[str] = []
+    reused: List[str] = []
+    for stage, counts in after.items():
+        prev = before.get(stage, {"hits": 0, "misses": 0})
+        if counts["misses"] > prev["misses"]:
+            recomputed.append(stage)
+        elif counts["hits"] > prev["hits"]:
+            reused.append(stage)
+    return {"recomputed": recomputed, "reused": reused}
+
+
 # ---------------------------------------------------------------------------
 # 結果表示フォーマッタ
 # ---------------------------------------------------------------------------
@@ -235,6 +278,7 @@ def run_simulation(
     stdin: IO[str] = None,
     record_to_kb: bool = True,
     kb_path: str = "",
+    edit: bool = False,
 ) -> Dict[str, Any]:
     """
     シミュレーションを実行して結果を返す。
@@ -244,6 +288,7 @@ def run_simulation(
         json_mode: True なら結果を JSON 文字列として返す
         stdin: テスト用 stdin 差し替え
         record_to_kb: True なら knowledge_base に記録する
+        edit: True なら分析後に項目を修正して再分析するループに入る（auto では無視）
 
     Returns:
         {
@@ -252,12 +297,14 @@ def run_simulation(
             "audit_hash": str,
             "philosophy_summary": dict,
             "knowledge_recorded": bool,
+            "similar_count": int,
+            "edit_count": int,       # 修正ループでの再分析回数
         }
     """
-    from aicw.decision import build_decision_report
     from aicw.audit_log import AuditLog
-    from bridge.po_core_bridge import analyze_philosophy_tensor
+    from bridge.decision_turn import analyze_decision_turn
     from aicw.knowledge_base import KnowledgeBase
+    from aicw.stage_cache import StageCache
 
     # Step 1: 入力収集
     if not auto:
@@ -273,8 +320,29 @@ def run_simulation(
         print("  入力を受け取りました。分析中...")
         print(_SEPARATOR)
 
-    # Step 2: 意思決定ブリーフ生成
-    brief = build_decision_report(request)
+    # Step 2: 意思決定ブリーフ + 哲学テンソル（決定パイプラインは 1 回だけ実行）
+    # human_decision はまだ未入力なので空のまま渡す
+    # 修正ループでは段ごとのキャッシュを共有し、入力が変わった段だけを再計算する
+    cache = StageCache()
+    turn = analyze_decision_turn(request, include_reasoning=False, cache=cache)
+    edit_count = 0
+    while edit and not auto:
+        brief = turn["brief"]
+        sel = brief.get("selection", {})
+        print(f"\n  status: {brief['status']} / 推奨案: {sel.get('recommended_id', '-')}"
+              f" / 理由コード: {sel.get('reason_codes', [])}")
+        menu = " ".join(f"{i}:{name}" for i, name in enumerate(_EDITABLE_FIELDS, 1))
+        answer = _prompt(f"\n修正する項目（{menu} / Enter で確定）", stdin=stdin)
+        if not answer.isdigit() or not 1 <= int(answer) <= len(_EDITABLE_FIELDS):
+            break
+        request = edit_request(request, _EDITABLE_FIELDS[int(answer) - 1], stdin=stdin)
+        before = cache.stats()
+        turn = analyze_decision_turn(request, include_reasoning=False, cache=cache)
+        edit_count += 1
+        delta = _stage_delta(before, cache.stats())
+        print(f"  再計算: {delta['recomputed']} / 再利用: {delta['reused']}")
+    brief = turn["brief"]
+    tensor = turn["tensor"]
 
     # Step 3: 監査ログ
     log = AuditLog()
@@ -284,19 +352,7 @@ def run_simulation(
     else:
         entry = log.append("blocked", blocked_by=brief.get("blocked_by"))
 
-    # Step 4: 哲学テンソル
-    explanation = ""
-    if brief["status"] == "ok":
-        explanation = brief.get("selection", {}).get("explanation", "")
-
-    human_decision = request.get("situation", "")  # まだ未入力なので situation で代替
-    tensor = analyze_philosophy_tensor(
-        situation=request["situation"],
-        explanation=explanation,
-        existence_analysis=brief.get("existence_analysis"),
-    )
-
-    # Step 5: 知識ベース（類似検索 + 記録）
+    # Step 4: 知識ベース（類似検索 + 記録）
     kb = KnowledgeBase(path=kb_path or None)
     similar = []
     if record_to_kb:
@@ -320,7 +376,7 @@ def run_simulation(
         else:
             record_to_kb = False
 
-    # Step 6: 表示 or JSON 出力
+    # Step 5: 表示 or JSON 出力
     if not json_mode:
         display_result(brief, tensor, entry.decision_hash, similar)
 
@@ -331,6 +387,7 @@ def run_simulation(
         "philosophy_summary": tensor["summary"],
         "knowledge_recorded": record_to_kb,
         "similar_count": len(similar),
+        "edit_count": edit_count,
     }
 
 
@@ -359,6 +416,10 @@ def main() -> int:
         default="",
         help="知識ベースJSONの保存/読込パス（未指定時はインメモリ）",
     )
+    parser.add_argument(
+        "--edit", action="store_true",
+        help="分析後に項目を修正して再分析するループに入る（変わった段だけ再計算）",
+    )
     args = parser.parse_args()
 
     try:
@@ -367,6 +428,7 @@ def main() -> int:
             json_mode=args.json,
             record_to_kb=not args.no_kb,
             kb_path=args.kb_path,
+            edit=args.edit,
         )
     except KeyboardInterrupt:
         print("\n\n  中断しました。またいつでも使ってください。")
@@ -8,10 +8,11 @@ Decision Request JSON バリデータ
 Usage:
   python scripts/validate_request.py request.json
   echo '{"situation":"..."}' | python scripts/validate_request.py
+  python scripts/validate_request.py --jsonl requests.jsonl   # 1 行 1 リクエストを一括検査
 
 Exit codes:
   0: valid（エラーなし）
-  1: validation errors found（項目名ミス・型ミスなど）
+  1: validation errors found（項目名ミス・型ミスなど。--jsonl では 1 行でもあれば 1）
   2: invalid JSON / file not found / 引数エラー
 """
 
@@ -24,9 +25,12 @@ from typing import Any, List
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from aicw.schema import validate_request
+from aicw.schema import validate_many, validate_request
 
-_USAGE = "usage: python scripts/validate_request.py [request.json]  (or pipe JSON to stdin)"
+_USAGE = (
+    "usage: python scripts/validate_request.py [request.json]  (or pipe JSON to stdin)\n"
+    "       python scripts/validate_request.py --jsonl requests.jsonl"
+)
 
 
 def _load(argv: List[str]) -> Any:
@@ -52,7 +56,31 @@ def _load(argv: List[str]) -> Any:
         sys.exit(2)
 
 
+def _main_jsonl(path: str) -> None:
+    checked = 0
+    invalid = 0
+    try:
+        for line_no, offset, errors in validate_many(path):
+            checked += 1
+            if not errors:
+                continue
+            invalid += 1
+            print(f"line {line_no} (offset {offset}):")
+            for e in errors:
+                print(f"  - {e}")
+    except FileNotFoundError:
+        print(f"error: file not found: {path}", file=sys.stderr)
+        sys.exit(2)
+    print(f"checked={checked} invalid={invalid}")
+    sys.exit(1 if invalid else 0)
+
+
 def main() -> None:
+    if len(sys.argv) >= 2 and sys.argv[1] == "--jsonl":
+        if len(sys.argv) != 3:
+            print(_USAGE, file=sys.stderr)
+            sys.exit(2)
+        _main_jsonl(sys.argv[2])
     data = _load(sys.argv)
     errors = validate_request(data)
     if errors:
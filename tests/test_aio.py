@@ -0,0 +1,171 @@
+"""tests/test_aio.py — AsyncEngine（aicw.aio）のテスト"""
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from aicw import knowledge_base
+from aicw.aio import AsyncEngine
+from aicw.decision import build_decision_report
+from aicw.knowledge_base import KnowledgeBase
+from bridge.decision_turn import analyze_decision_turn
+
+_REQUEST = {
+    "situation": "新規事業への参入可否を判断したい",
+    "constraints": ["法令遵守", "品質重視"],
+}
+
+
+class TestCpuStages(unittest.IsolatedAsyncioTestCase):
+
+    async def test_results_match_sync_api(self):
+        async with AsyncEngine() as engine:
+            report = await engine.build_decision_report(_REQUEST)
+            errors, validated = await engine.build_validated_report(_REQUEST)
+            turn = await engine.analyze_decision_turn(_REQUEST, include_reasoning=False)
+            tensor = await engine.analyze_philosophy_tensor(
+                _REQUEST["situation"], explanation=report["selection"]["explanation"]
+            )
+        self.assertEqual(report, build_decision_report(_REQUEST))
+        self.assertEqual((errors, validated), ([], report))
+        self.assertEqual(turn, analyze_decision_turn(_REQUEST, include_reasoning=False))
+        self.assertEqual(tensor["schema_version"], turn["tensor"]["schema_version"])
+
+    async def test_event_loop_keeps_running(self):
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.005)
+
+        task = asyncio.ensure_future(ticker())
+        async with AsyncEngine() as engine:
+            await engine.run(time.sleep, 0.1)
+        task.cancel()
+        self.assertGreater(len(ticks), 5)
+
+    async def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        active = [0, 0]   # 現在数, 最大
+
+        def work():
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+        async with AsyncEngine(max_concurrency=2) as engine:
+            await asyncio.gather(*(engine.run(work) for _ in range(8)))
+        self.assertEqual(active[1], 2)
+
+    async def test_errors_propagate(self):
+        async with AsyncEngine() as engine:
+            with self.assertRaises(ZeroDivisionError):
+                await engine.run(lambda: 1 / 0)
+
+    async def test_cancel_running_call_holds_slot_until_done(self):
+        started, release = threading.Event(), threading.Event()
+
+        def blocking():
+            started.set()
+            release.wait(5)
+            return "done"
+
+        async with AsyncEngine(max_concurrency=1) as engine:
+            task = asyncio.ensure_future(engine.run(blocking))
+            while not started.is_set():
+                await asyncio.sleep(0.001)
+            task.cancel()
+            await asyncio.sleep(0.01)
+            self.assertFalse(task.done())          # 実行中の処理が終わるまで待つ
+            release.set()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertEqual(await engine.run(lambda: "next"), "next")
+
+    async def test_cancel_queued_call_never_runs(self):
+        release = threading.Event()
+        ran = []
+        async with AsyncEngine(max_concurrency=1) as engine:
+            first = asyncio.ensure_future(engine.run(release.wait, 5))
+            queued = asyncio.ensure_future(engine.run(ran.append, 1))
+            await asyncio.sleep(0.01)
+            queued.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await queued
+            release.set()
+            await first
+        self.assertEqual(ran, [])
+
+    async def test_closed_engine_rejects_calls(self):
+        engine = AsyncEngine()
+        await engine.aclose()
+        with self.assertRaises(RuntimeError):
+            await engine.build_decision_report(_REQUEST)
+        with self.assertRaises(ValueError):
+            AsyncEngine(max_concurrency=0)
+
+
+class TestBatchedRecord(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "kb.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    async def test_burst_is_written_once(self):
+        engine = AsyncEngine(kb=KnowledgeBase(self.path), flush_interval=0.05)
+        with mock.patch("aicw.aio._write_snapshot",
+                        wraps=knowledge_base._write_snapshot) as write:
+            for i in range(50):
+                await engine.record(f"h{i}", "ok", ["SAFETY_FIRST"])
+            self.assertEqual(engine.kb.count(), 50)      # メモリ上は即時
+            self.assertFalse(os.path.exists(self.path))
+            await asyncio.sleep(0.15)
+            self.assertEqual(write.call_count, 1)
+        self.assertEqual(KnowledgeBase(self.path).count(), 50)
+        await engine.aclose()
+
+    async def test_max_pending_forces_flush(self):
+        engine = AsyncEngine(kb=KnowledgeBase(self.path), flush_interval=60, max_pending=10)
+        for i in range(25):
+            await engine.record(f"h{i}", "ok", [])
+        self.assertEqual(engine.writes, 2)
+        self.assertEqual(KnowledgeBase(self.path).count(), 20)
+        await engine.aclose()
+        self.assertEqual(engine.writes, 3)
+        self.assertEqual(KnowledgeBase(self.path).count(), 25)
+
+    async def test_context_exit_flushes(self):
+        async with AsyncEngine(kb=KnowledgeBase(self.path), flush_interval=60) as engine:
+            await engine.record("h1", "blocked", [], "#6 Privacy")
+        self.assertEqual(KnowledgeBase(self.path).all_entries()[0]["blocked_by"], "#6 Privacy")
+
+    async def test_failed_write_is_retried(self):
+        engine = AsyncEngine(kb=KnowledgeBase(self.path), flush_interval=60)
+        await engine.record("h1", "ok", [])
+        with mock.patch("aicw.aio._write_snapshot", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                await engine.flush()
+        await engine.flush()
+        self.assertEqual(KnowledgeBase(self.path).count(), 1)
+        await engine.aclose()
+
+    async def test_in_memory_kb_never_writes(self):
+        async with AsyncEngine() as engine:
+            await engine.record("h1", "ok", [])
+            await engine.flush()
+            self.assertEqual(engine.writes, 0)
+            self.assertEqual(engine.kb.count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
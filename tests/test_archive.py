@@ -0,0 +1,216 @@
+"""tests/test_archive.py — 列指向アーカイブ（compact / ArchiveReader）のテスト"""
+import os
+import random
+import tempfile
+import unittest
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from aicw import archive
+from aicw.archive import ArchiveReader, _popcount_range, compact
+from aicw.knowledge_base import KnowledgeBase
+from aicw.schema import DECISION_BRIEF_V0
+
+_CODES = list(DECISION_BRIEF_V0["reason_codes"]["selection"])
+_BASE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _entries(n, seed=0, extra_codes=()):
+    rng = random.Random(seed)
+    codes = _CODES + list(extra_codes)
+    out = []
+    for _ in range(n):
+        status = rng.choice(["ok", "blocked"])
+        ts = _BASE + timedelta(seconds=rng.randint(0, 86400 * 60),
+                               microseconds=rng.randint(0, 999999))
+        out.append({
+            "decision_hash": "%064x" % rng.getrandbits(256),
+            "status": status,
+            "reason_codes": sorted(rng.sample(codes, rng.randint(0, 3))) if status == "ok" else [],
+            "blocked_by": rng.choice(["#6 Privacy", "#4 Manipulation"]) if status == "blocked" else None,
+            "timestamp_utc": ts.isoformat(),
+        })
+    return out
+
+
+class ArchiveTestBase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "kb.col")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+class TestCompact(ArchiveTestBase):
+
+    def test_rows_round_trip_sorted_by_time(self):
+        entries = _entries(500)
+        self.assertEqual(compact(self.path, entries=entries), 500)
+        with ArchiveReader(self.path) as ar:
+            rows = [ar.row(i) for i in range(len(ar))]
+        expected = sorted(entries, key=lambda e: e["timestamp_utc"])
+        self.assertEqual(rows, expected)
+
+    def test_from_knowledge_base_file(self):
+        kb_path = os.path.join(self.tmpdir.name, "kb.json")
+        kb = KnowledgeBase(path=kb_path)
+        kb.record("a" * 64, "ok", ["SAFETY_FIRST"])
+        kb.record("b" * 64, "blocked", [], "#6 Privacy")
+        compact(self.path, kb_paths=[kb_path])
+        with ArchiveReader(self.path) as ar:
+            self.assertEqual([ar.row(i) for i in range(len(ar))], kb.all_entries())
+
+    def test_append_to_existing_archive(self):
+        first, second = _entries(300, seed=1), _entries(200, seed=2, extra_codes=["NEW_CODE"])
+        compact(self.path, entries=first)
+        compact(self.path, archives=[self.path], entries=second)
+        with ArchiveReader(self.path) as ar:
+            self.assertEqual(len(ar), 500)
+            self.assertIn("NEW_CODE", ar.code_names)
+            rows = [ar.row(i) for i in range(len(ar))]
+        key = lambda e: (e["timestamp_utc"], e["decision_hash"])
+        self.assertEqual(sorted(rows, key=key), sorted(first + second, key=key))
+
+    def test_overlapping_compacts_publish_whole_archives(self):
+        # 1 つ目の compact() が os.replace する直前に、2 つ目の compact() が終わる
+        first, second = _entries(300, seed=1), _entries(50, seed=2)
+        real_replace = os.replace
+        calls = []
+
+        def replace(src, dst):
+            if not calls:
+                calls.append(src)
+                compact(self.path, entries=second)
+            real_replace(src, dst)
+
+        with mock.patch.object(archive.os, "replace", side_effect=replace):
+            compact(self.path, entries=first)
+        self.assertEqual(os.listdir(self.tmpdir.name), ["kb.col"])
+        with ArchiveReader(self.path) as ar:
+            rows = [ar.row(i) for i in range(len(ar))]
+        self.assertEqual(rows, sorted(first, key=lambda e: e["timestamp_utc"]))
+
+    def test_failed_write_leaves_no_temp_file(self):
+        compact(self.path, entries=_entries(10))
+        with mock.patch.object(archive.os, "replace", side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                compact(self.path, entries=_entries(20))
+        self.assertEqual(os.listdir(self.tmpdir.name), ["kb.col"])
+        with ArchiveReader(self.path) as ar:
+            self.assertEqual(len(ar), 10)
+
+    def test_unregistered_blocked_by_is_kept(self):
+        entry = _entries(1)[0]
+        entry.update(status="blocked", reason_codes=[], blocked_by="#9 Future")
+        compact(self.path, entries=[entry])
+        with ArchiveReader(self.path) as ar:
+            self.assertEqual(ar.row(0)["blocked_by"], "#9 Future")
+
+    def test_empty_archive(self):
+        compact(self.path)
+        with ArchiveReader(self.path) as ar:
+            self.assertEqual(len(ar), 0)
+            self.assertEqual(ar.code_histogram(), {})
+            self.assertEqual(ar.status_counts(), {"ok": 0, "blocked": 0})
+            self.assertEqual(ar.bucket_stats(timedelta(days=7)), [])
+
+    def test_invalid_status_raises(self):
+        entry = dict(_entries(1)[0], status="maybe")
+        with self.assertRaises(ValueError):
+            compact(self.path, entries=[entry])
+
+    def test_corrupt_file_raises(self):
+        with open(self.path, "wb") as f:
+            f.write(b"NOTANARCHIVE" + b"\x00" * 32)
+        with self.assertRaises(ValueError):
+            ArchiveReader(self.path)
+        compact(self.path, entries=_entries(10))
+        with open(self.path, "rb") as f:
+            data = f.read()
+        with open(self.path, "wb") as f:
+            f.write(data[:-16])
+        with self.assertRaises(ValueError):
+            ArchiveReader(self.path)
+
+
+class TestQueries(ArchiveTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.entries = _entries(2000, seed=3)
+        compact(self.path, entries=self.entries)
+        self.ar = ArchiveReader(self.path)
+        self.start = "2026-01-10T00:00:00+00:00"
+        self.end = "2026-02-01T00:00:00+00:00"
+        self.window = [e for e in self.entries if self.start <= e["timestamp_utc"] < self.end]
+
+    def tearDown(self):
+        self.ar.close()
+        super().tearDown()
+
+    def test_time_range_is_half_open(self):
+        lo, hi = self.ar.time_range(self.start, self.end)
+        self.assertEqual(hi - lo, len(self.window))
+        self.assertEqual(self.ar.count(self.start, self.end), len(self.window))
+        self.assertEqual(self.ar.time_range(), (0, 2000))
+
+    def test_time_arguments_accept_datetime_and_int(self):
+        start = datetime.fromisoformat(self.start)
+        us = int((start - datetime(1970, 1, 1, tzinfo=timezone.utc)).total_seconds()) * 1_000_000
+        expected = self.ar.time_range(self.start, self.end)
+        self.assertEqual(self.ar.time_range(start, self.end), expected)
+        self.assertEqual(self.ar.time_range(us, self.end), expected)
+
+    def test_status_and_blocked_by_counts(self):
+        status = Counter(e["status"] for e in self.window)
+        self.assertEqual(self.ar.status_counts(self.start, self.end),
+                         {"ok": status["ok"], "blocked": status["blocked"]})
+        blocked_by = Counter(e["blocked_by"] for e in self.window if e["blocked_by"])
+        self.assertEqual(self.ar.blocked_by_counts(self.start, self.end), dict(blocked_by))
+
+    def test_code_histogram(self):
+        expected = Counter(c for e in self.window for c in e["reason_codes"])
+        hist = self.ar.code_histogram(self.start, self.end)
+        self.assertEqual(hist, dict(expected))
+        self.assertEqual(list(hist.values()), sorted(hist.values(), reverse=True))
+
+    def test_bucket_stats_weekly(self):
+        buckets = self.ar.bucket_stats(timedelta(days=7), self.start, self.end, codes=True)
+        self.assertEqual(sum(b["total"] for b in buckets), len(self.window))
+        self.assertEqual(sum(b["blocked"] for b in buckets),
+                         sum(e["status"] == "blocked" for e in self.window))
+        total_codes = Counter()
+        for b in buckets:
+            total_codes.update(b["codes"])
+        self.assertEqual(dict(total_codes), self.ar.code_histogram(self.start, self.end))
+        starts = [b["start"] for b in buckets]
+        self.assertEqual(starts, sorted(starts))
+
+    def test_bucket_origin_aligns_weeks(self):
+        monday = "2025-12-29T00:00:00+00:00"
+        buckets = self.ar.bucket_stats(timedelta(days=7), origin=monday)
+        for b in buckets:
+            self.assertEqual(datetime.fromisoformat(b["start"]).weekday(), 0)
+
+    def test_bucket_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            self.ar.bucket_stats(timedelta(0))
+
+
+class TestPopcountRange(unittest.TestCase):
+
+    def test_matches_bit_by_bit_count(self):
+        rng = random.Random(7)
+        plane = bytes(rng.getrandbits(8) for _ in range(40))
+        view = memoryview(plane)
+        for _ in range(500):
+            lo, hi = rng.randint(0, 320), rng.randint(0, 320)
+            expected = sum((plane[i >> 3] >> (i & 7)) & 1 for i in range(lo, hi))
+            self.assertEqual(_popcount_range(view, lo, hi), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+import contextlib
+import io
 import json
 import os
 import subprocess
 import sys
+import tempfile
 import unittest
+from unittest import mock
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
 
+import check_consistency as check_consistency_cli
 from check_consistency import check_consistency
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import aicw.consistency as consistency
+
 
 class TestConsistency(unittest.TestCase):
     _SCRIPT = os.path.join(
@@ -56,5 +64,108 @@ class TestConsistency(unittest.TestCase):
         self.assertEqual(2, p.returncode)
 
 
+class TestConsistencyEngine(unittest.TestCase):
+    _REQUESTS = [
+        {"situation": "障害時の対応方針を決めたい", "constraints": ["安全"], "options": ["案A", "案B"]},
+        {"situation": "連絡先は test@example.com です"},
+        {"situation": "採用方針を見直したい", "beneficiaries": ["顧客"]},
+    ]
+
+    def test_key_hashes_localize_diff(self):
+        a = consistency.report_key_hashes({"status": "ok", "selection": {"x": 1}})
+        b = consistency.report_key_hashes({"status": "ok", "selection": {"x": 2}})
+        self.assertEqual(["selection"], consistency.diff_keys(a, b))
+        self.assertEqual([], consistency.diff_keys(a, dict(a)))
+        self.assertNotEqual(consistency.combine_key_hashes(a), consistency.combine_key_hashes(b))
+
+    def test_check_requests_consistent_stops_early(self):
+        report = consistency.check_requests(self._REQUESTS, hash_seeds=(1, 2, 3), stop_after_clean=2)
+        self.assertTrue(report["consistent"])
+        self.assertEqual(3, report["requests"])
+        self.assertEqual([1, 2], [r["hash_seed"] for r in report["runs"]])
+        self.assertTrue(report["stopped_early"])
+        json.dumps(report)  # JSON 化可能
+
+    def test_check_requests_detects_divergent_key(self):
+        real = consistency.hash_requests
+
+        def skewed(requests):
+            hashes = real(requests)
+            hashes[1]["detected"] = "0" * 64
+            return hashes
+
+        with mock.patch.object(consistency, "hash_requests", side_effect=skewed):
+            report = consistency.check_requests(self._REQUESTS, hash_seeds=(1, 2), stop_after_clean=1)
+        self.assertFalse(report["consistent"])
+        self.assertFalse(report["stopped_early"])
+        bad = report["results"][1]
+        self.assertEqual(["detected"], bad["diff_keys"])
+        self.assertEqual([1, 2], bad["diverged_seeds"])
+        self.assertTrue(report["results"][0]["consistent"])
+
+    def test_check_requests_non_json_types_match_workers(self):
+        # tuple はワーカー側では list になる。基準も同じ値で計算するので不一致にならない
+        requests = [
+            {"situation": "方針を決めたい", "options": ("A: 安全側", "B: 速度側"),
+             "constraints": ("安全",)},
+        ]
+        report = consistency.check_requests(requests, hash_seeds=(1,))
+        self.assertTrue(report["consistent"], report["results"])
+
+    def test_argument_validation(self):
+        with self.assertRaises(ValueError):
+            consistency.check_requests(self._REQUESTS, hash_seeds=())
+        with self.assertRaises(ValueError):
+            consistency.check_requests(self._REQUESTS, stop_after_clean=0)
+
+    def test_cli_batch_writes_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "requests.jsonl")
+            out = os.path.join(tmp, "report.json")
+            with open(src, "w", encoding="utf-8") as f:
+                for r in self._REQUESTS:
+                    f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            p = subprocess.run(
+                [sys.executable, TestConsistency._SCRIPT, src, "--batch", "--hash-seeds", "2", "--report", out],
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(0, p.returncode, msg=p.stderr)
+            self.assertIn("CONSISTENT: requests=3", p.stdout)
+            with open(out, encoding="utf-8") as f:
+                report = json.load(f)
+            self.assertTrue(report["consistent"])
+            self.assertEqual(2, len(report["runs"]))
+
+    def test_worker_timeout_raises_runtime_error(self):
+        timeout = subprocess.TimeoutExpired(cmd="python", timeout=1.0)
+        with mock.patch.object(consistency.subprocess, "run", side_effect=timeout):
+            with self.assertRaises(RuntimeError):
+                consistency.check_requests(self._REQUESTS, hash_seeds=(1,))
+
+    def test_cli_worker_failure_is_failed_check(self):
+        failure = RuntimeError("worker failed (PYTHONHASHSEED=1): boom")
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "request.json")
+            with open(src, "w", encoding="utf-8") as f:
+                json.dump(self._REQUESTS[0], f, ensure_ascii=False)
+            out, err = io.StringIO(), io.StringIO()
+            with mock.patch.object(consistency, "_hash_in_subprocess", side_effect=failure), \
+                    contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                code = check_consistency_cli.main([src, "--hash-seeds", "2"])
+        self.assertEqual(3, code)
+        self.assertIn("FAILED: requests=1", out.getvalue())
+        self.assertIn("boom", err.getvalue())
+
+    def test_cli_batch_invalid_input(self):
+        p = subprocess.run(
+            [sys.executable, TestConsistency._SCRIPT, "--batch"],
+            input="[1, 2]",
+            text=True,
+            capture_output=True,
+        )
+        self.assertEqual(2, p.returncode)
+
+
 if __name__ == "__main__":
     unittest.main()
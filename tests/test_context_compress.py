@@ -2,7 +2,18 @@ from __future__ import annotations
 
 import unittest
 
-from aicw.context_compress import compress_situation
+from aicw import context_compress
+from aicw.context_compress import CompressionBudget, SituationCompressor, compress_situation
+from aicw.decision import build_decision_report, build_validated_report, format_report
+from aicw.rule_packs import compile_rule_packs, get_rule_set, parse_rule_pack
+
+_PACK = parse_rule_pack({
+    "version": "rule_pack.v0",
+    "name": "finance",
+    "revision": "2026-10-01",
+    "recommendation": {"safety_words": {"与信": "RISK_AVOIDANCE"}},
+    "existence": {"hard_destruction": ["買い叩く"]},
+})
 
 
 class TestContextCompress(unittest.TestCase):
@@ -40,5 +51,137 @@ class TestContextCompress(unittest.TestCase):
         self.assertIn("privacy", out.lower())
 
 
+class TestSituationCompressor(unittest.TestCase):
+    def setUp(self):
+        self.compressor = SituationCompressor()
+
+    def test_engine_tables_raise_scores(self):
+        self.assertGreater(self.compressor.score("競合を潰す計画です。"), 0)
+        self.assertGreater(self.compressor.score("事業から撤退する。"), 0)
+        self.assertEqual(self.compressor.score("天気の話です。"), 0)
+        plain = SituationCompressor(keywords=[], use_engine_tables=False)
+        self.assertEqual(plain.score("競合を潰す計画です。"), 0)
+
+    def test_weights_follow_the_rule_set(self):
+        # builtin_en の語も重みになる
+        self.assertEqual(self.compressor.score("We will crush them."), 3)
+        self.assertEqual(self.compressor.score("与信を確認する。"), 0)
+        rules = compile_rule_packs([_PACK])
+        packed = SituationCompressor(rules=rules)
+        self.assertEqual(packed.score("与信を確認する。"), 3)
+        self.assertEqual(packed.score("下請けを買い叩く。"), 3)
+
+    def test_default_compressor_per_rule_set(self):
+        rules = compile_rule_packs([_PACK])
+        get = context_compress._get_default_compressor
+        self.assertIs(get(rules), get(rules))
+        self.assertIs(get(), get(get_rule_set()))
+        self.assertIsNot(get(rules), get())
+
+    def test_keywords_are_case_insensitive(self):
+        self.assertGreater(self.compressor.score("PRIVACY matters."), 0)
+
+    def test_width_and_compatibility_forms_score_alike(self):
+        # 判断エンジンの照合と同じ正規化（NFKC + casefold）
+        for folded, raw in [("privacy matters.", "ＰＲＩＶＡＣＹ matters."),
+                            ("リスクを抑える。", "ﾘｽｸを抑える。")]:
+            self.assertEqual(self.compressor.score(raw), self.compressor.score(folded))
+            self.assertGreater(self.compressor.score(raw), 0)
+        custom = SituationCompressor(keywords=["Ｓｔｒａßｅ"], use_engine_tables=False)
+        self.assertEqual(custom.score("STRASSE ist gesperrt."), 2)
+
+    def test_iter_scored_keeps_order(self):
+        scored = list(self.compressor.iter_scored("背景。安全が大事。\n補足"))
+        self.assertEqual([s for _, s, _ in scored], ["背景。", "安全が大事。", "補足"])
+        self.assertEqual([i for i, _, _ in scored], [0, 1, 2])
+
+    def test_selection_preserves_original_order(self):
+        text = "期限は来週です。" + "背景説明です。" * 5 + "安全を最優先したい。"
+        out = self.compressor.compress(text, max_chars=30, max_sentences=2)
+        self.assertEqual(out, "期限は来週です。 安全を最優先したい。")
+
+    def test_budget_is_respected_and_duplicates_dropped(self):
+        text = "安全を確認する。" * 50 + "品質も見る。" + "雑談。" * 50
+        out = self.compressor.compress(text, max_chars=40, max_sentences=5)
+        self.assertLessEqual(len(out), 40)
+        self.assertEqual(out.count("安全を確認する。"), 1)
+        self.assertIn("品質も見る。", out)
+
+    def test_long_single_sentence_is_truncated(self):
+        out = self.compressor.compress("安全" * 200, max_chars=20)
+        self.assertEqual(len(out), 20)
+        self.assertTrue(out.endswith("…"))
+
+    def test_large_input_is_linear(self):
+        import time
+        text = ("背景説明です。安全を優先したい。補足です。期限は来週!\n") * 4000
+        self.assertGreater(len(text), 100_000)
+        start = time.perf_counter()
+        out = self.compressor.compress(text, max_chars=200, max_sentences=4)
+        self.assertLess(time.perf_counter() - start, 2.0)
+        self.assertLessEqual(len(out), 200)
+        self.assertIn("安全を優先したい。", out)
+
+
+class TestDecisionCompressionStage(unittest.TestCase):
+    FILLER = "会議の経緯を説明します。" * 2000
+
+    def _request(self, situation):
+        return {"situation": situation, "constraints": ["安全を優先"]}
+
+    def test_default_is_unchanged(self):
+        req = self._request("新しいツールを導入するか迷っている。")
+        self.assertEqual(
+            build_decision_report(req),
+            build_decision_report(req, compression=CompressionBudget(max_chars=500)),
+        )
+
+    def test_long_situation_is_compressed_and_recorded(self):
+        situation = self.FILLER + "品質リスクを避けたい。"
+        report = build_decision_report(
+            self._request(situation), compression=CompressionBudget(max_chars=300)
+        )
+        self.assertEqual(report["status"], "ok")
+        self.assertLessEqual(len(report["input"]["situation"]), 300)
+        self.assertIn("品質リスクを避けたい。", report["input"]["situation"])
+        info = report["input"]["compression"]
+        self.assertEqual(info["original_chars"], len(situation))
+        self.assertEqual(info["compressed_chars"], len(report["input"]["situation"]))
+        self.assertAlmostEqual(info["ratio"], info["compressed_chars"] / len(situation), places=4)
+        self.assertLess(len(format_report(report)), 3000)
+        self.assertIn("圧縮済み", format_report(report))
+
+    def test_guards_see_the_full_text(self):
+        budget = CompressionBudget(max_chars=200)
+        privacy = build_decision_report(
+            self._request(self.FILLER + "連絡先は test@example.com です。"), compression=budget
+        )
+        self.assertEqual(privacy["blocked_by"], "#6 Privacy")
+        destruction = build_decision_report(
+            self._request(self.FILLER + "競合を潰して市場を独占する。"), compression=budget
+        )
+        self.assertEqual(destruction["blocked_by"], "#5 Existence Ethics")
+
+    def test_validated_report_forwards_budget(self):
+        errors, report = build_validated_report(
+            self._request(self.FILLER), compression=CompressionBudget(max_chars=100)
+        )
+        self.assertEqual(errors, [])
+        self.assertIn("compression", report["input"])
+
+    def test_pack_vocabulary_steers_compression(self):
+        rules = compile_rule_packs([_PACK])
+        situation = self.FILLER + "与信枠の見直しが必要。"
+        budget = CompressionBudget(max_chars=100, max_sentences=1)
+        packed = build_decision_report(self._request(situation), compression=budget, rules=rules)
+        self.assertEqual(packed["input"]["situation"], "与信枠の見直しが必要。")
+        default = build_decision_report(self._request(situation), compression=budget)
+        self.assertEqual(default["input"]["situation"], "会議の経緯を説明します。")
+
+    def test_budget_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            CompressionBudget(max_chars=0)
+
+
 if __name__ == "__main__":
     unittest.main()
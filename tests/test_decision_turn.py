@@ -0,0 +1,109 @@
+"""tests/test_decision_turn.py — analyze_decision_turn のユニットテスト"""
+import unittest
+from unittest import mock
+
+from aicw.decision import build_decision_report
+from aicw.stage_cache import StageCache
+from bridge import hiroshitanaka_philosopher
+from bridge.decision_turn import analyze_decision_turn
+from bridge.po_core_bridge import analyze_philosophy_tensor
+
+
+_REQUEST = {
+    "situation": "新規事業への参入可否を判断したい",
+    "constraints": ["法令遵守", "品質重視"],
+    "options": ["A: 全面参入", "B: パイロットから段階的に拡大", "C: 参入しない"],
+}
+
+
+class TestAnalyzeDecisionTurn(unittest.TestCase):
+    def test_returns_three_stages(self):
+        turn = analyze_decision_turn(_REQUEST)
+        for key in ("brief", "tensor", "reasoning"):
+            self.assertIn(key, turn)
+
+    def test_brief_matches_standalone(self):
+        turn = analyze_decision_turn(_REQUEST)
+        self.assertEqual(turn["brief"], build_decision_report(_REQUEST))
+
+    def test_tensor_matches_standalone(self):
+        turn = analyze_decision_turn(_REQUEST, human_decision="パイロットから始める")
+        brief = build_decision_report(_REQUEST)
+        expected = analyze_philosophy_tensor(
+            situation=_REQUEST["situation"],
+            explanation=brief["selection"]["explanation"],
+            human_decision="パイロットから始める",
+            existence_analysis=brief["existence_analysis"],
+        )
+        self.assertEqual(turn["tensor"], expected)
+
+    def test_reasoning_matches_standalone(self):
+        turn = analyze_decision_turn(_REQUEST)
+        expected = hiroshitanaka_philosopher.HiroshiTanaka().reason(
+            _REQUEST["situation"],
+            {"constraints": _REQUEST["constraints"], "options": _REQUEST["options"]},
+        )
+        self.assertEqual(turn["reasoning"], expected)
+
+    def test_reasoning_matches_standalone_with_existence_fields(self):
+        request = dict(
+            _REQUEST,
+            beneficiaries=["自社の株主のみ"],
+            affected_structures=["社会", "生態"],
+        )
+        turn = analyze_decision_turn(request)
+        expected = hiroshitanaka_philosopher.HiroshiTanaka().reason(
+            request["situation"],
+            {key: request[key] for key in
+             ("constraints", "options", "beneficiaries", "affected_structures")},
+        )
+        self.assertEqual(turn["reasoning"], expected)
+        self.assertEqual(
+            turn["reasoning"]["tension"]["existence_analysis"]["q1_beneficiaries"],
+            turn["brief"]["existence_analysis"]["question_1_beneficiaries"],
+        )
+
+    def test_decision_pipeline_runs_once(self):
+        with mock.patch(
+            "bridge.decision_turn.build_decision_report",
+            wraps=build_decision_report,
+        ) as turn_build, mock.patch.object(
+            hiroshitanaka_philosopher, "build_decision_report",
+        ) as philosopher_build:
+            analyze_decision_turn(_REQUEST)
+        self.assertEqual(turn_build.call_count, 1)
+        philosopher_build.assert_not_called()
+
+    def test_cached_turns_match_uncached(self):
+        cache = StageCache()
+        edits = [
+            _REQUEST,
+            dict(_REQUEST, constraints=["期限厳守"]),
+            dict(_REQUEST, situation="既存事業の撤退時期を判断したい"),
+            dict(_REQUEST, beneficiaries=["顧客"]),
+            _REQUEST,
+        ]
+        for request in edits:
+            self.assertEqual(
+                analyze_decision_turn(request, human_decision="パイロットから始める", cache=cache),
+                analyze_decision_turn(request, human_decision="パイロットから始める"),
+            )
+        self.assertGreater(cache.stats()["tensor_scan"]["hits"], 0)
+
+    def test_without_reasoning(self):
+        turn = analyze_decision_turn(_REQUEST, include_reasoning=False)
+        self.assertIsNone(turn["reasoning"])
+
+    def test_blocked_brief_has_empty_explanation_tensor(self):
+        req = {"situation": "競合を支配して独占したい"}
+        turn = analyze_decision_turn(req)
+        self.assertEqual(turn["brief"]["status"], "blocked")
+        self.assertFalse(turn["tensor"]["tensor"]["Po"]["available"])
+        self.assertEqual(
+            turn["reasoning"]["tension"]["existence_analysis"]["source"],
+            "aicw_blocked",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
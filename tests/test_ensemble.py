@@ -1,6 +1,17 @@
+import threading
+import time
 import unittest
 
-from bridge.ensemble import run_ensemble
+import bridge.ensemble as ensemble
+from bridge.ensemble import (
+    execute_ensemble,
+    po_core_opinion,
+    register_philosopher,
+    registered_philosophers,
+    run_ensemble,
+    run_ensemble_batch,
+    unregister_philosopher,
+)
 
 
 class TestEnsemble(unittest.TestCase):
@@ -29,5 +40,253 @@ class TestEnsemble(unittest.TestCase):
         self.assertIn("oppose", stances)
 
 
+class TestEnsembleBatch(unittest.TestCase):
+    _PROMPTS = [
+        "新機能を段階的に検証して導入する",
+        "監視を強めて操作し、支配を進める",
+        "通常の運用改善を進める",
+        "問いと存在を小さく試験する",
+        "",
+        "通常の運用改善を進める",
+    ]
+
+    def test_matches_single_runs(self):
+        expected = [run_ensemble(p) for p in self._PROMPTS]
+        self.assertEqual(run_ensemble_batch(self._PROMPTS), expected)
+
+    def test_empty_batch(self):
+        self.assertEqual(run_ensemble_batch([]), [])
+
+    def test_results_do_not_share_objects(self):
+        a, b = run_ensemble_batch(["通常の運用改善を進める"] * 2)
+        a["opinions"][0]["stance"] = "changed"
+        a["majority"]["members"].append("X")
+        self.assertNotEqual(b["opinions"][0]["stance"], "changed")
+        self.assertNotIn("X", b["majority"]["members"])
+
+    def test_with_external_philosopher(self):
+        register_philosopher("BatchExt", lambda p, c: {"stance": "oppose", "rationale": p})
+        try:
+            expected = [run_ensemble(p) for p in self._PROMPTS]
+            self.assertEqual(run_ensemble_batch(self._PROMPTS), expected)
+        finally:
+            unregister_philosopher("BatchExt")
+
+
+class TestEnsembleExecutor(unittest.TestCase):
+    def setUp(self):
+        self._added = []
+        self._release = threading.Event()
+
+    def tearDown(self):
+        self._release.set()
+        for name in self._added:
+            unregister_philosopher(name)
+
+    def _register(self, name, opinion, **kwargs):
+        register_philosopher(name, opinion, **kwargs)
+        self._added.append(name)
+
+    def _slow(self, prompt, context):
+        self._release.wait(5)
+        return {"stance": "support", "rationale": "遅い"}
+
+    def test_builtins_registered_in_order(self):
+        self.assertEqual(
+            registered_philosophers()[:3],
+            ["HiroshiTanaka", "Pragmatist", "RightsGuardian"],
+        )
+
+    def test_duplicate_name_rejected(self):
+        with self.assertRaises(ValueError):
+            register_philosopher("Pragmatist", lambda p, c: {"stance": "hold"})
+
+    def test_external_philosopher_votes(self):
+        self._register("Ext", lambda p, c: {"stance": "oppose", "rationale": "外部"})
+        result = run_ensemble("通常の運用改善を進める")
+        names = [o["name"] for o in result["opinions"]]
+        self.assertEqual(names[-1], "Ext")
+        self.assertIn("Ext", [m["name"] for m in result["minority_report"]])
+
+    def test_timeout_records_abstain(self):
+        self._register("Slow", self._slow, timeout_s=0.05)
+        started = time.perf_counter()
+        result = execute_ensemble("段階的に検証する")
+        self.assertLess(time.perf_counter() - started, 2.0)
+        execution = result["execution"]
+        self.assertEqual(execution["timed_out"], ["Slow"])
+        self.assertEqual(execution["abstained"], ["Slow"])
+        stances = {o["name"]: o["stance"] for o in result["opinions"]}
+        self.assertEqual(stances["Slow"], "abstain")
+        self.assertNotIn("Slow", [m["name"] for m in result["minority_report"]])
+
+    def test_deadline_caps_timeouts(self):
+        self._register("Slow", self._slow, timeout_s=5)
+        started = time.perf_counter()
+        result = execute_ensemble("段階的に検証する", deadline_s=0.05)
+        self.assertLess(time.perf_counter() - started, 2.0)
+        self.assertEqual(result["execution"]["timed_out"], ["Slow"])
+
+    def test_error_records_abstain(self):
+        def broken(prompt, context):
+            raise RuntimeError("boom")
+
+        self._register("Broken", broken)
+        result = execute_ensemble("段階的に検証する")
+        self.assertEqual(result["execution"]["errors"], {"Broken": "RuntimeError"})
+        self.assertEqual(result["execution"]["abstained"], ["Broken"])
+        self.assertEqual(result["majority"]["stance"], "support")
+
+    def test_invalid_stance_abstains(self):
+        self._register("Odd", lambda p, c: {"stance": "maybe"})
+        result = execute_ensemble("段階的に検証する")
+        self.assertEqual(result["execution"]["abstained"], ["Odd"])
+
+    def test_order_independent_of_completion(self):
+        def slower(prompt, context):
+            time.sleep(0.05)
+            return {"stance": "oppose", "rationale": "遅い方"}
+
+        self._register("SlowerFirst", slower)
+        self._register("FastSecond", lambda p, c: {"stance": "oppose", "rationale": "速い"})
+        a = run_ensemble("通常の運用改善を進める")
+        b = run_ensemble("通常の運用改善を進める")
+        self.assertEqual(a, b)
+        self.assertEqual(
+            [o["name"] for o in a["opinions"]][-2:], ["SlowerFirst", "FastSecond"]
+        )
+
+    def test_latency_reported_for_all(self):
+        self._register("Ext", lambda p, c: {"stance": "hold", "rationale": "外部"})
+        result = execute_ensemble("段階的に検証する")
+        self.assertEqual(
+            sorted(result["execution"]["latency_ms"]), sorted(registered_philosophers())
+        )
+
+    def test_po_core_philosopher_adapter(self):
+        from bridge.hiroshitanaka_philosopher import HiroshiTanaka
+
+        self._register("HiroshiTanakaPoCore", po_core_opinion(HiroshiTanaka()))
+        result = execute_ensemble("AIに自我は芽生えるのか？")
+        op = result["opinions"][-1]
+        self.assertEqual(op["name"], "HiroshiTanakaPoCore")
+        self.assertEqual(op["stance"], "hold")
+        self.assertTrue(op["rationale"])
+
+    def test_subset_of_philosophers(self):
+        result = execute_ensemble("段階的に検証する", philosophers=["Pragmatist"])
+        self.assertEqual([o["name"] for o in result["opinions"]], ["Pragmatist"])
+
+    def test_queued_time_not_counted_against_timeout(self):
+        def steady(prompt, context):
+            time.sleep(0.1)
+            return {"stance": "support", "rationale": "一定"}
+
+        self._register("First", steady)
+        self._register("Second", steady)
+        self._register("Third", steady)
+        # 並列数 1: 3 人目は 0.2 秒待ってから始まるが、待ち時間は数えない
+        result = execute_ensemble("段階的に検証する", max_workers=1, timeout_s=0.15)
+        self.assertEqual(result["execution"]["timed_out"], [])
+        latency = result["execution"]["latency_ms"]
+        self.assertLess(latency["Third"], 600)
+
+    def test_pool_shared_across_calls(self):
+        self._register("Ext", lambda p, c: {"stance": "hold", "rationale": "外部"})
+        execute_ensemble("段階的に検証する")
+        pool = ensemble._get_pool()
+        size = pool.size
+        for _ in range(5):
+            execute_ensemble("段階的に検証する")
+        self.assertIs(ensemble._get_pool(), pool)
+        self.assertEqual(pool.size, size)
+
+    def test_hung_worker_is_daemon_and_does_not_starve(self):
+        self._register("Slow", self._slow, timeout_s=0.05)
+        execute_ensemble("段階的に検証する")
+        workers = [t for t in threading.enumerate() if t.name.startswith("ensemble-")]
+        self.assertTrue(workers)
+        self.assertTrue(all(t.daemon for t in workers))
+        # ハング中のワーカーがあっても次の呼び出しは新しいワーカーで進む
+        unregister_philosopher("Slow")
+        self._added.remove("Slow")
+        self._register("Ext", lambda p, c: {"stance": "oppose", "rationale": "外部"})
+        result = execute_ensemble("段階的に検証する", timeout_s=1.0)
+        self.assertEqual(result["execution"]["timed_out"], [])
+
+    def test_abandoned_call_is_not_started_later(self):
+        calls = []
+
+        def counted(prompt, context):
+            calls.append(prompt)
+            return {"stance": "support", "rationale": "数える"}
+
+        self._register("Slow", self._slow, timeout_s=0.05)
+        self._register("Counted", counted, timeout_s=0.05)
+        # 並列数 1: Counted は別のワーカーに取られても、Slow がハングしている間に打ち切られる
+        ensemble._get_pool().ensure_idle(4)
+        result = execute_ensemble("段階的に検証する", max_workers=1)
+        self.assertEqual(result["execution"]["timed_out"], ["Slow", "Counted"])
+        self._release.set()
+        time.sleep(0.2)
+        self.assertEqual(calls, [])
+
+    def test_call_past_deadline_is_not_started(self):
+        calls = []
+
+        def counted(prompt, context):
+            calls.append(prompt)
+            return {"stance": "support", "rationale": "数える"}
+
+        self._register("Slow", self._slow)
+        self._register("Counted", counted)
+        ensemble._get_pool().ensure_idle(4)
+        result = execute_ensemble("段階的に検証する", max_workers=1, deadline_s=0.05)
+        self.assertEqual(result["execution"]["timed_out"], ["Slow", "Counted"])
+        self._release.set()
+        time.sleep(0.2)
+        self.assertEqual(calls, [])
+
+    def test_pool_size_is_capped(self):
+        saved = ensemble._POOL
+        ensemble._POOL = pool = ensemble._WorkerPool(max_threads=2)
+        try:
+            self._register("Slow1", self._slow, timeout_s=0.05)
+            self._register("Slow2", self._slow, timeout_s=0.05)
+            execute_ensemble("段階的に検証する")
+            self.assertEqual(pool.size, 2)
+            # 2 本ともハング中: 空きがないので外部哲学者はすぐタイムアウト扱い
+            self._register("Ext", lambda p, c: {"stance": "oppose", "rationale": "外部"})
+            started = time.perf_counter()
+            result = execute_ensemble("段階的に検証する", timeout_s=1.0)
+            self.assertLess(time.perf_counter() - started, 0.5)
+            self.assertEqual(result["execution"]["timed_out"], ["Slow1", "Slow2", "Ext"])
+            self.assertEqual(pool.size, 2)
+        finally:
+            self._release.set()
+            ensemble._POOL = saved
+
+    def test_concurrent_registration(self):
+        errors = []
+
+        def churn(i):
+            try:
+                for j in range(50):
+                    name = f"Churn{i}-{j}"
+                    register_philosopher(name, lambda p, c: {"stance": "hold"})
+                    registered_philosophers()
+                    unregister_philosopher(name)
+            except Exception as e:  # pragma: no cover - 失敗時のみ
+                errors.append(e)
+
+        threads = [threading.Thread(target=churn, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertFalse([n for n in registered_philosophers() if n.startswith("Churn")])
+
+
 if __name__ == "__main__":
     unittest.main()
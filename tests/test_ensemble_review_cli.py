@@ -45,6 +45,73 @@ class TestEnsembleReviewCli(unittest.TestCase):
         )
         self.assertEqual(p.returncode, 2)
 
+    def test_batch_jsonl(self):
+        lines = [
+            {"situation": "段階的に検証する"},
+            {"situation": "競合を支配して独占したい"},
+            {"situation": "新機能導入を検討"},
+        ]
+        p = subprocess.run(
+            [sys.executable, _SCRIPT, "--batch"],
+            input="\n".join(json.dumps(x, ensure_ascii=False) for x in lines),
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(p.returncode, 0, msg=p.stderr)
+        self.assertIn("| 0 | ok | support |", p.stdout)
+        self.assertIn("| 1 | blocked", p.stdout)
+
+    def test_batch_json_array(self):
+        p = subprocess.run(
+            [sys.executable, _SCRIPT, "--batch"],
+            input=json.dumps([{"situation": "新機能導入を検討"}], ensure_ascii=False),
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(p.returncode, 0, msg=p.stderr)
+        self.assertIn("| 0 | ok |", p.stdout)
+
+    def test_batch_invalid_json(self):
+        p = subprocess.run(
+            [sys.executable, _SCRIPT, "--batch"],
+            input="{bad",
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(p.returncode, 2)
+
+    def test_batch_rejects_non_object_items(self):
+        p = subprocess.run(
+            [sys.executable, _SCRIPT, "--batch"],
+            input="[1, {\"situation\": \"x\"}, \"y\"]",
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(p.returncode, 2)
+        self.assertIn("item 0: request must be a JSON object, got int", p.stderr)
+        self.assertIn("item 2: request must be a JSON object, got str", p.stderr)
+        self.assertNotIn("Traceback", p.stderr)
+
+    def test_batch_jsonl_reports_line_numbers(self):
+        p = subprocess.run(
+            [sys.executable, _SCRIPT, "--batch"],
+            input='{"situation": "x"}\n\n"text"\n',
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(p.returncode, 2)
+        self.assertIn("line 3: request must be a JSON object, got str", p.stderr)
+
+    def test_exit_2_on_non_object(self):
+        p = subprocess.run(
+            [sys.executable, _SCRIPT],
+            input="[1, 2]",
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(p.returncode, 2)
+        self.assertNotIn("Traceback", p.stderr)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -9,7 +9,7 @@ import unittest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
 
-from gen_fuzz_cases import generate_cases
+from gen_fuzz_cases import generate_cases, iter_cases, shard_range
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from aicw.schema import validate_request
@@ -42,6 +42,9 @@ class TestFuzzGeneration(unittest.TestCase):
         b = generate_cases(count=10, seed=123)
         self.assertEqual(a, b)
 
+    def test_iter_cases_matches_generate_cases(self):
+        self.assertEqual(generate_cases(count=15, seed=4), list(iter_cases(count=15, seed=4)))
+
     def test_cli_writes_json_file(self):
         with tempfile.TemporaryDirectory() as tmp:
             out = os.path.join(tmp, "cases.json")
@@ -64,6 +67,44 @@ class TestFuzzGeneration(unittest.TestCase):
                 data = json.load(f)
             self.assertEqual(12, len(data))
 
+    def test_shards_are_disjoint_and_cover_all(self):
+        full = generate_cases(count=23, seed=8)
+        parts = [list(iter_cases(count=23, seed=8, shard=(i, 4))) for i in range(4)]
+        self.assertEqual(full, [case for part in parts for case in part])
+        self.assertEqual((0, 5), shard_range(23, (0, 4)))
+        with self.assertRaises(ValueError):
+            shard_range(23, (4, 4))
+
+    def test_cli_jsonl_shard(self):
+        p = subprocess.run(
+            [sys.executable, self._SCRIPT, "--count", "10", "--seed", "3",
+             "--format", "jsonl", "--shard", "1/2"],
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(0, p.returncode, msg=p.stderr)
+        lines = p.stdout.splitlines()
+        self.assertEqual(generate_cases(count=10, seed=3)[5:], [json.loads(x) for x in lines])
+
+    def test_cli_json_output_matches_json_dump(self):
+        for extra, indent in (([], None), (["--pretty"], 2)):
+            p = subprocess.run(
+                [sys.executable, self._SCRIPT, "--count", "6", "--seed", "2"] + extra,
+                capture_output=True,
+                text=True,
+            )
+            expected = json.dumps(generate_cases(count=6, seed=2), ensure_ascii=False, indent=indent)
+            self.assertEqual(expected, p.stdout.rstrip("\n"))
+
+    def test_cli_invalid_shard(self):
+        for shard in ("2/2", "x/2", "1"):
+            p = subprocess.run(
+                [sys.executable, self._SCRIPT, "--count", "5", "--shard", shard],
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(2, p.returncode, msg=shard)
+
     def test_cli_count_validation(self):
         p = subprocess.run(
             [sys.executable, self._SCRIPT, "--count", "0"],
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scripts.fuzz_verify import generated_lines, hash_chunk, run_fuzz_verify
+
+
+class TestFuzzVerify(unittest.TestCase):
+    _SCRIPT = os.path.join(
+        os.path.dirname(__file__), "..", "scripts", "fuzz_verify.py"
+    )
+
+    def test_hash_chunk_matches_across_calls(self):
+        lines = list(generated_lines(count=8, seed=3))
+        a = hash_chunk(lines, keep_hashes=True)
+        b = hash_chunk(lines, keep_hashes=True)
+        self.assertEqual(8, a["count"])
+        self.assertEqual(a["hashes"], b["hashes"])
+        self.assertEqual(a["digest"], b["digest"])
+
+    def test_run_is_deterministic_and_summarized(self):
+        summary = run_fuzz_verify(
+            generated_lines(count=40, seed=5), workers=1, chunk_size=7, verify_every=1,
+        )
+        self.assertTrue(summary["deterministic"])
+        self.assertEqual([], summary["mismatches"])
+        self.assertEqual(40, summary["cases"])
+        self.assertEqual(6, summary["verified_chunks"])
+        self.assertEqual(40, sum(summary["status"].values()))
+        self.assertEqual(
+            summary.get("status", {}).get("blocked", 0),
+            sum(summary["blocked_by"].values()),
+        )
+        self.assertEqual(40, sum(p["count"] for p in summary["paths"].values()))
+
+    def test_contract_sampling(self):
+        summary = run_fuzz_verify(
+            generated_lines(count=25, seed=2), workers=1, chunk_size=4,
+            verify_every=0, contract_every=5,
+        )
+        self.assertEqual(5, summary["contract"]["validated"])  # 0, 5, 10, 15, 20
+        self.assertEqual(0, summary["contract"]["failed"])
+
+    def test_hash_chunk_reports_contract_violation(self):
+        from unittest import mock
+        with mock.patch("aicw.schema.validate_brief", return_value=["broken"]):
+            result = hash_chunk(list(generated_lines(3, 1)), start=0, contract_every=2)
+        self.assertEqual({"validated": 2, "failed": 2, "errors": {"broken": 2}}, result["contract"])
+
+    def test_digest_independent_of_chunking(self):
+        a = run_fuzz_verify(generated_lines(30, 11), workers=1, chunk_size=4, verify_every=0)
+        b = run_fuzz_verify(generated_lines(30, 11), workers=2, chunk_size=9, verify_every=0)
+        self.assertEqual(a["hash_set_digest"], b["hash_set_digest"])
+        self.assertEqual(0, a["verified_chunks"])
+
+    def test_argument_validation(self):
+        with self.assertRaises(ValueError):
+            run_fuzz_verify([], workers=0)
+        with self.assertRaises(ValueError):
+            run_fuzz_verify([], chunk_size=0)
+
+    def test_cli_jsonl_input(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cases.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"situation": "方針を決めたい"}, ensure_ascii=False) + "\n\n")
+                f.write(json.dumps({"situation": "連絡先は a@example.com"}, ensure_ascii=False) + "\n")
+            p = subprocess.run(
+                [sys.executable, self._SCRIPT, "--input", path, "--workers", "1"],
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(0, p.returncode, msg=p.stderr)
+            summary = json.loads(p.stdout)
+            self.assertEqual(2, summary["cases"])
+            self.assertEqual({"blocked": 1, "ok": 1}, summary["status"])
+            self.assertEqual({"#6 Privacy": 1}, summary["blocked_by"])
+
+    def test_cli_invalid_jsonl(self):
+        p = subprocess.run(
+            [sys.executable, self._SCRIPT, "--input", "-", "--workers", "1"],
+            input="{invalid\n",
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(2, p.returncode)
+
+    def test_cli_non_object_line_is_input_error(self):
+        # JSON としては読めるがリクエストではない行 → 入力エラー
+        p = subprocess.run(
+            [sys.executable, self._SCRIPT, "--input", "-", "--workers", "1"],
+            input='{"situation": "方針"}\n[1]\n',
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(2, p.returncode)
+        self.assertIn("case 1: request must be a JSON object, got list", p.stderr)
+        self.assertNotIn("Traceback", p.stderr)
+        self.assertEqual("", p.stdout)
+
+    def test_hash_matches_check_consistency(self):
+        from aicw.consistency import hash_report
+        from aicw.decision import build_decision_report
+        from scripts.check_consistency import check_consistency
+
+        lines = list(generated_lines(count=3, seed=9))
+        result = hash_chunk(lines, keep_hashes=True)
+        for line, h in zip(lines, result["hashes"]):
+            request = json.loads(line)
+            self.assertEqual(hash_report(build_decision_report(request)), h)
+            self.assertEqual((True, h, []), check_consistency(request, 2))
+
+    def test_cli_missing_file(self):
+        p = subprocess.run(
+            [sys.executable, self._SCRIPT, "--input", "/nonexistent/cases.jsonl"],
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(2, p.returncode)
+
+
+if __name__ == "__main__":
+    unittest.main()
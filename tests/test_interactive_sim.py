@@ -120,6 +120,24 @@ class TestRunSimulation(unittest.TestCase):
         result = run_simulation(auto=False, json_mode=True, stdin=stdin, record_to_kb=True)
         self.assertFalse(result["knowledge_recorded"])
 
+    def test_edit_loop_reanalyzes_edited_field(self):
+        from scripts.interactive_sim import run_simulation
+        # 入力 5 項目は既定値 → 2(constraints) を「期限厳守」に修正 → 確定 → KB 保存しない
+        stdin = io.StringIO("\n\n\n\n\n2\n期限厳守\n\n\nN\n")
+        result = run_simulation(auto=False, json_mode=True, stdin=stdin, edit=True)
+        self.assertEqual(result["edit_count"], 1)
+        self.assertEqual(result["request"]["constraints"], ["期限厳守"])
+        self.assertEqual(result["request"]["situation"], "新規事業への参入可否を判断したい")
+        self.assertFalse(result["knowledge_recorded"])
+
+    def test_edit_request_keeps_other_fields(self):
+        from scripts.interactive_sim import edit_request
+        request = {"situation": "s", "options": ["a"], "constraints": ["c"]}
+        edited = edit_request(request, "options", stdin=io.StringIO("1\n2\n3\n4\n\n"))
+        self.assertEqual(edited["options"], ["1", "2", "3"])
+        self.assertEqual(request["options"], ["a"])
+        self.assertEqual(edited["constraints"], ["c"])
+
 
 class TestInteractiveSimCLI(unittest.TestCase):
     """CLI の動作テスト（サブプロセスで実行）"""
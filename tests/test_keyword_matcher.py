@@ -0,0 +1,89 @@
+"""tests/test_keyword_matcher.py — KeywordMatcher のユニットテスト"""
+import random
+import unittest
+
+from aicw.keyword_matcher import KeywordMatcher, normalize_text
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    def test_basic_hits(self):
+        m = KeywordMatcher(["安全", "品質", "期限"])
+        self.assertEqual(m.scan("安全と品質を確認する"), frozenset({"安全", "品質"}))
+
+    def test_empty_text(self):
+        m = KeywordMatcher(["安全"])
+        self.assertEqual(m.scan(""), frozenset())
+
+    def test_empty_vocabulary(self):
+        m = KeywordMatcher([])
+        self.assertEqual(m.scan("安全"), frozenset())
+
+    def test_nested_keyword_is_implied(self):
+        # 「個人情報」の最長一致から「個人」も補完される
+        m = KeywordMatcher(["個人", "個人情報", "情報"])
+        self.assertEqual(m.scan("個人情報"), frozenset({"個人", "個人情報", "情報"}))
+
+    def test_overlapping_keywords(self):
+        # 一致の内側から始まり、外側へはみ出すキーワードも拾う
+        m = KeywordMatcher(["abc", "cde"])
+        self.assertEqual(m.scan("abcde"), frozenset({"abc", "cde"}))
+
+    def test_regex_metacharacters_are_literal(self):
+        m = KeywordMatcher(["a.b", "(x)"])
+        self.assertEqual(m.scan("axb"), frozenset())
+        self.assertEqual(m.scan("a.b (x)"), frozenset({"a.b", "(x)"}))
+
+    def test_covers(self):
+        m = KeywordMatcher(["安全", "品質"])
+        self.assertTrue(m.covers(["安全"]))
+        self.assertFalse(m.covers(["安全", "期限"]))
+
+    def test_equivalent_to_substring_scan(self):
+        vocab = ["ab", "abc", "bc", "c", "ca", "aab", "bca", "d"]
+        m = KeywordMatcher(vocab)
+        rng = random.Random(0)
+        for _ in range(500):
+            text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 12)))
+            expected = frozenset(kw for kw in vocab if kw in text)
+            self.assertEqual(m.scan(text), expected, msg=text)
+
+    def test_wide_branching_is_equivalent_to_substring_scan(self):
+        # 先頭文字の種類が多い（選択を二分して組み立てる）語彙でも `kw in text` と同じ
+        rng = random.Random(1)
+        alphabet = [chr(c) for c in range(0x3041, 0x3041 + 40)] + list("abc-]^\\")
+        vocab = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 3))) for _ in range(300)}
+        m = KeywordMatcher(vocab)
+        for _ in range(300):
+            text = "".join(rng.choice(alphabet + ["x"]) for _ in range(rng.randint(0, 20)))
+            self.assertEqual(m.scan(text), frozenset(kw for kw in vocab if kw in text), msg=text)
+
+    def test_normalize(self):
+        self.assertEqual(normalize_text("ＳＬＡとﾘｽｸ"), "slaとリスク")
+        self.assertEqual(normalize_text("Deadline"), "deadline")
+        m = KeywordMatcher(["SLA", "リスク", "Straße"], normalize=True)
+        self.assertEqual(m.vocabulary, ("sla", "strasse", "リスク"))
+        self.assertEqual(m.scan("ｓｌａ遵守とﾘｽｸ, STRASSE"), frozenset({"sla", "リスク", "strasse"}))
+        self.assertEqual(KeywordMatcher(["SLA"]).scan("sla"), frozenset())
+
+    def test_word_boundaries(self):
+        m = KeywordMatcher(["risk", "use", "user", "end", "end-of-life", "リスク"],
+                           normalize=True, word_boundaries=True)
+        self.assertEqual(m.scan("asterisk, reuse"), frozenset())
+        self.assertEqual(m.scan("Risks of USERS"), frozenset({"risk", "user"}))
+        self.assertEqual(m.scan("used"), frozenset({"use"}))
+        # 区切りに揃う内側の語は補完する
+        self.assertEqual(m.scan("end-of-life plan"), frozenset({"end", "end-of-life"}))
+        # 日本語に隣接する ASCII 語は単語として扱い、日本語の語は部分一致のまま
+        self.assertEqual(m.scan("顧客riskとｻﾌﾞリスク"), frozenset({"risk", "リスク"}))
+        self.assertEqual(KeywordMatcher(["risk"]).scan("asterisk"), frozenset({"risk"}))
+
+    def test_scan_many_preserves_order(self):
+        m = KeywordMatcher(["安全", "期限"])
+        self.assertEqual(
+            m.scan_many(["安全", "期限", "なし"]),
+            [frozenset({"安全"}), frozenset({"期限"}), frozenset()],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,33 +1,55 @@
 """tests/test_knowledge_base.py — KnowledgeBase のユニットテスト"""
 import json
 import os
+import sys
 import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
+from datetime import datetime, timedelta, timezone
 
-from aicw.knowledge_base import KnowledgeBase, _jaccard
+from aicw import knowledge_base
+from aicw.knowledge_base import KnowledgeBase
+
+
+def _set_jaccard(a, b):
+    """参照実装: reason_codes の集合どうしの Jaccard 類似度（両方空 = 1.0）。"""
+    set_a, set_b = set(a), set(b)
+    if not set_a and not set_b:
+        return 1.0
+    return len(set_a & set_b) / len(set_a | set_b)
 
 
 class TestJaccard(unittest.TestCase):
+    """find_similar が返す similarity（公開 API 経由の Jaccard 類似度）。"""
+
+    def _similarity(self, query, stored):
+        kb = KnowledgeBase()
+        kb.record("h", "ok", stored)
+        return kb.find_similar(query, top_k=1)[0]["similarity"]
+
     def test_identical(self):
-        self.assertAlmostEqual(_jaccard(["A", "B"], ["A", "B"]), 1.0)
+        self.assertAlmostEqual(self._similarity(["A", "B"], ["A", "B"]), 1.0)
 
     def test_disjoint(self):
-        self.assertAlmostEqual(_jaccard(["A", "B"], ["C", "D"]), 0.0)
+        self.assertAlmostEqual(self._similarity(["A", "B"], ["C", "D"]), 0.0)
 
     def test_partial(self):
         # {A,B} ∩ {B,C} = {B}, {A,B} ∪ {B,C} = {A,B,C}
-        self.assertAlmostEqual(_jaccard(["A", "B"], ["B", "C"]), 1/3, places=4)
+        self.assertAlmostEqual(self._similarity(["A", "B"], ["B", "C"]), 1/3, places=4)
 
     def test_empty_both(self):
-        self.assertAlmostEqual(_jaccard([], []), 1.0)
+        self.assertAlmostEqual(self._similarity([], []), 1.0)
 
     def test_one_empty(self):
-        self.assertAlmostEqual(_jaccard(["A"], []), 0.0)
+        self.assertAlmostEqual(self._similarity(["A"], []), 0.0)
+        self.assertAlmostEqual(self._similarity([], ["A"]), 0.0)
 
     def test_symmetric(self):
         a = ["SAFETY_FIRST", "COMPLIANCE_FIRST"]
         b = ["SAFETY_FIRST", "QUALITY_FIRST"]
-        self.assertAlmostEqual(_jaccard(a, b), _jaccard(b, a))
+        self.assertAlmostEqual(self._similarity(a, b), self._similarity(b, a))
 
 
 class TestKnowledgeBaseBasic(unittest.TestCase):
@@ -37,6 +59,22 @@ class TestKnowledgeBaseBasic(unittest.TestCase):
     def test_initial_empty(self):
         self.assertEqual(self.kb.count(), 0)
 
+    def test_listeners_get_a_copy_outside_the_lock(self):
+        seen = []
+
+        def listener(entry):
+            # ロックの外で呼ばれる（KB を読み返せる）
+            self.assertTrue(self.kb._lock.acquire(blocking=False))
+            self.kb._lock.release()
+            entry["reason_codes"].append("改変")
+            seen.append(entry)
+
+        self.kb.subscribe(listener)
+        entry = self.kb.record("h1", "ok", ["SAFETY_FIRST"])
+        self.assertEqual(entry["reason_codes"], ["SAFETY_FIRST"])
+        self.assertEqual(seen[0]["reason_codes"], ["SAFETY_FIRST", "改変"])
+        self.assertEqual(self.kb.all_entries()[0]["reason_codes"], ["SAFETY_FIRST"])
+
     def test_record_ok(self):
         entry = self.kb.record("abc123", "ok", ["SAFETY_FIRST"])
         self.assertEqual(entry["status"], "ok")
@@ -75,6 +113,16 @@ class TestKnowledgeBaseBasic(unittest.TestCase):
         self.assertIn("hash3", hashes)
         self.assertIn("hash2", hashes)
 
+    def test_oldest_is_next_to_be_evicted(self):
+        self.assertIsNone(self.kb.oldest())
+        kb = KnowledgeBase(max_entries=2)
+        for i in range(3):
+            kb.record(f"hash{i}", "ok", ["A"])
+        oldest = kb.oldest()
+        self.assertEqual(oldest["decision_hash"], "hash1")
+        oldest["reason_codes"].append("改変")
+        self.assertEqual(kb.oldest()["reason_codes"], ["A"])
+
     def test_max_entries_zero_invalid(self):
         with self.assertRaises(ValueError):
             KnowledgeBase(max_entries=0)
@@ -135,7 +183,7 @@ class TestKnowledgeBaseFind(unittest.TestCase):
     def test_find_empty_query_returns_entries(self):
         # 空クエリは全エントリと similarity=0.0（両空=1.0 なので空+非空=0.0）
         result = self.kb.find_similar([], top_k=5)
-        # h3 の reason_codes は [] → _jaccard([], []) = 1.0
+        # h3 の reason_codes は [] → 両方空の Jaccard = 1.0
         hashes = [r["decision_hash"] for r in result]
         self.assertIn("h3", hashes)
 
@@ -145,6 +193,174 @@ class TestKnowledgeBaseFind(unittest.TestCase):
             self.assertAlmostEqual(r["similarity"], 0.0, places=4)
 
 
+class TestKnowledgeBaseFindParity(unittest.TestCase):
+    """ビットマスク検索が「全件 Jaccard → 安定ソート」と同じ結果を返すこと。"""
+
+    def _reference(self, kb, codes, top_k, min_similarity, status_filter):
+        results = []
+        for entry in kb.all_entries():
+            if status_filter and entry["status"] != status_filter:
+                continue
+            sim = _set_jaccard(codes, entry["reason_codes"])
+            if sim >= min_similarity:
+                results.append({**entry, "similarity": round(sim, 4)})
+        results.sort(key=lambda x: x["similarity"], reverse=True)
+        return results[:top_k]
+
+    def test_random_queries(self):
+        import random
+        rng = random.Random(1)
+        vocab = ["SAFETY_FIRST", "QUALITY_FIRST", "SPEED_FIRST", "COMPLIANCE_FIRST",
+                 "CUSTOM_A", "CUSTOM_B"]
+        kb = KnowledgeBase(max_entries=150)
+        for i in range(200):
+            status = rng.choice(["ok", "blocked"])
+            codes = rng.sample(vocab, rng.randint(0, 3)) if status == "ok" else []
+            kb.record(f"h{i}", status, codes, "#6 Privacy" if status == "blocked" else None)
+        for _ in range(100):
+            codes = rng.sample(vocab + ["NOT_RECORDED"], rng.randint(0, 3))
+            kwargs = {
+                "top_k": rng.choice([0, 1, 5, 500]),
+                "min_similarity": rng.choice([0.0, 0.3, 1.0]),
+                "status_filter": rng.choice([None, "ok", "blocked"]),
+            }
+            self.assertEqual(
+                kb.find_similar(codes, **kwargs),
+                self._reference(kb, codes, **kwargs),
+            )
+
+
+class TestKnowledgeBaseQuery(unittest.TestCase):
+    """query(): 時間窓・blocked_by で絞ってから減衰つきで採点する。"""
+
+    BASE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def _entry(self, i, status, codes, blocked_by=None, hours=0):
+        return {
+            "decision_hash": f"h{i}",
+            "status": status,
+            "reason_codes": codes,
+            "blocked_by": blocked_by,
+            "timestamp_utc": (self.BASE + timedelta(hours=hours)).isoformat(),
+        }
+
+    def _kb(self, entries, max_entries=500):
+        kb = KnowledgeBase(max_entries=max_entries)
+        for e in entries:
+            kb._append(e)
+        kb._trim()
+        return kb
+
+    def _reference(self, kb, codes, *, top_k=3, since=None, until=None,
+                   blocked_by=None, status_filter=None, min_similarity=0.0,
+                   half_life_hours=None, now=None):
+        if isinstance(blocked_by, str):
+            blocked_by = [blocked_by]
+        out = []
+        for e in kb.all_entries():
+            ts = datetime.fromisoformat(e["timestamp_utc"])
+            if since is not None and ts < datetime.fromisoformat(since):
+                continue
+            if until is not None and ts >= datetime.fromisoformat(until):
+                continue
+            if blocked_by is not None and e["blocked_by"] not in blocked_by:
+                continue
+            if status_filter and e["status"] != status_filter:
+                continue
+            sim = _set_jaccard(codes, e["reason_codes"])
+            if sim < min_similarity:
+                continue
+            score = round(sim, 4)
+            if half_life_hours is not None:
+                age = (datetime.fromisoformat(now) - ts).total_seconds() / 3600
+                score *= 0.5 ** (max(0.0, age) / half_life_hours)
+            out.append((score, ts, e, round(sim, 4)))
+        out.sort(key=lambda x: (x[0], x[1]), reverse=True)
+        return [(x[2]["decision_hash"], x[3], round(x[0], 4)) for x in out[:top_k]]
+
+    def _random_entries(self, n, seed, shuffle=False):
+        import random
+        rng = random.Random(seed)
+        vocab = ["SAFETY_FIRST", "QUALITY_FIRST", "SPEED_FIRST", "CUSTOM_A"]
+        entries = []
+        for i in range(n):
+            status = rng.choice(["ok", "blocked"])
+            entries.append(self._entry(
+                i, status,
+                sorted(rng.sample(vocab, rng.randint(0, 3))) if status == "ok" else [],
+                rng.choice(["#6 Privacy", "#4 Manipulation"]) if status == "blocked" else None,
+                hours=i * 3 + rng.random(),
+            ))
+        if shuffle:
+            rng.shuffle(entries)
+        return entries, rng
+
+    def _check_random(self, kb, rng, rounds=150):
+        now = (self.BASE + timedelta(days=40)).isoformat()
+        for _ in range(rounds):
+            start = rng.randint(0, 30)
+            kwargs = {
+                "top_k": rng.choice([1, 3, 10]),
+                "since": rng.choice([None, (self.BASE + timedelta(days=start)).isoformat()]),
+                "until": rng.choice([None, (self.BASE + timedelta(days=start + 5)).isoformat()]),
+                "blocked_by": rng.choice([None, "#6 Privacy", ["#6 Privacy", "#4 Manipulation"]]),
+                "status_filter": rng.choice([None, "ok", "blocked"]),
+                "min_similarity": rng.choice([0.0, 0.5]),
+                "half_life_hours": rng.choice([None, 24.0, 240.0]),
+                "now": now,
+            }
+            codes = rng.sample(["SAFETY_FIRST", "QUALITY_FIRST", "OTHER"], rng.randint(0, 2))
+            got = [(r["decision_hash"], r["similarity"], r["score"])
+                   for r in kb.query(codes, **kwargs)]
+            self.assertEqual(got, self._reference(kb, codes, **kwargs), kwargs)
+
+    def test_matches_brute_force(self):
+        entries, rng = self._random_entries(300, seed=2)
+        self._check_random(self._kb(entries, max_entries=250), rng)
+
+    def test_unsorted_timestamps_use_time_index(self):
+        entries, rng = self._random_entries(200, seed=3, shuffle=True)
+        kb = self._kb(entries)
+        self.assertFalse(kb._ts_sorted)
+        self._check_random(kb, rng, rounds=80)
+
+    def test_recency_decay_prefers_newer(self):
+        kb = self._kb([
+            self._entry(0, "ok", ["SAFETY_FIRST"], hours=0),
+            self._entry(1, "ok", ["SAFETY_FIRST"], hours=48),
+        ])
+        now = (self.BASE + timedelta(hours=48)).isoformat()
+        plain = kb.query(["SAFETY_FIRST"], now=now)
+        self.assertEqual([r["decision_hash"] for r in plain], ["h1", "h0"])
+        decayed = kb.query(["SAFETY_FIRST"], half_life_hours=24, now=now)
+        self.assertEqual([r["score"] for r in decayed], [1.0, 0.25])
+        self.assertEqual([r["similarity"] for r in decayed], [1.0, 1.0])
+
+    def test_time_window_is_half_open(self):
+        kb = self._kb([self._entry(i, "ok", ["A"], hours=i) for i in range(5)])
+        result = kb.query(
+            ["A"], top_k=10,
+            since=(self.BASE + timedelta(hours=1)).isoformat(),
+            until=(self.BASE + timedelta(hours=3)).isoformat(),
+        )
+        self.assertEqual(sorted(r["decision_hash"] for r in result), ["h1", "h2"])
+
+    def test_blocked_by_index_survives_eviction(self):
+        kb = KnowledgeBase(max_entries=3)
+        kb.record("h0", "blocked", [], "#6 Privacy")
+        kb.record("h1", "ok", ["A"])
+        kb.record("h2", "blocked", [], "#4 Manipulation")
+        kb.record("h3", "blocked", [], "#6 Privacy")
+        result = kb.query([], top_k=10, blocked_by="#6 Privacy")
+        self.assertEqual([r["decision_hash"] for r in result], ["h3"])
+        kb.clear()
+        self.assertEqual(kb.query([], blocked_by="#6 Privacy"), [])
+
+    def test_invalid_half_life_raises(self):
+        with self.assertRaises(ValueError):
+            KnowledgeBase().query(["A"], half_life_hours=0)
+
+
 class TestKnowledgeBaseStats(unittest.TestCase):
     def setUp(self):
         self.kb = KnowledgeBase()
@@ -242,3 +458,260 @@ class TestKnowledgeBasePersistence(unittest.TestCase):
             self.assertLessEqual(kb.count(), 3)
         finally:
             os.unlink(path)
+
+
+class TestKnowledgeBaseConcurrentReads(unittest.TestCase):
+    """記録（古いエントリの削除を含む）と並行して検索しても列の不整合を読まない。"""
+
+    def _run(self, kb, writers=1, readers=2, seconds=0.5):
+        errors = []
+        stop = threading.Event()
+
+        def write(n):
+            i = 0
+            while not stop.is_set():
+                kb.record(f"w{n}-{i}", "blocked" if i % 3 else "ok",
+                          ["SAFETY_FIRST"] if i % 2 else [], blocked_by="#6 Privacy")
+                i += 1
+
+        def read():
+            while not stop.is_set():
+                try:
+                    kb.find_similar(["SAFETY_FIRST"], top_k=5)
+                    kb.query(["SAFETY_FIRST"], top_k=5, blocked_by="#6 Privacy",
+                             half_life_hours=1.0)
+                    kb.stats()
+                    kb.all_entries()
+                except Exception as e:  # pragma: no cover - 失敗時のみ
+                    errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(writers)]
+        threads += [threading.Thread(target=read) for _ in range(readers)]
+        try:
+            for t in threads:
+                t.start()
+            time.sleep(seconds)
+            stop.set()
+            for t in threads:
+                t.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(errors[:3], [])
+        self.assertLessEqual(kb.count(), 20)
+
+    def test_readers_with_one_writer(self):
+        self._run(KnowledgeBase(max_entries=20))
+
+    def test_readers_with_write_behind_writers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            kb = KnowledgeBase(os.path.join(tmp, "kb.json"), max_entries=20,
+                               write_behind=True, flush_interval=0.05)
+            self._run(kb, writers=2)
+            kb.close()
+            self.assertEqual(len(KnowledgeBase(kb.path).all_entries()), 20)
+
+
+class TestKnowledgeBaseWriteBehind(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "kb.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _count_on_disk(self):
+        return KnowledgeBase(path=self.path).count()
+
+    def test_burst_is_coalesced_by_timer(self):
+        kb = KnowledgeBase(path=self.path, write_behind=True, flush_interval=0.05)
+        for i in range(30):
+            kb.record(f"h{i}", "ok", ["SAFETY_FIRST"])
+        self.assertEqual(kb.count(), 30)
+        self.assertEqual(kb.pending, 30)
+        self.assertFalse(os.path.exists(self.path))
+        deadline = time.monotonic() + 2
+        while kb.writes == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(kb.writes, 1)
+        self.assertEqual(kb.pending, 0)
+        self.assertEqual(self._count_on_disk(), 30)
+
+    def test_explicit_flush_and_context_exit(self):
+        with KnowledgeBase(path=self.path, write_behind=True, flush_interval=60) as kb:
+            kb.record("h1", "ok", [])
+            kb.flush()
+            self.assertEqual(self._count_on_disk(), 1)
+            kb.flush()                      # 未保存なし → 書かない
+            self.assertEqual(kb.writes, 1)
+            kb.record("h2", "blocked", [], "#6 Privacy")
+        self.assertEqual(kb.writes, 2)
+        self.assertEqual(self._count_on_disk(), 2)
+
+    def test_max_pending_flush_is_rate_limited(self):
+        kb = KnowledgeBase(path=self.path, write_behind=True, flush_interval=60, max_pending=5)
+        for i in range(12):
+            kb.record(f"h{i}", "ok", [])
+        # 最初の 5 件で書き出し。以降は flush_interval が経つまで溜める
+        self.assertEqual(kb.writes, 1)
+        self.assertEqual(self._count_on_disk(), 5)
+        self.assertEqual(kb.pending, 7)
+        kb.close()
+        self.assertEqual(self._count_on_disk(), 12)
+
+    def test_failed_write_keeps_records_pending(self):
+        kb = KnowledgeBase(path=self.path, write_behind=True, flush_interval=60)
+        kb.record("h1", "ok", [])
+        with mock.patch.object(knowledge_base, "_write_snapshot", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                kb.flush()
+        self.assertEqual(kb.pending, 1)
+        kb.flush()
+        self.assertEqual(self._count_on_disk(), 1)
+
+    def test_atexit_hook_flushes_pending(self):
+        kb = KnowledgeBase(path=self.path, write_behind=True, flush_interval=60)
+        kb.record("h1", "ok", [])
+        knowledge_base._flush_at_exit()
+        self.assertEqual(self._count_on_disk(), 1)
+
+    def test_failing_listener_does_not_lose_the_record(self):
+        kb = KnowledgeBase(path=self.path, write_behind=True, flush_interval=60)
+        seen = []
+
+        def broken(entry):
+            raise RuntimeError("listener bug")
+
+        kb.subscribe(broken)
+        kb.subscribe(seen.append)
+        with self.assertLogs("aicw.knowledge_base", level="ERROR"):
+            entry = kb.record("h1", "ok", ["SAFETY_FIRST"])
+        self.assertEqual(kb.pending, 1)
+        self.assertEqual(seen, [entry])      # 後ろの購読者にも届く
+        kb.flush()
+        self.assertEqual(self._count_on_disk(), 1)
+
+    def test_without_path_or_flag_behaves_as_before(self):
+        kb = KnowledgeBase(write_behind=True)
+        kb.record("h1", "ok", [])
+        self.assertEqual(kb.pending, 0)
+        kb = KnowledgeBase(path=self.path)
+        kb.record("h1", "ok", [])
+        self.assertEqual(self._count_on_disk(), 1)
+        with self.assertRaises(ValueError):
+            KnowledgeBase(flush_interval=0)
+
+
+
+class TestKnowledgeBaseFileFormat(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "kb.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _columns(self, kb):
+        return (kb._hashes, kb._statuses, kb._codes, kb._blocked_by, kb._timestamps,
+                kb._keys, list(kb._ts), kb._blocked_seq, kb._ts_sorted)
+
+    def _write_legacy(self, entries):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"version": "knowledge_base.v0.1", "max_entries": 500,
+                       "entries": entries}, f, ensure_ascii=False, indent=2)
+
+    def test_checksummed_header(self):
+        kb = KnowledgeBase(path=self.path)
+        kb.record("h1", "ok", ["SAFETY_FIRST"])
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(list(data), ["version", "max_entries", "count", "entries_sha256", "entries"])
+        self.assertEqual(data["version"], "knowledge_base.v0.2")
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(len(data["entries_sha256"]), 64)
+
+    def test_trusted_load_matches_validated_load(self):
+        base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        entries = [
+            {"decision_hash": f"h{i}", "status": ["ok", "blocked"][i % 2],
+             "reason_codes": [["SAFETY_FIRST"], [], ["NEW_CODE", "SPEED_FIRST"]][i % 3],
+             "blocked_by": "#6 Privacy" if i % 2 else None,
+             "timestamp_utc": (base + timedelta(minutes=(i * 7) % 50)).isoformat()}
+            for i in range(60)
+        ]
+        self._write_legacy(entries)
+        legacy = KnowledgeBase(path=self.path, max_entries=40)
+        legacy.save()
+        trusted = KnowledgeBase(path=self.path, max_entries=40)
+        self.assertEqual(self._columns(trusted), self._columns(legacy))
+        self.assertFalse(trusted._ts_sorted)
+        self.assertEqual(trusted.query(["SAFETY_FIRST"], blocked_by="#6 Privacy", top_k=50),
+                         legacy.query(["SAFETY_FIRST"], blocked_by="#6 Privacy", top_k=50))
+
+    def test_failed_write_keeps_previous_file(self):
+        kb = KnowledgeBase(path=self.path)
+        kb.record("h1", "ok", [])
+        with mock.patch.object(knowledge_base.os, "replace", side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                kb.record("h2", "ok", [])
+        self.assertEqual(os.listdir(self.tmpdir.name), ["kb.json"])
+        self.assertEqual([e["decision_hash"] for e in KnowledgeBase(path=self.path).all_entries()],
+                         ["h1"])
+
+    def test_overlapping_writers_do_not_tear_the_file(self):
+        # 1 つ目の書き手が os.replace する直前に、2 つ目の書き手が保存を終える
+        first = KnowledgeBase(path=self.path)
+        second = KnowledgeBase(path=self.path)
+        for i in range(20):
+            second.record(f"s{i}", "ok", [])
+        real_replace = os.replace
+        calls = []
+
+        def replace(src, dst):
+            if not calls:
+                calls.append(src)
+                second.save()
+            real_replace(src, dst)
+
+        with mock.patch.object(knowledge_base.os, "replace", side_effect=replace):
+            first.record("f0", "ok", ["SAFETY_FIRST"])
+        self.assertEqual(os.listdir(self.tmpdir.name), ["kb.json"])
+        reloaded = KnowledgeBase(path=self.path)
+        self.assertIsNone(reloaded.load_error)
+        self.assertEqual([e["decision_hash"] for e in reloaded.all_entries()], ["f0"])
+
+    def test_truncated_file_is_quarantined(self):
+        kb = KnowledgeBase(path=self.path)
+        for i in range(5):
+            kb.record(f"h{i}", "ok", [])
+        with open(self.path, "rb") as f:
+            data = f.read()
+        with open(self.path, "wb") as f:
+            f.write(data[: len(data) // 2])
+        reloaded = KnowledgeBase(path=self.path)
+        self.assertEqual(reloaded.count(), 0)
+        self.assertIsNotNone(reloaded.load_error)
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.path + ".corrupt", "rb") as f:
+            self.assertEqual(f.read(), data[: len(data) // 2])
+
+    def test_checksum_mismatch_falls_back_to_validation(self):
+        kb = KnowledgeBase(path=self.path)
+        kb.record("h1", "ok", ["SAFETY_FIRST"])
+        kb.record("h2", "ok", [])
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        del data["entries"][1]["timestamp_utc"]       # 手で編集された想定
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+        reloaded = KnowledgeBase(path=self.path)
+        self.assertEqual([e["decision_hash"] for e in reloaded.all_entries()], ["h1"])
+        self.assertIsNone(reloaded.load_error)
+
+    def test_legacy_file_is_loaded(self):
+        self._write_legacy([{"decision_hash": "h1", "status": "ok", "reason_codes": [],
+                             "timestamp_utc": "2026-01-01T00:00:00+00:00"}])
+        self.assertEqual(KnowledgeBase(path=self.path).count(), 1)
@@ -5,11 +5,16 @@ A: _build_next_questions の動的生成テスト
 B: _build_existence_alternatives の具体化テスト
 C: _build_uncertainties の動的生成テスト
 D: _build_counterarguments の動的生成テスト
+E: 特徴量 → 事前計算した文言表の一致テスト
 """
 from __future__ import annotations
 
+import itertools
 import unittest
 from aicw.decision import (
+    _existence_features,
+    _get_templates,
+    _judge_existence,
     _build_next_questions,
     _build_existence_alternatives,
     _build_uncertainties,
@@ -19,6 +24,8 @@ from aicw.decision import (
     _SOFT_DESTRUCTION_KEYWORDS,
     build_decision_report,
 )
+from aicw import decision
+from aicw.rule_packs import get_rule_set
 
 # ---------------------------------------------------------------------------
 # ヘルパー: existence_analysis の最小スタブ
@@ -534,3 +541,60 @@ class TestDynamicCounterarguments(unittest.TestCase):
         })
         assert report["status"] == "ok"
         assert any("短期の最適化" in c for c in report["counterarguments"])
+
+
+# ===========================================================================
+# E: TestExistenceTemplates
+# ===========================================================================
+
+class TestExistenceTemplates(unittest.TestCase):
+    """特徴量で引く文言表が、全組み合わせで各ビルダーの出力と一致する"""
+
+    def _cases(self):
+        for b_unknown, s_unknown, risk, judgment, score, has_c in itertools.product(
+            (False, True), (False, True), ("low", "medium", "high"),
+            ("unclear", "lifecycle", "self_interested_destruction"), (0, 3, 4, 8), (False, True),
+        ):
+            ea = _ea(
+                beneficiaries=["不明"] if b_unknown else ["顧客"],
+                structures=["不明"] if s_unknown else ["社会"],
+                judgment=judgment, distortion_risk=risk, impact_score=score,
+            )
+            yield ea, (["安全"] if has_c else [])
+
+    def test_table_matches_builders(self):
+        for ea, constraints in self._cases():
+            features = _existence_features(ea, bool(constraints))
+            nq, unc, ca = _get_templates(features)
+            self.assertIn(features, decision._TEMPLATES)   # 既知の値はすべて事前計算済み
+            self.assertEqual(list(nq), _build_next_questions(ea, constraints))
+            self.assertEqual(list(unc), _build_uncertainties(ea, constraints))
+            self.assertEqual(list(ca), _build_counterarguments(ea))
+            self.assertLessEqual((len(nq), len(unc), len(ca)), (6, 5, 4))
+
+    def test_judge_existence_features_match_dict(self):
+        rules = get_rule_set()
+        for text, beneficiaries, structures, has_c in [
+            ("サービスを終了し移行する", [], [], False),
+            ("市場を独占して競合を排除する", ["株主"], [], True),
+            ("チームの体制を見直す", ["顧客"], ["社会", "認知"], True),
+        ]:
+            analysis, features = _judge_existence(
+                rules.scan(text), beneficiaries, structures, has_c, rules
+            )
+            self.assertEqual(features, _existence_features(analysis, has_c))
+
+    def test_report_shares_table_strings(self):
+        report = build_decision_report({"situation": "新しい施策を検討する", "constraints": []})
+        features = _existence_features(report["existence_analysis"], False)
+        nq, unc, ca = _get_templates(features)
+        self.assertEqual(report["next_questions"], list(nq))
+        # 文言は表の文字列そのもの（リクエストごとに作り直さない）
+        self.assertTrue(all(a is b for a, b in zip(report["next_questions"], nq)))
+        self.assertTrue(all(a is b for a, b in zip(report["uncertainties"], unc)))
+        self.assertTrue(all(a is b for a, b in zip(report["counterarguments"], ca)))
+
+    def test_unknown_values_fall_back(self):
+        ea = _ea(judgment="custom", distortion_risk="medium")
+        self.assertIn("「誰の私益か」「誰が損するか」を一文で整理できますか？",
+                      _build_next_questions(ea, constraints=[]))
@@ -1,3 +1,4 @@
+import dataclasses
 import unittest
 
 from aicw.decision import build_decision_report, format_report
@@ -32,6 +33,13 @@ class TestP0Manipulation(unittest.TestCase):
         self.assertIsInstance(hits[0], ManipulationHit)
         self.assertEqual("block", hits[0].severity)
 
+    def test_manipulation_hit_is_frozen_dataclass(self):
+        hit = scan_manipulation("従" + "え")[0]
+        self.assertTrue(dataclasses.is_dataclass(hit))
+        self.assertEqual("block", dataclasses.asdict(hit)["severity"])
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            hit.severity = "warn"
+
     def test_detects_multiple_severities(self):
         s_warn = "必" + "ず"
         s_block = "拡" + "散"
@@ -1,6 +1,7 @@
+import random
 import unittest
 
-from aicw.safety import guard_text, scan_privacy_risks
+from aicw.safety import guard_fields, guard_text, scan_privacy_risks
 from aicw.decision import build_decision_report
 
 
@@ -206,5 +207,28 @@ class TestP0Privacy(unittest.TestCase):
         self.assertIn("SECRET_LIKE_LONG", kinds)
 
 
+class TestGuardFields(unittest.TestCase):
+    """フィールド単位の検知を組み立てた結果が、改行連結の guard_text と一致する"""
+
+    _PARTS = ["token", "例", "説明", "=x", " ", ":", "a@b.co", "03-1234-5678",
+              "123-4567", "1.2.3.4", "A" * 33, "password", "単語", "あ"]
+
+    def test_matches_joined_guard_text(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            texts = ["".join(rng.choice(self._PARTS) for _ in range(rng.randint(0, 5)))
+                     for _ in range(rng.randint(1, 5))]
+            self.assertEqual(guard_fields(texts), guard_text("\n".join(texts)))
+
+    def test_secret_context_from_neighbor_field(self):
+        # 「例」は隣のフィールドにあるが、連結テキストでは説明文脈の窓に入る
+        texts = ["例として", "token"]
+        allowed, _, findings, _ = guard_fields(texts)
+        self.assertTrue(allowed)
+        self.assertEqual([f.severity for f in findings], ["warn"])
+        self.assertEqual(guard_fields(texts, [scan_privacy_risks(t) for t in texts]),
+                         guard_text("\n".join(texts)))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -5,7 +5,9 @@ from aicw.philosophy_check import (
     DUTY_OUTCOME_CONFLICT,
     FAIRNESS_EFFICIENCY_CONFLICT,
     RIGHTS_TOTAL_BENEFIT_CONFLICT,
+    conflicts_from_signals,
     detect_philosophy_conflicts,
+    philosophy_signals,
 )
 
 
@@ -32,6 +34,17 @@ class TestPhilosophyCheck(unittest.TestCase):
         text = "公平と公正を守り、差別を避ける。"
         self.assertEqual(detect_philosophy_conflicts(text), [])
 
+    def test_signals_of_parts_combine(self):
+        parts = [("規則を守るべきだ", "成果を最大化するため例外を容認する"),
+                 ("公平を重視する", "しかし効率を優先"),
+                 ("権利と全体", "多数の便益のため例外"),
+                 ("", "公平と公正")]
+        for a, b in parts:
+            self.assertEqual(
+                conflicts_from_signals(philosophy_signals(a) | philosophy_signals(b)),
+                detect_philosophy_conflicts(f"{a} {b}"),
+            )
+
 
 class TestPhilosophyIntegration(unittest.TestCase):
     def test_reason_codes_include_philo_code_in_report(self):
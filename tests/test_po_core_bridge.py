@@ -237,3 +237,48 @@ class TestSummary(unittest.TestCase):
         )
         if result["summary"]["highest_risk"] == "clear":
             self.assertIn("OK", result["summary"]["recommended_action"])
+
+
+class TestFusedScanEquivalence(unittest.TestCase):
+    """融合スキャン（1 パス照合）が各コンポーネントの単独実行と一致すること"""
+
+    _CASES = [
+        ("AI導入すべきか", "効率化のため義務的に全員に適用し、便益最大化を達成すべきだ", ""),
+        ("拡散させて炎上させる", "従え、洗脳させろ", "従う"),
+        ("監視を強めて操作し、支配を進める", "", "段階的に進める"),
+        ("問いと存在を検証する", "公平だが効率も重要。多数のため一部犠牲を容認", "容認する"),
+        ("", "今すぐ必ず絶対にやれ", ""),
+    ]
+
+    def test_matches_unfused_components(self):
+        from aicw.philosophy_check import detect_philosophy_conflicts
+        from aicw.safety import scan_manipulation
+        from bridge.ensemble import run_ensemble
+
+        for situation, explanation, human in self._CASES:
+            with self.subTest(situation=situation, explanation=explanation):
+                result = analyze_philosophy_tensor(
+                    situation=situation,
+                    explanation=explanation,
+                    human_decision=human,
+                )
+                ethics_text = explanation or situation
+                w_eth = result["tensor"]["W_eth"]
+                t_sub = result["tensor"]["T_sub"]
+                self.assertEqual(
+                    w_eth["conflict_codes"], detect_philosophy_conflicts(ethics_text)
+                )
+                self.assertEqual(
+                    w_eth["ensemble_minority_report"],
+                    run_ensemble(situation)["minority_report"],
+                )
+                self.assertEqual(
+                    t_sub["direct_manipulation_hits"],
+                    [h.phrase for h in scan_manipulation(ethics_text)],
+                )
+
+    def test_repeated_calls_are_independent(self):
+        a = analyze_philosophy_tensor(situation="AIに意識はあるか")
+        a["tensor"]["T_free"]["positions"].clear()
+        b = analyze_philosophy_tensor(situation="AIに意識はあるか")
+        self.assertEqual(len(b["tensor"]["T_free"]["positions"]), 3)
@@ -0,0 +1,68 @@
+"""tests/test_reason_bits.py — ReasonCodeRegistry / jaccard のユニットテスト"""
+import random
+import unittest
+
+from aicw.reason_bits import ReasonCodeRegistry, jaccard
+from aicw.schema import DECISION_BRIEF_V0
+
+
+def _set_jaccard(a, b):
+    """参照実装: 集合どうしの Jaccard 類似度（両方空 = 1.0）。"""
+    set_a, set_b = set(a), set(b)
+    if not set_a and not set_b:
+        return 1.0
+    return len(set_a & set_b) / len(set_a | set_b)
+
+
+class TestReasonCodeRegistry(unittest.TestCase):
+
+    def test_schema_codes_get_bits_in_order(self):
+        reg = ReasonCodeRegistry.from_schema()
+        selection = list(DECISION_BRIEF_V0["reason_codes"]["selection"])
+        self.assertEqual(reg.names, tuple(selection))
+        self.assertEqual(reg.bit(selection[0]), 0)
+        self.assertEqual(reg.mask([selection[0], selection[2]]), 0b101)
+
+    def test_unknown_code_gets_next_bit(self):
+        reg = ReasonCodeRegistry(["A", "B"])
+        self.assertEqual(reg.bit("C"), 2)
+        self.assertEqual(reg.bit("C"), 2)
+        self.assertIn("C", reg)
+        self.assertEqual(len(reg), 3)
+
+    def test_codes_round_trip(self):
+        reg = ReasonCodeRegistry(["A", "B", "C"])
+        self.assertEqual(reg.codes(reg.mask(["C", "A"])), ["A", "C"])
+        self.assertEqual(reg.codes(0), [])
+
+    def test_query_mask_does_not_register(self):
+        reg = ReasonCodeRegistry(["A"])
+        self.assertEqual(reg.query_mask(["A", "X", "X", "Y"]), (1, 2))
+        self.assertNotIn("X", reg)
+
+    def test_max_bits(self):
+        reg = ReasonCodeRegistry(["A", "B"], max_bits=2)
+        with self.assertRaises(ValueError):
+            reg.bit("C")
+
+
+class TestJaccardBits(unittest.TestCase):
+
+    def test_matches_set_jaccard(self):
+        rng = random.Random(0)
+        vocab = [f"C{i}" for i in range(12)]
+        reg = ReasonCodeRegistry()
+        for _ in range(500):
+            a = rng.sample(vocab, rng.randint(0, 5))
+            b = rng.sample(vocab[:10], rng.randint(0, 5))
+            reg.mask(b)
+            qa, extra = reg.query_mask(a)
+            self.assertAlmostEqual(jaccard(qa, reg.mask(b), extra), _set_jaccard(a, b))
+
+    def test_both_empty_is_one(self):
+        self.assertEqual(jaccard(0, 0), 1.0)
+        self.assertEqual(jaccard(0, 0, extra=1), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
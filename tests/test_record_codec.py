@@ -0,0 +1,146 @@
+"""tests/test_record_codec.py — record_codec（バイナリ永続化形式）のテスト"""
+import json
+import unittest
+
+from aicw.audit_log import AuditEntry, AuditLog
+from aicw.decision import build_decision_report, build_persistence_record
+from aicw.knowledge_base import KnowledgeBase
+from aicw.record_codec import (
+    BLOCKED_BY_VALUES,
+    REASON_CODES,
+    decode_record,
+    dump_records,
+    encode_kb_entry,
+    encode_persistence_record,
+    encode_record,
+    iter_frames,
+    load_records,
+)
+from aicw.schema import DECISION_BRIEF_V0
+
+_OK_REQ = {
+    "situation": "新しいプロジェクトの進め方を決めたい",
+    "constraints": ["予算は限られている"],
+    "options": ["A案", "B案", "C案"],
+}
+_BLOCKED_REQ = {"situation": "連絡先は test@example.com です"}
+
+
+def _json_size(record):
+    if isinstance(record, AuditEntry):
+        record = record.__dict__
+    return len(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_registry_follows_brief_schema(self):
+        codes = DECISION_BRIEF_V0["reason_codes"]
+        self.assertEqual(REASON_CODES, tuple(codes["selection"]))
+        self.assertEqual(BLOCKED_BY_VALUES, tuple(codes["blocked_by_values"]))
+
+
+class TestPersistenceRecord(unittest.TestCase):
+
+    def test_round_trip_ok(self):
+        rec = build_persistence_record(build_decision_report(_OK_REQ))
+        self.assertEqual(rec["status"], "ok")
+        self.assertEqual(decode_record(encode_record(rec)), rec)
+
+    def test_round_trip_blocked(self):
+        rec = build_persistence_record(build_decision_report(_BLOCKED_REQ))
+        self.assertEqual(rec["status"], "blocked")
+        self.assertEqual(decode_record(encode_record(rec)), rec)
+
+    def test_hash_and_codes_are_compact(self):
+        rec = build_persistence_record(build_decision_report(_OK_REQ))
+        blob = encode_persistence_record(rec)
+        # 64 桁 hex は 32 バイト、reason code は 1 バイトずつ
+        self.assertLess(len(blob), 32 + len(rec["reason_codes"]) + 20 + len(rec["recommended_id"]))
+        self.assertLess(len(blob) * 3, _json_size(rec))
+
+    def test_unregistered_values_are_escaped(self):
+        rec = {
+            "status": "ok",
+            "recommended_id": None,
+            "reason_codes": ["UNKNOWN_CODE", REASON_CODES[0], ""],
+            "version": "v0",
+            "record_hash": "abc123",
+        }
+        self.assertEqual(decode_record(encode_record(rec)), rec)
+        blocked = {
+            "status": "blocked",
+            "blocked_by": "#99 Future",
+            "detected": ["メール", "電話"],
+            "version": "v0",
+            "record_hash": "A" * 64,   # 大文字 hex は往復しないので文字列のまま
+        }
+        self.assertEqual(decode_record(encode_record(blocked)), blocked)
+
+    def test_unsupported_records_raise(self):
+        with self.assertRaises(ValueError):
+            encode_record({"status": "maybe", "version": "v0", "record_hash": ""})
+        rec = build_persistence_record(build_decision_report(_OK_REQ))
+        rec["extra"] = 1
+        with self.assertRaises(ValueError):
+            encode_record(rec)
+
+
+class TestAuditAndKnowledgeBase(unittest.TestCase):
+
+    def test_audit_entry_round_trip(self):
+        log = AuditLog()
+        log.append("ok", reason_codes=["SAFETY_FIRST", "NOT_IN_REGISTRY"])
+        log.append("blocked", blocked_by="#6 Privacy")
+        for entry in log.query():
+            self.assertEqual(decode_record(encode_record(entry)), entry)
+
+    def test_audit_entry_irregular_timestamp(self):
+        entry = AuditEntry(
+            timestamp_utc="2026-01-01T00:00:00Z",
+            decision_hash="0" * 64,
+            status="ok",
+            blocked_by=None,
+            reason_codes=[],
+            version="v0",
+            expires_at_utc="2026-01-02T09:00:00+09:00",
+        )
+        self.assertEqual(decode_record(encode_record(entry)), entry)
+
+    def test_kb_entry_round_trip(self):
+        kb = KnowledgeBase()
+        kb.record("f" * 64, "ok", ["SAFETY_FIRST"], None)
+        kb.record("not-a-hash", "blocked", [], "#5 Dependency")
+        for entry in kb.all_entries():
+            self.assertEqual(decode_record(encode_kb_entry(entry)), entry)
+
+
+class TestFraming(unittest.TestCase):
+
+    def test_dump_and_load_mixed_stream(self):
+        log = AuditLog()
+        records = [
+            build_persistence_record(build_decision_report(_OK_REQ)),
+            build_persistence_record(build_decision_report(_BLOCKED_REQ)),
+            log.append("ok", reason_codes=["SAFETY_FIRST"]),
+        ]
+        blob = dump_records(records)
+        self.assertEqual(load_records(blob), records)
+        self.assertEqual(len(list(iter_frames(blob))), 3)
+        self.assertLess(len(blob) * 3, sum(_json_size(r) for r in records))
+
+    def test_truncated_and_trailing_data_raise(self):
+        blob = encode_record(build_persistence_record(build_decision_report(_OK_REQ)))
+        with self.assertRaises(ValueError):
+            decode_record(blob[:-1])
+        with self.assertRaises(ValueError):
+            decode_record(blob + b"\x00")
+        with self.assertRaises(ValueError):
+            decode_record(b"\x09\x00")
+        framed = dump_records([build_persistence_record(build_decision_report(_OK_REQ))])
+        with self.assertRaises(ValueError):
+            load_records(framed[:-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
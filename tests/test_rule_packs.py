@@ -0,0 +1,206 @@
+"""tests/test_rule_packs.py — ルールパックの検査・コンパイル・ホットリロードのテスト"""
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from aicw import rule_packs
+from aicw.decision import build_decision_report
+from aicw.rule_packs import (
+    RulePackLoader,
+    compile_rule_packs,
+    get_rule_set,
+    parse_rule_pack,
+    validate_rule_pack,
+)
+from aicw.stage_cache import StageCache
+
+_FINANCE = {
+    "version": "rule_pack.v0",
+    "name": "finance",
+    "revision": "2026-10-01",
+    "recommendation": {"safety_words": {"与信": "RISK_AVOIDANCE"}},
+    "existence": {
+        "structures": {"金融": ["決済網"]},
+        "hard_destruction": ["買い叩く"],
+        "alternatives": {"買い叩く": "取引条件の見直しとして交渉方針を再設計できますか？"},
+    },
+}
+
+
+def _request(situation, constraints=()):
+    return {"situation": situation, "constraints": list(constraints)}
+
+
+class TestValidation(unittest.TestCase):
+
+    def test_valid_pack(self):
+        self.assertEqual(validate_rule_pack(_FINANCE), [])
+        pack = parse_rule_pack(_FINANCE)
+        self.assertEqual((pack.name, pack.revision), ("finance", "2026-10-01"))
+        self.assertEqual(pack.lifecycle, [])
+
+    def test_errors_are_listed(self):
+        bad = dict(_FINANCE, version="rule_pack.v9",
+                   recommendation={"safety_words": {"月末 締め": "late"}})
+        errors = validate_rule_pack(bad)
+        self.assertEqual(len(errors), 3)
+        with self.assertRaises(ValueError):
+            parse_rule_pack(bad)
+        self.assertEqual(validate_rule_pack([]), ["ルールパックは object にしてください"])
+
+    def test_conflicts_are_rejected(self):
+        clash = dict(_FINANCE, name="other",
+                     recommendation={"safety_words": {"与信": "QUALITY_FIRST"}})
+        with self.assertRaises(ValueError):
+            compile_rule_packs([parse_rule_pack(_FINANCE), parse_rule_pack(clash)])
+        with self.assertRaises(ValueError):
+            compile_rule_packs([parse_rule_pack(_FINANCE), parse_rule_pack(_FINANCE)])
+        both = dict(_FINANCE, existence={"soft_destruction": ["破壊"]})
+        with self.assertRaises(ValueError):
+            compile_rule_packs([parse_rule_pack(both)])
+
+
+class TestCompiledRules(unittest.TestCase):
+
+    def test_scan_matches_substring_semantics(self):
+        # 日本語の語は部分一致（ASCII の語は単語単位: test_english_words_match_whole_words）
+        rules = compile_rule_packs([parse_rule_pack(_FINANCE)])
+        vocab = sorted(kw for kw in rules.flags if not kw.isascii())
+        rng = random.Random(0)
+        for _ in range(300):
+            text = "".join(rng.choice(vocab + ["。", "の", "を"]) for _ in range(rng.randint(0, 12)))
+            self.assertEqual(rules.scan(text), {kw for kw in vocab if kw in text})
+
+    def test_pack_vocabulary_reaches_the_report(self):
+        rules = compile_rule_packs([parse_rule_pack(_FINANCE)])
+        report = build_decision_report(_request("取引先の決済網を整備する", ["与信管理"]), rules=rules)
+        self.assertEqual(report["selection"]["recommended_id"], "A")
+        self.assertIn("RISK_AVOIDANCE", report["selection"]["reason_codes"])
+        self.assertIn("金融", report["existence_analysis"]["question_2_affected_structures"])
+
+        blocked = build_decision_report(_request("下請けを買い叩く"), rules=rules)
+        self.assertEqual(blocked["blocked_by"], "#5 Existence Ethics")
+        self.assertEqual(blocked["detected"], ["買い叩く"])
+        self.assertTrue(blocked["safe_alternatives"][0].startswith("「買い叩く」→"))
+
+        # 明示した rules は有効な RuleSet を変えない
+        self.assertEqual(build_decision_report(_request("下請けを買い叩く"))["status"], "ok")
+
+    def test_detected_keywords_keep_table_order(self):
+        rules = compile_rule_packs([parse_rule_pack(_FINANCE)])
+        report = build_decision_report(_request("買い叩く。排除する。独占する。"), rules=rules)
+        self.assertEqual(report["detected"], ["独占", "買い叩く", "排除"])
+
+
+class TestMultiLanguage(unittest.TestCase):
+
+    def test_english_request_is_no_longer_unknown(self):
+        report = build_decision_report(_request(
+            "We plan to migrate our customer support platform.", ["Safety and legal review"]
+        ))
+        self.assertEqual(report["selection"]["recommended_id"], "A")
+        self.assertEqual(report["selection"]["reason_codes"][:2], ["COMPLIANCE_FIRST", "SAFETY_FIRST"])
+        self.assertEqual(report["existence_analysis"]["question_2_affected_structures"], ["関係"])
+        self.assertEqual(report["existence_analysis"]["question_3_judgment"], "lifecycle")
+
+    def test_mixed_language_and_width_are_folded(self):
+        report = build_decision_report(_request("新サービスの検討。ＤＥＡＤＬＩＮＥは来月。", ["URGENT"]))
+        self.assertEqual(report["selection"]["reason_codes"][0], "URGENCY_FIRST")
+        half_width = build_decision_report(_request("新サービスの検討", ["ﾘｽｸを抑える"]))
+        self.assertEqual(half_width["selection"]["reason_codes"][0], "RISK_AVOIDANCE")
+
+    def test_english_words_match_whole_words(self):
+        for situation, word in [
+            ("Sales may predominate in Q3.", "dominate"),
+            ("We bought a rock crusher for the site.", "crush"),
+            ("Move the team off waterfall planning.", "water"),
+            ("We reuse the components.", "user"),
+            ("Mark optional fields with an asterisk.", "risk"),
+        ]:
+            self.assertNotIn(word, get_rule_set().scan(situation), msg=situation)
+            report = build_decision_report(_request(situation))
+            self.assertEqual(report["status"], "ok", msg=situation)
+        hits = get_rule_set().scan("Risks were dominated by users; 顧客riskを確認")
+        self.assertLessEqual({"risk", "dominate", "user"}, hits)
+
+    def test_english_destruction_uses_shared_alternatives(self):
+        report = build_decision_report(_request("We want to crush and monopolize the market."))
+        self.assertEqual(report["blocked_by"], "#5 Existence Ethics")
+        self.assertEqual(report["detected"], ["crush", "monopolize"])
+        self.assertTrue(report["safe_alternatives"][0].startswith("「crush」→ 「競争」ではなく"))
+
+    def test_language_tags(self):
+        self.assertEqual(get_rule_set().languages, ("ja", "en"))
+        ko = dict(_FINANCE, name="finance_ko", language="ko",
+                  recommendation={"safety_words": {"안전": "SAFETY_FIRST"}}, existence={})
+        rules = compile_rule_packs([parse_rule_pack(_FINANCE), parse_rule_pack(ko)])
+        self.assertEqual(rules.languages, ("ja", "en", "und", "ko"))
+        report = build_decision_report(_request("신규 사업", ["안전 우선"]), rules=rules)
+        self.assertEqual(report["selection"]["reason_codes"][0], "SAFETY_FIRST")
+        self.assertEqual(len(validate_rule_pack(dict(_FINANCE, language="Japanese"))), 1)
+
+    def test_bench_reports_every_language_count(self):
+        from scripts.bench_languages import measure
+
+        results = [measure(n, keywords=20, repeat=1, number=1) for n in (0, 2)]
+        self.assertEqual(results[1]["languages"], ["ja", "en", "ru", "el"])
+        self.assertEqual(results[1]["keywords"] - results[0]["keywords"], 40)
+
+    def test_keywords_that_normalize_alike_must_agree(self):
+        clash = dict(_FINANCE, recommendation={"safety_words": {"ＲＩＳＫ": "QUALITY_FIRST"}})
+        with self.assertRaises(ValueError):
+            compile_rule_packs([parse_rule_pack(clash)])
+
+
+class TestHotReload(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.loader = RulePackLoader(self.tmpdir.name)
+
+    def tearDown(self):
+        rule_packs.activate(None)
+        self.tmpdir.cleanup()
+
+    def _write(self, name, data):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data if isinstance(data, str) else json.dumps(data, ensure_ascii=False))
+        # mtime の分解能に依存しないよう、書くたびに時刻を進める
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def test_reload_swaps_active_rules(self):
+        self.assertEqual(self.loader.reload().packs, (("builtin", "p0"), ("builtin_en", "p0")))
+        self._write("finance.json", _FINANCE)
+        self.assertTrue(self.loader.reload_if_changed())
+        self.assertFalse(self.loader.reload_if_changed())
+        self.assertIs(get_rule_set(), self.loader.rule_set)
+        report = build_decision_report(_request("新しい施策", ["与信"]))
+        self.assertIn("RISK_AVOIDANCE", report["selection"]["reason_codes"])
+
+    def test_broken_pack_keeps_previous_rules(self):
+        self._write("finance.json", _FINANCE)
+        active = self.loader.reload()
+        self._write("zz_broken.json", "{")
+        self.assertFalse(self.loader.reload_if_changed())
+        self.assertIn("zz_broken.json", self.loader.load_error)
+        self.assertIs(get_rule_set(), active)
+        self.assertFalse(self.loader.reload_if_changed())    # 同じ壊れたファイルは読み直さない
+        os.remove(os.path.join(self.tmpdir.name, "zz_broken.json"))
+        self.assertTrue(self.loader.reload_if_changed())
+        self.assertIsNone(self.loader.load_error)
+
+    def test_stage_cache_is_not_stale_after_reload(self):
+        cache = StageCache()
+        request = _request("下請けを買い叩く")
+        self.assertEqual(build_decision_report(request, cache=cache)["status"], "ok")
+        self._write("finance.json", _FINANCE)
+        self.loader.reload()
+        self.assertEqual(build_decision_report(request, cache=cache)["status"], "blocked")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,11 @@ DECISION_BRIEF_V0 スキーマと build_decision_report の実際の出力が
 また、validate_request() の動作も網羅的にテストする。
 """
 
+import io
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
 
 from aicw import (
@@ -15,6 +20,14 @@ from aicw import (
     DECISION_REQUEST_V0,
     validate_request,
 )
+from aicw.decision import build_validated_report
+from aicw.schema import (
+    BriefSampler,
+    compile_request_validator,
+    validate_brief,
+    validate_and_normalize,
+    validate_many,
+)
 
 
 # スキーマから known reason code セットを取得
@@ -325,5 +338,178 @@ class TestDecisionBriefSchema(unittest.TestCase):
         self.assertTrue(any("beneficiaries" in e for e in errors))
 
 
+class TestCompiledValidator(unittest.TestCase):
+    """コンパイル済みバリデータ / validate_many / 正規化高速経路のテスト"""
+
+    _SCRIPT = os.path.join(os.path.dirname(__file__), "..", "scripts", "validate_request.py")
+
+    def test_error_order_is_stable(self):
+        errors = validate_request({"zzz": 1, "options": "x", "situaton": "a", "constraints": 1})
+        self.assertEqual([
+            "必須フィールドが不足: 'situation'",
+            "'constraints' はリスト型が必要です（現在: int）",
+            "'options' はリスト型が必要です（現在: str）",
+            "不明なフィールド: 'situaton' → もしかして 'situation' ?",
+        ], errors[:4])
+        self.assertTrue(errors[4].startswith("不明なフィールド: 'zzz'"))
+
+    def test_compiled_matches_default(self):
+        validate = compile_request_validator(DECISION_REQUEST_V0)
+        for data in ({"situation": "x"}, {"situation": 1}, [], {"asker_status": 3}):
+            self.assertEqual(validate_request(data), validate(data))
+
+    def test_asker_status_type_is_not_checked(self):
+        self.assertEqual([], validate_request({"situation": "x", "asker_status": 3}))
+
+    def test_validate_and_normalize(self):
+        errors, normalized = validate_and_normalize(
+            {"situation": "x", "constraints": ["安全", 1], "asker_status": "CEO"}
+        )
+        self.assertEqual([], errors)
+        self.assertEqual(
+            {"situation": "x", "constraints": ["安全", "1"], "asker_status": "CEO"}, normalized
+        )
+        errors, normalized = validate_and_normalize({"situation": "x", "options": "A"})
+        self.assertIsNone(normalized)
+        self.assertEqual(validate_request({"situation": "x", "options": "A"}), errors)
+
+    def test_build_validated_report_matches(self):
+        req = {"situation": "障害対応の方針", "constraints": ["安全"], "options": ["A", "B"]}
+        errors, report = build_validated_report(req)
+        self.assertEqual([], errors)
+        self.assertEqual(build_decision_report(req), report)
+        errors, report = build_validated_report({"constraints": ["安全"]})
+        self.assertIsNone(report)
+        self.assertTrue(errors)
+
+    def test_validate_many_reports_line_and_offset(self):
+        lines = [
+            b'{"situation": "a"}\n',
+            b"\n",
+            b'{"situaton": "b"}\n',
+            b"{broken\n",
+        ]
+        results = list(validate_many(io.BytesIO(b"".join(lines))))
+        self.assertEqual([1, 3, 4], [r[0] for r in results])
+        self.assertEqual([0, len(lines[0]) + 1, len(lines[0]) + 1 + len(lines[2])],
+                         [r[1] for r in results])
+        self.assertEqual([], results[0][2])
+        self.assertTrue(any("situation" in e for e in results[1][2]))
+        self.assertEqual(1, len(results[2][2]))
+
+    def test_cli_jsonl(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "requests.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write('{"situation": "a"}\n{"situation": 1}\n')
+            p = subprocess.run(
+                [sys.executable, self._SCRIPT, "--jsonl", path], capture_output=True, text=True
+            )
+            self.assertEqual(1, p.returncode, msg=p.stderr)
+            self.assertIn("line 2 (offset 19):", p.stdout)
+            self.assertIn("checked=2 invalid=1", p.stdout)
+            p = subprocess.run(
+                [sys.executable, self._SCRIPT, "--jsonl", os.path.join(tmp, "missing.jsonl")],
+                capture_output=True, text=True,
+            )
+            self.assertEqual(2, p.returncode)
+
+
+class TestBriefValidator(unittest.TestCase):
+    """validate_brief() / BriefSampler のテスト"""
+
+    def setUp(self):
+        self.ok = build_decision_report({"situation": "障害対応の方針を決めたい", "constraints": ["安全"]})
+        self.blocked = build_decision_report({"situation": "連絡先は test@example.com です"})
+
+    def test_generated_reports_pass(self):
+        self.assertEqual([], validate_brief(self.ok))
+        self.assertEqual([], validate_brief(self.blocked))
+        self.assertEqual([], validate_brief(build_decision_report({"situation": "競合他社を支配して市場を独占したい"})))
+
+    def test_status_enum(self):
+        errors = validate_brief({**self.ok, "status": "maybe"})
+        self.assertEqual(1, len(errors))
+        self.assertIn("'status'", errors[0])
+
+    def test_required_if(self):
+        report = dict(self.ok)
+        del report["selection"]
+        self.assertIn("status == ok のとき必須のフィールドが不足: 'selection'", validate_brief(report))
+        report = dict(self.blocked)
+        del report["safe_alternatives"]
+        self.assertIn("status == blocked のとき必須のフィールドが不足: 'safe_alternatives'", validate_brief(report))
+
+    def test_existence_enums(self):
+        ea = {**self.ok["existence_analysis"], "question_3_judgment": "destroy", "distortion_risk": "extreme"}
+        errors = validate_brief({**self.ok, "existence_analysis": ea})
+        self.assertTrue(any("question_3_judgment" in e for e in errors))
+        self.assertTrue(any("distortion_risk" in e for e in errors))
+
+    def test_blocked_by_value(self):
+        errors = validate_brief({**self.blocked, "blocked_by": "#9 Unknown"})
+        self.assertTrue(any("blocked_by" in e for e in errors))
+
+    def test_reason_code_membership(self):
+        selection = {**self.ok["selection"], "reason_codes": ["SAFETY_FIRST", "MADE_UP"]}
+        errors = validate_brief({**self.ok, "selection": selection})
+        self.assertEqual(["未登録の reason code: 'selection.reason_codes' に 'MADE_UP'"], errors)
+        candidates = [dict(c) for c in self.ok["candidates"]]
+        candidates[1]["not_selected_reason_code"] = "NOPE"
+        errors = validate_brief({**self.ok, "candidates": candidates})
+        self.assertEqual(1, len(errors))
+        self.assertIn("candidates[1].not_selected_reason_code", errors[0])
+
+    def test_item_types(self):
+        errors = validate_brief({**self.ok, "next_questions": ["質問", 3]})
+        self.assertEqual(["'next_questions[1]' の型が不正です（現在: int）"], errors)
+        errors = validate_brief({**self.ok, "impact_map": None})
+        self.assertTrue(any("'impact_map' は文字列型" in e for e in errors))
+
+    def test_sampler_validates_one_in_n(self):
+        sampler = BriefSampler(every=3)
+        results = [sampler.observe(self.ok) for _ in range(7)]
+        self.assertEqual([None, None, [], None, None, []], results[:6])
+        sampler.observe({"status": "broken"})  # 8 件目（検査されない）
+        sampler.observe({"status": "broken"})  # 9 件目（検査される）
+        stats = sampler.stats()
+        self.assertEqual(9, stats["seen"])
+        self.assertEqual(3, stats["validated"])
+        self.assertEqual(1, stats["failed"])
+        self.assertEqual(1, sum(stats["errors"].values()))
+        sampler.reset()
+        self.assertEqual(0, sampler.stats()["seen"])
+
+    def test_sampler_counts_are_exact_across_threads(self):
+        import threading
+
+        sampler = BriefSampler(every=2, validator=lambda report: ["e"])
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [
+                threading.Thread(target=lambda: [sampler.observe({}) for _ in range(2000)])
+                for _ in range(8)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            sys.setswitchinterval(interval)
+        stats = sampler.stats()
+        self.assertEqual(16000, stats["seen"])
+        self.assertEqual(8000, stats["validated"])
+        self.assertEqual(8000, stats["failed"])
+        self.assertEqual({"e": 8000}, stats["errors"])
+
+    def test_sampler_disabled(self):
+        sampler = BriefSampler(every=0)
+        self.assertIsNone(sampler.observe({"status": "broken"}))
+        self.assertEqual(0, sampler.stats()["validated"])
+        with self.assertRaises(ValueError):
+            BriefSampler(every=-1)
+
+
 if __name__ == "__main__":
     unittest.main()
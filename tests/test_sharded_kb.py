@@ -0,0 +1,196 @@
+"""tests/test_sharded_kb.py — ShardedKnowledgeBase のユニットテスト"""
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+from aicw.knowledge_base import KnowledgeBase
+from aicw.sharded_kb import ShardedKnowledgeBase
+
+
+class ShardedTestBase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+class TestIsolation(ShardedTestBase):
+
+    def test_tenants_do_not_evict_each_other(self):
+        skb = ShardedKnowledgeBase(max_entries=3)
+        for i in range(5):
+            skb.record("team-a", f"a{i}", "ok", ["SAFETY_FIRST"])
+        skb.record("team-b", "b0", "ok", ["SAFETY_FIRST"])
+        self.assertEqual(skb.shard("team-a").count(), 3)
+        self.assertEqual(skb.shard("team-b").count(), 1)
+        hits = skb.find_similar("team-b", ["SAFETY_FIRST"], top_k=10)
+        self.assertEqual([h["decision_hash"] for h in hits], ["b0"])
+
+    def test_per_tenant_quota(self):
+        skb = ShardedKnowledgeBase(max_entries=2, quotas={"big": 10})
+        for i in range(6):
+            skb.record("big", f"h{i}", "ok", [])
+            skb.record("small", f"h{i}", "ok", [])
+        self.assertEqual(skb.shard("big").count(), 6)
+        self.assertEqual(skb.shard("small").count(), 2)
+        self.assertEqual(skb.quota("big"), 10)
+
+    def test_query_is_forwarded(self):
+        skb = ShardedKnowledgeBase()
+        skb.record("t", "h1", "blocked", [], "#6 Privacy")
+        skb.record("t", "h2", "blocked", [], "#4 Manipulation")
+        hits = skb.query("t", [], blocked_by="#6 Privacy")
+        self.assertEqual([h["decision_hash"] for h in hits], ["h1"])
+
+    def test_invalid_tenant_and_arguments(self):
+        skb = ShardedKnowledgeBase(self.root)
+        for bad in ["", "../x", ".hidden", "a/b", "x" * 65]:
+            with self.assertRaises(ValueError, msg=bad):
+                skb.shard(bad)
+        with self.assertRaises(ValueError):
+            ShardedKnowledgeBase(quotas={"t": 0})
+        with self.assertRaises(ValueError):
+            ShardedKnowledgeBase(max_loaded_shards=0)
+
+
+class TestLazyLoadAndEviction(ShardedTestBase):
+
+    def test_one_file_per_tenant(self):
+        skb = ShardedKnowledgeBase(self.root)
+        skb.record("team-a", "h1", "ok", [])
+        skb.record("team-b", "h2", "ok", [])
+        self.assertEqual(sorted(os.listdir(self.root)), ["team-a.json", "team-b.json"])
+        self.assertEqual(KnowledgeBase(path=os.path.join(self.root, "team-a.json")).count(), 1)
+
+    def test_shards_load_on_first_access(self):
+        ShardedKnowledgeBase(self.root).record("team-a", "h1", "ok", ["A"])
+        skb = ShardedKnowledgeBase(self.root)
+        self.assertEqual(skb.loaded_tenants(), [])
+        self.assertEqual(skb.tenants(), ["team-a"])
+        self.assertEqual(skb.shard("team-a").count(), 1)
+        self.assertEqual(skb.loaded_tenants(), ["team-a"])
+
+    def test_lru_eviction_keeps_data_on_disk(self):
+        skb = ShardedKnowledgeBase(self.root, max_loaded_shards=2)
+        skb.record("a", "h1", "ok", [])
+        skb.record("b", "h2", "ok", [])
+        skb.shard("a")                       # a を最新に
+        skb.record("c", "h3", "ok", [])      # 最古の b が外れる
+        self.assertEqual(skb.loaded_tenants(), ["a", "c"])
+        self.assertEqual(skb.evictions, 1)
+        self.assertEqual(skb.shard("b").all_entries()[0]["decision_hash"], "h2")
+        self.assertEqual(skb.loaded_tenants(), ["c", "b"])
+
+    def test_write_behind_shard_is_flushed_on_eviction(self):
+        skb = ShardedKnowledgeBase(self.root, max_loaded_shards=1,
+                                   write_behind=True, flush_interval=60)
+        skb.record("a", "h1", "ok", [])
+        self.assertEqual(os.listdir(self.root), [])
+        skb.record("b", "h2", "ok", [])      # a が外れる → 書き出し
+        self.assertEqual(os.listdir(self.root), ["a.json"])
+        self.assertEqual(skb.shard("a").count(), 1)
+        skb.flush()
+        self.assertEqual(sorted(os.listdir(self.root)), ["a.json", "b.json"])
+
+    def test_in_memory_shards_are_not_evicted(self):
+        skb = ShardedKnowledgeBase(max_loaded_shards=1)
+        skb.record("a", "h1", "ok", [])
+        skb.record("b", "h2", "ok", [])
+        self.assertEqual(skb.loaded_tenants(), ["a", "b"])
+        self.assertEqual(skb.shard("a").count(), 1)
+
+
+class TestAggregateStats(ShardedTestBase):
+
+    def test_counters_follow_quota_eviction(self):
+        skb = ShardedKnowledgeBase(self.root, max_entries=3, max_loaded_shards=1)
+        codes = [["A"], ["A", "B"], ["B"], ["C"], ["A", "C"]]
+        for i, c in enumerate(codes):
+            skb.record("t1", f"h{i}", "ok", c)
+            skb.record("t2", f"h{i}", "blocked" if i % 2 else "ok", [], None)
+        stats = skb.stats()
+        self.assertEqual(stats["per_tenant"]["t1"]["total"], 3)
+        self.assertEqual(dict(stats["top_reason_codes"]), {"A": 1, "B": 1, "C": 2})
+        self.assertEqual(stats["total"], 6)
+        self.assertEqual(stats["blocked_count"], 1)
+        # ディスクから数え直した値と一致する
+        fresh = ShardedKnowledgeBase(self.root, max_entries=3).stats()
+        for key in ("total", "ok_count", "blocked_count", "per_tenant"):
+            self.assertEqual(fresh[key], stats[key])
+
+    def test_counters_exact_under_concurrent_records(self):
+        skb = ShardedKnowledgeBase(self.root, max_entries=50, max_loaded_shards=2)
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+        def work(n):
+            for i in range(200):
+                skb.record(f"t{(n + i) % 3}", f"h{n}-{i}", "ok", ["A"])
+
+        try:
+            threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            sys.setswitchinterval(interval)
+        skb.flush()
+        stats = skb.stats()
+        self.assertLessEqual(stats["loaded_shards"], 2)
+        fresh = ShardedKnowledgeBase(self.root, max_entries=50).stats()
+        self.assertEqual(stats["total"], 150)
+        for key in ("total", "ok_count", "per_tenant", "top_reason_codes"):
+            self.assertEqual(fresh[key], stats[key])
+
+    def test_search_while_recording(self):
+        skb = ShardedKnowledgeBase(max_entries=20)
+        errors = []
+        stop = threading.Event()
+
+        def write():
+            i = 0
+            while not stop.is_set():
+                skb.record(f"t{i % 2}", f"h{i}", "blocked", ["A"], "#6 Privacy")
+                i += 1
+
+        def read():
+            while not stop.is_set():
+                try:
+                    for tenant in ("t0", "t1"):
+                        skb.find_similar(tenant, ["A"], top_k=5)
+                        skb.query(tenant, ["A"], top_k=5, blocked_by="#6 Privacy")
+                except Exception as e:  # pragma: no cover - 失敗時のみ
+                    errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        threads = [threading.Thread(target=write)]
+        threads += [threading.Thread(target=read) for _ in range(2)]
+        try:
+            for t in threads:
+                t.start()
+            stop.wait(0.5)
+            stop.set()
+            for t in threads:
+                t.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(errors[:3], [])
+
+    def test_stats_include_tenants_on_disk_without_loading(self):
+        ShardedKnowledgeBase(self.root).record("x", "h1", "ok", ["SAFETY_FIRST"])
+        skb = ShardedKnowledgeBase(self.root)
+        stats = skb.stats()
+        self.assertEqual(stats["tenants"], 1)
+        self.assertEqual(stats["top_reason_codes"], [("SAFETY_FIRST", 1)])
+        self.assertEqual(stats["loaded_shards"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""tests/test_stage_cache.py — StageCache と build_decision_report(cache=...) のテスト"""
+import random
+import unittest
+
+from aicw.decision import _EXISTENCE_VOCABULARY, _REPORT_HEAD, build_decision_report, format_report
+from aicw.safety import MANIPULATION_KEYWORDS
+from aicw.keyword_matcher import KeywordMatcher
+from aicw.stage_cache import StageCache
+
+_WORDS = [
+    "安全", "期限", "破壊", "終了", "リスク", "排除", "家族", "環境", "自由", "判断",
+    "品質", "至急", "拡散", "絶対に", "顧客", "廃止", "乗っ取る", "通常の作業",
+    "連絡先 a@example.com", "token",
+]
+
+
+def _random_request(rng):
+    def text(n):
+        return "".join(rng.choice(_WORDS) + "。" for _ in range(n))
+    return {
+        "situation": text(rng.randint(0, 6)),
+        "constraints": [text(1) for _ in range(rng.randint(0, 3))],
+        "options": [text(1) for _ in range(rng.randint(0, 3))],
+        "beneficiaries": [rng.choice(_WORDS) for _ in range(rng.randint(0, 2))],
+        "affected_structures": [rng.choice(["社会", "関係"]) for _ in range(rng.randint(0, 2))],
+    }
+
+
+class TestStageCache(unittest.TestCase):
+
+    def test_hits_and_misses_per_stage(self):
+        cache = StageCache()
+        calls = []
+        fn = lambda *a: calls.append(a) or len(calls)
+        self.assertEqual(cache.run("s", fn, "x", ["a"]), 1)
+        self.assertEqual(cache.run("s", fn, "x", ["a"]), 1)   # list は内容でキー化
+        self.assertEqual(cache.run("t", fn, "x", ["a"]), 2)   # 段ごとに別の表
+        self.assertEqual(calls, [("x", ["a"]), ("x", ["a"])])
+        self.assertEqual(cache.stats()["s"], {"hits": 1, "misses": 1, "size": 1})
+
+    def test_lru_per_stage(self):
+        cache = StageCache(max_entries=2)
+        cache.run("s", str.upper, "a")
+        cache.run("s", str.upper, "b")
+        cache.run("s", str.upper, "a")      # a を最新に
+        cache.run("s", str.upper, "c")      # b が外れる
+        cache.run("s", str.upper, "a")
+        cache.run("s", str.upper, "b")
+        self.assertEqual(cache.stats()["s"], {"hits": 2, "misses": 4, "size": 2})
+        cache.clear()
+        self.assertEqual(cache.stats(), {})
+        with self.assertRaises(ValueError):
+            StageCache(max_entries=0)
+
+    def test_scan_union_matches_joined_text(self):
+        matcher = KeywordMatcher(["安全", "全体", "リスク"])
+        cache = StageCache()
+        texts = ["安全", "体制", "リスク管理"]
+        self.assertEqual(cache.scan_union("scan", matcher, texts),
+                         frozenset(kw for kw in ["安全", "リスク"]))
+        self.assertEqual(cache.stats()["scan"]["misses"], 3)
+
+    def test_existence_vocabulary_has_no_spaces(self):
+        # フィールド単位の照合が空白連結テキストの照合と一致する前提
+        self.assertFalse([kw for kw in _EXISTENCE_VOCABULARY if " " in kw])
+
+
+class TestIncrementalDecisionReport(unittest.TestCase):
+
+    def test_random_single_field_edits_match_full_run(self):
+        rng = random.Random(0)
+        cache = StageCache(max_entries=8)
+        request = _random_request(rng)
+        statuses = set()
+        for _ in range(400):
+            field = rng.choice(list(request))
+            request = dict(request, **{field: _random_request(rng)[field]})
+            expected = build_decision_report(request)
+            self.assertEqual(build_decision_report(request, cache=cache), expected)
+            statuses.add(expected.get("blocked_by", "ok"))
+        self.assertEqual(statuses, {"ok", "#6 Privacy", "#5 Existence Ethics", "#4 Manipulation"})
+
+    def test_constraint_edit_reuses_situation_scan(self):
+        cache = StageCache()
+        request = {"situation": "新規事業への参入可否を判断したい。顧客の安全を守る。",
+                   "constraints": ["法令遵守"]}
+        build_decision_report(request, cache=cache)
+        before = cache.stats()
+        build_decision_report(dict(request, constraints=["期限厳守"]), cache=cache)
+        after = cache.stats()
+        self.assertEqual(after["recommendation"]["misses"], before["recommendation"]["misses"] + 1)
+        # situation のフィールド照合は再利用、制約のみ新たに照合
+        self.assertEqual(after["rule_scan"]["misses"], before["rule_scan"]["misses"] + 1)
+        self.assertGreater(after["rule_scan"]["hits"], before["rule_scan"]["hits"])
+
+    def test_constraint_edit_hits_situation_level_stages(self):
+        cache = StageCache()
+        request = {"situation": "規則を守るべきだが、成果を最大化したい。顧客の安全を守る。" * 50,
+                   "constraints": ["法令遵守"]}
+        build_decision_report(request, cache=cache)
+        before = cache.stats()
+        edited = dict(request, constraints=["期限厳守"])
+        self.assertEqual(build_decision_report(edited, cache=cache), build_decision_report(edited))
+        after = cache.stats()
+        # situation・既定の選択肢は再走査せず、変わった制約・説明文・出力の残りだけを走査する
+        for stage, new_fields in [("guard", 1), ("philosophy", 1), ("manipulation", 1)]:
+            self.assertEqual(after[stage]["misses"] - before[stage]["misses"], new_fields, stage)
+            self.assertGreater(after[stage]["hits"], before[stage]["hits"], stage)
+
+    def test_report_head_is_fixed(self):
+        report = build_decision_report({"situation": "体制を見直す"})
+        self.assertTrue(format_report(report).startswith(_REPORT_HEAD + "体制を見直す\n"))
+        self.assertFalse([kw for kw in MANIPULATION_KEYWORDS if kw in _REPORT_HEAD])
+
+    def test_cached_report_is_not_shared(self):
+        cache = StageCache()
+        request = {"situation": "チームの判断を整理したい", "constraints": ["品質"]}
+        first = build_decision_report(request, cache=cache)
+        first["existence_analysis"]["question_2_affected_structures"].append("改変")
+        first["selection"]["reason_codes"].append("改変")
+        self.assertEqual(build_decision_report(request, cache=cache),
+                         build_decision_report(request))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+tests/test_startup.py
+
+起動時間対策（遅延 import / 遅延コンパイル）のテスト
+
+- `import aicw` / `import aicw.schema` が重いサブモジュールを読み込まないこと
+- `import aicw.decision` が rule_packs / context_compress などと重い標準ライブラリ
+  （dataclasses → inspect、json など）を読み込まないこと（起動時間の退行検知）
+- 公開 API は従来どおり `from aicw import ...` で取得できること
+- scripts/bench_startup.py の importtime 解析
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+import aicw
+from scripts.bench_startup import _top_level_times
+
+
+def _loaded_after(code: str) -> list:
+    """新しいインタプリタで code を実行し、読み込まれた aicw / bridge モジュールを返す。"""
+    probe = (
+        code
+        + "\nimport json, sys\n"
+        + "print(json.dumps(sorted(m for m in sys.modules"
+        + " if m.split('.')[0] in ('aicw', 'bridge'))))"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = _ROOT
+    out = subprocess.run(
+        [sys.executable, "-c", probe],
+        capture_output=True, text=True, env=env, cwd=_ROOT, check=True,
+    ).stdout
+    return json.loads(out)
+
+
+class TestLazyPackage(unittest.TestCase):
+
+    def test_import_package_loads_no_submodule(self):
+        self.assertEqual(_loaded_after("import aicw"), ["aicw"])
+
+    def test_import_schema_does_not_load_decision(self):
+        loaded = _loaded_after("import aicw.schema")
+        self.assertIn("aicw.schema", loaded)
+        self.assertNotIn("aicw.decision", loaded)
+        self.assertNotIn("aicw.safety", loaded)
+
+    def test_import_decision_defers_dependencies(self):
+        loaded = _loaded_after("import aicw.decision")
+        self.assertEqual(loaded, ["aicw", "aicw.decision", "aicw.philosophy_check"])
+
+    def test_import_decision_does_not_load_heavy_stdlib(self):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = _ROOT
+        heavy = ("dataclasses", "inspect", "json", "copy", "hashlib", "threading")
+        out = subprocess.run(
+            [sys.executable, "-c",
+             "import sys, aicw.decision\n"
+             f"print([m for m in {heavy!r} if m in sys.modules])"],
+            capture_output=True, text=True, env=env, cwd=_ROOT, check=True,
+        ).stdout.strip()
+        self.assertEqual(out, "[]")
+
+    def test_first_report_loads_rules_on_demand(self):
+        loaded = _loaded_after("from aicw.decision import build_decision_report\n"
+                               "build_decision_report({'situation': 'x'})")
+        self.assertIn("aicw.rule_packs", loaded)
+        self.assertNotIn("aicw.context_compress", loaded)
+
+    def test_attribute_access_loads_on_demand(self):
+        loaded = _loaded_after("from aicw import validate_request")
+        self.assertEqual(loaded, ["aicw", "aicw.schema"])
+
+    def test_public_names_resolve(self):
+        from aicw.decision import build_decision_report
+        from aicw.schema import DECISION_REQUEST_V0
+        self.assertIs(aicw.build_decision_report, build_decision_report)
+        self.assertIs(aicw.DECISION_REQUEST_V0, DECISION_REQUEST_V0)
+        for name in aicw.__all__:
+            self.assertTrue(hasattr(aicw, name), name)
+
+    def test_dir_lists_public_names(self):
+        self.assertTrue(set(aicw.__all__) <= set(dir(aicw)))
+
+    def test_unknown_attribute_raises(self):
+        with self.assertRaises(AttributeError):
+            getattr(aicw, "no_such_name")
+
+    def test_bridge_import_does_not_load_thread_pool(self):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = _ROOT
+        out = subprocess.run(
+            [sys.executable, "-c",
+             "import sys, bridge.po_core_bridge as b\n"
+             "print('concurrent.futures' in sys.modules, b._TENSOR_MATCHER is None)"],
+            capture_output=True, text=True, env=env, cwd=_ROOT, check=True,
+        ).stdout.split()
+        self.assertEqual(out, ["False", "True"])
+
+
+class TestBenchStartupParser(unittest.TestCase):
+
+    def test_top_level_times(self):
+        stderr = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        100 |     _typing",
+            "import time:       300 |        400 |   typing",
+            "import time:       200 |        600 | aicw",
+            "import time:        50 |        650 | aicw.schema",
+        ])
+        self.assertEqual(_top_level_times(stderr), {"aicw": 600, "aicw.schema": 650})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+"""tests/test_trends.py — ReasonCodeTrends（reason code の時系列集計）のテスト"""
+import csv
+import io
+import json
+import random
+import sys
+import threading
+import unittest
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from itertools import combinations
+
+from aicw.audit_log import AuditLog
+from aicw.knowledge_base import KnowledgeBase
+from aicw.trends import ReasonCodeTrends
+
+_BASE = datetime(2026, 3, 1, tzinfo=timezone.utc)
+_CODES = ["SAFETY_FIRST", "SPEED_FIRST", "EXISTENCE_IMPACT_OVERRIDE",
+          "PHILO_TELEOLOGY", "PHILO_KANT", "PHILO_MILL"]
+
+
+def _entries(n, seed=0):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        ts = _BASE + timedelta(seconds=rng.randint(0, 86400 * 10))
+        status = rng.choice(["ok", "ok", "blocked"])
+        out.append({
+            "decision_hash": "h",
+            "status": status,
+            "reason_codes": sorted(rng.sample(_CODES, rng.randint(0, 4))) if status == "ok" else [],
+            "blocked_by": None if status == "ok" else "#6 Privacy",
+            "timestamp_utc": ts.isoformat(),
+        })
+    return out
+
+
+class TestAggregates(unittest.TestCase):
+
+    def setUp(self):
+        self.entries = _entries(1500)
+        self.trends = ReasonCodeTrends(timedelta(days=1))
+        # 時刻順でなくても取り込める
+        self.trends.extend(reversed(self.entries))
+
+    def _window(self, start, end):
+        return [e for e in self.entries if start <= e["timestamp_utc"] < end]
+
+    def test_buckets_match_brute_force(self):
+        buckets = self.trends.buckets()
+        self.assertEqual(buckets[0]["start"], _BASE.isoformat())
+        self.assertEqual(sum(b["total"] for b in buckets), len(self.entries))
+        for b in buckets:
+            end = (datetime.fromisoformat(b["start"]) + timedelta(days=1)).isoformat()
+            window = self._window(b["start"], end)
+            self.assertEqual(b["total"], len(window))
+            self.assertEqual(b["blocked"], sum(e["status"] == "blocked" for e in window))
+            self.assertEqual(b["codes"], dict(Counter(c for e in window for c in e["reason_codes"])))
+
+    def test_series_share(self):
+        series = self.trends.series("EXISTENCE_IMPACT_OVERRIDE", share=True)
+        counts = self.trends.series("EXISTENCE_IMPACT_OVERRIDE")
+        for (start, share), (_, n), b in zip(series, counts, self.trends.buckets()):
+            self.assertEqual(share, round(n / b["total"], 4))
+
+    def test_range_is_bucket_aligned(self):
+        start = (_BASE + timedelta(days=2, hours=5)).isoformat()
+        end = (_BASE + timedelta(days=4)).isoformat()
+        buckets = self.trends.buckets(start, end)
+        self.assertEqual([b["start"] for b in buckets],
+                         [(_BASE + timedelta(days=d)).isoformat() for d in (2, 3)])
+        expected = Counter(c for e in self._window((_BASE + timedelta(days=2)).isoformat(), end)
+                           for c in e["reason_codes"])
+        self.assertEqual(self.trends.totals(start, end), dict(expected))
+
+    def test_cooccurrence(self):
+        expected = Counter(pair for e in self.entries
+                           for pair in combinations(sorted(e["reason_codes"]), 2))
+        self.assertEqual(self.trends.cooccurrence(), dict(expected))
+        philo = self.trends.cooccurrence(prefix="PHILO_")
+        self.assertTrue(philo)
+        self.assertTrue(all(a.startswith("PHILO_") and b.startswith("PHILO_") for a, b in philo))
+        self.assertEqual(list(philo.values()), sorted(philo.values(), reverse=True))
+
+    def test_cooccurrence_matrix_is_symmetric(self):
+        names, matrix = self.trends.cooccurrence_matrix(["PHILO_KANT", "PHILO_MILL", "UNSEEN"])
+        self.assertEqual(names, ["PHILO_KANT", "PHILO_MILL", "UNSEEN"])
+        self.assertEqual(matrix[0][1], matrix[1][0])
+        self.assertEqual(matrix[0][1], self.trends.cooccurrence()[("PHILO_KANT", "PHILO_MILL")])
+        self.assertEqual(matrix[0][0], self.trends.totals()["PHILO_KANT"])
+        self.assertEqual(matrix[2], [0, 0, 0])
+
+    def test_origin_shifts_bucket_boundaries(self):
+        trends = ReasonCodeTrends(timedelta(days=7), origin="1970-01-05T00:00:00+00:00")
+        trends.extend(self.entries)
+        for b in trends.buckets():
+            self.assertEqual(datetime.fromisoformat(b["start"]).weekday(), 0)
+        with self.assertRaises(ValueError):
+            ReasonCodeTrends(timedelta(0))
+
+
+class TestSources(unittest.TestCase):
+
+    def test_watch_updates_on_every_record(self):
+        kb = KnowledgeBase()
+        trends = ReasonCodeTrends()
+        trends.watch(kb)
+        kb.record("h1", "ok", ["SAFETY_FIRST", "PHILO_KANT"])
+        kb.record("h2", "blocked", [], "#4 Manipulation")
+        self.assertEqual(sum(b["total"] for b in trends.buckets()), 2)
+        self.assertEqual(trends.cooccurrence(), {("PHILO_KANT", "SAFETY_FIRST"): 1})
+
+    def test_audit_entries(self):
+        log = AuditLog()
+        log.append("ok", reason_codes=["SAFETY_FIRST"])
+        log.append("blocked", blocked_by="#6 Privacy")
+        trends = ReasonCodeTrends(timedelta(hours=1))
+        trends.extend(log.query())
+        self.assertEqual(trends.totals(), {"SAFETY_FIRST": 1})
+        self.assertEqual(sum(b["blocked"] for b in trends.buckets()), 1)
+
+
+class TestConcurrency(unittest.TestCase):
+
+    def test_concurrent_add_and_query(self):
+        trends = ReasonCodeTrends(timedelta(hours=1))
+        entries = _entries(20000, seed=7)
+        errors = []
+        done = threading.Event()
+
+        def writer(chunk):
+            try:
+                trends.extend(chunk)
+            except Exception as e:  # pragma: no cover - 失敗時のみ
+                errors.append(e)
+
+        def reader():
+            try:
+                while not done.is_set():
+                    trends.to_json()
+                    trends.cooccurrence_matrix()
+            except Exception as e:  # pragma: no cover - 失敗時のみ
+                errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            writers = [threading.Thread(target=writer, args=(entries[i::4],)) for i in range(4)]
+            readers = [threading.Thread(target=reader) for _ in range(2)]
+            for t in writers + readers:
+                t.start()
+            for t in writers:
+                t.join()
+            done.set()
+            for t in readers:
+                t.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(errors, [])
+        self.assertEqual(sum(b["total"] for b in trends.buckets()), len(entries))
+        expected = Counter(c for e in entries for c in e["reason_codes"])
+        self.assertEqual(trends.totals(), dict(expected))
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.trends = ReasonCodeTrends()
+        self.trends.extend(_entries(200, seed=4))
+
+    def test_json_round_trip(self):
+        data = json.loads(json.dumps(self.trends.to_json()))
+        self.assertEqual(data["bucket_seconds"], 86400)
+        self.assertEqual(data["buckets"], self.trends.buckets())
+        self.assertEqual({(a, b): n for a, b, n in data["cooccurrence"]},
+                         self.trends.cooccurrence())
+
+    def test_csv_rows_sum_to_totals(self):
+        buf = io.StringIO()
+        self.trends.write_csv(buf)
+        rows = list(csv.DictReader(io.StringIO(buf.getvalue())))
+        per_code = Counter()
+        for row in rows:
+            if row["code"]:
+                per_code[row["code"]] += int(row["count"])
+        self.assertEqual(dict(per_code), self.trends.totals())
+        self.assertEqual(len({r["bucket_start"] for r in rows}), len(self.trends.buckets()))
+
+
+if __name__ == "__main__":
+    unittest.main()